@@ -2,38 +2,55 @@
   dashboard_alt.js
   - Demonstrates:
     1) Basic chart rendering with Chart.js (now includes all 6 charts)
-    2) Simulated metric updates (Energy, Tilt, Status)
+    2) Live metric updates (state, angles, water, dust, wind) pushed by the
+       Python DashboardServer; wind, dust and cleaning charts from /api/history
     3) Log table usage
     4) Quick action button handlers
 */
 
 document.addEventListener('DOMContentLoaded', () => {
-    // 1. METRICS SIMULATION
-    const energyOutput = document.getElementById('energyOutput');
+    // 1. LIVE METRICS (pushed by the Python DashboardServer over Server-Sent Events)
+    const TELEMETRY_URL = 'http://127.0.0.1:8765';
     const tiltAngle    = document.getElementById('tiltAngle');
+    const baseAngle    = document.getElementById('baseAngle');
+    const waterVolume  = document.getElementById('waterVolume');
+    const dustLevel    = document.getElementById('dustLevel');
+    const windSpeed    = document.getElementById('windSpeed');
     const systemStatus = document.getElementById('systemStatus');
     const logsBody     = document.getElementById('logsTable').querySelector('tbody');
+    const MAX_LOG_ROWS = 200;
   
-    function updateMetrics() {
-      const energy = (Math.random() * 10 + 5).toFixed(2) + ' kWh';
-      const tilt   = Math.floor(Math.random() * 41) + 10 + '°';
-      const statuses = ['Online', 'Optimizing', 'Maintenance', 'Error'];
-      const status   = statuses[Math.floor(Math.random() * statuses.length)];
+    // Latest state; 'state' events only carry the fields that changed
+    let systemState = {};
   
-      energyOutput.textContent = energy;
-      tiltAngle.textContent    = tilt;
-      systemStatus.textContent = status;
-  
-      addLogEntry(`Metrics updated: Energy=${energy}, Tilt=${tilt}, Status=${status}`);
+    function renderMetrics() {
+      if (systemState.tiltAngle !== undefined) {
+        tiltAngle.textContent = systemState.tiltAngle + '°';
+      }
+      if (systemState.baseAngle !== undefined) {
+        baseAngle.textContent = systemState.baseAngle + '°';
+      }
+      if (systemState.waterVolume !== undefined) {
+        waterVolume.textContent = systemState.waterVolume.toFixed(2) + ' L';
+      }
+      if (systemState.dust !== undefined) {
+        dustLevel.textContent = systemState.dust + ' %';
+      }
+      if (systemState.windSpeed !== undefined) {
+        windSpeed.textContent = systemState.windSpeed + ' m/s';
+      }
+      if (systemState.currentState !== undefined) {
+        systemStatus.textContent = systemState.currentState;
+      }
     }
   
-    function addLogEntry(msg) {
+    function addLogEntry(msg, timestamp) {
       const row   = document.createElement('tr');
       const time  = document.createElement('td');
       const event = document.createElement('td');
-      const now   = new Date().toLocaleTimeString();
+      const when  = timestamp ? new Date(timestamp * 1000) : new Date();
   
-      time.textContent  = now;
+      time.textContent  = when.toLocaleTimeString();
       event.textContent = msg;
   
       row.appendChild(time);
@@ -45,14 +62,41 @@ document.addEventListener('DOMContentLoaded', () => {
       } else {
         logsBody.appendChild(row);
       }
+      while (logsBody.children.length > MAX_LOG_ROWS) {
+        logsBody.removeChild(logsBody.lastChild);
+      }
     }
   
-    // Initial metrics + updates every 4 seconds
-    updateMetrics();
-    setInterval(updateMetrics, 4000);
+    const stream = new EventSource(TELEMETRY_URL + '/api/stream');
+  
+    stream.addEventListener('snapshot', (e) => {
+      systemState = JSON.parse(e.data).state;
+      renderMetrics();
+    });
+  
+    stream.addEventListener('state', (e) => {
+      const update = JSON.parse(e.data);
+      Object.assign(systemState, update.changes);
+      renderMetrics();
+      if (update.changes.currentState !== undefined) {
+        addLogEntry(`State changed to ${update.changes.currentState}`, update.t);
+      }
+    });
+  
+    stream.addEventListener('log', (e) => {
+      const event = JSON.parse(e.data);
+      addLogEntry(`[${event.source}] ${event.message}`, event.t);
+    });
+  
+    // EventSource reconnects on its own; just show that we're offline meanwhile
+    stream.onerror = () => {
+      systemStatus.textContent = 'Offline';
+    };
   
   
     // 2. CHART INITIALIZATIONS (Chart.js)
+    //    Energy, efficiency and sunlight have no telemetry source yet and keep
+    //    their sample data; wind, dust and cleanings are replaced by history.
     // ---------------------------------------------------
     // (A) ENERGY OUTPUT OVER TIME (Line Chart)
     // ---------------------------------------------------
@@ -146,7 +190,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // (D) WIND SPEED TRENDS (Line Chart)
     // ---------------------------------------------------
     const windCtx = document.getElementById('windSpeedChart').getContext('2d');
-    new Chart(windCtx, {
+    const windChart = new Chart(windCtx, {
       type: 'line',
       data: {
         labels: ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
@@ -176,7 +220,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // (E) DUST ACCUMULATION OVER TIME (Line or Bar)
     // ---------------------------------------------------
     const dustCtx = document.getElementById('dustChart').getContext('2d');
-    new Chart(dustCtx, {
+    const dustChart = new Chart(dustCtx, {
       type: 'line', // or 'bar', if you prefer
       data: {
         // Example: weekly dust accumulation (grams)
@@ -207,7 +251,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // (F) CLEANING ACTIVATIONS (Bar Chart)
     // ---------------------------------------------------
     const cleaningCtx = document.getElementById('cleaningChart').getContext('2d');
-    new Chart(cleaningCtx, {
+    const cleaningChart = new Chart(cleaningCtx, {
       type: 'bar',
       data: {
         // Example: times cleaned each day
@@ -231,7 +275,43 @@ document.addEventListener('DOMContentLoaded', () => {
       }
     });
   
-    
+
+    // ---------------------------------------------------
+    // HISTORY (hourly rollups of the last week from /api/history)
+    // ---------------------------------------------------
+    const HISTORY_SECONDS = 7 * 24 * 3600;
+    const HISTORY_POINTS  = 168;
+
+    function setSeries(chart, labels, data, label) {
+      chart.data.labels = labels;
+      chart.data.datasets[0].data = data;
+      chart.data.datasets[0].label = label;
+      chart.update();
+    }
+
+    function loadHistory() {
+      const end = Date.now() / 1000;
+      const url = `${TELEMETRY_URL}/api/history?start=${end - HISTORY_SECONDS}&end=${end}&points=${HISTORY_POINTS}`;
+      fetch(url)
+        .then((response) => (response.ok ? response.json() : null))
+        .then((history) => {
+          if (!history || history.rows.length === 0) {
+            return;  // no rollups configured yet: keep the sample charts
+          }
+          const rows   = history.rows;
+          const labels = rows.map((r) => new Date(r.timestamp * 1000).toLocaleString());
+          setSeries(windChart, labels, rows.map((r) => r.wind_speed_mean), 'Wind Speed (m/s)');
+          setSeries(dustChart, labels, rows.map((r) => r.dust_mean), 'Dust Level (%)');
+          setSeries(cleaningChart, labels,
+                    rows.map((r) => r.events_cleaning_wind + r.events_cleaning_water), '# of Cleanings');
+        })
+        .catch(() => {});  // server offline: the stream handler shows it
+    }
+
+    loadHistory();
+    setInterval(loadHistory, 5 * 60 * 1000);
+
+
     // 3. QUICK ACTIONS
     document.getElementById('startCleaningBtn').addEventListener('click', () => {
       alert('Cleaning process started. This may take a while...');
@@ -1,9 +1,25 @@
 from .actuator_controller import ActuatorController
 from .sensor_controller import SensorController
+from .sensor_bus import FakeBus, I2CBlockBus, SensorBus
 from .cleaning_controller import CleaningController
+from .sensor_history import SensorHistory
+from .sensor_filters import (FilterChain, HampelFilter, MedianFilter, RateLimitFilter,
+                             StuckSensorFilter, default_filter_chains)
+from .motion_planner import MotionPlanner
 
 __all__ = [
     "ActuatorController",
     "SensorController",
-    "CleaningController"
+    "SensorBus",
+    "FakeBus",
+    "I2CBlockBus",
+    "CleaningController",
+    "SensorHistory",
+    "FilterChain",
+    "HampelFilter",
+    "MedianFilter",
+    "RateLimitFilter",
+    "StuckSensorFilter",
+    "default_filter_chains",
+    "MotionPlanner",
 ]
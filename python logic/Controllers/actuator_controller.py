@@ -1,5 +1,13 @@
+import asyncio
+import threading
 import time
-import math
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from concurrent.futures import wait as wait_for_futures
+
+from hal.registry import resolve_backend
+from telemetry.events import INFO, get_event_bus
+
+from .motion_planner import shortest_azimuth_delta
 
 class ActuatorController:
     """
@@ -11,22 +19,51 @@ class ActuatorController:
     - The base rotates (body) only if the required tilt is out of range
       or if we have a large horizontal change (e.g., wind from an opposite direction).
 
-    Supports both 'simulated' (no actual motor movement)
-    and 'real' (GPIO/servo control) modes.
+    Motor commands go to an ActuatorDriver backend: the simulator (no actual
+    motor movement) in 'simulated' mode, the hardware stubs (or e.g. 'pwm'
+    servo control) in 'real' mode.
+
+    With a realtime driver each axis has its own worker thread, so the base
+    and the tilt move at the same time (see move_to() and start_move()) and
+    a reposition takes as long as the slower axis instead of both added up.
+    stop_actuators() cuts moves in progress short.
     """
 
-    def __init__(self, mode="simulated"):
+    AXES = ("base", "tilt")
+
+    def __init__(self, mode="simulated", events=None, metrics=None, driver=None,
+                 driver_options=None):
         """
         :param mode: 'simulated' or 'real'
+        :param events: (Optional) EventBus; defaults to the shared bus
+        :param metrics: (Optional) ControlLoopMetrics to count motor commands
+        :param driver: (Optional) ActuatorDriver or backend name ('simulator',
+                       'stub', 'pwm', 'recording'); defaults to the mode's backend
+        :param driver_options: (Optional) dict of keyword arguments for a named driver
         """
         self.mode = mode
+        self.events = events if events is not None else get_event_bus()
+        self.metrics = metrics
+        self.driver = resolve_backend("actuator", driver, mode, driver_options, events=self.events)
 
         # Track current angles
         self.current_base_angle = 0.0  # in degrees, range [0..360)
         self.current_tilt_angle = 0.0  # in degrees, range [0..90]
 
-        if self.mode == "real":
-            self._initialize_hardware()
+        # One worker thread per axis (created on the first realtime move),
+        # so moves of one axis run in order and never wait on the other axis
+        self._executors = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+        # Motion stats
+        self.repositions = 0
+        self.move_seconds = 0.0             # time spent repositioning
+        self.sequential_move_seconds = 0.0  # the same moves one axis after the other
+        self.cancelled_moves = 0
+        self.stopped_repositions = 0        # cut short by stop_actuators()
+        self.stopped_move_seconds = 0.0
+        self.last_move_duration = 0.0
 
     # ------------------------------------------------------
     # Public Methods (Existing)
@@ -35,41 +72,161 @@ class ActuatorController:
     def rotate_base_to(self, target_angle):
         """
         Rotates the base (azimuth) actuator to the specified angle [0..360).
-        In 'simulated' mode, just updates the variable.
-        In 'real' mode, commands the motor to move.
+        Returns the seconds the move took.
         """
-        target_angle = target_angle % 360
-
-        if self.mode == "simulated":
-            print(f"[Simulated] Rotating base from {self.current_base_angle}° to {target_angle}°")
-            self.current_base_angle = target_angle
-        else:
-            self._rotate_base_hardware(target_angle)
+        return self.wait_for_moves([self.start_move("base", target_angle)])
 
     def tilt_top_to(self, target_angle):
         """
         Tilts the top actuator (elevation) to the specified angle [0..90].
-        In 'simulated' mode, just updates the variable.
-        In 'real' mode, commands the motor.
+        Returns the seconds the move took.
         """
-        # Clamp angle to [0..90]
-        target_angle = max(0, min(target_angle, 90))
-
-        if self.mode == "simulated":
-            print(f"[Simulated] Tilting top from {self.current_tilt_angle}° to {target_angle}°")
-            self.current_tilt_angle = target_angle
-        else:
-            self._tilt_top_hardware(target_angle)
+        return self.wait_for_moves([self.start_move("tilt", target_angle)])
 
     def stop_actuators(self):
         """
         Immediately stops both actuators. Useful for manual overrides
-        or emergency stops.
+        or emergency stops. Moves in progress end where the axes stopped
+        (their angles are updated accordingly) and queued moves are dropped.
+        May be called from any thread.
+        """
+        if self.metrics is not None:
+            self.metrics.record_actuator_command("stop")
+        self.events.emit(INFO, "ActuatorController", "Stopping all actuators.", mode=self.mode)
+        with self._lock:
+            in_flight = list(self._in_flight)
+        for future in in_flight:
+            future.cancel()  # only succeeds for moves that haven't started
+        self.driver.stop()
+        # Interrupted moves return at once; wait so the angles are final
+        wait_for_futures([f for f in in_flight if not f.cancelled()])
+
+    def update(self):
+        """
+        Called once per tick by DecisionManager. Commands are never deferred
+        here, so there is nothing to issue (MotionPlanner issues its
+        rate-limited setpoints from its update()).
         """
-        if self.mode == "simulated":
-            print("[Simulated] Stopping all actuators.")
+        return None
+
+    # ------------------------------------------------------
+    # Concurrent Motion
+    # ------------------------------------------------------
+
+    def move_to(self, base_angle=None, tilt_angle=None):
+        """
+        Moves both axes at the same time and blocks until both arrive (or
+        stop_actuators() cuts the move short).
+
+        :param base_angle: (Optional) base target in degrees; None leaves it
+        :param tilt_angle: (Optional) tilt target in degrees; None leaves it
+        :return: seconds the reposition took (the slower axis)
+        """
+        moves = []
+        if base_angle is not None:
+            moves.append(self.start_move("base", base_angle))
+        if tilt_angle is not None:
+            moves.append(self.start_move("tilt", tilt_angle))
+        return self.wait_for_moves(moves)
+
+    def start_move(self, axis, target_angle):
+        """
+        Starts moving one axis ('base' or 'tilt') and returns a Future that
+        resolves to (angle reached, seconds taken, whether the target was
+        reached). With a realtime driver
+        the move runs in the axis' worker thread and this returns at once;
+        otherwise the move is complete when it returns.
+        """
+        if axis == "base":
+            target_angle = target_angle % 360
+            command, message = "rotate_base", "Rotating base from %s° to %s°"
+            current = self.current_base_angle
+        elif axis == "tilt":
+            # Clamp angle to [0..90]
+            target_angle = max(0, min(target_angle, 90))
+            command, message = "tilt_top", "Tilting top from %s° to %s°"
+            current = self.current_tilt_angle
         else:
-            self._stop_hardware()
+            raise ValueError(f"axis must be one of {self.AXES}")
+        if self.metrics is not None:
+            self.metrics.record_actuator_command(command)
+        self.events.emit(INFO, "ActuatorController", message, current, target_angle, mode=self.mode)
+
+        if not self.driver.realtime:
+            return _CompletedMove(self._run_move(axis, target_angle))
+
+        with self._lock:
+            executor = self._executors.get(axis)
+            if executor is None:
+                executor = self._executors[axis] = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"actuator-{axis}")
+            future = executor.submit(self._run_move, axis, target_angle)
+            self._in_flight.add(future)
+        future.add_done_callback(self._move_done)
+        return future
+
+    def wait_for_moves(self, moves):
+        """
+        Blocks until the given start_move() futures are done and records the
+        reposition in the motion stats. Returns its duration in seconds: the
+        slowest axis, since the axes move together. A reposition that
+        stop_actuators() cut short (or partly cancelled) is counted in
+        stopped_repositions instead of repositions.
+        """
+        duration = total = 0.0
+        finished = False
+        stopped = False
+        for move in moves:
+            try:
+                _, seconds, completed = move.result()
+            except CancelledError:
+                # Dropped before it started (possibly after the caller looked)
+                stopped = True
+                continue
+            total += seconds
+            if seconds > duration:
+                duration = seconds
+            finished = True
+            stopped = stopped or not completed
+        if not finished:
+            return 0.0
+        self.last_move_duration = duration
+        if stopped:
+            self.stopped_repositions += 1
+            self.stopped_move_seconds += duration
+            return duration
+        self.repositions += 1
+        self.move_seconds += duration
+        self.sequential_move_seconds += total
+        return duration
+
+    def motion_stats(self):
+        """
+        Time spent repositioning, and how much moving the axes together saved
+        over moving them one after the other (the time the panel is off-sun).
+        """
+        return {
+            "repositions": self.repositions,
+            "move_seconds": self.move_seconds,
+            "sequential_move_seconds": self.sequential_move_seconds,
+            "seconds_saved": self.sequential_move_seconds - self.move_seconds,
+            "mean_move_seconds": self.move_seconds / self.repositions if self.repositions else 0.0,
+            "cancelled_moves": self.cancelled_moves,
+            "stopped_repositions": self.stopped_repositions,
+            "stopped_move_seconds": self.stopped_move_seconds,
+        }
+
+    def close(self):
+        """
+        Stops the axis worker threads (after their current moves), then
+        closes the driver (e.g. releases its PWM pins).
+        """
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=True)
+        self.driver.close()
 
     # ------------------------------------------------------
     # New Helper Method for Sun Tracking (Neck vs. Body)
@@ -80,12 +237,21 @@ class ActuatorController:
         Moves the panel to align with the given sun azimuth and elevation.
         The top tilt (neck) tries to handle small vertical angles.
         The base (body) only rotates if the desired tilt is out of 0..90 range
-        OR if the horizontal difference is too large.
+        OR if the horizontal difference is too large. Both axes move at the
+        same time; returns the seconds the reposition took.
 
         :param desired_azimuth: 0..360 degrees (where the sun is horizontally)
         :param desired_elevation: the vertical angle of the sun in degrees
                                  (where 0 is horizontal, 90 is straight up).
         """
+        moves = self._plan_sun_move(desired_azimuth, desired_elevation)
+        return self.wait_for_moves([self.start_move(axis, target) for axis, target in moves])
+
+    def _plan_sun_move(self, desired_azimuth, desired_elevation):
+        """
+        The (axis, target) moves for move_panel_for_sun(), in command order.
+        """
+        moves = []
 
         # Step 1: Normalize angles
         desired_azimuth %= 360
@@ -96,15 +262,16 @@ class ActuatorController:
         # Our top tilt physically only supports 0..90
         if desired_elevation <= 90:
             # We can directly tilt to desired elevation (the "neck" can handle it)
-            self.tilt_top_to(desired_elevation)
+            moves.append(("tilt", desired_elevation))
 
             # Check how far the sun azimuth is from current_base_angle
             # If it's not drastically different, we can stay put. Otherwise rotate base.
-            azimuth_diff = abs(desired_azimuth - self.current_base_angle)
+            # (measured the short way around, so 359° vs 1° is 2°, not 358°)
+            azimuth_diff = abs(shortest_azimuth_delta(self.current_base_angle, desired_azimuth))
             # For example, if difference > 15 degrees, we rotate the base
             # You can choose a different threshold
             if azimuth_diff > 15:
-                self.rotate_base_to(desired_azimuth)
+                moves.append(("base", desired_azimuth))
 
         else:
             # desired_elevation is above 90 (e.g., 100..180).
@@ -125,48 +292,111 @@ class ActuatorController:
             new_elevation = max(0, min(new_elevation, 90))
 
             # Rotate base to opposite
-            self.rotate_base_to(opposite_azimuth)
+            moves.append(("base", opposite_azimuth))
             # Tilt top to new_elevation
-            self.tilt_top_to(new_elevation)
+            moves.append(("tilt", new_elevation))
+        return moves
 
     # ------------------------------------------------------
-    # Hardware-Specific (Stub or Real Implementation)
+    # Async Variants (hardware motor commands run in a worker thread)
     # ------------------------------------------------------
 
-    def _initialize_hardware(self):
-        """Set up GPIO pins, PWM signals, or motor driver connections."""
-        pass
+    async def rotate_base_to_async(self, target_angle):
+        """Non-blocking rotate_base_to()."""
+        if not self.driver.realtime:
+            return self.rotate_base_to(target_angle)
+        return await asyncio.to_thread(self.rotate_base_to, target_angle)
+
+    async def tilt_top_to_async(self, target_angle):
+        """Non-blocking tilt_top_to()."""
+        if not self.driver.realtime:
+            return self.tilt_top_to(target_angle)
+        return await asyncio.to_thread(self.tilt_top_to, target_angle)
 
-    def _rotate_base_hardware(self, target_angle):
-        """Command the base actuator from current_base_angle to target_angle."""
-        print(f"[Real] (Stub) Rotating base from {self.current_base_angle}° to {target_angle}°")
-        self.current_base_angle = target_angle
+    async def stop_actuators_async(self):
+        """Non-blocking stop_actuators()."""
+        if not self.driver.realtime:
+            return self.stop_actuators()
+        return await asyncio.to_thread(self.stop_actuators)
 
-    def _tilt_top_hardware(self, target_angle):
-        """Command the tilt actuator from current_tilt_angle to target_angle."""
-        print(f"[Real] (Stub) Tilting top from {self.current_tilt_angle}° to {target_angle}°")
-        self.current_tilt_angle = target_angle
+    async def update_async(self):
+        return None
 
-    def _stop_hardware(self):
-        """Immediately halt any motor movement."""
-        print("[Real] (Stub) Stopping hardware actuators.")
+    async def move_panel_for_sun_async(self, desired_azimuth, desired_elevation):
+        """Non-blocking move_panel_for_sun()."""
+        moves = self._plan_sun_move(desired_azimuth, desired_elevation)
+        return await self._wait_for_moves_async([self.start_move(axis, target) for axis, target in moves])
+
+    async def move_to_async(self, base_angle=None, tilt_angle=None):
+        """Non-blocking move_to(); the event loop awaits both axes' futures."""
+        moves = []
+        if base_angle is not None:
+            moves.append(self.start_move("base", base_angle))
+        if tilt_angle is not None:
+            moves.append(self.start_move("tilt", tilt_angle))
+        return await self._wait_for_moves_async(moves)
 
     # ------------------------------------------------------
-    # Utility Methods (if needed)
+    # Internal Helpers
     # ------------------------------------------------------
 
-    def _angle_to_duty_cycle(self, angle, servo_type='base'):
-        """
-        Convert angle to PWM duty cycle for your specific servo range.
-        This is just an example and depends on your servo specs.
-        """
-        if servo_type == 'base':
-            angle = angle % 360  # Wrap
-            duty_cycle = 2.5 + (angle / 360.0) * 10.0
-            return duty_cycle
-        elif servo_type == 'tilt':
-            # 0..90 => 2.5..7.0 duty cycle (example range)
-            duty_cycle = 2.5 + (angle / 90.0) * 4.5
-            return duty_cycle
+    async def _wait_for_moves_async(self, moves):
+        pending = [asyncio.wrap_future(move) for move in moves if not move.done()]
+        if pending:
+            await asyncio.wait(pending)
+        return self.wait_for_moves(moves)
+
+    def _run_move(self, axis, target_angle):
+        """Drives one axis (in its worker thread for realtime drivers)."""
+        driver = self.driver
+        start = time.perf_counter() if driver.realtime else 0.0
+        if axis == "base":
+            from_angle = self.current_base_angle
+            reached = driver.rotate_base(from_angle, target_angle)
         else:
-            return 0.0
+            from_angle = self.current_tilt_angle
+            reached = driver.tilt_top(from_angle, target_angle)
+
+        completed = reached is None
+        if completed:
+            reached = target_angle
+        else:
+            with self._lock:  # both axis workers may be cut short at once
+                self.cancelled_moves += 1
+        if axis == "base":
+            self.current_base_angle = reached
+        else:
+            self.current_tilt_angle = reached
+        # Modelled time if the driver has a slew model, else wall-clock time
+        # (instant for the plain simulator)
+        if driver.slew is not None:
+            return reached, driver.move_duration(axis, from_angle, reached), completed
+        return reached, time.perf_counter() - start if driver.realtime else 0.0, completed
+
+    def _move_done(self, future):
+        with self._lock:
+            self._in_flight.discard(future)
+
+
+class _CompletedMove:
+    """
+    Future-like result of a move that finished before start_move() returned
+    (drivers without realtime moves); much cheaper than a Future per tick.
+    """
+
+    __slots__ = ("_result",)
+
+    def __init__(self, result):
+        self._result = result
+
+    def result(self, timeout=None):
+        return self._result
+
+    def done(self):
+        return True
+
+    def cancelled(self):
+        return False
+
+    def cancel(self):
+        return False
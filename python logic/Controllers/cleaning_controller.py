@@ -1,4 +1,7 @@
-import time
+import asyncio
+
+from hal.registry import resolve_backend
+from telemetry.events import INFO, WARNING, get_event_bus
 
 class CleaningController:
     """
@@ -8,19 +11,30 @@ class CleaningController:
 
     Tracks water volume to ensure you don't exceed available supply
     (each cleaning consumes 0.125 L by default).
+
+    The pump and vibration motor are switched through a CleaningDriver
+    backend (the simulator in 'simulated' mode, the stubs or e.g. 'gpio'
+    in 'real' mode).
     """
 
-    def __init__(self, mode="simulated", initial_water_volume=2.0):
+    def __init__(self, mode="simulated", initial_water_volume=2.0, events=None, metrics=None,
+                 driver=None, driver_options=None):
         """
         :param mode: 'simulated' or 'real'
         :param initial_water_volume: in liters
+        :param events: (Optional) EventBus; defaults to the shared bus
+        :param metrics: (Optional) ControlLoopMetrics for water usage gauges
+        :param driver: (Optional) CleaningDriver or backend name ('simulator',
+                       'stub', 'gpio', 'recording'); defaults to the mode's backend
+        :param driver_options: (Optional) dict of keyword arguments for a named driver
         """
         self.mode = mode
+        self.events = events if events is not None else get_event_bus()
+        self.metrics = metrics
         self.water_volume = initial_water_volume
         self.water_usage_per_clean = 0.125  # liters per cleaning operation
-
-        if self.mode == "real":
-            self._initialize_hardware()
+        self.pump_run_time = 3  # seconds the pump runs per cleaning (hardware drivers)
+        self.driver = resolve_backend("cleaning", driver, mode, driver_options, events=self.events)
 
     # ------------------------------------------------------
     # Public Methods
@@ -34,16 +48,14 @@ class CleaningController:
         :param actuator_controller: Instance of ActuatorController
         :param wind_direction: angle in degrees (0-359)
         """
-        if self.mode == "simulated":
-            print(f"[Simulated] Tilting panel toward wind direction: {wind_direction}°")
-        else:
-            print(f"[Real] Tilting panel for wind cleaning, wind direction: {wind_direction}°")
+        self.events.emit(INFO, "CleaningController", "Tilting panel toward wind direction: %s°",
+                         wind_direction, mode=self.mode)
 
-        # Use the actuator's rotate_base_to, while tilt might remain at a minimal angle
+        # Rotate the base toward the wind, while tilt might remain at a minimal angle
         # or an angle that best exposes the panel to the wind. For simplicity, we'll
-        # rotate the base to wind_direction and keep tilt at 0.
-        actuator_controller.rotate_base_to(wind_direction)
-        actuator_controller.tilt_top_to(0)  # Example: fully flat to catch wind effectively
+        # rotate the base to wind_direction and keep tilt at 0 (fully flat to catch
+        # wind effectively). Both axes move at the same time.
+        actuator_controller.move_to(base_angle=wind_direction, tilt_angle=0)
 
     def clean_with_water(self):
         """
@@ -53,72 +65,79 @@ class CleaningController:
         """
         if self.water_volume < self.water_usage_per_clean:
             # Not enough water to clean
-            print("[CleaningController] Insufficient water for cleaning.")
+            self.events.emit(WARNING, "CleaningController", "Insufficient water for cleaning.", mode=self.mode)
+            self._record_cleaning(False)
             return False
 
         # If sufficient water, proceed with cleaning
         self.water_volume -= self.water_usage_per_clean
-
-        if self.mode == "simulated":
-            print(f"[Simulated] Activating water cleaning. Using {self.water_usage_per_clean} L.")
-            print(f"[Simulated] Remaining water volume: {self.water_volume:.3f} L")
-        else:
-            print("[Real] Activating water pump and vibration mechanism.")
-            # Trigger hardware
-            self._activate_water_pump()
-            self._activate_vibration()
-            # Example short run
-            time.sleep(3)  # Let the water flow for a short period
-            self._deactivate_water_pump()
-            self._deactivate_vibration()
-
-            print(f"[Real] Water cleaning completed. Remaining volume: {self.water_volume:.3f} L")
+        self._record_cleaning(True)
+
+        self.events.emit(INFO, "CleaningController",
+                         "Activating water cleaning. Using %s L. Remaining water volume: %.3f L",
+                         self.water_usage_per_clean, self.water_volume, mode=self.mode)
+        self.driver.set_pump(True)
+        self.driver.set_vibration(True)
+        try:
+            self.driver.wait(self.pump_run_time)  # Let the water flow for a short period
+        finally:
+            self.driver.set_pump(False)
+            self.driver.set_vibration(False)
+        self._log_completed()
 
         return True
 
     # ------------------------------------------------------
-    # Hardware-Specific (Stub or Real Implementation)
+    # Async Variants
     # ------------------------------------------------------
 
-    def _initialize_hardware(self):
+    async def tilt_for_wind_cleaning_async(self, actuator_controller, wind_direction):
         """
-        Setup pump, vibration motor (if any), and any relevant GPIO pins.
+        Non-blocking tilt_for_wind_cleaning().
         """
-        # Example pseudocode:
-        # import RPi.GPIO as GPIO
-        # GPIO.setmode(GPIO.BCM)
-        # GPIO.setup(PUMP_PIN, GPIO.OUT)
-        # GPIO.setup(VIBRATION_PIN, GPIO.OUT)
-        pass
-
-    def _activate_water_pump(self):
-        """
-        Turn on the water pump (GPIO HIGH or similar).
-        """
-        # Example:
-        # GPIO.output(PUMP_PIN, GPIO.HIGH)
-        print("[Real] (Stub) Water pump ON.")
+        self.events.emit(INFO, "CleaningController", "Tilting panel toward wind direction: %s°",
+                         wind_direction, mode=self.mode)
 
-    def _deactivate_water_pump(self):
-        """
-        Turn off the water pump (GPIO LOW or similar).
-        """
-        # Example:
-        # GPIO.output(PUMP_PIN, GPIO.LOW)
-        print("[Real] (Stub) Water pump OFF.")
+        await actuator_controller.move_to_async(base_angle=wind_direction, tilt_angle=0)
 
-    def _activate_vibration(self):
+    async def clean_with_water_async(self):
         """
-        Turn on any vibration mechanism to loosen dust.
+        Non-blocking clean_with_water(). The pump run time is awaited instead
+        of slept, so the control loop keeps ticking while the water flows.
+        If the task is cancelled mid-run, the pump and vibration are still
+        switched off.
         """
-        # Example:
-        # GPIO.output(VIBRATION_PIN, GPIO.HIGH)
-        print("[Real] (Stub) Vibration ON.")
+        if self.water_volume < self.water_usage_per_clean:
+            self.events.emit(WARNING, "CleaningController", "Insufficient water for cleaning.", mode=self.mode)
+            self._record_cleaning(False)
+            return False
 
-    def _deactivate_vibration(self):
-        """
-        Turn off the vibration mechanism.
-        """
-        # Example:
-        # GPIO.output(VIBRATION_PIN, GPIO.LOW)
-        print("[Real] (Stub) Vibration OFF.")
\ No newline at end of file
+        self.water_volume -= self.water_usage_per_clean
+        self._record_cleaning(True)
+
+        self.events.emit(INFO, "CleaningController",
+                         "Activating water cleaning. Using %s L. Remaining water volume: %.3f L",
+                         self.water_usage_per_clean, self.water_volume, mode=self.mode)
+        self.driver.set_pump(True)
+        self.driver.set_vibration(True)
+        try:
+            if self.driver.realtime:
+                await asyncio.sleep(self.pump_run_time)
+        finally:
+            self.driver.set_pump(False)
+            self.driver.set_vibration(False)
+        self._log_completed()
+
+        return True
+
+    def _record_cleaning(self, success):
+        """Report a cleaning attempt to the metrics (if enabled)."""
+        if self.metrics is not None:
+            used = self.water_usage_per_clean if success else 0.0
+            self.metrics.record_water_cleaning(success, used, self.water_volume)
+
+    def _log_completed(self):
+        # The simulator's pump run is instant, so only hardware runs report it
+        if self.driver.realtime:
+            self.events.emit(INFO, "CleaningController", "Water cleaning completed. Remaining volume: %.3f L",
+                             self.water_volume, mode=self.mode)
\ No newline at end of file
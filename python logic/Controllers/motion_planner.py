@@ -0,0 +1,278 @@
+import asyncio
+import threading
+import time
+
+
+def shortest_azimuth_delta(from_angle, to_angle):
+    """
+    Signed shortest rotation in degrees from from_angle to to_angle,
+    in the range [-180, 180). E.g. 359° -> 1° is +2°, not -358°.
+    """
+    return (to_angle - from_angle + 180) % 360 - 180
+
+
+class MotionPlanner:
+    """
+    Motion-planning layer in front of an ActuatorController.
+
+    It has the same public interface as ActuatorController, so it can be
+    passed to DecisionManager / CleaningController in its place, and it:
+      - measures azimuth error the short way around (wrap-aware),
+      - drops setpoints within a deadband of the current angle,
+      - applies hysteresis to the "sun behind the panel" base flip so the
+        base doesn't swing 180° back and forth around 90° elevation,
+      - rate-limits each axis; setpoints that arrive too soon are coalesced
+        (the newest wins) and issued once the interval has passed,
+      - drops repeated stop commands when nothing has moved since the last stop.
+
+    Every skipped command is counted; see stats().
+
+    stop_actuators() may be called from another thread (e.g. the override
+    listener's stop_all) while the control thread plans a move; the
+    planner state is guarded by a lock that is never held while a move
+    runs, so a stop is never kept waiting behind one.
+    """
+
+    AXES = ("base", "tilt")
+
+    def __init__(self, actuator_ctrl, base_deadband=1.0, tilt_deadband=1.0,
+                 sun_azimuth_threshold=15.0, flip_hysteresis=5.0,
+                 min_command_interval=0.0, clock=time.time):
+        """
+        :param actuator_ctrl: Instance of ActuatorController
+        :param base_deadband: base setpoints within this many degrees are dropped
+        :param tilt_deadband: tilt setpoints within this many degrees are dropped
+        :param sun_azimuth_threshold: azimuth error (degrees) before sun tracking
+                                      rotates the base (same role as the 15° in
+                                      ActuatorController.move_panel_for_sun)
+        :param flip_hysteresis: degrees above/below 90° elevation before the
+                                base flips to / back from the opposite side
+        :param min_command_interval: minimum seconds between commands per axis
+        :param clock: time source (injectable for tests/simulation)
+        """
+        self.actuator_ctrl = actuator_ctrl
+        self.mode = actuator_ctrl.mode
+        self.deadband = {"base": base_deadband, "tilt": tilt_deadband}
+        self.sun_azimuth_threshold = sun_azimuth_threshold
+        self.flip_hysteresis = flip_hysteresis
+        self.min_command_interval = min_command_interval
+        self.clock = clock
+
+        self._flipped = False
+        self._moved_since_stop = False
+        self._pending = {"base": None, "tilt": None}
+        self._last_command_time = {"base": float("-inf"), "tilt": float("-inf")}
+        self._started = []  # moves issued by the current call (run concurrently)
+        self._lock = threading.Lock()
+
+        # Counters
+        self.commands_issued = 0
+        self.skipped_deadband = 0
+        self.coalesced = 0
+        self.skipped_stops = 0
+        self.discarded = 0
+        self.base_travel = 0.0  # total degrees commanded
+        self.tilt_travel = 0.0
+
+    # ------------------------------------------------------
+    # ActuatorController-Compatible Interface
+    # ------------------------------------------------------
+
+    @property
+    def current_base_angle(self):
+        return self.actuator_ctrl.current_base_angle
+
+    @property
+    def current_tilt_angle(self):
+        return self.actuator_ctrl.current_tilt_angle
+
+    def rotate_base_to(self, target_angle):
+        """
+        Requests a base rotation. Returns True if a command was issued.
+        """
+        with self._lock:
+            issued = self._request("base", target_angle % 360)
+        self._finish()
+        return issued
+
+    def tilt_top_to(self, target_angle):
+        """
+        Requests a tilt. Returns True if a command was issued.
+        """
+        with self._lock:
+            issued = self._request("tilt", max(0, min(target_angle, 90)))
+        self._finish()
+        return issued
+
+    def move_to(self, base_angle=None, tilt_angle=None):
+        """
+        Requests both axes at once; the ones that get issued move together.
+        Returns the seconds the reposition took.
+        """
+        with self._lock:
+            if base_angle is not None:
+                self._request("base", base_angle % 360)
+            if tilt_angle is not None:
+                self._request("tilt", max(0, min(tilt_angle, 90)))
+        return self._finish()
+
+    def stop_actuators(self):
+        """
+        Stops both actuators and discards pending setpoints (counted in
+        stats()['discarded']). Skipped if no command was issued since the
+        last stop (nothing can be moving).
+        """
+        with self._lock:
+            self.discarded += sum(target is not None for target in self._pending.values())
+            self._pending = {"base": None, "tilt": None}
+            if not self._moved_since_stop:
+                self.skipped_stops += 1
+                return
+            self._moved_since_stop = False
+        self.actuator_ctrl.stop_actuators()
+
+    def move_panel_for_sun(self, desired_azimuth, desired_elevation):
+        """
+        Same geometry as ActuatorController.move_panel_for_sun(), with
+        wrap-aware azimuth error, deadbands, rate limits and a hysteresis
+        band around the 90° elevation flip.
+        """
+        desired_azimuth %= 360
+        desired_elevation = max(0, min(desired_elevation, 180))
+
+        with self._lock:
+            if not self._flipped and desired_elevation > 90 + self.flip_hysteresis:
+                self._flipped = True
+            elif self._flipped and desired_elevation < 90 - self.flip_hysteresis:
+                self._flipped = False
+
+            if not self._flipped:
+                self._request("tilt", min(desired_elevation, 90))
+                error = shortest_azimuth_delta(self.current_base_angle, desired_azimuth)
+                if abs(error) > self.sun_azimuth_threshold:
+                    self._request("base", desired_azimuth)
+            else:
+                self._request("base", (desired_azimuth + 180) % 360)
+                self._request("tilt", max(0, min(180 - desired_elevation, 90)))
+        return self._finish()
+
+    def update(self):
+        """
+        Issues any coalesced setpoints whose rate-limit interval has passed.
+        DecisionManager calls it once per tick, before the state handler, so
+        a deferred one-shot move (e.g. the wind-cleaning tilt) goes out as
+        soon as its axis is free.
+        """
+        with self._lock:
+            for axis in self.AXES:
+                target = self._pending[axis]
+                if target is not None and self._interval_elapsed(axis):
+                    self._pending[axis] = None
+                    self._issue(axis, target)
+        self._finish()
+
+    def close(self):
+        """Closes the wrapped ActuatorController (worker threads and driver)."""
+        self.actuator_ctrl.close()
+
+    def stats(self):
+        """
+        Returns command counters and commanded travel (a proxy for actuator wear).
+        """
+        with self._lock:
+            return {
+                "commands_issued": self.commands_issued,
+                "skipped_deadband": self.skipped_deadband,
+                "coalesced": self.coalesced,
+                "skipped_stops": self.skipped_stops,
+                "discarded": self.discarded,
+                "base_travel": self.base_travel,
+                "tilt_travel": self.tilt_travel,
+            }
+
+    # ------------------------------------------------------
+    # Async Variants
+    # ------------------------------------------------------
+
+    async def rotate_base_to_async(self, target_angle):
+        if not self.actuator_ctrl.driver.realtime:
+            return self.rotate_base_to(target_angle)
+        return await asyncio.to_thread(self.rotate_base_to, target_angle)
+
+    async def tilt_top_to_async(self, target_angle):
+        if not self.actuator_ctrl.driver.realtime:
+            return self.tilt_top_to(target_angle)
+        return await asyncio.to_thread(self.tilt_top_to, target_angle)
+
+    async def update_async(self):
+        if not self.actuator_ctrl.driver.realtime:
+            return self.update()
+        return await asyncio.to_thread(self.update)
+
+    async def stop_actuators_async(self):
+        if not self.actuator_ctrl.driver.realtime:
+            return self.stop_actuators()
+        return await asyncio.to_thread(self.stop_actuators)
+
+    async def move_panel_for_sun_async(self, desired_azimuth, desired_elevation):
+        if not self.actuator_ctrl.driver.realtime:
+            return self.move_panel_for_sun(desired_azimuth, desired_elevation)
+        return await asyncio.to_thread(self.move_panel_for_sun, desired_azimuth, desired_elevation)
+
+    async def move_to_async(self, base_angle=None, tilt_angle=None):
+        if not self.actuator_ctrl.driver.realtime:
+            return self.move_to(base_angle, tilt_angle)
+        return await asyncio.to_thread(self.move_to, base_angle, tilt_angle)
+
+    # ------------------------------------------------------
+    # Internal Helpers
+    # ------------------------------------------------------
+
+    def _finish(self):
+        """
+        Waits for the moves issued by this call (they run concurrently),
+        outside the lock so a stop from another thread can cut them short.
+        """
+        with self._lock:
+            started, self._started = self._started, []
+        if not started:
+            return 0.0
+        return self.actuator_ctrl.wait_for_moves(started)
+
+    def _error(self, axis, target):
+        if axis == "base":
+            return shortest_azimuth_delta(self.current_base_angle, target)
+        return target - self.current_tilt_angle
+
+    def _interval_elapsed(self, axis):
+        return self.clock() - self._last_command_time[axis] >= self.min_command_interval
+
+    # The helpers below run with self._lock held
+
+    def _request(self, axis, target):
+        if abs(self._error(axis, target)) <= self.deadband[axis]:
+            # Already there; a newer setpoint also supersedes any pending one
+            self._pending[axis] = None
+            self.skipped_deadband += 1
+            return False
+
+        if not self._interval_elapsed(axis):
+            if self._pending[axis] is not None:
+                self.coalesced += 1
+            self._pending[axis] = target
+            return False
+
+        self._pending[axis] = None
+        self._issue(axis, target)
+        return True
+
+    def _issue(self, axis, target):
+        travel = abs(self._error(axis, target))
+        self._started.append(self.actuator_ctrl.start_move(axis, target))
+        if axis == "base":
+            self.base_travel += travel
+        else:
+            self.tilt_travel += travel
+        self._last_command_time[axis] = self.clock()
+        self._moved_since_stop = True
+        self.commands_issued += 1
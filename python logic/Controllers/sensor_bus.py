@@ -0,0 +1,119 @@
+import time
+
+# Raw channels a bus can read (SensorController derives dust from power)
+RAW_CHANNELS = ("power", "wind_speed", "wind_direction", "ambient_temperature")
+
+
+class SensorBus:
+    """
+    Backend SensorController reads its channels through (see hal for the
+    registered backends). read() gets every requested channel in one
+    transaction, so a bus that can (e.g. an I2C block read or an ADC scan)
+    should group them.
+    """
+
+    # Channels this bus provides
+    channels = RAW_CHANNELS
+    # Reads cost real time, so SensorController caches them (see DEFAULT_TTL)
+    realtime = True
+
+    def read(self, channels):
+        """
+        :param channels: sequence of RAW_CHANNELS names
+        :return: dict {channel: value}
+        """
+        raise NotImplementedError
+
+    def read_channel(self, channel):
+        """One uncached channel on its own."""
+        return self.read((channel,))[channel]
+
+    def close(self):
+        pass
+
+
+class I2CBlockBus(SensorBus):
+    """
+    Reads every requested channel with one I2C block read from a sensor
+    hub (or ADC) that exposes them as consecutive 16-bit registers.
+    smbus2 is only imported when this bus is created.
+    """
+
+    def __init__(self, bus_number=1, address=0x48, layout=None):
+        """
+        :param bus_number: I2C bus (1 on a Raspberry Pi)
+        :param address: device address
+        :param layout: dict {channel: (register, scale)}; a register holds a
+                       signed big-endian word, value = word * scale
+        """
+        from smbus2 import SMBus
+
+        self.address = address
+        self.layout = layout or {
+            "power": (0x00, 0.1),
+            "wind_speed": (0x02, 0.01),
+            "wind_direction": (0x04, 0.1),
+            "ambient_temperature": (0x06, 0.01),
+        }
+        self.channels = tuple(self.layout)
+        self._bus = SMBus(bus_number)
+
+    def read(self, channels):
+        registers = [self.layout[c][0] for c in channels]
+        first = min(registers)
+        block = self._bus.read_i2c_block_data(self.address, first, max(registers) + 2 - first)
+        values = {}
+        for channel in channels:
+            register, scale = self.layout[channel]
+            offset = register - first
+            word = int.from_bytes(bytes(block[offset:offset + 2]), "big", signed=True)
+            values[channel] = word * scale
+        return values
+
+    def close(self):
+        self._bus.close()
+
+
+class FakeBus(SensorBus):
+    """
+    Stand-in bus for measuring read latency without hardware. Each read()
+    costs `transaction_latency` plus `channel_latency` per channel; with
+    grouped=False every channel is its own transaction, like separate
+    round-trips to each sensor.
+    """
+
+    def __init__(self, values=None, transaction_latency=0.002, channel_latency=0.0002,
+                 grouped=True, sleep=time.sleep):
+        """
+        :param values: dict {channel: value or callable returning one}
+        :param transaction_latency: seconds of fixed cost per transaction
+        :param channel_latency: seconds per channel read
+        :param grouped: read all requested channels in one transaction
+        :param sleep: how latency is spent (None: only count it in busy_seconds)
+        """
+        self.values = {"power": 250.0, "wind_speed": 0.0, "wind_direction": 0.0,
+                       "ambient_temperature": 25.0}
+        if values:
+            self.values.update(values)
+        self.transaction_latency = transaction_latency
+        self.channel_latency = channel_latency
+        self.grouped = grouped
+        self.sleep = sleep
+
+        self.transactions = 0
+        self.channel_reads = 0
+        self.busy_seconds = 0.0
+
+    def read(self, channels):
+        transactions = 1 if self.grouped else len(channels)
+        latency = transactions * self.transaction_latency + len(channels) * self.channel_latency
+        self.transactions += transactions
+        self.channel_reads += len(channels)
+        self.busy_seconds += latency
+        if self.sleep is not None and latency > 0:
+            self.sleep(latency)
+        values = {}
+        for channel in channels:
+            value = self.values[channel]
+            values[channel] = value() if callable(value) else value
+        return values
@@ -1,133 +1,233 @@
-import random
+import asyncio
+import threading
 import time
 
+from hal.registry import resolve_backend
+
+# Seconds a raw reading stays valid on a hardware bus. Shorter than the 2 s
+# tick, so each tick reads fresh values once and every later read in that
+# tick (e.g. wind direction for wind cleaning) comes from the same acquisition.
+DEFAULT_TTL = {
+    "power": 1.0,
+    "wind_speed": 1.0,
+    "wind_direction": 1.0,
+    "ambient_temperature": 60.0,
+}
+# Channels read every tick: set_tick_interval() keeps their TTL at half the tick
+TICK_CHANNELS = ("power", "wind_speed", "wind_direction")
+
 class SensorController:
     """
     Handles reading from wind, dust (indirectly), and wind direction sensors.
-    Can operate in 'simulated' mode or 'real' mode.
+    Readings come from a SensorBus backend: the simulator in 'simulated'
+    mode, the hardware stubs (or e.g. 'i2c') in 'real' mode.
     """
 
-    def __init__(self, mode="simulated"):
+    def __init__(self, mode="simulated", seed=None, power_model=None, actuator_ctrl=None,
+                 clock=time.time, bus=None, ttl=None, bus_options=None):
         """
         :param mode: 'simulated' or 'real'
+        :param seed: (Optional) seed for simulated readings, for reproducible runs
+        :param power_model: (Optional) ClearSkyPowerModel for the site; without it
+                            the expected power is a fixed 300 W
+        :param actuator_ctrl: (Optional) ActuatorController whose current angles
+                              give the panel orientation for the power model
+        :param clock: time source for the power model lookup and read caching
+        :param bus: (Optional) SensorBus or backend name ('simulator', 'stub',
+                    'i2c', 'fake', 'recording', 'replay'); defaults to the
+                    mode's backend (FakeBus measures latency)
+        :param ttl: (Optional) dict {channel: seconds a reading is reused}
+        :param bus_options: (Optional) dict of keyword arguments for a named bus
         """
         self.mode = mode
-        # For demonstration, you can tweak these ranges or formulas as needed
-        # in simulated mode:
-        self._simulated_wind_speed_min = 0.0
-        self._simulated_wind_speed_max = 25.0  # m/s
-        self._simulated_dust_min = 0.0
-        self._simulated_dust_max = 50.0  # up to 50% dust (for simulation)
-        self._last_wind_direction = 0    # store the last direction to mimic real sensors in sim
-
-        # If you need initialization for real sensors (GPIO setup, ADC config, etc.):
-        if self.mode == "real":
-            self._initialize_hardware()
+        self.power_model = power_model
+        self.actuator_ctrl = actuator_ctrl
+        self.clock = clock
+        self.bus = resolve_backend("sensor", bus, mode, bus_options, seed=seed, clock=clock)
+
+        # Reads over a hardware bus are cached per channel; simulated ones are not
+        self.ttl = dict(DEFAULT_TTL) if self.bus.realtime else {}
+        if ttl:
+            self.ttl.update(ttl)
+        self._dust_reported = "dust" in self.bus.channels
+        self._values = {}
+        self._read_at = {}
+        self._lock = threading.Lock()
+        self.bus_transactions = 0
+        self.cache_hits = 0
 
     def get_wind_speed(self):
         """
-        Returns the wind speed in m/s.
-        If in simulated mode, generate a random value.
-        If in real mode, read from actual hardware (placeholder).
+        Returns the wind speed in m/s (e.g. from an anemometer on GPIO or I2C).
         """
-        if self.mode == "simulated":
-            return random.uniform(self._simulated_wind_speed_min, self._simulated_wind_speed_max)
-        else:
-            # Replace with real hardware reading
-            # Example: read from anemometer sensor connected via GPIO or I2C
-            return self._read_wind_speed_hardware()
+        return self._read_channel("wind_speed")
 
     def get_dust_percentage(self):
         """
         Returns an estimate of dust accumulation on the panel (0-100+ %).
         In a real system, you'd compare actual vs. expected power output
-        or use a dedicated dust sensor. Here we simulate or stub.
+        or use a dedicated dust sensor; the simulator reports it directly.
         """
-        if self.mode == "simulated":
-            return random.uniform(self._simulated_dust_min, self._simulated_dust_max)
-        else:
-            # For real hardware approach, you might do something like:
-            #   actual_power = self._read_power_output()
-            #   expected_power = self._estimate_expected_power()
-            #   dust_percent = (1 - (actual_power / expected_power)) * 100
-            #   return max(dust_percent, 0)
-            return self._calculate_real_dust_level()
+        if self._dust_reported:
+            return self._read_channel("dust")
+        return self._calculate_real_dust_level()
 
     def get_wind_direction(self):
         """
-        Returns the wind direction in degrees (0-359).
-        If in simulated mode, generate a random or semi-random value.
-        If real, read from a hardware wind vane sensor or an appropriate sensor array.
+        Returns the wind direction in degrees (0-359), from a hardware wind
+        vane or an appropriate sensor array.
         """
-        if self.mode == "simulated":
-            # Option 1: Pure random each time
-            # return random.uniform(0, 360)
+        return self._read_channel("wind_direction")
 
-            # Option 2: Semi-random changes from the last direction
-            delta = random.uniform(-30, 30)
-            self._last_wind_direction = (self._last_wind_direction + delta) % 360
-            return self._last_wind_direction
+    def snapshot(self):
+        """
+        Returns every reading at once as {'timestamp', 'dust', 'wind_speed',
+        'wind_direction'}. All channels that aren't cached are read in one
+        bus transaction; the get_*() methods share the same cache, so one
+        tick costs one acquisition however many readings it uses.
+        """
+        now = self.clock()
+        if self._dust_reported:
+            required = ("dust", "wind_speed", "wind_direction")
+        else:
+            required = ("power", "ambient_temperature", "wind_speed", "wind_direction")
+        self._refresh(now, required)
+        values = self._values
+        if self._dust_reported:
+            dust = values["dust"]
         else:
-            return self._read_wind_direction_hardware()
+            dust = self._dust_from_power(values["power"], values["ambient_temperature"])
+        return {
+            "timestamp": now,
+            "dust": dust,
+            "wind_speed": values["wind_speed"],
+            "wind_direction": values["wind_direction"],
+        }
+
+    def set_tick_interval(self, interval):
+        """
+        Scales the TTL of the per-tick channels to a loop that doesn't tick
+        every 2 s (e.g. AdaptiveTickScheduler, before each sleep): half the
+        interval, so a tick never reuses a reading from the one before.
+        Channels that aren't cached stay uncached.
+        """
+        with self._lock:
+            for channel in TICK_CHANNELS:
+                if self.ttl.get(channel, 0.0) > 0:
+                    self.ttl[channel] = interval / 2.0
+
+    def invalidate(self):
+        """Drops cached readings so the next read goes to the bus."""
+        with self._lock:
+            self._read_at.clear()
 
     # ------------------
-    # Hardware Stubs
+    # Async Variants
     # ------------------
 
-    def _initialize_hardware(self):
+    async def get_wind_speed_async(self):
         """
-        If you're in 'real' mode, initialize your hardware resources here.
-        For example, configure GPIO pins, initialize I2C, etc.
+        Non-blocking get_wind_speed(). Hardware reads run in a worker
+        thread so the event loop keeps serving other tasks.
         """
-        # Example:
-        # GPIO.setmode(GPIO.BCM)
-        # setup pins for the anemometer, direction sensor, power sensor, etc.
-        pass
+        if not self.bus.realtime:
+            return self.get_wind_speed()
+        return await asyncio.to_thread(self.get_wind_speed)
 
-    def _read_wind_speed_hardware(self):
+    async def get_dust_percentage_async(self):
         """
-        Actual code to read wind speed from hardware sensors.
-        Replace this with your real sensor logic.
+        Non-blocking get_dust_percentage().
         """
-        # Example placeholder
-        wind_speed = 0.0
-        # e.g. read pulses from an anemometer for a certain interval
-        # convert pulses to wind speed (m/s) using sensor's datasheet formula
-        return wind_speed
+        if not self.bus.realtime:
+            return self.get_dust_percentage()
+        return await asyncio.to_thread(self.get_dust_percentage)
+
+    async def get_wind_direction_async(self):
+        """
+        Non-blocking get_wind_direction().
+        """
+        if not self.bus.realtime:
+            return self.get_wind_direction()
+        return await asyncio.to_thread(self.get_wind_direction)
+
+    # ------------------
+    # Bus Reads
+    # ------------------
+
+    def _read_channel(self, channel):
+        """
+        Reading of one channel. Uncached channels go straight to the bus; on
+        a cache miss, every expired cached channel is refreshed in the same
+        transaction, not only the one asked for.
+        """
+        ttl = self.ttl.get(channel, 0.0)
+        if ttl <= 0:
+            self.bus_transactions += 1
+            return self.bus.read_channel(channel)
+        now = self.clock()
+        read_at = self._read_at.get(channel)
+        if read_at is not None and now - read_at < ttl:
+            self.cache_hits += 1
+            return self._values[channel]
+        self._refresh(now, (channel,))
+        return self._values[channel]
+
+    def _refresh(self, now, required):
+        with self._lock:
+            stale = [c for c in required if not self._is_fresh(c, now)]
+            if not stale:
+                return  # another thread refreshed them meanwhile
+            # Expired cached channels ride along in the same transaction
+            for channel in self.bus.channels:
+                if (channel not in stale and self.ttl.get(channel, 0.0) > 0
+                        and not self._is_fresh(channel, now)):
+                    stale.append(channel)
+            values = self.bus.read(stale)
+            self.bus_transactions += 1
+            self._values.update(values)
+            for channel in stale:
+                self._read_at[channel] = now
+
+    def _is_fresh(self, channel, now):
+        read_at = self._read_at.get(channel)
+        return read_at is not None and now - read_at < self.ttl.get(channel, 0.0)
+
+    # ------------------
+    # Dust Estimation
+    # ------------------
 
     def _calculate_real_dust_level(self):
         """
-        Example approach to dust measurement if you have a power sensor:
+        Dust measurement from the power sensor:
           dust% = (1 - (actual_power / expected_power)) * 100
-        Replace or expand as needed.
         """
-        # Example placeholder
-        actual_power = self._read_power_output()
-        expected_power = self._estimate_expected_power()
-        if expected_power == 0:
+        return self._dust_from_power(self._read_channel("power"),
+                                     self._read_channel("ambient_temperature"))
+
+    def _dust_from_power(self, actual_power, ambient_temperature):
+        expected_power = self._estimate_expected_power(ambient_temperature)
+        if expected_power <= 0:
             return 0.0
         dust_percent = (1 - (actual_power / expected_power)) * 100
         # clamp or adjust as needed
         return max(dust_percent, 0)
 
-    def _read_power_output(self):
-        """
-        If using a voltage/current sensor, read it here and convert to watts.
+    def _estimate_expected_power(self, ambient_temperature=None):
         """
-        # Placeholder example:
-        return 250.0  # some measured value in watts
+        Clear-sky output for the panel's current orientation and temperature
+        (a table lookup in the power model). Falls back to a fixed 300 W
+        without a power model.
 
-    def _estimate_expected_power(self):
+        :param ambient_temperature: (Optional) °C; read from the sensor if omitted
         """
-        Could base on a known solar irradiance level or a reference sensor.
-        """
-        # Placeholder example
-        return 300.0
-
-    def _read_wind_direction_hardware(self):
-        """
-        Replace with actual code for a wind vane or multi-sensor approach
-        to get direction in degrees (0-359).
-        """
-        # Placeholder example
-        return 0.0
+        if self.power_model is None:
+            return 300.0
+        if self.actuator_ctrl is not None:
+            base_angle = self.actuator_ctrl.current_base_angle
+            tilt_angle = self.actuator_ctrl.current_tilt_angle
+        else:
+            base_angle, tilt_angle = 180.0, 90.0  # fixed panel facing straight up
+        if ambient_temperature is None:
+            ambient_temperature = self._read_channel("ambient_temperature")
+        return self.power_model.expected_power(
+            self.clock(), base_angle, tilt_angle, ambient_temperature)
@@ -0,0 +1,285 @@
+from bisect import bisect_left, insort
+from collections import deque
+
+from telemetry.events import WARNING, get_event_bus
+
+# Scale that turns a median absolute deviation into a standard deviation
+# estimate for normally distributed noise
+MAD_SCALE = 1.4826
+
+# Event text per flag reason
+REASONS = {
+    "spike": "rejected as a spike",
+    "rate": "rejected: changed faster than the rate limit",
+    "stuck": "looks stuck (no change for too many samples)",
+}
+
+
+class HampelFilter:
+    """
+    Spike rejection for one channel. Each sample is compared with the median
+    of the previous `window` raw samples; if it is further away than
+    `n_sigmas` robust standard deviations (MAD * 1.4826), the median is
+    returned instead and the sample is flagged as a spike.
+
+    The window keeps raw samples, so a genuine step change is accepted once
+    it fills half the window. Memory and time per sample are bounded by the
+    (small, fixed) window size. With side='high' only upward spikes are
+    rejected, so a real drop (e.g. dust after a cleaning) passes at once.
+    """
+
+    name = "hampel"
+    SIDES = ("both", "high", "low")
+
+    def __init__(self, window=7, n_sigmas=3.0, min_deviation=0.0, side="both"):
+        """
+        :param window: number of previous samples the median covers
+        :param n_sigmas: rejection threshold in robust standard deviations
+        :param min_deviation: smallest deviation ever rejected, so a flat
+                              signal (MAD == 0) doesn't turn noise into spikes
+        :param side: which spikes are rejected: 'both', 'high' (above the
+                     median only) or 'low' (below it only)
+        """
+        if window < 3:
+            raise ValueError("window must be at least 3")
+        if side not in self.SIDES:
+            raise ValueError(f"side must be one of {self.SIDES}")
+        self.window = int(window)
+        self.n_sigmas = n_sigmas
+        self.min_deviation = min_deviation
+        self.side = side
+        self._recent = deque()
+        self._sorted = []
+
+    def update(self, value, timestamp):
+        """
+        :return: (value to use, flag reason or None)
+        """
+        reason = None
+        recent = self._recent
+        ordered = self._sorted
+        size = len(ordered)
+        if size > self.window // 2:
+            mid = size // 2
+            median = ordered[mid] if size % 2 else 0.5 * (ordered[mid - 1] + ordered[mid])
+            deviations = sorted([abs(v - median) for v in ordered])
+            mad = deviations[mid] if size % 2 else 0.5 * (deviations[mid - 1] + deviations[mid])
+            limit = max(self.n_sigmas * MAD_SCALE * mad, self.min_deviation)
+            deviation = value - median
+            if self.side == "high":
+                spike = deviation > limit
+            elif self.side == "low":
+                spike = -deviation > limit
+            else:
+                spike = abs(deviation) > limit
+            if spike:
+                reason = "spike"
+
+        if size == self.window:
+            del ordered[bisect_left(ordered, recent.popleft())]
+        recent.append(value)
+        insort(ordered, value)
+        return (median, reason) if reason else (value, None)
+
+    def reset(self):
+        self._recent.clear()
+        del self._sorted[:]
+
+
+class MedianFilter:
+    """
+    Running median of the last `window` samples (the current one included).
+    Smooths out isolated glitches without ever flagging them.
+    """
+
+    name = "median"
+
+    def __init__(self, window=5):
+        """
+        :param window: number of samples the median covers (odd is best)
+        """
+        self.window = int(window)
+        self._recent = deque()
+        self._sorted = []
+
+    def update(self, value, timestamp):
+        ordered = self._sorted
+        if len(ordered) == self.window:
+            del ordered[bisect_left(ordered, self._recent.popleft())]
+        self._recent.append(value)
+        insort(ordered, value)
+        size = len(ordered)
+        mid = size // 2
+        median = ordered[mid] if size % 2 else 0.5 * (ordered[mid - 1] + ordered[mid])
+        return median, None
+
+    def reset(self):
+        self._recent.clear()
+        del self._sorted[:]
+
+
+class RateLimitFilter:
+    """
+    Rejects samples that moved away from the last accepted one faster than
+    the channel physically can (e.g. dust can't build up by 10 % in two
+    seconds), holding the last accepted value instead. After
+    `max_rejections` rejections in a row the new level is accepted, so a
+    real jump isn't held off forever.
+    """
+
+    name = "rate"
+
+    def __init__(self, max_rise_rate, max_fall_rate=None, slack=0.0, max_rejections=3):
+        """
+        :param max_rise_rate: largest believable increase, units per second
+        :param max_fall_rate: largest believable decrease, units per second
+                              (defaults to max_rise_rate; inf disables it,
+                              e.g. dust drops at once after a cleaning)
+        :param slack: change always allowed on top of the rate (sensor noise)
+        :param max_rejections: consecutive rejections before a new level is accepted
+        """
+        self.max_rise_rate = max_rise_rate
+        self.max_fall_rate = max_rise_rate if max_fall_rate is None else max_fall_rate
+        self.slack = slack
+        self.max_rejections = max_rejections
+        self._last = None
+        self._last_at = None
+        self._rejections = 0
+
+    def update(self, value, timestamp):
+        last = self._last
+        if last is not None and self._rejections < self.max_rejections:
+            elapsed = max(timestamp - self._last_at, 0.0)
+            change = value - last
+            if (change > self.max_rise_rate * elapsed + self.slack
+                    or -change > self.max_fall_rate * elapsed + self.slack):
+                self._rejections += 1
+                return last, "rate"
+        self._last = value
+        self._last_at = timestamp
+        self._rejections = 0
+        return value, None
+
+    def reset(self):
+        self._last = None
+        self._last_at = None
+        self._rejections = 0
+
+
+class StuckSensorFilter:
+    """
+    Detects a sensor that keeps returning the same value (a seized
+    anemometer, a frozen ADC). Samples pass through unchanged; the first
+    sample of a stuck run is flagged once, and `stuck` stays True until
+    the value moves again.
+    """
+
+    name = "stuck"
+
+    def __init__(self, max_repeats=30, tolerance=0.0):
+        """
+        :param max_repeats: identical samples in a row that count as stuck
+        :param tolerance: changes up to this size still count as identical
+        """
+        self.max_repeats = max_repeats
+        self.tolerance = tolerance
+        self.stuck = False
+        self._last = None
+        self._repeats = 0
+
+    def update(self, value, timestamp):
+        last = self._last
+        self._last = value
+        if last is not None and abs(value - last) <= self.tolerance:
+            self._repeats += 1
+            if self._repeats + 1 >= self.max_repeats and not self.stuck:
+                self.stuck = True
+                return value, "stuck"
+        else:
+            self._repeats = 0
+            self.stuck = False
+        return value, None
+
+    def reset(self):
+        self.stuck = False
+        self._last = None
+        self._repeats = 0
+
+
+class FilterChain:
+    """
+    Runs one channel's samples through a sequence of filters and reports
+    every flagged sample on the event bus (WARNING from 'SensorFilter').
+
+    Typical use: one chain per channel, passed to DecisionManager as
+    sensor_filters={'dust': ..., 'wind_speed': ...}; samples are filtered
+    before they reach the SensorHistory and the state machine. Each panel
+    in a fleet gets its own chains (see FleetSensorFilter for the batched
+    equivalent).
+    """
+
+    def __init__(self, channel, filters, events=None, source="SensorFilter"):
+        """
+        :param channel: channel name used in events (e.g. 'dust')
+        :param filters: filters applied in order; each has
+                        update(value, timestamp) -> (value, reason or None)
+        :param events: (Optional) EventBus; defaults to the shared bus
+        :param source: event source name (e.g. include a panel id)
+        """
+        self.channel = channel
+        self.filters = list(filters)
+        self.events = events if events is not None else get_event_bus()
+        self.source = source
+
+        # Counters
+        self.samples = 0
+        self.flagged = {}
+
+    def process(self, value, timestamp):
+        """
+        Filters one sample and returns the value the decision logic should use.
+        """
+        self.samples += 1
+        raw = value
+        for sensor_filter in self.filters:
+            value, reason = sensor_filter.update(value, timestamp)
+            if reason is not None:
+                self.flagged[reason] = self.flagged.get(reason, 0) + 1
+                self.events.emit(WARNING, self.source, "%s sample %.2f %s",
+                                 self.channel, raw, REASONS.get(reason, reason),
+                                 channel=self.channel, reason=reason, value=raw)
+        return value
+
+    @property
+    def stuck(self):
+        """True while any stuck detector in the chain reports the sensor stuck."""
+        return any(getattr(f, "stuck", False) for f in self.filters)
+
+    def reset(self):
+        for sensor_filter in self.filters:
+            sensor_filter.reset()
+
+
+def default_filter_chains(events=None, source="SensorFilter"):
+    """
+    Chains for the channels DecisionManager acts on, tuned for a 2 s tick:
+
+    - dust: Hampel rejection of upward spikes, then a rise limit of
+      0.05 %/s plus 5 % of noise (real soiling takes hours), then stuck
+      detection over 10 minutes. Neither stage holds back a fall, so the
+      drop after a cleaning reaches the state machine on the same tick.
+    - wind_speed: Hampel spike rejection (gusts come and go over several
+      samples, single-sample jumps are glitches) and stuck detection over
+      10 minutes (a seized anemometer reads a steady 0).
+    """
+    return {
+        "dust": FilterChain("dust", [
+            HampelFilter(window=7, n_sigmas=3.0, min_deviation=2.0, side="high"),
+            RateLimitFilter(max_rise_rate=0.05, max_fall_rate=float("inf"), slack=5.0),
+            StuckSensorFilter(max_repeats=300),
+        ], events, source),
+        "wind_speed": FilterChain("wind_speed", [
+            HampelFilter(window=7, n_sigmas=3.0, min_deviation=3.0),
+            StuckSensorFilter(max_repeats=300),
+        ], events, source),
+    }
@@ -0,0 +1,242 @@
+import math
+from array import array
+from bisect import bisect_left, insort
+from collections import deque
+from operator import ge, le
+
+
+class SensorHistory:
+    """
+    Fixed-capacity ring buffer of readings for one sensor channel, with
+    rolling statistics over one or more sliding windows.
+
+    - Storage is a preallocated array('d'), so memory never grows per sample
+      no matter how long the controller runs.
+    - Rolling mean, EWMA, min/max and percentiles are maintained
+      incrementally as samples arrive, so reading them costs O(1).
+      Appending is O(1) for mean, EWMA and min/max; percentiles keep each
+      window in a sorted list, so each append does a binary search plus a
+      memmove of up to `window` floats (fine for windows of tens to a few
+      thousand samples).
+    - Every window length is set up front (`window` plus any extra
+      `windows`); the statistics take a `window=` argument to pick one.
+    - Non-finite readings (NaN or inf from a failed read) are counted in
+      `skipped` and kept out of the buffer and the statistics.
+
+    Typical use: one SensorHistory per channel (dust, wind speed), passed to
+    DecisionManager so it switches state on smoothed values instead of a
+    single noisy sample.
+    """
+
+    SMOOTHING_MODES = ("mean", "ewma", "median")
+
+    def __init__(self, capacity=600, window=30, ewma_alpha=0.2, smoothing="mean", windows=()):
+        """
+        :param capacity: number of raw samples kept in the ring buffer
+        :param window: number of most recent samples the rolling stats (and
+                       smoothed()) cover by default (must be <= capacity)
+        :param ewma_alpha: weight of the newest sample in the EWMA (0..1]
+        :param smoothing: statistic returned by smoothed(): 'mean', 'ewma' or 'median'
+        :param windows: (Optional) further window lengths to keep stats for,
+                        e.g. (60, 300) next to a 30-sample default
+        """
+        if smoothing not in self.SMOOTHING_MODES:
+            raise ValueError(f"smoothing must be one of {self.SMOOTHING_MODES}")
+
+        self.capacity = int(capacity)
+        self.window = int(window)
+        self.ewma_alpha = ewma_alpha
+        self.smoothing = smoothing
+        self.skipped = 0          # non-finite readings left out
+
+        self._windows = {}
+        for length in (self.window,) + tuple(int(w) for w in windows):
+            if length < 1:
+                raise ValueError("window must be at least 1")
+            if length > self.capacity:
+                raise ValueError("window must not exceed capacity")
+            self._windows[length] = _Window(length)
+
+        self._buffer = array("d", bytes(8 * self.capacity))
+        self._count = 0           # total samples ever appended
+        self._ewma = None
+
+    # ------------------------------------------------------
+    # Public Methods
+    # ------------------------------------------------------
+
+    def append(self, value):
+        """
+        Adds a new reading and updates every rolling statistic.
+
+        :return: the reading as a float, or None if it was not finite (and
+                 so was skipped)
+        """
+        value = float(value)
+        if not math.isfinite(value):
+            self.skipped += 1
+            return None
+
+        index = self._count
+        buffer = self._buffer
+        capacity = self.capacity
+        resum = (index + 1) % capacity == 0
+        for w in self._windows.values():
+            old = buffer[(index - w.length) % capacity] if index >= w.length else None
+            w.push(index, value, old, resum)
+
+        buffer[index % capacity] = value
+        self._count += 1
+
+        if self._ewma is None:
+            self._ewma = value
+        else:
+            self._ewma += self.ewma_alpha * (value - self._ewma)
+
+        return value
+
+    def __len__(self):
+        """Number of samples currently held in the ring buffer."""
+        return min(self._count, self.capacity)
+
+    @property
+    def windows(self):
+        """The window lengths statistics are kept for (default first)."""
+        return tuple(self._windows)
+
+    @property
+    def latest(self):
+        """Most recent reading, or None if empty."""
+        if self._count == 0:
+            return None
+        return self._buffer[(self._count - 1) % self.capacity]
+
+    def mean(self, window=None):
+        """Rolling mean over the window."""
+        w = self._get_window(window)
+        n = len(w.sorted)
+        return w.sum / n if n else None
+
+    def ewma(self):
+        """Exponentially weighted moving average over all samples."""
+        return self._ewma
+
+    def min(self, window=None):
+        """Smallest reading in the window."""
+        w = self._get_window(window)
+        return w.min_deque[0][1] if w.min_deque else None
+
+    def max(self, window=None):
+        """Largest reading in the window."""
+        w = self._get_window(window)
+        return w.max_deque[0][1] if w.max_deque else None
+
+    def percentile(self, q, window=None):
+        """
+        Returns the q-th percentile (0..100) of the window, using linear
+        interpolation between the closest ranks.
+        """
+        if not 0 <= q <= 100:
+            raise ValueError("q must be between 0 and 100")
+        ordered = self._get_window(window).sorted
+        n = len(ordered)
+        if n == 0:
+            return None
+        pos = (n - 1) * q / 100.0
+        lo = int(pos)
+        hi = min(lo + 1, n - 1)
+        return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+    def median(self, window=None):
+        """50th percentile of the window."""
+        return self.percentile(50, window)
+
+    def smoothed(self):
+        """
+        Returns the statistic selected by self.smoothing (over the default
+        window), or None before the first reading.
+        """
+        if self.smoothing == "ewma":
+            return self.ewma()
+        if self.smoothing == "median":
+            return self.median()
+        return self.mean()
+
+    def values(self, n=None):
+        """
+        Returns the last n readings (default: all held) in chronological order.
+        """
+        held = len(self)
+        n = held if n is None else min(n, held)
+        start = self._count - n
+        return [self._buffer[i % self.capacity] for i in range(start, self._count)]
+
+    def clear(self):
+        """Forget all readings."""
+        self._count = 0
+        self._ewma = None
+        self.skipped = 0
+        for w in self._windows.values():
+            w.clear()
+
+    # ------------------------------------------------------
+    # Internal Helpers
+    # ------------------------------------------------------
+
+    def _get_window(self, window):
+        if window is None:
+            window = self.window
+        w = self._windows.get(window)
+        if w is None:
+            raise ValueError(f"No statistics kept for window {window}; configure it in windows=")
+        return w
+
+
+class _Window:
+    """Running sum, sorted samples and min/max deques for one window length."""
+
+    __slots__ = ("length", "sum", "sorted", "min_deque", "max_deque")
+
+    def __init__(self, length):
+        self.length = length
+        self.sum = 0.0            # sum of the samples inside the window
+        self.sorted = []          # window samples in sorted order (for percentiles)
+        self.min_deque = deque()  # (sample index, value), increasing values
+        self.max_deque = deque()  # (sample index, value), decreasing values
+
+    def push(self, index, value, old, resum):
+        """
+        Adds sample `index`, dropping `old` (the sample that falls out of
+        the window, or None while the window is filling).
+        """
+        if old is not None:
+            self.sum -= old
+            del self.sorted[bisect_left(self.sorted, old)]
+        self.sum += value
+        insort(self.sorted, value)
+
+        # Resum once per buffer cycle so float drift can't build up over months
+        if resum:
+            self.sum = sum(self.sorted)
+
+        oldest_in_window = index - self.length + 1
+        self._push_extreme(self.min_deque, index, value, oldest_in_window, ge)
+        self._push_extreme(self.max_deque, index, value, oldest_in_window, le)
+
+    def clear(self):
+        self.sum = 0.0
+        self.sorted.clear()
+        self.min_deque.clear()
+        self.max_deque.clear()
+
+    @staticmethod
+    def _push_extreme(dq, index, value, oldest_in_window, dominated):
+        """
+        Monotonic deque update: drop entries the new value dominates, append
+        it, and expire the front once it leaves the window.
+        """
+        while dq and dominated(dq[-1][1], value):
+            dq.pop()
+        dq.append((index, value))
+        if dq[0][0] < oldest_in_window:
+            dq.popleft()
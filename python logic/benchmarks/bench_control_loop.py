@@ -0,0 +1,157 @@
+import os
+import random
+import tempfile
+
+from Controllers.sensor_bus import FakeBus
+from Controllers.sensor_controller import SensorController
+from Controllers.sensor_filters import default_filter_chains
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from managers.checkpoint import Checkpointer
+from managers.decision_manager import DecisionManager
+from managers.fleet_sensor_filter import default_fleet_filters
+from managers.simulation import VirtualClock
+from telemetry.events import WARNING, EventBus
+
+from .harness import measure, measure_peak_memory
+
+
+def _build_decision_manager(seed=0, events=None):
+    """
+    Simulated system on a virtual clock that advances 2 s per tick (like
+    main.py), so wind-cleaning timeouts happen at their real tick counts.
+    A large reservoir keeps water cleaning from running dry mid-benchmark.
+
+    :param events: EventBus for all components; None uses the shared
+                   (verbose, stdout) bus
+    """
+    clock = VirtualClock()
+    decision_mgr = DecisionManager(
+        sensor_ctrl=SensorController(mode="simulated", seed=seed),
+        actuator_ctrl=ActuatorController(mode="simulated", events=events),
+        cleaning_ctrl=CleaningController(mode="simulated", initial_water_volume=1e9, events=events),
+        clock=clock,
+        events=events,
+    )
+
+    def tick():
+        clock.sleep(2)
+        decision_mgr.run_logic()
+
+    return decision_mgr, tick
+
+
+def run(iterations=20000):
+    """
+    Returns {benchmark name: metrics} for the control loop and controllers.
+    """
+    results = {}
+    quiet = EventBus(level=WARNING)
+
+    _, tick = _build_decision_manager(events=quiet)
+    results["decision_manager.run_logic"] = measure(tick, iterations)
+
+    # Same loop with INFO events formatted and printed (stdout goes to /dev/null)
+    _, tick = _build_decision_manager()
+    results["decision_manager.run_logic_verbose"] = measure(tick, iterations)
+
+    actuator_ctrl = ActuatorController(mode="simulated", events=quiet)
+    angles = iter(range(10 ** 9))
+
+    def move():
+        step = next(angles)
+        actuator_ctrl.move_panel_for_sun((step * 7) % 360, (step * 3) % 120)
+
+    results["actuator.move_panel_for_sun"] = measure(move, iterations)
+
+    # Modelled time off-sun per reposition with both axes moving together,
+    # against the same moves one axis after the other (slew-rate simulator)
+    slew_ctrl = ActuatorController(mode="simulated", events=quiet, driver="simulator",
+                                   driver_options={"slew": {"base_rate": 6.0, "tilt_rate": 3.0,
+                                                            "acceleration": 6.0, "settle_time": 0.2}})
+    for step in range(1000):
+        slew_ctrl.move_panel_for_sun((step * 7) % 360, (step * 3) % 120)
+    motion = slew_ctrl.motion_stats()
+    results["actuator.reposition_time"] = {
+        "repositions": motion["repositions"],
+        "concurrent_s": motion["mean_move_seconds"],
+        "sequential_s": motion["sequential_move_seconds"] / motion["repositions"],
+        "saved_pct": 100.0 * motion["seconds_saved"] / motion["sequential_move_seconds"],
+    }
+
+    sensor_ctrl = SensorController(mode="simulated", seed=0)
+    results["sensor.get_wind_speed"] = measure(sensor_ctrl.get_wind_speed, iterations, batch=100)
+    results["sensor.get_dust_percentage"] = measure(sensor_ctrl.get_dust_percentage, iterations, batch=100)
+    results["sensor.get_wind_direction"] = measure(sensor_ctrl.get_wind_direction, iterations, batch=100)
+
+    # Real-mode sensor reads for one tick over a bus with 0.5 ms per
+    # transaction: separate round-trips (power, temperature, wind speed; the
+    # old per-getter path) versus one cached snapshot acquisition
+    bus_iterations = max(200, iterations // 100)
+    bus = FakeBus(transaction_latency=0.0005, channel_latency=0.0001)
+
+    def separate_reads():
+        for channel in ("power", "ambient_temperature", "wind_speed"):
+            bus.read([channel])
+
+    results["sensor.real_tick_separate_reads"] = measure(separate_reads, bus_iterations)
+
+    clock = VirtualClock()
+    real_sensor_ctrl = SensorController(mode="real", bus=bus, clock=clock)
+
+    def snapshot():
+        clock.sleep(2)
+        real_sensor_ctrl.snapshot()
+
+    results["sensor.real_tick_snapshot"] = measure(snapshot, bus_iterations)
+
+    # Per-tick checkpoint (angles change every call, so every save writes)
+    # and the warm-restart read that replaces re-homing
+    with tempfile.TemporaryDirectory() as tmp:
+        decision_mgr, _ = _build_decision_manager(events=quiet)
+        checkpointer = Checkpointer(os.path.join(tmp, "state.ckpt"))
+        step = iter(range(10 ** 9))
+
+        def save():
+            decision_mgr.actuator_ctrl.current_base_angle = next(step) % 360
+            checkpointer.save(decision_mgr)
+
+        results["checkpoint.save"] = measure(save, iterations)
+        results["checkpoint.restore"] = measure(lambda: checkpointer.restore(decision_mgr), iterations)
+        checkpointer.close()
+
+    # Glitch filtering for one tick (dust + wind chains) on noisy readings
+    # with occasional spikes, for one panel and batched for 1000 panels
+    rng = random.Random(0)
+    samples = [(rng.gauss(15.0, 1.0) + (60.0 if rng.random() < 0.01 else 0.0),
+                rng.uniform(0.0, 25.0)) for _ in range(4096)]
+    chains = default_filter_chains(events=quiet)
+    dust_chain, wind_chain = chains["dust"], chains["wind_speed"]
+    step = iter(range(10 ** 9))
+
+    def filter_tick():
+        i = next(step)
+        dust, wind = samples[i & 4095]
+        dust_chain.process(dust, 2.0 * i)
+        wind_chain.process(wind, 2.0 * i)
+
+    results["filters.tick"] = measure(filter_tick, iterations)
+
+    fleet_filters = default_fleet_filters(1000, events=quiet)
+    dust_filter, wind_filter = fleet_filters["dust"], fleet_filters["wind_speed"]
+    fleet_samples = [([dust] * 1000, [wind] * 1000) for dust, wind in samples[:64]]
+    step = iter(range(10 ** 9))
+
+    def fleet_filter_tick():
+        i = next(step)
+        dust, wind = fleet_samples[i & 63]
+        dust_filter.process(dust, 2.0 * i)
+        wind_filter.process(wind, 2.0 * i)
+
+    results["filters.fleet_tick_1000"] = measure(fleet_filter_tick, iterations // 10)
+
+    # Long run: peak memory should not grow with the number of ticks
+    _, tick = _build_decision_manager(events=quiet)
+    results["decision_manager.memory"] = measure_peak_memory(tick, iterations * 5)
+
+    return results
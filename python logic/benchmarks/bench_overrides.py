@@ -0,0 +1,101 @@
+import random
+import threading
+import time
+from time import perf_counter
+
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from Controllers.sensor_controller import SensorController
+from managers.decision_manager import DecisionManager
+from managers.override_listener import OverrideListener
+from managers.state_writer import LocalBackend, StateWriter
+from telemetry.events import INFO, EventBus
+
+# Loop sleep between ticks (shortened from main.py's 2 s to keep the run brief;
+# the polled reaction time scales with it, the pushed one doesn't)
+TICK = 0.2
+# Simulated round-trip per uplink call
+LATENCY = 0.005
+TRIALS = 20
+
+
+def _reaction_times(push, trials, seed=0):
+    """
+    Runs the control loop in a thread and publishes stop_all at random
+    points of the tick, timing each until the actuators are told to stop.
+
+    :return: (reaction times in seconds, uplink calls per tick)
+    """
+    stopped = threading.Event()
+    stopped_at = []
+    published_at = [float("inf")]
+
+    def sink(event):
+        # The first stop after the publish (a late one from the last trial doesn't count)
+        if (event["message"] == "Stopping all actuators." and not stopped.is_set()
+                and event["timestamp"] >= published_at[0]):
+            stopped_at.append(event["timestamp"])
+            stopped.set()
+
+    events = EventBus(level=INFO, sinks=[sink], clock=perf_counter)
+    backend = LocalBackend(latency=LATENCY)
+    listener = OverrideListener(backend, events=events).start() if push else None
+    decision_mgr = DecisionManager(
+        sensor_ctrl=SensorController(mode="simulated", seed=seed),
+        actuator_ctrl=ActuatorController(mode="simulated", events=events),
+        cleaning_ctrl=CleaningController(mode="simulated", initial_water_volume=1e9, events=events),
+        firebase_mgr=StateWriter(backend),
+        events=events,
+        override_listener=listener,
+    )
+    sleep = listener.wait if push else time.sleep
+    done = threading.Event()
+    ticks = [0]
+
+    def loop():
+        while not done.is_set():
+            decision_mgr.run_logic()
+            ticks[0] += 1
+            sleep(TICK)
+
+    thread = threading.Thread(target=loop, daemon=True)
+    thread.start()
+    rng = random.Random(seed)
+    reactions = []
+    try:
+        for _ in range(trials):
+            time.sleep(rng.uniform(0.0, TICK))
+            stopped.clear()
+            published_at[0] = perf_counter()
+            backend.publish_override("stop_all")
+            stopped.wait()
+            reactions.append(stopped_at[-1] - published_at[0])
+            # Back to normal operation before the next trial
+            backend.publish_override("resume")
+            while backend.override_command is not None:
+                time.sleep(0.001)
+    finally:
+        done.set()
+        if listener is not None:
+            listener.close()
+        thread.join()
+    calls = backend.calls
+    return reactions, calls / max(ticks[0], 1)
+
+
+def run(iterations=20000):
+    """
+    stop_all reaction time with overrides polled by the loop every tick
+    against pushed through an OverrideListener (which also preempts the
+    tick in progress), plus uplink calls per tick for each.
+    """
+    results = {}
+    for name, push in (("overrides.polled", False), ("overrides.pushed", True)):
+        reactions, calls_per_tick = _reaction_times(push, TRIALS)
+        reactions.sort()
+        results[name] = {
+            "reaction_p50_ms": reactions[len(reactions) // 2] * 1e3,
+            "reaction_max_ms": reactions[-1] * 1e3,
+            "uplink_calls_per_tick": calls_per_tick,
+        }
+    return results
@@ -0,0 +1,101 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from hal.registry import available_backends
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter so every import is cold
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from hal.registry import backend_class, load_backend
+from telemetry.events import EventBus
+kind, name, options = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+result = {"available": True}
+try:
+    backend_class(kind, name)
+    t1 = time.perf_counter()
+    load_backend(kind, name, options, events=EventBus())
+    t2 = time.perf_counter()
+    result.update(import_ms=(t1 - t0) * 1e3, startup_ms=(t2 - t1) * 1e3)
+except Exception as exc:  # missing hardware library or device
+    result.update(available=False, error=f"{type(exc).__name__}: {exc}")
+print(json.dumps(result))
+"""
+
+_CONTROLLERS_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from Controllers import ActuatorController, CleaningController, SensorController
+t1 = time.perf_counter()
+mode = sys.argv[1]
+SensorController(mode=mode)
+ActuatorController(mode=mode)
+CleaningController(mode=mode)
+t2 = time.perf_counter()
+print(json.dumps({"available": True, "import_ms": (t1 - t0) * 1e3, "startup_ms": (t2 - t1) * 1e3}))
+"""
+
+# What `python main.py` pays before the first tick: importing main (and
+# through it the controllers and managers packages) and build_system()
+_MAIN_PROBE = """
+import contextlib, io, json, sys, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    main.build_system()
+t2 = time.perf_counter()
+print(json.dumps({"available": True, "import_ms": (t1 - t0) * 1e3, "startup_ms": (t2 - t1) * 1e3,
+                  "numpy_loaded": "numpy" in sys.modules}))
+"""
+
+
+def _probe(code, *args, repeat=5):
+    """Best (lowest) of `repeat` cold runs, plus the interpreter's own start time."""
+    best = None
+    for _ in range(repeat):
+        result = json.loads(subprocess.run(
+            [sys.executable, "-c", code, *args], cwd=ROOT, check=True,
+            capture_output=True, text=True).stdout)
+        if not result["available"]:
+            return result
+        if best is None or result["import_ms"] + result["startup_ms"] < best["import_ms"] + best["startup_ms"]:
+            best = result
+    best["total_ms"] = best["import_ms"] + best["startup_ms"]
+    return best
+
+
+def run(iterations=20000):
+    """
+    Returns {benchmark name: metrics} with the cold import and construction
+    time of every registered backend (backends whose hardware library isn't
+    installed report available=False), of the controllers per mode, and of
+    main.py itself (import main + build_system()).
+    """
+    repeat = max(3, min(10, iterations // 4000))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        recording = os.path.join(tmp, "sensors.jsonl")
+        with open(recording, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"t": 0.0, "values": {"power": 250.0, "wind_speed": 3.0}}) + "\n")
+        options = {
+            ("sensor", "fake"): {"sleep": None},
+            ("sensor", "recording"): {"path": os.path.join(tmp, "record.jsonl")},
+            ("sensor", "replay"): {"path": recording},
+            ("actuator", "recording"): {"path": os.path.join(tmp, "actuator.jsonl")},
+            ("cleaning", "recording"): {"path": os.path.join(tmp, "cleaning.jsonl")},
+        }
+        for kind in ("sensor", "actuator", "cleaning"):
+            for name in available_backends(kind):
+                opts = json.dumps(options.get((kind, name), {}))
+                results[f"startup.{kind}.{name}"] = _probe(_PROBE, kind, name, opts, repeat=repeat)
+
+    for mode in ("simulated", "real"):
+        results[f"startup.controllers.{mode}"] = _probe(_CONTROLLERS_PROBE, mode, repeat=repeat)
+    results["startup.main"] = _probe(_MAIN_PROBE, repeat=repeat)
+    return results
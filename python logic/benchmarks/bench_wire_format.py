@@ -0,0 +1,98 @@
+import json
+import random
+
+from telemetry.events import INFO, WARNING
+from telemetry.wire_format import WireEncoder, decode_frame
+
+from .harness import measure
+
+# Records per uplink batch (StateWriter's default max_batch)
+BATCH = 100
+
+_MESSAGES = (
+    ("User override: Resumed sun tracking.", INFO),
+    ("User override: Forced water cleaning.", INFO),
+    ("Water reservoir empty or cleaning failed.", WARNING),
+    ("Wind cleaning finished.", INFO),
+)
+
+
+def _records(seed=0):
+    """
+    One batch of each record kind as the dicts the uplink sends today: the
+    systemState payload, a sample per 2 s tick with slowly moving angles,
+    and event-log entries (a handful of distinct messages).
+    """
+    rng = random.Random(seed)
+    t = 1.7e9
+    base_angle, tilt_angle = 120.0, 35.0
+    states, samples, events = [], [], []
+    for i in range(BATCH):
+        t += 2.0
+        base_angle = (base_angle + rng.uniform(0.0, 0.02)) % 360
+        tilt_angle += rng.uniform(-0.01, 0.01)
+        states.append({
+            "currentState": "CLEANING_WIND" if i % 10 == 0 else "SUN_TRACKING",
+            "windCleanStartTime": t - 30.0 if i % 10 == 0 else None,
+        })
+        samples.append({
+            "timestamp": t,
+            "dust": rng.uniform(0.0, 50.0),
+            "wind_speed": rng.uniform(0.0, 25.0),
+            "wind_direction": rng.uniform(0.0, 360.0),
+            "base_angle": base_angle,
+            "tilt_angle": tilt_angle,
+            "water_volume": 2.0 - i * 0.00125,
+            "state": "SUN_TRACKING",
+        })
+        message, level = _MESSAGES[rng.randrange(len(_MESSAGES))]
+        events.append({"timestamp": t, "description": message, "level": level,
+                       "source": "DecisionManager"})
+    return t, states, samples, events
+
+
+def run(iterations=20000):
+    """
+    Bytes per record and encode/decode throughput of the binary wire format
+    against the JSON-encoded dict payloads, per batch of BATCH records.
+    """
+    iterations = max(100, iterations // 20)
+    now, states, samples, events = _records()
+    encoder = WireEncoder()
+
+    def encode_states():
+        for i, state in enumerate(states):
+            encoder.add_state(now + 2.0 * i, state["currentState"], state["windCleanStartTime"])
+        return encoder.finish()
+
+    def encode_samples():
+        add = encoder.add_sample
+        for s in samples:
+            add(s["timestamp"], s["dust"], s["wind_speed"], s["wind_direction"],
+                s["base_angle"], s["tilt_angle"], s["water_volume"], s["state"])
+        return encoder.finish()
+
+    def encode_events():
+        for e in events:
+            encoder.add_event(e["timestamp"], e["description"], e["level"], e["source"])
+        return encoder.finish()
+
+    results = {}
+    for kind, payloads, encode in (("state", states, encode_states),
+                                   ("sample", samples, encode_samples),
+                                   ("event", events, encode_events)):
+        frame = encode()
+        json_bytes = len(json.dumps(payloads).encode("utf-8"))
+
+        wire = measure(encode, iterations)
+        wire["bytes_per_record"] = len(frame) / BATCH
+        wire["records_per_second"] = wire["ops_per_second"] * BATCH
+        results[f"wire_format.{kind}.encode"] = wire
+
+        baseline = measure(lambda: json.dumps(payloads).encode("utf-8"), iterations)
+        baseline["bytes_per_record"] = json_bytes / BATCH
+        baseline["records_per_second"] = baseline["ops_per_second"] * BATCH
+        results[f"wire_format.{kind}.json_encode"] = baseline
+
+        results[f"wire_format.{kind}.decode"] = measure(lambda: decode_frame(frame), iterations)
+    return results
@@ -0,0 +1,126 @@
+import contextlib
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+
+def measure(fn, iterations=10000, warmup=100, batch=1, repeat=3):
+    """
+    Calls fn() `iterations` times and returns throughput and per-call
+    latency percentiles (microseconds). Controller print() output is sent
+    to /dev/null so terminal I/O doesn't dominate the numbers.
+
+    :param batch: calls timed together per sample; use >1 for sub-microsecond
+                  functions so timer overhead doesn't swamp the result
+    :param repeat: the whole measurement is repeated and the run with the
+                   best median is kept (like timeit), to filter out noise
+    """
+    samples_per_run = max(1, iterations // batch)
+    clock = time.perf_counter_ns
+    best = None
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(warmup):
+            fn()
+        for _ in range(repeat):
+            samples = [0] * samples_per_run
+            start = clock()
+            for i in range(samples_per_run):
+                t0 = clock()
+                for _ in range(batch):
+                    fn()
+                samples[i] = (clock() - t0) / batch
+            total = clock() - start
+            samples.sort()
+            if best is None or samples[len(samples) // 2] < best[0][len(best[0]) // 2]:
+                best = (samples, total)
+
+    samples, total = best
+    return {
+        "iterations": samples_per_run * batch,
+        "ops_per_second": samples_per_run * batch / (total / 1e9),
+        "p50_us": _percentile(samples, 50) / 1e3,
+        "p90_us": _percentile(samples, 90) / 1e3,
+        "p99_us": _percentile(samples, 99) / 1e3,
+        "max_us": samples[-1] / 1e3,
+    }
+
+
+def measure_peak_memory(fn, iterations):
+    """
+    Calls fn() `iterations` times under tracemalloc and returns the peak
+    and final traced memory in KiB (catches per-tick growth on long runs).
+    """
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        tracemalloc.start()
+        try:
+            for _ in range(iterations):
+                fn()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {
+        "iterations": iterations,
+        "peak_kib": peak / 1024,
+        "final_kib": current / 1024,
+    }
+
+
+# ------------------------------------------------------
+# Baselines
+# ------------------------------------------------------
+
+def save_results(results, path):
+    """
+    Writes results (plus a little environment info) as a JSON baseline.
+    """
+    payload = {
+        "created": time.time(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+# Metrics checked by compare_results(): name -> which direction is better.
+# max_us is left out on purpose; a single scheduler hiccup moves it a lot.
+COMPARED_METRICS = {
+    "ops_per_second": "higher",
+    "p50_us": "lower",
+    "p99_us": "lower",
+    "peak_kib": "lower",
+}
+
+
+def compare_results(baseline, current, tolerance=0.15):
+    """
+    Compares two result sets and returns a list of regression messages for
+    every COMPARED_METRICS entry that got worse by more than `tolerance`
+    (relative).
+    """
+    regressions = []
+    for bench, metrics in current.items():
+        base_metrics = baseline.get(bench, {})
+        for name, better in COMPARED_METRICS.items():
+            base = base_metrics.get(name)
+            value = metrics.get(name)
+            if not base or value is None:
+                continue
+            change = (value - base) / base
+            worse = change < -tolerance if better == "higher" else change > tolerance
+            if worse:
+                regressions.append(f"{bench}.{name}: {base:.2f} -> {value:.2f} ({change:+.0%})")
+    return regressions
+
+
+def _percentile(sorted_samples, q):
+    index = min(len(sorted_samples) - 1, int(round((len(sorted_samples) - 1) * q / 100)))
+    return sorted_samples[index]
@@ -0,0 +1,60 @@
+import argparse
+import importlib
+import sys
+
+from .harness import compare_results, load_results, save_results
+
+# Benchmark modules in this package; each exposes run(iterations) -> {name: metrics}
+SUITES = [
+    "bench_control_loop",
+    "bench_overrides",
+    "bench_startup",
+    "bench_wire_format",
+]
+
+
+def main():
+    """
+    Runs the benchmark suite in simulated mode (no hardware needed), e.g.
+
+        python -m benchmarks.run --save benchmarks/baseline.json
+        python -m benchmarks.run --compare benchmarks/baseline.json
+
+    Exits with status 1 if --compare finds a regression.
+    """
+    parser = argparse.ArgumentParser(description="Control loop and controller benchmarks.")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--suite", action="append", choices=SUITES,
+                        help="run only this suite (repeatable)")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed relative slowdown before flagging a regression")
+    args = parser.parse_args()
+
+    results = {}
+    for suite in args.suite or SUITES:
+        module = importlib.import_module(f"{__package__}.{suite}")
+        results.update(module.run(args.iterations))
+
+    for bench, metrics in results.items():
+        summary = ", ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+                            for k, v in metrics.items())
+        print(f"{bench}: {summary}")
+
+    if args.save:
+        save_results(results, args.save)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        regressions = compare_results(load_results(args.compare), results, args.tolerance)
+        if regressions:
+            print("Regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
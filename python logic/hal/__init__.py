@@ -0,0 +1,15 @@
+from .drivers import ActuatorDriver, CleaningDriver, SlewRateModel
+from .registry import (DEFAULT_BACKENDS, available_backends, backend_class, load_backend,
+                       register_backend, resolve_backend)
+
+__all__ = [
+    "ActuatorDriver",
+    "CleaningDriver",
+    "SlewRateModel",
+    "DEFAULT_BACKENDS",
+    "available_backends",
+    "backend_class",
+    "load_backend",
+    "register_backend",
+    "resolve_backend",
+]
\ No newline at end of file
@@ -0,0 +1,133 @@
+import math
+import threading
+import time
+
+
+class SlewRateModel:
+    """
+    How long an axis takes to move: a trapezoidal speed profile per axis
+    (accelerate, cruise at the slew rate, decelerate) plus a settling time.
+    """
+
+    def __init__(self, base_rate=6.0, tilt_rate=3.0, acceleration=None, settle_time=0.0):
+        """
+        :param base_rate: base (azimuth) slew rate in degrees per second
+        :param tilt_rate: tilt (elevation) slew rate in degrees per second
+        :param acceleration: (Optional) degrees/s² for both axes; None means
+                             the axes reach full speed at once
+        :param settle_time: seconds added to every move for the axis to settle
+        """
+        self.rates = {"base": base_rate, "tilt": tilt_rate}
+        self.acceleration = acceleration
+        self.settle_time = settle_time
+
+    def duration(self, axis, from_angle, target_angle):
+        """Seconds to move `axis` ('base' or 'tilt') between two angles."""
+        if axis == "base":
+            distance = abs((target_angle - from_angle + 180) % 360 - 180)
+        else:
+            distance = abs(target_angle - from_angle)
+        if distance == 0:
+            return 0.0
+        rate = self.rates[axis]
+        accel = self.acceleration
+        if not accel:
+            return distance / rate + self.settle_time
+        if distance < rate * rate / accel:
+            # Never reaches the slew rate: accelerate half way, then brake
+            return 2.0 * math.sqrt(distance / accel) + self.settle_time
+        return distance / rate + rate / accel + self.settle_time
+
+
+class ActuatorDriver:
+    """
+    Motor backend ActuatorController delegates to. Angles are already
+    normalized and clamped by the controller.
+
+    rotate_base() and tilt_top() block until their axis arrives and may be
+    called from two threads at once (one per axis). stop() must interrupt
+    a move in progress; a move cut short returns the angle it reached
+    (returning None means the target was reached).
+    """
+
+    # Moves take wall-clock time (both axes then run in worker threads)
+    realtime = True
+    # SlewRateModel, if the driver knows how long its moves take
+    slew = None
+
+    def rotate_base(self, from_angle, target_angle):
+        raise NotImplementedError
+
+    def tilt_top(self, from_angle, target_angle):
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def move_duration(self, axis, from_angle, target_angle):
+        """Modelled seconds for a move, or 0.0 without a slew model."""
+        if self.slew is None:
+            return 0.0
+        return self.slew.duration(axis, from_angle, target_angle)
+
+    # ------------------------------------------------------
+    # Helpers for drivers whose moves take time
+    # ------------------------------------------------------
+
+    def _travel(self, seconds):
+        """
+        Waits `seconds` for a move to complete unless stop() (via _halt())
+        interrupts it. Returns the fraction of the move that was completed.
+        """
+        if seconds <= 0:
+            return 1.0
+        condition = self._motion_condition()
+        start = time.monotonic()
+        deadline = start + seconds
+        with condition:
+            generation = self._halts
+            while self._halts == generation:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return 1.0
+                condition.wait(remaining)
+        return min((time.monotonic() - start) / seconds, 1.0)
+
+    def _halt(self):
+        """Wakes every _travel() in progress so the moves end early."""
+        condition = self._motion_condition()
+        with condition:
+            self._halts += 1
+            condition.notify_all()
+
+    def _motion_condition(self):
+        condition = self.__dict__.get("_condition")
+        if condition is None:
+            # Created on first use so subclasses needn't call a base __init__
+            self.__dict__.setdefault("_halts", 0)
+            condition = self.__dict__.setdefault("_condition", threading.Condition())
+        return condition
+
+
+class CleaningDriver:
+    """
+    Pump and vibration backend CleaningController delegates to.
+    """
+
+    realtime = True
+
+    def set_pump(self, on):
+        raise NotImplementedError
+
+    def set_vibration(self, on):
+        raise NotImplementedError
+
+    def wait(self, seconds):
+        """Lets the water run (the simulator returns immediately)."""
+        time.sleep(seconds)
+
+    def close(self):
+        pass
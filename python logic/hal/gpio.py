@@ -0,0 +1,41 @@
+import RPi.GPIO as GPIO
+
+from telemetry.events import DEBUG, get_event_bus
+
+from .drivers import CleaningDriver
+
+
+class GpioCleaningDriver(CleaningDriver):
+    """
+    Pump and vibration motor on two GPIO pins (e.g. through relays or a
+    MOSFET driver board).
+    """
+
+    def __init__(self, pump_pin=23, vibration_pin=24, active_high=True, events=None):
+        """
+        :param pump_pin: BCM pin switching the pump
+        :param vibration_pin: BCM pin switching the vibration motor
+        :param active_high: False for relay boards that switch on LOW
+        :param events: (Optional) EventBus; defaults to the shared bus
+        """
+        self.pump_pin = pump_pin
+        self.vibration_pin = vibration_pin
+        self._on, self._off = (GPIO.HIGH, GPIO.LOW) if active_high else (GPIO.LOW, GPIO.HIGH)
+        self.events = events if events is not None else get_event_bus()
+
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(pump_pin, GPIO.OUT, initial=self._off)
+        GPIO.setup(vibration_pin, GPIO.OUT, initial=self._off)
+
+    def set_pump(self, on):
+        GPIO.output(self.pump_pin, self._on if on else self._off)
+        self.events.emit(DEBUG, "CleaningController", "Water pump %s.", "ON" if on else "OFF", mode="real")
+
+    def set_vibration(self, on):
+        GPIO.output(self.vibration_pin, self._on if on else self._off)
+        self.events.emit(DEBUG, "CleaningController", "Vibration %s.", "ON" if on else "OFF", mode="real")
+
+    def close(self):
+        self.set_pump(False)
+        self.set_vibration(False)
+        GPIO.cleanup((self.pump_pin, self.vibration_pin))
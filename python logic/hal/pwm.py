@@ -0,0 +1,82 @@
+import RPi.GPIO as GPIO
+
+from telemetry.events import DEBUG, get_event_bus
+
+from .drivers import ActuatorDriver
+
+
+class PwmActuatorDriver(ActuatorDriver):
+    """
+    Base and tilt servos driven by hardware PWM. The pulse is held for
+    `settle_time` seconds and then released so the servos don't buzz.
+    """
+
+    def __init__(self, base_pin=18, tilt_pin=19, frequency=50, settle_time=0.5, events=None):
+        """
+        :param base_pin: BCM pin of the base (azimuth) servo
+        :param tilt_pin: BCM pin of the tilt (elevation) servo
+        :param frequency: PWM frequency in Hz (50 for hobby servos)
+        :param settle_time: seconds to hold the pulse while the servo moves
+        :param events: (Optional) EventBus; defaults to the shared bus
+        """
+        self.base_pin = base_pin
+        self.tilt_pin = tilt_pin
+        self.settle_time = settle_time
+        self.events = events if events is not None else get_event_bus()
+
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(base_pin, GPIO.OUT)
+        GPIO.setup(tilt_pin, GPIO.OUT)
+        self._pwm = {"base": GPIO.PWM(base_pin, frequency), "tilt": GPIO.PWM(tilt_pin, frequency)}
+        for pwm in self._pwm.values():
+            pwm.start(0)
+
+    def rotate_base(self, from_angle, target_angle):
+        return self._move("base", from_angle, target_angle)
+
+    def tilt_top(self, from_angle, target_angle):
+        return self._move("tilt", from_angle, target_angle)
+
+    def stop(self):
+        self._halt()  # ends a move's settle wait early
+        for pwm in self._pwm.values():
+            pwm.ChangeDutyCycle(0)
+
+    def close(self):
+        for pwm in self._pwm.values():
+            pwm.stop()
+        # Only our pins: the pump and vibration motor may share the GPIO
+        GPIO.cleanup((self.base_pin, self.tilt_pin))
+
+    def _move(self, servo, from_angle, angle):
+        """
+        Returns None once the move settled, or the estimated angle reached
+        (assuming a steady sweep over settle_time) if stop() cut it short.
+        A servo sweeps straight across its duty cycle range and can't wrap
+        past it, so the base moves linearly between the normalized angles.
+        """
+        duty_cycle = angle_to_duty_cycle(angle, servo)
+        self.events.emit(DEBUG, "ActuatorController", "PWM %s -> %.2f%% duty", servo, duty_cycle, mode="real")
+        self._pwm[servo].ChangeDutyCycle(duty_cycle)
+        done = self._travel(self.settle_time)
+        self._pwm[servo].ChangeDutyCycle(0)
+        if done >= 1.0:
+            return None
+        if servo == "base":
+            from_angle, angle = from_angle % 360, angle % 360
+        return from_angle + done * (angle - from_angle)
+
+
+def angle_to_duty_cycle(angle, servo_type="base"):
+    """
+    Convert angle to PWM duty cycle for your specific servo range.
+    This is just an example and depends on your servo specs.
+    """
+    if servo_type == "base":
+        angle = angle % 360  # Wrap
+        return 2.5 + (angle / 360.0) * 10.0
+    elif servo_type == "tilt":
+        # 0..90 => 2.5..7.0 duty cycle (example range)
+        return 2.5 + (angle / 90.0) * 4.5
+    else:
+        return 0.0
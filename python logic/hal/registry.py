@@ -0,0 +1,86 @@
+import importlib
+import inspect
+
+# Backends per driver kind as "module:attribute". Modules are only imported
+# when their backend is selected, so a board running the simulator never
+# pays for RPi.GPIO or smbus2, and one without them installed still starts.
+_BACKENDS = {
+    "sensor": {
+        "simulator": "hal.simulator:SimulatedSensorBus",
+        "stub": "hal.stub:StubSensorBus",
+        "i2c": "Controllers.sensor_bus:I2CBlockBus",
+        "fake": "Controllers.sensor_bus:FakeBus",
+        "recording": "hal.replay:RecordingSensorBus",
+        "replay": "hal.replay:ReplaySensorBus",
+    },
+    "actuator": {
+        "simulator": "hal.simulator:SimulatedActuatorDriver",
+        "stub": "hal.stub:StubActuatorDriver",
+        "pwm": "hal.pwm:PwmActuatorDriver",
+        "recording": "hal.replay:RecordingActuatorDriver",
+    },
+    "cleaning": {
+        "simulator": "hal.simulator:SimulatedCleaningDriver",
+        "stub": "hal.stub:StubCleaningDriver",
+        "gpio": "hal.gpio:GpioCleaningDriver",
+        "recording": "hal.replay:RecordingCleaningDriver",
+    },
+}
+
+# Backend used when a controller is given only a mode
+DEFAULT_BACKENDS = {
+    "simulated": "simulator",
+    "real": "stub",  # placeholder hardware stubs until a site picks real drivers
+}
+
+
+def register_backend(kind, name, target):
+    """
+    Adds (or replaces) a backend.
+
+    :param kind: 'sensor', 'actuator' or 'cleaning'
+    :param name: backend name controllers select it by
+    :param target: "module:attribute" (imported on first use) or the class itself
+    """
+    _BACKENDS.setdefault(kind, {})[name] = target
+
+
+def available_backends(kind):
+    return sorted(_BACKENDS.get(kind, {}))
+
+
+def backend_class(kind, name):
+    """Imports (if needed) and returns the class registered as `name`."""
+    try:
+        target = _BACKENDS[kind][name]
+    except KeyError:
+        raise ValueError(f"Unknown {kind} backend '{name}'. "
+                         f"Available: {', '.join(available_backends(kind))}") from None
+    if isinstance(target, str):
+        module_name, _, attribute = target.partition(":")
+        target = getattr(importlib.import_module(module_name), attribute)
+    return target
+
+
+def load_backend(kind, name, options=None, **defaults):
+    """
+    Creates a backend. `defaults` (e.g. events, seed) are only passed to
+    backends whose constructor accepts them; `options` always are.
+    """
+    cls = backend_class(kind, name)
+    parameters = inspect.signature(cls).parameters
+    takes_any = any(p.kind == p.VAR_KEYWORD for p in parameters.values())
+    kwargs = {k: v for k, v in defaults.items() if takes_any or k in parameters}
+    kwargs.update(options or {})
+    return cls(**kwargs)
+
+
+def resolve_backend(kind, backend, mode, options=None, **defaults):
+    """
+    What controllers call: `backend` may be a driver instance (used as is),
+    a backend name, or None for the mode's default.
+    """
+    if backend is not None and not isinstance(backend, str):
+        return backend
+    name = backend or DEFAULT_BACKENDS.get(mode, mode)
+    return load_backend(kind, name, options, **defaults)
@@ -0,0 +1,130 @@
+import bisect
+import json
+import time
+
+from Controllers.sensor_bus import SensorBus
+
+from .registry import resolve_backend
+
+
+class _JsonLines:
+    """Append-only JSON-lines log, flushed per record so a crash loses at most one."""
+
+    def __init__(self, path):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class RecordingSensorBus(SensorBus):
+    """
+    Passes reads through to another bus and logs each transaction as
+    {"t": time, "values": {...}} for later replay.
+    """
+
+    def __init__(self, path, inner="stub", inner_options=None, clock=time.time):
+        """
+        :param path: JSON-lines file to append to
+        :param inner: bus to record (instance or backend name)
+        :param inner_options: (Optional) keyword arguments for a named inner bus
+        :param clock: time source for record timestamps
+        """
+        self.inner = resolve_backend("sensor", inner, None, inner_options)
+        self.realtime = self.inner.realtime
+        self.channels = self.inner.channels
+        self.clock = clock
+        self._log = _JsonLines(path)
+
+    def read(self, channels):
+        values = self.inner.read(channels)
+        self._log.write({"t": self.clock(), "values": values})
+        return values
+
+    def close(self):
+        self._log.close()
+        self.inner.close()
+
+
+class ReplaySensorBus(SensorBus):
+    """
+    Plays back a RecordingSensorBus log: a read returns, per channel, the
+    latest recorded value at or before the clock (the first one before the
+    recording starts). Run it on a VirtualClock to replay a field day.
+    """
+
+    realtime = False
+
+    def __init__(self, path, clock=time.time):
+        """
+        :param path: JSON-lines file written by RecordingSensorBus
+        :param clock: time source the recording is indexed by
+        """
+        self.clock = clock
+        self._times = {}
+        self._values = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                for channel, value in record["values"].items():
+                    self._times.setdefault(channel, []).append(record["t"])
+                    self._values.setdefault(channel, []).append(value)
+        self.channels = tuple(self._times)
+
+    def read(self, channels):
+        now = self.clock()
+        values = {}
+        for channel in channels:
+            index = bisect.bisect_right(self._times[channel], now) - 1
+            values[channel] = self._values[channel][max(index, 0)]
+        return values
+
+
+class _RecordingDriver:
+    """
+    Wraps an actuator or cleaning driver and logs every command it is given
+    as {"t": time, "call": name, "args": [...]}.
+    """
+
+    KIND = None
+
+    def __init__(self, path, inner="simulator", inner_options=None, events=None, clock=time.time):
+        """
+        :param path: JSON-lines file to append to
+        :param inner: driver to record (instance or backend name)
+        :param inner_options: (Optional) keyword arguments for a named inner driver
+        :param events: (Optional) EventBus passed on to a named inner driver
+        :param clock: time source for record timestamps
+        """
+        self.inner = resolve_backend(self.KIND, inner, None, inner_options, events=events)
+        self.clock = clock
+        self._log = _JsonLines(path)
+
+    def __getattr__(self, name):
+        attribute = getattr(self.inner, name)
+        if not callable(attribute) or name in ("close", "wait", "move_duration"):
+            return attribute
+
+        def record(*args):
+            self._log.write({"t": self.clock(), "call": name, "args": list(args)})
+            return attribute(*args)
+
+        return record
+
+    def close(self):
+        self._log.close()
+        self.inner.close()
+
+
+class RecordingActuatorDriver(_RecordingDriver):
+    KIND = "actuator"
+
+
+class RecordingCleaningDriver(_RecordingDriver):
+    KIND = "cleaning"
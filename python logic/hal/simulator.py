@@ -0,0 +1,109 @@
+import random
+
+from Controllers.sensor_bus import SensorBus
+
+from .drivers import ActuatorDriver, CleaningDriver, SlewRateModel
+
+
+class SimulatedSensorBus(SensorBus):
+    """
+    Random readings for simulated mode. It reports dust directly instead of
+    panel power. Every read is a fresh draw (nothing is cached), in the
+    order requested, so seeded runs reproduce.
+    """
+
+    realtime = False
+    channels = ("dust", "wind_speed", "wind_direction")
+
+    def __init__(self, seed=None):
+        """
+        :param seed: (Optional) seed for reproducible runs
+        """
+        self._rng = random.Random(seed)
+        # For demonstration, you can tweak these ranges or formulas as needed:
+        self._simulated_wind_speed_min = 0.0
+        self._simulated_wind_speed_max = 25.0  # m/s
+        self._simulated_dust_min = 0.0
+        self._simulated_dust_max = 50.0  # up to 50% dust (for simulation)
+        self._last_wind_direction = 0    # store the last direction to mimic real sensors
+        self._readers = {
+            "dust": self._dust,
+            "wind_speed": self._wind_speed,
+            "wind_direction": self._wind_direction,
+        }
+
+    def read(self, channels):
+        return {c: self._readers[c]() for c in channels}
+
+    def read_channel(self, channel):
+        return self._readers[channel]()
+
+    def _wind_speed(self):
+        return self._rng.uniform(self._simulated_wind_speed_min, self._simulated_wind_speed_max)
+
+    def _dust(self):
+        return self._rng.uniform(self._simulated_dust_min, self._simulated_dust_max)
+
+    def _wind_direction(self):
+        # Semi-random changes from the last direction (not pure random each time)
+        delta = self._rng.uniform(-30, 30)
+        self._last_wind_direction = (self._last_wind_direction + delta) % 360
+        return self._last_wind_direction
+
+
+class SimulatedActuatorDriver(ActuatorDriver):
+    """
+    No motors: the controller's angle bookkeeping is the whole move.
+
+    With a slew-rate model, move durations are reported (see
+    ActuatorController.motion_stats()). With a time_scale as well, each
+    move also takes duration * time_scale of wall-clock time and can be
+    cut short by stop(), which exercises concurrent moves and cancellation
+    without hardware.
+    """
+
+    realtime = False
+
+    def __init__(self, slew=None, time_scale=0.0):
+        """
+        :param slew: (Optional) SlewRateModel, or a dict of its keyword arguments
+        :param time_scale: wall-clock seconds per modelled second (0: moves are instant)
+        """
+        self.slew = SlewRateModel(**slew) if isinstance(slew, dict) else slew
+        self.time_scale = time_scale
+        self.realtime = bool(self.slew is not None and time_scale > 0)
+
+    def rotate_base(self, from_angle, target_angle):
+        return self._move("base", from_angle, target_angle)
+
+    def tilt_top(self, from_angle, target_angle):
+        return self._move("tilt", from_angle, target_angle)
+
+    def stop(self):
+        if self.realtime:
+            self._halt()
+
+    def _move(self, axis, from_angle, target_angle):
+        if not self.realtime:
+            return None
+        done = self._travel(self.move_duration(axis, from_angle, target_angle) * self.time_scale)
+        if done >= 1.0:
+            return None
+        if axis == "base":
+            return (from_angle + done * ((target_angle - from_angle + 180) % 360 - 180)) % 360
+        return from_angle + done * (target_angle - from_angle)
+
+
+class SimulatedCleaningDriver(CleaningDriver):
+    """No pump: cleaning only updates the controller's water accounting."""
+
+    realtime = False
+
+    def set_pump(self, on):
+        pass
+
+    def set_vibration(self, on):
+        pass
+
+    def wait(self, seconds):
+        pass
@@ -0,0 +1,89 @@
+from Controllers.sensor_bus import RAW_CHANNELS, SensorBus
+from telemetry.events import DEBUG, get_event_bus
+
+from .drivers import ActuatorDriver, CleaningDriver
+
+
+class StubSensorBus(SensorBus):
+    """
+    Placeholder hardware reads for 'real' mode. Replace with your sensors
+    (or select the 'i2c' backend).
+    """
+
+    channels = RAW_CHANNELS
+
+    def read(self, channels):
+        return {c: getattr(self, "_read_" + c)() for c in channels}
+
+    def _read_power(self):
+        """
+        If using a voltage/current sensor, read it here and convert to watts.
+        """
+        # Placeholder example:
+        return 250.0  # some measured value in watts
+
+    def _read_wind_speed(self):
+        """
+        Actual code to read wind speed from hardware sensors.
+        """
+        # Example placeholder
+        wind_speed = 0.0
+        # e.g. read pulses from an anemometer for a certain interval
+        # convert pulses to wind speed (m/s) using sensor's datasheet formula
+        return wind_speed
+
+    def _read_wind_direction(self):
+        """
+        Replace with actual code for a wind vane or multi-sensor approach
+        to get direction in degrees (0-359).
+        """
+        # Placeholder example
+        return 0.0
+
+    def _read_ambient_temperature(self):
+        """
+        Air temperature in °C for the power model's temperature derating.
+        """
+        # Placeholder example
+        return 25.0
+
+
+class StubActuatorDriver(ActuatorDriver):
+    """Placeholder motor commands for 'real' mode (see the 'pwm' backend)."""
+
+    # Commands return at once, so moves don't need the axis worker threads
+    realtime = False
+
+    def __init__(self, events=None):
+        self.events = events if events is not None else get_event_bus()
+
+    def rotate_base(self, from_angle, target_angle):
+        """Command the base actuator from from_angle to target_angle."""
+        self.events.emit(DEBUG, "ActuatorController", "(Stub) Rotating base from %s° to %s°",
+                         from_angle, target_angle, mode="real")
+
+    def tilt_top(self, from_angle, target_angle):
+        """Command the tilt actuator from from_angle to target_angle."""
+        self.events.emit(DEBUG, "ActuatorController", "(Stub) Tilting top from %s° to %s°",
+                         from_angle, target_angle, mode="real")
+
+    def stop(self):
+        """Immediately halt any motor movement."""
+        self.events.emit(DEBUG, "ActuatorController", "(Stub) Stopping hardware actuators.", mode="real")
+
+
+class StubCleaningDriver(CleaningDriver):
+    """Placeholder pump and vibration switching for 'real' mode (see 'gpio')."""
+
+    def __init__(self, events=None):
+        self.events = events if events is not None else get_event_bus()
+
+    def set_pump(self, on):
+        """Turn the water pump on or off (GPIO HIGH/LOW or similar)."""
+        self.events.emit(DEBUG, "CleaningController", "(Stub) Water pump %s.",
+                         "ON" if on else "OFF", mode="real")
+
+    def set_vibration(self, on):
+        """Turn any vibration mechanism that loosens dust on or off."""
+        self.events.emit(DEBUG, "CleaningController", "(Stub) Vibration %s.",
+                         "ON" if on else "OFF", mode="real")
@@ -1,25 +1,49 @@
+import asyncio
+import sys
 import time
 
 # Import controllers
 from Controllers.sensor_controller import SensorController
 from Controllers.actuator_controller import ActuatorController
 from Controllers.cleaning_controller import CleaningController
+from Controllers.motion_planner import MotionPlanner
 
 # Import managers
 from managers.decision_manager import DecisionManager
+# from models.solar_position import SolarEphemeris  # Uncomment to enable sun tracking
+# from models.expected_power import ClearSkyPowerModel  # Uncomment for real dust estimates
 # from managers.firebase_manager import FirebaseManager  # Uncomment if using Firebase
+# from managers.state_writer import StateWriter  # Uncomment to coalesce and batch cloud writes
+# from telemetry.dashboard_server import DashboardServer  # Uncomment for the live dashboard
+# from managers.checkpoint import Checkpointer  # Uncomment for warm restarts
+# from managers.override_listener import OverrideListener  # Uncomment for pushed overrides
 
-def main():
+def build_system():
     """
-    Main entry point for the solar panel system. Instantiates all controllers,
-    sets up the DecisionManager, and runs the control loop.
+    Instantiates all controllers and returns the DecisionManager wired to them.
     """
 
     # 1. Instantiate each controller in either 'simulated' or 'real' mode
-    sensor_ctrl = SensorController(mode="simulated")
+    #    ('real' uses the hardware stubs; pick drivers per site, e.g.
+    #    ActuatorController(mode="real", driver="pwm", driver_options={"base_pin": 18}),
+    #    CleaningController(mode="real", driver="gpio"), SensorController(mode="real", bus="i2c"))
+    #    To see realistic reposition times in simulation, give the simulator a slew model:
+    #    ActuatorController(driver="simulator", driver_options={"slew": {"base_rate": 6.0, "tilt_rate": 3.0}})
     actuator_ctrl = ActuatorController(mode="simulated")
+    # (Optional) Clear-sky reference for dust estimation in 'real' mode
+    # power_model = ClearSkyPowerModel(latitude=24.7136, longitude=46.6753, rated_power=300.0)
+    power_model = None  # Without it, expected power is a fixed 300 W
+    sensor_ctrl = SensorController(mode="simulated", power_model=power_model,
+                                   actuator_ctrl=actuator_ctrl)
     cleaning_ctrl = CleaningController(mode="simulated", initial_water_volume=2.0)
 
+    # (Optional, --planner) Put a MotionPlanner in front of the actuators:
+    # deadbands, wrap-aware azimuth, flip hysteresis and per-axis rate limits
+    # (deferred setpoints are issued by DecisionManager every tick)
+    motion_ctrl = actuator_ctrl
+    if "--planner" in sys.argv:
+        motion_ctrl = MotionPlanner(actuator_ctrl, min_command_interval=10.0)
+
     # 2. (Optional) If you have a Firebase manager, instantiate it here
     # firebase_mgr = FirebaseManager(
     #     firebase_config_path="path/to/credentials.json",
@@ -27,23 +51,133 @@ def main():
     # )
     firebase_mgr = None  # If not using Firebase yet
 
+    # (Optional) Send only changed state fields, batch events and spool them to
+    # disk while offline (StateWriter(WireBackend(link.send)) for the binary uplink)
+    # firebase_mgr = StateWriter(firebase_mgr, outbox_path="outbox.jsonl")
+
+    # (Optional) Sun position lookup table for the site (set your coordinates)
+    # solar_ephemeris = SolarEphemeris(latitude=24.7136, longitude=46.6753)
+    solar_ephemeris = None  # Without it, sun tracking just holds position
+
+    # (Optional) Push live state to HTML files/dashboard.html (port 8765)
+    # dashboard = DashboardServer(port=8765).start()
+    dashboard = None
+
+    # (Optional) Checkpoint state every tick and resume from it after a reboot or crash
+    # checkpointer = Checkpointer("state.ckpt")
+    checkpointer = None
+
+    # (Optional) Receive override commands as they are written instead of polling
+    # Firebase every tick; stop_all then halts the actuators at once
+    # override_listener = OverrideListener(firebase_mgr).start()
+    override_listener = None
+
     # 3. Create the DecisionManager with references to the controllers and Firebase (if any)
     decision_mgr = DecisionManager(
         sensor_ctrl=sensor_ctrl,
-        actuator_ctrl=actuator_ctrl,
+        actuator_ctrl=motion_ctrl,
         cleaning_ctrl=cleaning_ctrl,
-        firebase_mgr=firebase_mgr
+        firebase_mgr=firebase_mgr,
+        solar_ephemeris=solar_ephemeris,
+        dashboard=dashboard,
+        checkpointer=checkpointer,
+        override_listener=override_listener
     )
+    if checkpointer:
+        # Warm restart: angles, water level and any wind cleaning in progress,
+        # instead of re-homing the trackers
+        checkpointer.restore(decision_mgr)
+    return decision_mgr
 
-    # 4. Run your main control loop
-    #    - Each iteration calls decision_mgr.run_logic() to handle
-    #      sun tracking, cleaning, etc.
+def shutdown(decision_mgr):
+    """
+    Shared shutdown path for every runtime: stops listening for overrides,
+    stops and closes the actuators and closes the checkpoint file, cloud
+    writer and dashboard.
+    """
+    if decision_mgr.override_listener:
+        decision_mgr.override_listener.close()
+    decision_mgr.actuator_ctrl.stop_actuators()
+    decision_mgr.actuator_ctrl.close()  # axis worker threads and driver (e.g. PWM pins)
+    if decision_mgr.checkpointer:
+        decision_mgr.checkpointer.close()
+    if hasattr(decision_mgr.firebase_mgr, "close"):
+        decision_mgr.firebase_mgr.close()  # StateWriter: final flush, the rest stays in the outbox
+    if decision_mgr.dashboard:
+        decision_mgr.dashboard.stop()
+
+def main():
+    """
+    Main entry point for the solar panel system. Instantiates all controllers,
+    sets up the DecisionManager, and runs the control loop.
+    """
+    if "--adaptive" in sys.argv and "--event-driven" in sys.argv:
+        # The scheduler calls run_logic() itself, so step() would never run
+        sys.exit("--adaptive and --event-driven cannot be combined")
+    decision_mgr = build_system()
+    # With an override listener, a new command cuts the sleep short
+    listener = decision_mgr.override_listener
+    sleep = listener.wait if listener else time.sleep
+    scheduler = None
     try:
+        if "--adaptive" in sys.argv:
+            # Tick interval per state/time of day, sleeps through the night
+            from managers.tick_scheduler import AdaptiveTickScheduler
+            scheduler = AdaptiveTickScheduler(decision_mgr, sleep=sleep)
+            scheduler.run()
+            return
+
+        run_logic = decision_mgr.run_logic
+        if "--event-driven" in sys.argv:
+            # Only re-evaluate guards whose inputs changed; timeouts come from a timer wheel
+            from managers.event_driven_manager import EventDrivenDecisionManager
+            run_logic = EventDrivenDecisionManager(decision_mgr).step
+
+        # 4. Run your main control loop
+        #    - Each iteration calls decision_mgr.run_logic() to handle
+        #      sun tracking, cleaning, etc.
         while True:
-            decision_mgr.run_logic()
-            time.sleep(2)  # Sleep interval; adjust as needed
+            run_logic()
+            sleep(2)  # Sleep interval; adjust as needed
     except KeyboardInterrupt:
-        print("Shutting down system...")
+        if scheduler is not None:
+            print(f"Shutting down system... {scheduler.stats()}")
+        else:
+            print("Shutting down system...")
+    finally:
+        shutdown(decision_mgr)
+
+async def main_async():
+    """
+    Asyncio entry point. Same loop as main(), but sensor reads run
+    concurrently and long actions (e.g. the water pump) run in the
+    background instead of stalling the tick.
+    """
+    decision_mgr = build_system()
+    try:
+        while True:
+            await decision_mgr.run_logic_async()
+            await asyncio.sleep(2)  # Sleep interval; adjust as needed
+    finally:
+        shutdown(decision_mgr)
+
+def main_fleet(num_panels):
+    """
+    Multi-core entry point: runs one DecisionManager per tracker, with the
+    trackers split across worker processes (see managers/fleet_runner.py).
+    """
+    from managers.fleet_runner import FleetRunner
+    runner = FleetRunner(num_panels, tick_interval=2, mode="simulated", heartbeat_timeout=30)
+    runner.run()
+    print("Shutting down system...")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if "--fleet" in sys.argv:
+        main_fleet(int(sys.argv[sys.argv.index("--fleet") + 1]))
+    elif "--async" in sys.argv:
+        try:
+            asyncio.run(main_async())
+        except KeyboardInterrupt:
+            print("Shutting down system...")
+    else:
+        main()
\ No newline at end of file
@@ -1,5 +1,63 @@
-from .decision_manager import DecisionManager
+# Imported on first access: the fleet and policy-sweep modules pull in numpy
+# and multiprocessing, which the single-panel control loop never needs
+_LAZY = {
+    "Checkpointer": ".checkpoint",
+    "DecisionManager": ".decision_manager",
+    "EventDrivenDecisionManager": ".event_driven_manager",
+    "Transition": ".event_driven_manager",
+    "default_transitions": ".event_driven_manager",
+    "FleetDecisionManager": ".fleet_decision_manager",
+    "FleetRunner": ".fleet_runner",
+    "FleetSensorFilter": ".fleet_sensor_filter",
+    "default_fleet_filters": ".fleet_sensor_filter",
+    "OverrideListener": ".override_listener",
+    "PolicySweep": ".policy_sweep",
+    "parameter_grid": ".policy_sweep",
+    "synthetic_trace": ".policy_sweep",
+    "trace_from_csv": ".policy_sweep",
+    "trace_from_store": ".policy_sweep",
+    "LocalBackend": ".state_writer",
+    "StateWriter": ".state_writer",
+    "WireBackend": ".state_writer",
+    "Simulation": ".simulation",
+    "VirtualClock": ".simulation",
+    "TimerWheel": ".timer_wheel",
+    "AdaptiveTickScheduler": ".tick_scheduler",
+    "ChannelPoller": ".tick_scheduler",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
+    "Checkpointer",
     "DecisionManager",
+    "EventDrivenDecisionManager",
+    "Transition",
+    "default_transitions",
+    "FleetDecisionManager",
+    "FleetRunner",
+    "FleetSensorFilter",
+    "default_fleet_filters",
+    "OverrideListener",
+    "PolicySweep",
+    "parameter_grid",
+    "synthetic_trace",
+    "trace_from_csv",
+    "trace_from_store",
+    "LocalBackend",
+    "StateWriter",
+    "WireBackend",
+    "Simulation",
+    "VirtualClock",
+    "TimerWheel",
+    "AdaptiveTickScheduler",
+    "ChannelPoller",
 ]
\ No newline at end of file
@@ -0,0 +1,211 @@
+import math
+import os
+import struct
+import time
+import zlib
+
+from .decision_manager import DecisionManager
+
+MAGIC = b"SPCK"
+VERSION = 1
+
+# The state is stored as a one-byte code. The order is part of the file
+# format: append new states, never reorder.
+STATE_NAMES = (
+    DecisionManager.STATE_SUN_TRACKING,
+    DecisionManager.STATE_CLEANING_WIND,
+    DecisionManager.STATE_CLEANING_WATER,
+    DecisionManager.STATE_IDLE,
+)
+STATE_CODES = {name: code for code, name in enumerate(STATE_NAMES)}
+UNKNOWN_STATE = 255
+
+# magic, version, sequence, saved_at, state code, base angle, tilt angle,
+# water volume, wind clean start (NaN == none), then the settings in effect
+# at save time (wind clean duration, dust threshold, wind speed threshold,
+# water per clean; recorded for diagnostics, never restored). A CRC32 of
+# all of it follows, so a torn write is detected on load.
+_BODY = struct.Struct("<4sHxxQdB7xdddddddd")
+_CRC = struct.Struct("<I")
+SLOT_SIZE = _BODY.size + _CRC.size
+
+
+class Checkpointer:
+    """
+    Crash-safe binary checkpoint of the state a restart would otherwise
+    lose: DecisionManager's state and wind cleaning timer, the actuator
+    angles and the water left in the reservoir.
+
+    The file holds two fixed-size slots and saves alternate between them,
+    each stamped with a sequence number and a CRC. A crash or power cut in
+    the middle of a write can only tear the slot being written; load()
+    returns the newest slot whose CRC checks out. Because a save is one
+    pwrite of ~100 bytes into a file that is already open, and is skipped
+    when nothing changed, it is cheap enough to run on every tick.
+
+    Writes reach the OS page cache immediately (enough to survive a process
+    crash). They are fsync'ed at once when the state or the water volume
+    changed, and otherwise at most every `fsync_interval` seconds, so a
+    power cut can lose at most that much panel movement.
+    """
+
+    def __init__(self, path, fsync_interval=30.0, clock=time.time):
+        """
+        :param path: checkpoint file (created if missing)
+        :param fsync_interval: longest time an angle-only change stays unsynced
+        :param clock: time source for save timestamps and the fsync interval
+        """
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.clock = clock
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        latest = self._read_latest()
+        self.sequence = latest["sequence"] if latest else 0
+        self._slot = self.sequence % 2
+        self._last_body = None
+        self._last_key = None
+        self._last_sync = clock()
+        self._dirty = False
+
+        # Counters
+        self.saves = 0
+        self.skipped = 0
+        self.syncs = 0
+
+    # ------------------------------------------------------
+    # Public Methods
+    # ------------------------------------------------------
+
+    def save(self, decision_mgr):
+        """
+        Writes the manager's current state if it changed since the last save.
+        Returns True if a checkpoint was written.
+        """
+        mgr = decision_mgr
+        start = mgr.wind_clean_start_time
+        body_fields = (
+            STATE_CODES.get(mgr.system_state, UNKNOWN_STATE),
+            float(mgr.actuator_ctrl.current_base_angle),
+            float(mgr.actuator_ctrl.current_tilt_angle),
+            float(mgr.cleaning_ctrl.water_volume),
+            math.nan if start is None else float(start),
+            float(mgr.wind_clean_duration),
+            float(mgr.dust_threshold),
+            float(mgr.wind_speed_threshold),
+            float(mgr.cleaning_ctrl.water_usage_per_clean),
+        )
+        now = self.clock()
+        if body_fields == self._last_body:
+            self.skipped += 1
+            if self._dirty and now - self._last_sync >= self.fsync_interval:
+                self.sync()
+            return False
+
+        # State changes and water use are synced right away; angles can wait
+        key = (body_fields[0], body_fields[3])
+        urgent = key != self._last_key
+
+        self.sequence += 1
+        self._slot ^= 1
+        body = _BODY.pack(MAGIC, VERSION, self.sequence, now, *body_fields)
+        os.pwrite(self._fd, body + _CRC.pack(zlib.crc32(body)), self._slot * SLOT_SIZE)
+        self._last_body = body_fields
+        self._last_key = key
+        self._dirty = True
+        self.saves += 1
+
+        if urgent or now - self._last_sync >= self.fsync_interval:
+            self.sync()
+        return True
+
+    def sync(self):
+        """Forces written checkpoints to disk."""
+        if self._dirty:
+            os.fsync(self._fd)
+            self.syncs += 1
+            self._dirty = False
+        self._last_sync = self.clock()
+
+    def load(self):
+        """
+        Returns the newest intact checkpoint as a dict, or None if there is
+        none (first start, or both slots damaged).
+        """
+        return self._read_latest()
+
+    def restore(self, decision_mgr):
+        """
+        Applies the newest checkpoint to a freshly built DecisionManager and
+        its controllers, so the trackers resume where they stopped instead of
+        re-homing. Returns the checkpoint dict, or None if there was none.
+
+        Only runtime state is restored (state, wind cleaning timer, angles,
+        water volume). Thresholds, durations and water per clean come from
+        the configuration the manager was built with, so settings changed
+        while the system was down take effect.
+        """
+        checkpoint = self.load()
+        if checkpoint is None:
+            return None
+        mgr = decision_mgr
+        if checkpoint["state"] is not None:
+            mgr.system_state = checkpoint["state"]
+        mgr.wind_clean_start_time = checkpoint["wind_clean_start_time"]
+
+        # The motors haven't moved since the save; only the bookkeeping is reset.
+        # (A MotionPlanner exposes the angles read-only; set them underneath.)
+        actuator_ctrl = getattr(mgr.actuator_ctrl, "actuator_ctrl", mgr.actuator_ctrl)
+        actuator_ctrl.current_base_angle = checkpoint["base_angle"]
+        actuator_ctrl.current_tilt_angle = checkpoint["tilt_angle"]
+        mgr.cleaning_ctrl.water_volume = checkpoint["water_volume"]
+
+        self._last_body = None  # next save writes unconditionally
+        return checkpoint
+
+    def close(self):
+        if self._fd is None:
+            return
+        self.sync()
+        os.close(self._fd)
+        self._fd = None
+
+    # ------------------------------------------------------
+    # Internal Helpers
+    # ------------------------------------------------------
+
+    def _read_latest(self):
+        data = os.pread(self._fd, 2 * SLOT_SIZE, 0)
+        latest = None
+        for slot in range(2):
+            raw = data[slot * SLOT_SIZE:(slot + 1) * SLOT_SIZE]
+            checkpoint = _decode(raw)
+            if checkpoint is not None and (latest is None or checkpoint["sequence"] > latest["sequence"]):
+                latest = checkpoint
+        return latest
+
+
+def _decode(raw):
+    """Slot bytes -> checkpoint dict, or None if empty, torn or from another version."""
+    if len(raw) < SLOT_SIZE:
+        return None
+    body = raw[:_BODY.size]
+    if _CRC.unpack_from(raw, _BODY.size)[0] != zlib.crc32(body):
+        return None
+    (magic, version, sequence, saved_at, code, base_angle, tilt_angle, water_volume,
+     wind_start, wind_duration, dust_threshold, wind_threshold, water_per_clean) = _BODY.unpack(body)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return {
+        "sequence": sequence,
+        "saved_at": saved_at,
+        "state": STATE_NAMES[code] if code < len(STATE_NAMES) else None,
+        "base_angle": base_angle,
+        "tilt_angle": tilt_angle,
+        "water_volume": water_volume,
+        "wind_clean_start_time": None if math.isnan(wind_start) else wind_start,
+        "wind_clean_duration": wind_duration,
+        "dust_threshold": dust_threshold,
+        "wind_speed_threshold": wind_threshold,
+        "water_usage_per_clean": water_per_clean,
+    }
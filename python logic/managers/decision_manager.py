@@ -1,5 +1,10 @@
+import asyncio
 import time
 
+from time import perf_counter
+
+from telemetry.events import INFO, LEVEL_NAMES, WARNING, get_event_bus
+
 class DecisionManager:
     """
     Handles the state machine for solar panel operations:
@@ -15,17 +20,57 @@ class DecisionManager:
     STATE_CLEANING_WATER = "CLEANING_WATER"
     STATE_IDLE = "IDLE"
 
-    def __init__(self, sensor_ctrl, actuator_ctrl, cleaning_ctrl, firebase_mgr=None):
+    def __init__(self, sensor_ctrl, actuator_ctrl, cleaning_ctrl, firebase_mgr=None,
+                 solar_ephemeris=None, dust_history=None, wind_history=None,
+                 clock=time.time, events=None, metrics=None, store=None, dashboard=None,
+                 checkpointer=None, sensor_filters=None, override_listener=None):
         """
         :param sensor_ctrl: Instance of SensorController
         :param actuator_ctrl: Instance of ActuatorController
         :param cleaning_ctrl: Instance of CleaningController
         :param firebase_mgr: (Optional) Instance of FirebaseManager
+        :param solar_ephemeris: (Optional) Instance of SolarEphemeris for the site;
+                                without it, sun tracking just holds position
+        :param dust_history: (Optional) SensorHistory; if given, decisions use its
+                             smoothed dust level instead of the raw sample
+        :param wind_history: (Optional) SensorHistory for wind speed, same idea
+        :param clock: time source; a VirtualClock lets simulations run faster
+                      than real time
+        :param events: (Optional) EventBus; defaults to the shared bus
+        :param metrics: (Optional) ControlLoopMetrics for per-phase latency and
+                        transition counters
+        :param store: (Optional) TimeSeriesStore that records every tick's
+                      readings, angles and state, plus state changes and logs
+        :param dashboard: (Optional) DashboardServer that gets pushed each tick's
+                          state (only changed fields go out)
+        :param checkpointer: (Optional) Checkpointer that saves the state every
+                             tick so a restart can resume without re-homing
+        :param sensor_filters: (Optional) dict {'dust' / 'wind_speed': FilterChain}
+                               that rejects spikes and glitches before the
+                               readings reach the histories and state machine
+        :param override_listener: (Optional) OverrideListener; commands are then
+                                  drained from its queue instead of polling
+                                  firebase_mgr every tick, and stop_all acts
+                                  the moment it arrives (see preempt())
         """
         self.sensor_ctrl = sensor_ctrl
         self.actuator_ctrl = actuator_ctrl
         self.cleaning_ctrl = cleaning_ctrl
         self.firebase_mgr = firebase_mgr
+        self.solar_ephemeris = solar_ephemeris
+        self.dust_history = dust_history
+        self.wind_history = wind_history
+        self.clock = clock
+        self.events = events if events is not None else get_event_bus()
+        self.metrics = metrics
+        self.store = store
+        self.dashboard = dashboard
+        self.checkpointer = checkpointer
+        self.sensor_filters = sensor_filters
+        self.override_listener = override_listener
+        if override_listener is not None and override_listener.on_emergency is None:
+            override_listener.on_emergency = self.preempt
+        self._preempted = False
 
         # Current system state
         self.system_state = self.STATE_SUN_TRACKING
@@ -38,41 +83,154 @@ class DecisionManager:
         self.dust_threshold = 20.0   # e.g., >20% dust triggers cleaning
         self.wind_speed_threshold = 15.0  # e.g., >15 m/s is sufficient for wind cleaning
 
+        # Background water cleaning run (async runtime only)
+        self._water_clean_task = None
+
     def run_logic(self):
         """
         Main method to be called repeatedly (e.g., in a loop from main.py).
         Gathers sensor data, checks system state, performs transitions, and
         updates Firebase (if available).
         """
+        if self.metrics is not None:
+            return self._run_logic_instrumented()
+
         # 1. Gather necessary sensor data
-        dust_level = self._check_dust_level()      # Indirect dust measurement
-        wind_speed = self.sensor_ctrl.get_wind_speed()
+        dust_level, wind_speed = self._gather_sensor_data()
 
         # 2. Check for user overrides (if firebase is integrated)
-        if self.firebase_mgr:
+        if self.firebase_mgr or self.override_listener:
+            self._handle_overrides()
+
+        # 3. State Machine Logic (after issuing any deferred actuator setpoints)
+        self.actuator_ctrl.update()
+        self._run_state_handler(dust_level, wind_speed)
+        if self._preempted:
+            # An emergency arrived mid-tick: apply it before the tick ends
+            self._handle_overrides()
+
+        # 4. (Optional) Log or store updated state in Firebase
+        self._update_firebase_state()
+        self._record_sample(dust_level, wind_speed)
+
+    def _run_logic_instrumented(self):
+        """
+        Same steps as run_logic(), timing each phase into self.metrics.
+        """
+        metrics = self.metrics
+        profiled = metrics.tick_started()
+        start = t0 = perf_counter()
+
+        dust_level, wind_speed = self._gather_sensor_data()
+        t1 = perf_counter()
+        metrics.observe_phase("sensors", t1 - t0)
+
+        if self.firebase_mgr or self.override_listener:
+            self._handle_overrides()
+        t0 = perf_counter()
+        metrics.observe_phase("overrides", t0 - t1)
+
+        self.actuator_ctrl.update()
+        self._run_state_handler(dust_level, wind_speed)
+        if self._preempted:
             self._handle_overrides()
+        t1 = perf_counter()
+        metrics.observe_phase("state_handler", t1 - t0)
+
+        self._update_firebase_state()
+        self._record_sample(dust_level, wind_speed)
+        t0 = perf_counter()
+        metrics.observe_phase("cloud_update", t0 - t1)
+
+        metrics.observe_tick(t0 - start)
+        metrics.tick_finished(profiled)
+
+    async def run_logic_async(self):
+        """
+        Async equivalent of run_logic() for the asyncio runtime.
+        Sensor reads run concurrently, and a water cleaning run continues in
+        the background so the next tick is never blocked by the pump.
+        Phases, ticks and profiles are recorded as in the sync runtime.
+        """
+        metrics = self.metrics
+        profiled = metrics.tick_started() if metrics is not None else False
+        start = t0 = perf_counter()
+        # 1. Gather necessary sensor data concurrently
+        dust_level, wind_speed = await asyncio.gather(
+            self.sensor_ctrl.get_dust_percentage_async(),
+            self.sensor_ctrl.get_wind_speed_async(),
+        )
+        dust_level, wind_speed = self._smooth_readings(dust_level, wind_speed)
+        t0 = self._observe_phase("sensors", t0)
+
+        # 2. Check for user overrides (if firebase is integrated)
+        if self.override_listener:
+            self._handle_overrides()  # only drains a local queue
+        elif self.firebase_mgr:
+            # Only the remote calls leave the loop: applying the command
+            # changes the state and may cancel the water cleaning task
+            override_command = await asyncio.to_thread(self.firebase_mgr.get_override_command)
+            if override_command:
+                self._apply_override(override_command)
+                await asyncio.to_thread(self.firebase_mgr.clear_override_command)
+        t0 = self._observe_phase("overrides", t0)
 
         # 3. State Machine Logic
+        await self.actuator_ctrl.update_async()
         if self.system_state == self.STATE_SUN_TRACKING:
-            self._handle_sun_tracking(dust_level, wind_speed)
+            await self._handle_sun_tracking_async(dust_level, wind_speed)
 
         elif self.system_state == self.STATE_CLEANING_WIND:
-            self._handle_wind_cleaning(dust_level, wind_speed)
+            await self._handle_wind_cleaning_async(dust_level, wind_speed)
 
         elif self.system_state == self.STATE_CLEANING_WATER:
-            self._handle_water_cleaning()
+            await self._handle_water_cleaning_async()
 
         elif self.system_state == self.STATE_IDLE:
-            # Idle means do nothing or minimal actions (e.g., safety override).
             pass
+        if self._preempted:
+            self._handle_overrides()
+        t0 = self._observe_phase("state_handler", t0)
 
         # 4. (Optional) Log or store updated state in Firebase
-        self._update_firebase_state()
+        if self.firebase_mgr:
+            await asyncio.to_thread(self._update_firebase_state)
+        self._record_sample(dust_level, wind_speed)
+        t0 = self._observe_phase("cloud_update", t0)
+
+        if metrics is not None:
+            metrics.observe_tick(t0 - start)
+            metrics.tick_finished(profiled)
 
     # -----------------------
     # Internal State Handlers
     # -----------------------
 
+    def _gather_sensor_data(self):
+        """
+        Reads dust level and wind speed, filtered and smoothed if configured.
+        """
+        dust_level = self._check_dust_level()      # Indirect dust measurement
+        wind_speed = self.sensor_ctrl.get_wind_speed()
+        return self._smooth_readings(dust_level, wind_speed)
+
+    def _run_state_handler(self, dust_level, wind_speed):
+        """
+        Dispatches to the handler for the current state.
+        """
+        if self.system_state == self.STATE_SUN_TRACKING:
+            self._handle_sun_tracking(dust_level, wind_speed)
+
+        elif self.system_state == self.STATE_CLEANING_WIND:
+            self._handle_wind_cleaning(dust_level, wind_speed)
+
+        elif self.system_state == self.STATE_CLEANING_WATER:
+            self._handle_water_cleaning()
+
+        elif self.system_state == self.STATE_IDLE:
+            # Idle means do nothing or minimal actions (e.g., safety override).
+            pass
+
     def _handle_sun_tracking(self, dust_level, wind_speed):
         """
         Handles normal operation of tracking the sun, and transitions to
@@ -86,9 +244,7 @@ class DecisionManager:
                 self._switch_state(self.STATE_CLEANING_WATER)
         else:
             # Otherwise, just track the sun
-            self.actuator_ctrl.stop_actuators()  # or refine with real sun-tracking logic
-            # Example: If you have a method to track sun
-            # self._track_sun()
+            self._track_sun()
 
     def _handle_wind_cleaning(self, dust_level, wind_speed):
         """
@@ -97,10 +253,10 @@ class DecisionManager:
         """
         # If just entered wind cleaning (start_time not set), begin now
         if self.wind_clean_start_time is None:
-            self.wind_clean_start_time = time.time()
+            self.wind_clean_start_time = self.clock()
             self._tilt_for_wind_cleaning()  # calls cleaning_ctrl or actuators
 
-        elapsed = time.time() - self.wind_clean_start_time
+        elapsed = self.clock() - self.wind_clean_start_time
 
         # If dust is now below threshold, go back to sun tracking
         if dust_level <= self.dust_threshold:
@@ -122,10 +278,75 @@ class DecisionManager:
             self._switch_state(self.STATE_SUN_TRACKING)
         else:
             # Reservoir is empty or cleaning failed
-            self._log_event("WARNING: Water reservoir empty or cleaning failed.")
+            self._log_event("Water reservoir empty or cleaning failed.", WARNING)
             # Decide next state (Idle or remain in sun tracking)
             self._switch_state(self.STATE_SUN_TRACKING)
 
+    # -----------------------------
+    # Async State Handlers
+    # -----------------------------
+
+    async def _handle_sun_tracking_async(self, dust_level, wind_speed):
+        """
+        Async equivalent of _handle_sun_tracking().
+        """
+        if dust_level > self.dust_threshold:
+            if wind_speed > self.wind_speed_threshold:
+                self._switch_state(self.STATE_CLEANING_WIND)
+            else:
+                self._switch_state(self.STATE_CLEANING_WATER)
+        else:
+            await self._track_sun_async()
+
+    async def _handle_wind_cleaning_async(self, dust_level, wind_speed):
+        """
+        Async equivalent of _handle_wind_cleaning().
+        """
+        if self.wind_clean_start_time is None:
+            self.wind_clean_start_time = self.clock()
+            wind_direction = await self.sensor_ctrl.get_wind_direction_async()
+            await self.cleaning_ctrl.tilt_for_wind_cleaning_async(self.actuator_ctrl, wind_direction)
+
+        elapsed = self.clock() - self.wind_clean_start_time
+
+        if dust_level <= self.dust_threshold:
+            self._switch_state(self.STATE_SUN_TRACKING)
+        elif elapsed > self.wind_clean_duration:
+            self._switch_state(self.STATE_CLEANING_WATER)
+
+    async def _handle_water_cleaning_async(self):
+        """
+        Starts a water cleaning run as a background task on the first tick in
+        this state, and applies the result on the tick after it finishes.
+        The state stays CLEANING_WATER while the pump is running.
+        """
+        if self._water_clean_task is None:
+            self._water_clean_task = asyncio.create_task(self.cleaning_ctrl.clean_with_water_async())
+            # Let short (e.g. simulated) runs finish within this tick
+            await asyncio.sleep(0)
+
+        if not self._water_clean_task.done():
+            return
+
+        task, self._water_clean_task = self._water_clean_task, None
+        if not task.result():
+            self._log_event("Water reservoir empty or cleaning failed.", WARNING)
+        self._switch_state(self.STATE_SUN_TRACKING)
+
+    async def _track_sun_async(self):
+        """
+        Async equivalent of _track_sun().
+        """
+        if self.solar_ephemeris is None:
+            await self.actuator_ctrl.stop_actuators_async()
+            return
+
+        azimuth, elevation = self.solar_ephemeris.get_sun_position(self.clock())
+        if elevation <= 0:
+            await self.actuator_ctrl.stop_actuators_async()
+        else:
+            await self.actuator_ctrl.move_panel_for_sun_async(azimuth, elevation)
+
     # -------------------------
     # Supporting / Utility Code
     # -------------------------
@@ -134,19 +355,50 @@ class DecisionManager:
         """
         Safely updates the system state. Clears any needed timers or counters.
         """
+        if self.metrics is not None:
+            self.metrics.record_switch(self.system_state, new_state)
+        if self.store is not None and new_state != self.system_state:
+            self.store.record_state_change(self.clock(), self.system_state, new_state)
         self.system_state = new_state
         if new_state != self.STATE_CLEANING_WIND:
             self.wind_clean_start_time = None  # reset wind cleaning timer
+        if new_state != self.STATE_CLEANING_WATER and self._water_clean_task is not None:
+            # e.g. a stop_all override while the pump is running
+            self._water_clean_task.cancel()
+            self._water_clean_task = None
+
+    def preempt(self, command):
+        """
+        Emergency hook for the OverrideListener, called from its thread the
+        moment a command like stop_all arrives: the actuators stop at once
+        (a move in progress is cut short) and the running tick applies the
+        command as soon as its state handler returns.
+        """
+        self._preempted = True
+        if command == "stop_all":
+            self.actuator_ctrl.stop_actuators()
 
     def _handle_overrides(self):
         """
-        Checks Firebase for manual user commands (e.g., force cleaning, stop all).
-        After processing, clears them as needed.
+        Checks for manual user commands (e.g., force cleaning, stop all). With
+        an override_listener they are drained from its queue (no remote call);
+        otherwise Firebase is polled and the command cleared after processing.
         """
+        if self.override_listener is not None:
+            self._preempted = False
+            for override in self.override_listener.drain():
+                self._apply_override(override.command)
+            return
+
         override_command = self.firebase_mgr.get_override_command()
         if not override_command:
             return
+        self._apply_override(override_command)
+
+        # Clear the command in Firebase after handling (optional)
+        self.firebase_mgr.clear_override_command()
 
+    def _apply_override(self, override_command):
         if override_command == "force_clean":
             self._switch_state(self.STATE_CLEANING_WATER)
             self._log_event("User override: Forced water cleaning.")
@@ -159,8 +411,34 @@ class DecisionManager:
             self._switch_state(self.STATE_SUN_TRACKING)
             self._log_event("User override: Resumed sun tracking.")
 
-        # Clear the command in Firebase after handling (optional)
-        self.firebase_mgr.clear_override_command()
+    def _smooth_readings(self, dust_level, wind_speed):
+        """
+        Filters the raw readings, records them in the sensor histories (if
+        configured) and returns the smoothed values the state machine should
+        act on.
+        """
+        filters = self.sensor_filters
+        if filters:
+            now = self.clock()
+            dust_filter = filters.get("dust")
+            if dust_filter is not None:
+                dust_level = dust_filter.process(dust_level, now)
+            wind_filter = filters.get("wind_speed")
+            if wind_filter is not None:
+                wind_speed = wind_filter.process(wind_speed, now)
+        # A skipped (non-finite) reading falls back on the history so far;
+        # smoothed() is None only while a history is still empty
+        if self.dust_history is not None:
+            self.dust_history.append(dust_level)
+            smoothed = self.dust_history.smoothed()
+            if smoothed is not None:
+                dust_level = smoothed
+        if self.wind_history is not None:
+            self.wind_history.append(wind_speed)
+            smoothed = self.wind_history.smoothed()
+            if smoothed is not None:
+                wind_speed = smoothed
+        return dust_level, wind_speed
 
     def _check_dust_level(self):
         """
@@ -170,6 +448,22 @@ class DecisionManager:
         # If you have a method for that in the sensor controller, delegate to it:
         return self.sensor_ctrl.get_dust_percentage()
 
+    def _track_sun(self):
+        """
+        Points the panel at the sun using the site's ephemeris table.
+        Holds position (stops actuators) at night or if no ephemeris is set.
+        """
+        if self.solar_ephemeris is None:
+            self.actuator_ctrl.stop_actuators()
+            return
+
+        azimuth, elevation = self.solar_ephemeris.get_sun_position(self.clock())
+        if elevation <= 0:
+            # Sun is below the horizon; nothing to track
+            self.actuator_ctrl.stop_actuators()
+        else:
+            self.actuator_ctrl.move_panel_for_sun(azimuth, elevation)
+
     def _tilt_for_wind_cleaning(self):
         """
         Tells the CleaningController or ActuatorController to align the panel
@@ -191,11 +485,51 @@ class DecisionManager:
                 "windCleanStartTime": self.wind_clean_start_time,
             })
 
-    def _log_event(self, message):
+    def _record_sample(self, dust_level, wind_speed):
         """
-        Send a log or warning message to Firebase or a local logger.
+        Appends this tick's readings, angles, water level and state to the
+        time-series store, pushes them to the dashboard and checkpoints them
+        (if configured).
         """
-        if self.firebase_mgr:
-            self.firebase_mgr.log_event({"description": message})
+        if self.store is not None:
+            # On a hardware bus the direction comes from this tick's acquisition
+            self.store.record_sample(
+                self.clock(), dust_level, wind_speed,
+                self.actuator_ctrl.current_base_angle, self.actuator_ctrl.current_tilt_angle,
+                self.cleaning_ctrl.water_volume, self.system_state,
+                wind_direction=self.sensor_ctrl.get_wind_direction(),
+            )
+        if self.dashboard is not None:
+            self.dashboard.publish_from(self, dust_level, wind_speed)
+        if self.checkpointer is not None:
+            self.checkpointer.save(self)
+
+    def _observe_phase(self, phase, since):
+        """
+        Records the time since `since` as `phase` (if metrics are enabled)
+        and returns the current perf_counter().
+        """
+        now = perf_counter()
+        if self.metrics is not None:
+            self.metrics.observe_phase(phase, now - since)
+        return now
+
+    def _log_event(self, message, level=INFO):
+        """
+        Record a log or warning message on the event bus and send it to
+        Firebase (if available). The event is marked as uplinked, so a
+        CloudSink on the bus doesn't send it a second time.
+        """
+        if not self.firebase_mgr:
+            self.events.emit(level, "DecisionManager", message)
         else:
-            print(f"[LOG] {message}")
\ No newline at end of file
+            self.events.emit(level, "DecisionManager", message, uplinked=True)
+            self.firebase_mgr.log_event({
+                "description": message,
+                "level": LEVEL_NAMES.get(level, level),
+                "source": "DecisionManager",
+                "timestamp": self.clock(),
+            })
+        if self.store is not None:
+            self.store.record_event(self.clock(), message, level)
+
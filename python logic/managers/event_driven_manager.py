@@ -0,0 +1,279 @@
+from time import perf_counter
+
+from telemetry.events import WARNING
+
+from .decision_manager import DecisionManager
+from .timer_wheel import TimerWheel
+
+# Inputs guards can depend on
+INPUT_DUST = "dust"
+INPUT_WIND_SPEED = "wind_speed"
+INPUT_WIND_CLEAN_TIMEOUT = "wind_clean_timeout"
+
+
+class Transition:
+    """
+    One row of the state machine: source -> target when guard(mgr, inputs)
+    is true. `inputs` names what the guard reads, so it is only re-evaluated
+    when one of those inputs changes (or when the source state is entered).
+    `thresholds` maps an input to the manager attribute the guard compares
+    it against, so a change smaller than the input's epsilon is still
+    published when it crosses that threshold.
+    """
+
+    __slots__ = ("source", "target", "guard", "inputs", "thresholds", "name")
+
+    def __init__(self, source, target, guard, inputs=(), name=None, thresholds=None):
+        self.source = source
+        self.target = target
+        self.guard = guard
+        self.inputs = frozenset(inputs)
+        self.thresholds = dict(thresholds or {})
+        self.name = name or f"{source}->{target}"
+
+
+def default_transitions():
+    """
+    DecisionManager's handlers as a transition table. Thresholds are read
+    from the manager at evaluation time, so tuning them takes effect live.
+    """
+    S = DecisionManager
+    both = {INPUT_DUST: "dust_threshold", INPUT_WIND_SPEED: "wind_speed_threshold"}
+    return [
+        Transition(S.STATE_SUN_TRACKING, S.STATE_CLEANING_WIND,
+                   lambda m, i: i[INPUT_DUST] > m.dust_threshold
+                   and i[INPUT_WIND_SPEED] > m.wind_speed_threshold,
+                   (INPUT_DUST, INPUT_WIND_SPEED), "dusty_and_windy", both),
+        Transition(S.STATE_SUN_TRACKING, S.STATE_CLEANING_WATER,
+                   lambda m, i: i[INPUT_DUST] > m.dust_threshold
+                   and i[INPUT_WIND_SPEED] <= m.wind_speed_threshold,
+                   (INPUT_DUST, INPUT_WIND_SPEED), "dusty_and_calm", both),
+        Transition(S.STATE_CLEANING_WIND, S.STATE_SUN_TRACKING,
+                   lambda m, i: i[INPUT_DUST] <= m.dust_threshold,
+                   (INPUT_DUST,), "wind_cleaned", {INPUT_DUST: "dust_threshold"}),
+        Transition(S.STATE_CLEANING_WIND, S.STATE_CLEANING_WATER,
+                   lambda m, i: i.get(INPUT_WIND_CLEAN_TIMEOUT, False),
+                   (INPUT_WIND_CLEAN_TIMEOUT,), "wind_clean_timeout"),
+        # Water cleaning runs as the state's entry action, then always returns
+        Transition(S.STATE_CLEANING_WATER, S.STATE_SUN_TRACKING,
+                   lambda m, i: True, (), "water_cleaning_done"),
+    ]
+
+
+class EventDrivenDecisionManager:
+    """
+    Event-driven mode for a DecisionManager (its controllers, thresholds,
+    overrides, store and events are all reused).
+
+    - Sensor readings are published as changes: a new value only counts if
+      it moved more than the channel's epsilon since the last published
+      value, or crossed a threshold a guard of the current state compares
+      it against. Hardware with interrupts can call publish() directly.
+    - The state machine is the declarative `transitions` table. Guards are
+      indexed by (state, input), so a change re-evaluates only the guards of
+      the current state that read that input; a newly entered state runs its
+      entry action and has all of its guards evaluated once.
+    - The wind-clean timeout and periodic sun tracking are timers on a
+      TimerWheel instead of clock comparisons on every tick.
+
+    step() replaces run_logic() in the main loop and reports the same
+    per-phase timings, ticks and profiles to the manager's metrics.
+    """
+
+    def __init__(self, decision_mgr, epsilons=None, transitions=None,
+                 timer_resolution=1.0, tracking_interval=60.0):
+        """
+        :param decision_mgr: DecisionManager providing controllers and settings
+        :param epsilons: dict {input: minimum change that gets published}
+                         (default: 0.5 % dust, 0.5 m/s wind)
+        :param transitions: (Optional) list of Transition; defaults to default_transitions()
+        :param timer_resolution: TimerWheel precision in seconds
+        :param tracking_interval: seconds between sun tracking updates
+        """
+        self.mgr = decision_mgr
+        self.epsilons = {INPUT_DUST: 0.5, INPUT_WIND_SPEED: 0.5}
+        if epsilons:
+            self.epsilons.update(epsilons)
+        self.transitions = transitions if transitions is not None else default_transitions()
+        self.tracking_interval = tracking_interval
+        self.timers = TimerWheel(timer_resolution, clock=decision_mgr.clock)
+
+        self.inputs = {}
+        self._guards = {}  # (state, input) -> [Transition]
+        self._entry_guards = {}  # state -> [Transition]
+        self._thresholds = {}  # (state, input) -> [manager attribute]
+        for t in self.transitions:
+            self._entry_guards.setdefault(t.source, []).append(t)
+            for name in t.inputs:
+                self._guards.setdefault((t.source, name), []).append(t)
+            for name, attr in t.thresholds.items():
+                attrs = self._thresholds.setdefault((t.source, name), [])
+                if attr not in attrs:
+                    attrs.append(attr)
+        self._state_timers = []  # cancelled when the state is left
+        self._pending = set()    # inputs changed since the last evaluation
+        self._entered = None     # True: evaluate all guards of a newly entered state
+
+        # Counters
+        self.ticks = 0
+        self.published = 0
+        self.suppressed = 0
+        self.guard_evaluations = 0
+
+    # ------------------------------------------------------
+    # Public Methods
+    # ------------------------------------------------------
+
+    def publish(self, name, value):
+        """
+        Offers a new reading. Returns True if it moved past the epsilon (or
+        across a threshold of the current state's guards) and was published
+        (its dependent guards will be evaluated).
+        """
+        last = self.inputs.get(name)
+        if (last is not None and abs(value - last) < self.epsilons.get(name, 0.0)
+                and not self._crosses_threshold(name, last, value)):
+            self.suppressed += 1
+            return False
+        self.inputs[name] = value
+        self._pending.add(name)
+        self.published += 1
+        return True
+
+    def step(self):
+        """
+        One pass of the event loop: fire due timers, handle overrides, read
+        the sensors (publishing only real changes) and evaluate the guards
+        that depend on what changed. Like run_logic(), a step takes at most
+        one transition; a newly entered state's guards run on the next step.
+        """
+        mgr = self.mgr
+        metrics = mgr.metrics
+        profiled = metrics.tick_started() if metrics is not None else False
+        start = t0 = perf_counter()
+        self.ticks += 1
+        state_before = mgr.system_state
+
+        if self._entered is None:
+            # First step: the state may have been restored from a checkpoint
+            self._entered = True
+            self._run_entry_action(resume=True)
+        self.timers.advance()
+        if mgr.firebase_mgr or mgr.override_listener:
+            self._apply_overrides()
+        t0 = mgr._observe_phase("overrides", t0)
+
+        dust_level, wind_speed = mgr._gather_sensor_data()
+        self.publish(INPUT_DUST, dust_level)
+        self.publish(INPUT_WIND_SPEED, wind_speed)
+        t0 = mgr._observe_phase("sensors", t0)
+
+        mgr.actuator_ctrl.update()
+        if self._entered:
+            self._entered = False
+            self._pending.clear()
+            self._evaluate(self._entry_guards.get(mgr.system_state, ()))
+        elif self._pending:
+            changed, self._pending = self._pending, set()
+            state = mgr.system_state
+            candidates = []
+            for name in changed:
+                for t in self._guards.get((state, name), ()):
+                    if t not in candidates:
+                        candidates.append(t)
+            self._evaluate(candidates)
+        if mgr._preempted:
+            # An emergency arrived mid-step: apply it before the step ends
+            self._apply_overrides()
+        t0 = mgr._observe_phase("state_handler", t0)
+
+        if mgr.system_state != state_before:
+            mgr._update_firebase_state()
+        mgr._record_sample(self.inputs[INPUT_DUST], self.inputs[INPUT_WIND_SPEED])
+        t0 = mgr._observe_phase("cloud_update", t0)
+
+        if metrics is not None:
+            metrics.observe_tick(t0 - start)
+            metrics.tick_finished(profiled)
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "published": self.published,
+            "suppressed": self.suppressed,
+            "guard_evaluations": self.guard_evaluations,
+            "pending_timers": self.timers.pending,
+        }
+
+    # ------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------
+
+    def _crosses_threshold(self, name, last, value):
+        for attr in self._thresholds.get((self.mgr.system_state, name), ()):
+            threshold = getattr(self.mgr, attr)
+            if (last > threshold) != (value > threshold):
+                return True
+        return False
+
+    def _evaluate(self, transitions):
+        """Takes the first transition whose guard holds."""
+        for t in transitions:
+            self.guard_evaluations += 1
+            if t.guard(self.mgr, self.inputs):
+                self._exit_state()
+                self.mgr._switch_state(t.target)
+                self._run_entry_action()
+                self._entered = True
+                return t
+        return None
+
+    def _run_entry_action(self, resume=False):
+        """
+        :param resume: True on the first step; a wind cleaning already in
+                       progress (e.g. restored by Checkpointer.restore) keeps
+                       its start time and tilt, and only the remaining time
+                       is scheduled
+        """
+        mgr = self.mgr
+        state = mgr.system_state
+        if state == mgr.STATE_SUN_TRACKING:
+            self._track_sun(mgr.clock())
+        elif state == mgr.STATE_CLEANING_WIND:
+            if not resume or mgr.wind_clean_start_time is None:
+                mgr.wind_clean_start_time = mgr.clock()
+                mgr._tilt_for_wind_cleaning()
+            self.inputs[INPUT_WIND_CLEAN_TIMEOUT] = False
+            self._state_timers.append(self.timers.schedule_at(
+                mgr.wind_clean_start_time + mgr.wind_clean_duration, self._wind_clean_timeout))
+        elif state == mgr.STATE_CLEANING_WATER:
+            if not mgr.cleaning_ctrl.clean_with_water():
+                mgr._log_event("Water reservoir empty or cleaning failed.", WARNING)
+
+    def _exit_state(self):
+        for timer in self._state_timers:
+            self.timers.cancel(timer)
+        self._state_timers = []
+
+    def _apply_overrides(self):
+        """Overrides switch state directly; the new state is evaluated this step."""
+        state_before = self.mgr.system_state
+        self.mgr._handle_overrides()
+        if self.mgr.system_state != state_before:
+            self._exit_state()
+            self._run_entry_action()
+            self._entered = True
+
+    # ------------------------------------------------------
+    # Timers
+    # ------------------------------------------------------
+
+    def _wind_clean_timeout(self, now):
+        self._state_timers = []
+        self.inputs[INPUT_WIND_CLEAN_TIMEOUT] = True
+        self._pending.add(INPUT_WIND_CLEAN_TIMEOUT)
+
+    def _track_sun(self, now):
+        self.mgr._track_sun()
+        self._state_timers = [t for t in self._state_timers if t.active]
+        self._state_timers.append(self.timers.schedule(self.tracking_interval, self._track_sun))
@@ -0,0 +1,281 @@
+import time
+
+import numpy as np
+
+from telemetry.events import INFO, LEVEL_NAMES, WARNING, get_event_bus
+
+from .decision_manager import DecisionManager
+
+
+class FleetDecisionManager:
+    """
+    Runs the DecisionManager state machine for a whole fleet of panels at once.
+
+    Instead of one DecisionManager (plus three controller objects) per panel,
+    the state of all N panels lives in NumPy arrays and every transition from
+    _handle_sun_tracking, _handle_wind_cleaning and _handle_water_cleaning is
+    evaluated for the whole fleet in one batched step. The cost of a tick is
+    a handful of array operations, so ticks per second stay roughly flat as
+    the panel count grows.
+    """
+
+    # State codes (index into STATE_NAMES)
+    STATE_SUN_TRACKING = 0
+    STATE_CLEANING_WIND = 1
+    STATE_CLEANING_WATER = 2
+    STATE_IDLE = 3
+
+    STATE_NAMES = (
+        DecisionManager.STATE_SUN_TRACKING,
+        DecisionManager.STATE_CLEANING_WIND,
+        DecisionManager.STATE_CLEANING_WATER,
+        DecisionManager.STATE_IDLE,
+    )
+
+    def __init__(self, num_panels, mode="simulated", initial_water_volume=2.0,
+                 firebase_mgr=None, seed=None, events=None, sensor_filters=None):
+        """
+        :param num_panels: Number of panels in the fleet
+        :param mode: 'simulated' or 'real' (real mode expects sensor arrays
+                     to be passed into run_logic)
+        :param initial_water_volume: in liters, per panel (scalar or array)
+        :param firebase_mgr: (Optional) Instance of FirebaseManager
+        :param seed: (Optional) seed for the simulated sensor generator
+        :param events: (Optional) EventBus; defaults to the shared bus
+        :param sensor_filters: (Optional) dict {'dust' / 'wind_speed': FleetSensorFilter}
+                               applied to the readings before the state machine
+        """
+        self.num_panels = int(num_panels)
+        self.mode = mode
+        self.firebase_mgr = firebase_mgr
+        self.events = events if events is not None else get_event_bus()
+        self.sensor_filters = sensor_filters
+        self._rng = np.random.default_rng(seed)
+
+        n = self.num_panels
+
+        # Current system state per panel
+        self.system_state = np.full(n, self.STATE_SUN_TRACKING, dtype=np.int8)
+
+        # Wind cleaning start time per panel (NaN == not started)
+        self.wind_clean_start_time = np.full(n, np.nan)
+        self.wind_clean_duration = np.full(n, 15 * 60.0)  # 15 minutes in seconds
+
+        # Thresholds and settings (per panel so sites can be tuned individually)
+        self.dust_threshold = np.full(n, 20.0)
+        self.wind_speed_threshold = np.full(n, 15.0)
+
+        # Cleaning reservoir per panel
+        self.water_volume = np.broadcast_to(
+            np.asarray(initial_water_volume, dtype=np.float64), (n,)).copy()
+        self.water_usage_per_clean = np.full(n, 0.125)
+
+        # Actuator angles per panel
+        self.current_base_angle = np.zeros(n)
+        self.current_tilt_angle = np.zeros(n)
+
+        # Simulated sensor ranges (same as SensorController)
+        self._simulated_wind_speed_max = 25.0
+        self._simulated_dust_max = 50.0
+        self._last_wind_direction = np.zeros(n)
+
+    # -----------------------
+    # Public Methods
+    # -----------------------
+
+    def read_sensors(self):
+        """
+        Returns (dust_levels, wind_speeds, wind_directions) for the whole fleet.
+        In simulated mode, mirrors the SensorController random generators.
+        """
+        n = self.num_panels
+        dust_levels = self._rng.uniform(0.0, self._simulated_dust_max, n)
+        wind_speeds = self._rng.uniform(0.0, self._simulated_wind_speed_max, n)
+        delta = self._rng.uniform(-30.0, 30.0, n)
+        self._last_wind_direction = (self._last_wind_direction + delta) % 360
+        return dust_levels, wind_speeds, self._last_wind_direction
+
+    def run_logic(self, dust_levels=None, wind_speeds=None, wind_directions=None, now=None):
+        """
+        Batched equivalent of DecisionManager.run_logic() for every panel.
+
+        :param dust_levels: array of dust percentages (one per panel)
+        :param wind_speeds: array of wind speeds in m/s
+        :param wind_directions: array of wind directions in degrees
+        :param now: (Optional) timestamp for this tick, defaults to time.time()
+        """
+        # 1. Gather sensor data (simulated if not supplied)
+        if dust_levels is None or wind_speeds is None or wind_directions is None:
+            if self.mode != "simulated":
+                raise ValueError("Real mode requires dust, wind speed and direction arrays.")
+            dust_levels, wind_speeds, wind_directions = self.read_sensors()
+        if now is None:
+            now = time.time()
+
+        dust_levels = np.asarray(dust_levels, dtype=np.float64)
+        wind_speeds = np.asarray(wind_speeds, dtype=np.float64)
+        wind_directions = np.asarray(wind_directions, dtype=np.float64)
+        if self.sensor_filters:
+            dust_filter = self.sensor_filters.get("dust")
+            if dust_filter is not None:
+                dust_levels = dust_filter.process(dust_levels, now)
+            wind_filter = self.sensor_filters.get("wind_speed")
+            if wind_filter is not None:
+                wind_speeds = wind_filter.process(wind_speeds, now)
+
+        # 2. Check for user overrides (if firebase is integrated)
+        if self.firebase_mgr:
+            self._handle_overrides()
+
+        # 3. State machine logic. Masks are taken from the state at the start
+        #    of the tick so each panel runs exactly one handler, as in run_logic().
+        state = self.system_state
+        sun_mask = state == self.STATE_SUN_TRACKING
+        wind_mask = state == self.STATE_CLEANING_WIND
+        water_mask = state == self.STATE_CLEANING_WATER
+
+        self._handle_sun_tracking(sun_mask, dust_levels, wind_speeds)
+        self._handle_wind_cleaning(wind_mask, dust_levels, wind_directions, now)
+        self._handle_water_cleaning(water_mask)
+
+        # 4. (Optional) Log or store updated state in Firebase
+        self._update_firebase_state()
+
+    def apply_override(self, command, panels=None):
+        """
+        Applies a manual override command to some or all panels.
+
+        :param command: 'force_clean', 'stop_all' or 'resume'
+        :param panels: (Optional) index array or boolean mask; defaults to all panels
+        """
+        mask = np.zeros(self.num_panels, dtype=bool)
+        if panels is None:
+            mask[:] = True
+        else:
+            mask[panels] = True
+
+        if command == "force_clean":
+            self._switch_state(mask, self.STATE_CLEANING_WATER)
+            self._log_event("User override: Forced water cleaning.")
+        elif command == "stop_all":
+            self._switch_state(mask, self.STATE_IDLE)
+            self._log_event("User override: Stopped all actuators.")
+        elif command == "resume":
+            self._switch_state(mask, self.STATE_SUN_TRACKING)
+            self._log_event("User override: Resumed sun tracking.")
+
+    def state_counts(self):
+        """
+        Returns a dict mapping each state name to the number of panels in it.
+        """
+        counts = np.bincount(self.system_state, minlength=len(self.STATE_NAMES))
+        return {name: int(c) for name, c in zip(self.STATE_NAMES, counts)}
+
+    def panel_state(self, index):
+        """
+        Returns the state of one panel in the same shape DecisionManager pushes
+        to Firebase.
+        """
+        start = self.wind_clean_start_time[index]
+        return {
+            "currentState": self.STATE_NAMES[self.system_state[index]],
+            "windCleanStartTime": None if np.isnan(start) else float(start),
+        }
+
+    # -----------------------
+    # Internal State Handlers
+    # -----------------------
+
+    def _handle_sun_tracking(self, mask, dust_levels, wind_speeds):
+        """
+        Panels with dust above threshold go to wind cleaning if the wind is
+        strong enough, otherwise to water cleaning.
+        """
+        dusty = mask & (dust_levels > self.dust_threshold)
+        windy = wind_speeds > self.wind_speed_threshold
+        self._switch_state(dusty & windy, self.STATE_CLEANING_WIND)
+        self._switch_state(dusty & ~windy, self.STATE_CLEANING_WATER)
+
+    def _handle_wind_cleaning(self, mask, dust_levels, wind_directions, now):
+        """
+        Starts the wind cleaning timer (and tilts toward the wind) for panels
+        that just entered the state, then returns them to sun tracking once
+        clean, or to water cleaning once the duration has elapsed.
+        """
+        just_started = mask & np.isnan(self.wind_clean_start_time)
+        if just_started.any():
+            self.wind_clean_start_time[just_started] = now
+            # Same as CleaningController.tilt_for_wind_cleaning: face the wind, lie flat
+            self.current_base_angle[just_started] = wind_directions[just_started] % 360
+            self.current_tilt_angle[just_started] = 0.0
+
+        elapsed = now - self.wind_clean_start_time
+        clean = mask & (dust_levels <= self.dust_threshold)
+        timed_out = mask & ~clean & (elapsed > self.wind_clean_duration)
+        self._switch_state(clean, self.STATE_SUN_TRACKING)
+        self._switch_state(timed_out, self.STATE_CLEANING_WATER)
+
+    def _handle_water_cleaning(self, mask):
+        """
+        Uses one cleaning's worth of water on every panel that has enough left.
+        All panels return to sun tracking; empty reservoirs are logged.
+        """
+        if not mask.any():
+            return
+        has_water = mask & (self.water_volume >= self.water_usage_per_clean)
+        self.water_volume[has_water] -= self.water_usage_per_clean[has_water]
+
+        empty = np.count_nonzero(mask & ~has_water)
+        if empty:
+            self._log_event(
+                f"Water reservoir empty or cleaning failed on {empty} panel(s).", WARNING)
+        self._switch_state(mask, self.STATE_SUN_TRACKING)
+
+    # -------------------------
+    # Supporting / Utility Code
+    # -------------------------
+
+    def _switch_state(self, mask, new_state):
+        """
+        Moves the masked panels to new_state and clears their wind cleaning
+        timer if they leave the wind cleaning state.
+        """
+        self.system_state[mask] = new_state
+        if new_state != self.STATE_CLEANING_WIND:
+            self.wind_clean_start_time[mask] = np.nan
+
+    def _handle_overrides(self):
+        """
+        Checks Firebase for a fleet-wide override command and applies it.
+        """
+        override_command = self.firebase_mgr.get_override_command()
+        if not override_command:
+            return
+        self.apply_override(override_command)
+        self.firebase_mgr.clear_override_command()
+
+    def _update_firebase_state(self):
+        """
+        If a Firebase manager is present, push a per-state panel count instead
+        of N individual state documents.
+        """
+        if self.firebase_mgr:
+            self.firebase_mgr.set_system_state({
+                "fleetSize": self.num_panels,
+                "stateCounts": self.state_counts(),
+            })
+
+    def _log_event(self, message, level=INFO):
+        """
+        Record a log or warning message on the event bus and send it to
+        Firebase (if available), marked as uplinked so a CloudSink skips it.
+        """
+        if not self.firebase_mgr:
+            self.events.emit(level, "FleetDecisionManager", message)
+            return
+        self.events.emit(level, "FleetDecisionManager", message, uplinked=True)
+        self.firebase_mgr.log_event({
+            "description": message,
+            "level": LEVEL_NAMES.get(level, level),
+            "source": "FleetDecisionManager",
+        })
@@ -0,0 +1,437 @@
+import multiprocessing
+import os
+import queue
+import time
+
+import numpy as np
+
+from Controllers.sensor_controller import SensorController
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from telemetry.events import INFO, WARNING, EventBus, get_event_bus
+
+from .decision_manager import DecisionManager
+
+STATE_NAMES = (
+    DecisionManager.STATE_SUN_TRACKING,
+    DecisionManager.STATE_CLEANING_WIND,
+    DecisionManager.STATE_CLEANING_WATER,
+    DecisionManager.STATE_IDLE,
+)
+STATE_CODES = {name: code for code, name in enumerate(STATE_NAMES)}
+
+# Per-panel snapshot columns in shared memory
+PANEL_FIELDS = ("state", "water_volume", "base_angle", "tilt_angle",
+                "wind_clean_start_time", "updated_at")
+_STATE, _WATER, _BASE, _TILT, _WIND_START, _UPDATED = range(len(PANEL_FIELDS))
+
+# Per-shard counters in shared memory
+SHARD_FIELDS = ("ticks", "heartbeat", "dropped_events")
+_TICKS, _HEARTBEAT, _DROPPED = range(len(SHARD_FIELDS))
+
+
+def build_panel(panel_id, mode, seed, initial_water_volume, events):
+    """
+    Default panel factory: one DecisionManager with its own controllers.
+    Custom factories (passed as FleetRunner(panel_factory=...)) take the same
+    arguments and must be picklable (a module-level function).
+    """
+    return DecisionManager(
+        sensor_ctrl=SensorController(mode=mode, seed=seed),
+        actuator_ctrl=ActuatorController(mode=mode, events=events),
+        cleaning_ctrl=CleaningController(mode=mode, initial_water_volume=initial_water_volume,
+                                         events=events),
+        events=events,
+    )
+
+
+class _ShardUplink:
+    """
+    Stands in for FirebaseManager inside a worker, so overrides from the
+    coordinator go through DecisionManager's normal _handle_overrides().
+    State and events reach the coordinator through shared memory and the
+    event queue instead.
+    """
+
+    def __init__(self):
+        self.override_command = None
+
+    def get_override_command(self):
+        return self.override_command
+
+    def clear_override_command(self):
+        self.override_command = None
+
+    def set_system_state(self, state):
+        pass
+
+    def log_event(self, event):
+        pass
+
+
+class _QueueSink:
+    """EventBus sink that forwards events to the coordinator, tagged with the panel."""
+
+    def __init__(self, panel_id, event_queue, shard_row):
+        self.panel_id = panel_id
+        self.event_queue = event_queue
+        self.shard_row = shard_row
+
+    def __call__(self, event):
+        event = dict(event, panel=self.panel_id)
+        try:
+            self.event_queue.put_nowait(event)
+        except queue.Full:
+            self.shard_row[_DROPPED] += 1
+
+
+# ------------------------------------------------------
+# Worker Process
+# ------------------------------------------------------
+
+def _shard_main(shard_id, panel_ids, panel_buf, shard_buf, override_queue, event_queue,
+                stop_flag, config):
+    """
+    Worker loop: owns the DecisionManagers of one shard and calls run_logic()
+    on each every tick. Publishes each panel's state into shared memory and
+    applies override commands from its queue.
+    """
+    panels = np.frombuffer(panel_buf, dtype=np.float64).reshape(-1, len(PANEL_FIELDS))
+    shard_row = np.frombuffer(shard_buf, dtype=np.float64).reshape(-1, len(SHARD_FIELDS))[shard_id]
+    factory = config["panel_factory"] or build_panel
+    seed = config["seed"]
+
+    managers = []
+    for panel_id in panel_ids:
+        bus = EventBus(level=config["event_level"],
+                       sinks=[_QueueSink(panel_id, event_queue, shard_row)])
+        panel_seed = None if seed is None else seed * 100003 + panel_id
+        mgr = factory(panel_id, config["mode"], panel_seed,
+                      config["initial_water_volume"], bus)
+        mgr.firebase_mgr = _ShardUplink()
+        _restore_panel(mgr, panels[panel_id])
+        managers.append((panel_id, mgr))
+
+    tick_interval = config["tick_interval"]
+    max_ticks = config["max_ticks"]
+    while not stop_flag.value:
+        started = time.time()
+        _apply_overrides(override_queue, managers)
+
+        for panel_id, mgr in managers:
+            mgr.run_logic()
+            _publish_panel(mgr, panels[panel_id], started)
+
+        shard_row[_TICKS] += 1
+        shard_row[_HEARTBEAT] = time.time()
+        if max_ticks is not None and shard_row[_TICKS] >= max_ticks:
+            break
+        if tick_interval:
+            _sleep_until(started + tick_interval, stop_flag)
+
+
+def _sleep_until(deadline, stop_flag, step=0.05):
+    """
+    Sleeps in short steps, watching the shared stop flag. (A flag instead of
+    multiprocessing.Event: a worker killed inside Event.wait() would leave
+    the event's condition broken and hang the coordinator's set().)
+    """
+    while not stop_flag.value:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, step))
+
+
+def _apply_overrides(override_queue, managers):
+    while True:
+        try:
+            command, panel_ids = override_queue.get_nowait()
+        except queue.Empty:
+            return
+        for panel_id, mgr in managers:
+            if panel_ids is None or panel_id in panel_ids:
+                mgr.firebase_mgr.override_command = command
+
+
+def _publish_panel(mgr, row, now):
+    row[_STATE] = STATE_CODES.get(mgr.system_state, -1)
+    row[_WATER] = mgr.cleaning_ctrl.water_volume
+    row[_BASE] = mgr.actuator_ctrl.current_base_angle
+    row[_TILT] = mgr.actuator_ctrl.current_tilt_angle
+    row[_WIND_START] = np.nan if mgr.wind_clean_start_time is None else mgr.wind_clean_start_time
+    row[_UPDATED] = now
+
+
+def _restore_panel(mgr, row):
+    """
+    Picks up where a crashed worker left off, using the last snapshot it
+    published (nothing to restore on a first start).
+    """
+    if row[_UPDATED] == 0:
+        return
+    code = int(row[_STATE])
+    if 0 <= code < len(STATE_NAMES):
+        mgr.system_state = STATE_NAMES[code]
+    mgr.cleaning_ctrl.water_volume = float(row[_WATER])
+    mgr.actuator_ctrl.current_base_angle = float(row[_BASE])
+    mgr.actuator_ctrl.current_tilt_angle = float(row[_TILT])
+    mgr.wind_clean_start_time = None if np.isnan(row[_WIND_START]) else float(row[_WIND_START])
+
+
+# ------------------------------------------------------
+# Coordinator
+# ------------------------------------------------------
+
+class FleetRunner:
+    """
+    Runs a fleet of independent DecisionManagers split across worker
+    processes, one shard of panels per process, so sensor I/O and state
+    handling for different trackers run on different cores.
+
+    - Each worker builds and owns its shard's controllers and runs the
+      run_logic() loop for them.
+    - Panel state snapshots live in one shared-memory array that the workers
+      write and the coordinator reads without copying or messaging.
+    - Events (at or above `event_level`) come back over a bounded queue per
+      worker; override commands go out over another queue per worker.
+    - supervise() restarts any worker that died (or stopped heartbeating);
+      the new worker restores its panels from the last snapshot, and the
+      other shards keep running. A killed worker may leave its queues
+      half-written, so they are replaced; its undelivered events and
+      pending overrides are lost.
+    """
+
+    def __init__(self, num_panels, num_workers=None, tick_interval=2.0, mode="simulated",
+                 seed=None, initial_water_volume=2.0, panel_factory=None, event_level=WARNING,
+                 events=None, heartbeat_timeout=None, max_event_queue=10000,
+                 start_method=None, max_ticks=None):
+        """
+        :param num_panels: number of trackers in the fleet
+        :param num_workers: worker processes (default: one per core, at most one per panel)
+        :param tick_interval: seconds between ticks in each worker (0 = as fast as possible)
+        :param mode: 'simulated' or 'real', passed to the panel factory
+        :param seed: (Optional) base seed; panel i gets its own derived seed
+        :param initial_water_volume: in liters, per panel
+        :param panel_factory: (Optional) picklable f(panel_id, mode, seed,
+                              initial_water_volume, events) -> DecisionManager
+        :param event_level: minimum level of worker events sent to the coordinator
+        :param events: (Optional) coordinator EventBus; forwarded events are re-emitted on it
+        :param heartbeat_timeout: (Optional) seconds without a tick before a worker
+                                  is considered hung and restarted
+        :param max_event_queue: events buffered per worker before it starts dropping them
+        :param start_method: (Optional) multiprocessing start method ('fork', 'spawn', ...)
+        :param max_ticks: (Optional) stop each worker after this many ticks (benchmarks)
+        """
+        self.num_panels = int(num_panels)
+        self.num_workers = max(1, min(num_workers or os.cpu_count() or 1, self.num_panels))
+        self.events = events if events is not None else get_event_bus()
+        self.heartbeat_timeout = heartbeat_timeout
+        self._ctx = multiprocessing.get_context(start_method)
+        self._config = {
+            "mode": mode,
+            "seed": seed,
+            "tick_interval": tick_interval,
+            "initial_water_volume": initial_water_volume,
+            "panel_factory": panel_factory,
+            "event_level": event_level,
+            "max_ticks": max_ticks,
+        }
+
+        self.shards = [s.tolist() for s in np.array_split(np.arange(self.num_panels), self.num_workers)]
+        self._panel_buf = self._ctx.RawArray("d", self.num_panels * len(PANEL_FIELDS))
+        self._shard_buf = self._ctx.RawArray("d", self.num_workers * len(SHARD_FIELDS))
+        self._panels = np.frombuffer(self._panel_buf, dtype=np.float64).reshape(
+            self.num_panels, len(PANEL_FIELDS))
+        self._shard_stats = np.frombuffer(self._shard_buf, dtype=np.float64).reshape(
+            self.num_workers, len(SHARD_FIELDS))
+        self._panels[:, _WIND_START] = np.nan
+
+        self.max_event_queue = max_event_queue
+        self._event_queues = [None] * self.num_workers
+        self._override_queues = [None] * self.num_workers
+        self._stop_flag = self._ctx.RawValue("b", 0)
+        self._processes = [None] * self.num_workers
+        self.restarts = [0] * self.num_workers
+        self._panel_shard = {}
+        for shard_id, panel_ids in enumerate(self.shards):
+            for panel_id in panel_ids:
+                self._panel_shard[panel_id] = shard_id
+
+    # ------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------
+
+    def start(self):
+        self._stop_flag.value = 0
+        for shard_id in range(self.num_workers):
+            self._start_worker(shard_id)
+
+    def stop(self, timeout=5.0):
+        """Asks every worker to finish its tick and exit; terminates stragglers."""
+        self._stop_flag.value = 1
+        deadline = time.time() + timeout
+        processes = [p for p in self._processes if p is not None]
+        while any(p.is_alive() for p in processes) and time.time() < deadline:
+            # Keep draining so no worker blocks at exit flushing a full pipe
+            self.drain_events()
+            for process in processes:
+                process.join(0.01)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        self.drain_events()
+
+    def supervise(self):
+        """
+        Restarts workers that exited (or stopped heartbeating) while the
+        fleet is running. Call periodically; run() does.
+
+        :return: list of restarted shard ids
+        """
+        if self._stop_flag.value:
+            return []
+        restarted = []
+        now = time.time()
+        for shard_id, process in enumerate(self._processes):
+            if process is None:
+                continue
+            hung = (self.heartbeat_timeout is not None and process.is_alive()
+                    and now - self._shard_stats[shard_id, _HEARTBEAT] > self.heartbeat_timeout)
+            if process.is_alive() and not hung:
+                continue
+            if not hung and process.exitcode == 0:
+                continue  # finished normally (max_ticks)
+            if hung:
+                process.terminate()
+            process.join()
+            self._event_queues[shard_id] = self._override_queues[shard_id] = None
+            self.restarts[shard_id] += 1
+            self._log_event(
+                f"Shard {shard_id} worker {'hung' if hung else 'exited with code %s' % process.exitcode}; "
+                f"restarting (restart #{self.restarts[shard_id]}).", WARNING)
+            self._start_worker(shard_id)
+            restarted.append(shard_id)
+        return restarted
+
+    def run(self, duration=None, poll_interval=0.5):
+        """
+        Starts the fleet and supervises it (restarts, event forwarding) until
+        `duration` seconds pass, all workers finish, or KeyboardInterrupt.
+        """
+        self.start()
+        deadline = None if duration is None else time.time() + duration
+        try:
+            while deadline is None or time.time() < deadline:
+                time.sleep(poll_interval)
+                self.drain_events()
+                self.supervise()
+                if all(not p.is_alive() and p.exitcode == 0 for p in self._processes):
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    # ------------------------------------------------------
+    # Commands and Snapshots
+    # ------------------------------------------------------
+
+    def send_override(self, command, panels=None):
+        """
+        Sends 'force_clean', 'stop_all' or 'resume' to some or all panels;
+        each panel applies it on its next tick.
+
+        :param panels: (Optional) iterable of panel ids; defaults to all panels
+        """
+        if panels is None:
+            for q in self._override_queues:
+                if q is not None:
+                    q.put((command, None))
+            return
+        by_shard = {}
+        for panel_id in panels:
+            by_shard.setdefault(self._panel_shard[int(panel_id)], set()).add(int(panel_id))
+        for shard_id, panel_ids in by_shard.items():
+            if self._override_queues[shard_id] is not None:
+                self._override_queues[shard_id].put((command, panel_ids))
+
+    def snapshot(self):
+        """
+        Returns a copy of the shared panel state as {field: array}. Reads
+        are lock-free, so a row may mix values from two consecutive ticks.
+        """
+        data = self._panels.copy()
+        return {field: data[:, i] for i, field in enumerate(PANEL_FIELDS)}
+
+    def panel_state(self, panel_id):
+        """Returns one panel's state in the shape DecisionManager pushes to Firebase."""
+        row = self._panels[panel_id]
+        code = int(row[_STATE])
+        start = row[_WIND_START]
+        return {
+            "currentState": STATE_NAMES[code] if row[_UPDATED] and 0 <= code < len(STATE_NAMES) else None,
+            "windCleanStartTime": None if np.isnan(start) else float(start),
+        }
+
+    def state_counts(self):
+        """Returns a dict mapping each state name to the number of panels in it."""
+        codes = self._panels[self._panels[:, _UPDATED] > 0, _STATE].astype(np.int64)
+        counts = np.bincount(codes[codes >= 0], minlength=len(STATE_NAMES))
+        return {name: int(c) for name, c in zip(STATE_NAMES, counts)}
+
+    def stats(self):
+        """Per-shard tick counts, dropped events and restarts."""
+        return [{
+            "shard": shard_id,
+            "panels": len(self.shards[shard_id]),
+            "ticks": int(self._shard_stats[shard_id, _TICKS]),
+            "dropped_events": int(self._shard_stats[shard_id, _DROPPED]),
+            "restarts": self.restarts[shard_id],
+            "alive": self._processes[shard_id] is not None and self._processes[shard_id].is_alive(),
+        } for shard_id in range(self.num_workers)]
+
+    def panel_ticks(self):
+        """Total run_logic() calls across the fleet so far."""
+        return int(sum(self._shard_stats[s, _TICKS] * len(p) for s, p in enumerate(self.shards)))
+
+    def drain_events(self, max_events=None):
+        """
+        Moves forwarded worker events onto the coordinator's bus and returns them.
+        """
+        drained = []
+        for event_queue in self._event_queues:
+            while event_queue is not None and (max_events is None or len(drained) < max_events):
+                try:
+                    drained.append(event_queue.get_nowait())
+                except queue.Empty:
+                    break
+        for event in drained:
+            fields = {k: v for k, v in event.items()
+                      if k not in ("timestamp", "level", "source", "message")}
+            self.events.emit(event["level"], event["source"], "%s", event["message"], **fields)
+        return drained
+
+    # ------------------------------------------------------
+    # Internal Helpers
+    # ------------------------------------------------------
+
+    def _start_worker(self, shard_id):
+        if self._event_queues[shard_id] is None:
+            self._event_queues[shard_id] = self._ctx.Queue(self.max_event_queue)
+            self._override_queues[shard_id] = self._ctx.Queue()
+        self._shard_stats[shard_id, _HEARTBEAT] = time.time()
+        process = self._ctx.Process(
+            target=_shard_main,
+            args=(shard_id, self.shards[shard_id], self._panel_buf, self._shard_buf,
+                  self._override_queues[shard_id], self._event_queues[shard_id], self._stop_flag,
+                  self._config),
+            name=f"fleet-shard-{shard_id}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[shard_id] = process
+
+    def _log_event(self, message, level=INFO):
+        self.events.emit(level, "FleetRunner", message)
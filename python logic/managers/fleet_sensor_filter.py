@@ -0,0 +1,157 @@
+import numpy as np
+
+from Controllers.sensor_filters import MAD_SCALE, REASONS, HampelFilter
+from telemetry.events import WARNING, get_event_bus
+
+
+class FleetSensorFilter:
+    """
+    Batched equivalent of a FilterChain (Hampel -> rate limit -> stuck
+    detection) for one channel across a whole fleet, for
+    FleetDecisionManager. Every panel has its own window, last accepted
+    value and stuck counter, held in (num_panels, window) arrays, so a tick
+    is a few array operations however many panels there are.
+
+    Flagged samples are summarised in one WARNING per reason per tick
+    (with the panel indices), rather than one event per panel.
+    """
+
+    def __init__(self, num_panels, channel, window=7, n_sigmas=3.0, min_deviation=0.0,
+                 spike_side="both", max_rise_rate=None, max_fall_rate=None, rate_slack=0.0, max_rejections=3,
+                 stuck_repeats=None, stuck_tolerance=0.0, events=None,
+                 source="FleetSensorFilter"):
+        """
+        :param num_panels: number of panels in the fleet
+        :param channel: channel name used in events (e.g. 'dust')
+        :param window: Hampel window (None disables spike rejection)
+        :param n_sigmas: Hampel threshold in robust standard deviations
+        :param min_deviation: smallest deviation ever rejected as a spike
+        :param spike_side: 'both', 'high' or 'low' (see HampelFilter's side)
+        :param max_rise_rate: (Optional) largest believable increase per second
+        :param max_fall_rate: (Optional) largest believable decrease per second
+                              (defaults to max_rise_rate)
+        :param rate_slack: change always allowed on top of the rate (sensor noise)
+        :param max_rejections: consecutive rate rejections before a new level is accepted
+        :param stuck_repeats: (Optional) identical samples in a row that count as stuck
+        :param stuck_tolerance: changes up to this size still count as identical
+        :param events: (Optional) EventBus; defaults to the shared bus
+        :param source: event source name
+        """
+        n = self.num_panels = int(num_panels)
+        self.channel = channel
+        self.window = None if window is None else int(window)
+        self.n_sigmas = n_sigmas
+        self.min_deviation = min_deviation
+        if spike_side not in HampelFilter.SIDES:
+            raise ValueError(f"spike_side must be one of {HampelFilter.SIDES}")
+        self.spike_side = spike_side
+        self.max_rise_rate = max_rise_rate
+        if max_fall_rate is None:
+            max_fall_rate = max_rise_rate
+        self.max_fall_rate = max_fall_rate
+        self.rate_slack = rate_slack
+        self.max_rejections = max_rejections
+        self.stuck_repeats = stuck_repeats
+        self.stuck_tolerance = stuck_tolerance
+        self.events = events if events is not None else get_event_bus()
+        self.source = source
+
+        # Hampel window of raw samples per panel (NaN == empty slot)
+        if self.window is not None:
+            self._recent = np.full((n, self.window), np.nan)
+        self._count = 0
+        # Rate limit: last accepted value and when it was accepted
+        self._last = np.full(n, np.nan)
+        self._last_at = np.full(n, np.nan)
+        self._rejections = np.zeros(n, dtype=np.int32)
+        # Stuck detection
+        self._previous = np.full(n, np.nan)
+        self._repeats = np.zeros(n, dtype=np.int32)
+        self.stuck = np.zeros(n, dtype=bool)
+
+        # Counters
+        self.samples = 0
+        self.flagged = {}
+
+    def process(self, values, now):
+        """
+        Filters one sample per panel and returns the values to act on.
+
+        :param values: array of raw readings (one per panel)
+        :param now: timestamp of this tick
+        """
+        raw = np.asarray(values, dtype=np.float64)
+        values = raw.copy()
+        self.samples += 1
+
+        if self.window is not None:
+            recent = self._recent
+            if self._count > self.window // 2:
+                median = self._median(recent)
+                mad = self._median(np.abs(recent - median[:, None]))
+                limit = np.maximum(self.n_sigmas * MAD_SCALE * mad, self.min_deviation)
+                deviation = raw - median
+                if self.spike_side == "high":
+                    spike = deviation > limit
+                elif self.spike_side == "low":
+                    spike = -deviation > limit
+                else:
+                    spike = np.abs(deviation) > limit
+                values[spike] = median[spike]
+                self._flag("spike", spike)
+            recent[:, self._count % self.window] = raw
+            self._count += 1
+
+        if self.max_rise_rate is not None:
+            elapsed = np.maximum(now - self._last_at, 0.0)
+            change = values - self._last
+            # NaN comparisons are False, so panels without a last value pass
+            too_fast = ((change > self.max_rise_rate * elapsed + self.rate_slack)
+                        | (-change > self.max_fall_rate * elapsed + self.rate_slack))
+            too_fast &= self._rejections < self.max_rejections
+            values = np.where(too_fast, self._last, values)
+            accepted = ~too_fast
+            self._last[accepted] = values[accepted]
+            self._last_at[accepted] = now
+            self._rejections[too_fast] += 1
+            self._rejections[accepted] = 0
+            self._flag("rate", too_fast)
+
+        if self.stuck_repeats is not None:
+            same = np.abs(raw - self._previous) <= self.stuck_tolerance
+            self._repeats = np.where(same, self._repeats + 1, 0)
+            newly_stuck = (self._repeats + 1 >= self.stuck_repeats) & ~self.stuck
+            self.stuck = same & (self.stuck | newly_stuck)
+            self._previous = raw
+            self._flag("stuck", newly_stuck)
+
+        return values
+
+    def _median(self, rows):
+        if self._count < self.window:
+            return np.nanmedian(rows, axis=1)  # window not full yet
+        mid = self.window // 2
+        if self.window % 2:
+            # A partial sort is much cheaper than np.median on short rows
+            return np.partition(rows, mid, axis=1)[:, mid]
+        return np.median(rows, axis=1)
+
+    def _flag(self, reason, mask):
+        if not mask.any():
+            return
+        panels = np.flatnonzero(mask)
+        self.flagged[reason] = self.flagged.get(reason, 0) + len(panels)
+        self.events.emit(WARNING, self.source, "%s: %d panel(s) %s",
+                         self.channel, len(panels), REASONS.get(reason, reason),
+                         channel=self.channel, reason=reason, panels=panels.tolist())
+
+
+def default_fleet_filters(num_panels, events=None):
+    """FleetSensorFilter equivalents of default_filter_chains()."""
+    return {
+        "dust": FleetSensorFilter(num_panels, "dust", window=7, min_deviation=2.0,
+                                  spike_side="high", max_rise_rate=0.05, max_fall_rate=np.inf, rate_slack=5.0,
+                                  stuck_repeats=300, events=events),
+        "wind_speed": FleetSensorFilter(num_panels, "wind_speed", window=7, min_deviation=3.0,
+                                        stuck_repeats=300, events=events),
+    }
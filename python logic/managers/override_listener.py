@@ -0,0 +1,147 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from telemetry.events import ERROR, INFO, get_event_bus
+
+# One received command and when the listener got it
+Override = namedtuple("Override", ("command", "received_at"))
+
+# Commands that act the moment they arrive instead of on the next tick
+EMERGENCY_COMMANDS = ("stop_all",)
+
+
+class OverrideListener:
+    """
+    Receives override commands in the background so the control loop never
+    waits on the cloud for them.
+
+    - If the source can push (subscribe_overrides(callback), e.g. a Firebase
+      listener or LocalBackend), the listener subscribes; otherwise a daemon
+      thread polls get_override_command() every `poll_interval` seconds.
+    - Each command goes on a thread-safe queue that DecisionManager drains
+      at the start of a tick without blocking, and is cleared on the source
+      from the listener's thread.
+    - Emergency commands (stop_all) also call `on_emergency` right away from
+      the listener's thread; DecisionManager uses it to stop the actuators
+      mid-tick (interrupting a move in progress).
+    - wait() can stand in for the loop's time.sleep(): it returns early as
+      soon as a command arrives, so the next tick picks it up at once.
+    """
+
+    def __init__(self, source, emergency_commands=EMERGENCY_COMMANDS, poll_interval=1.0,
+                 clock=time.time, events=None):
+        """
+        :param source: FirebaseManager-like object with get_override_command()
+                       and clear_override_command(), and optionally
+                       subscribe_overrides(callback) -> unsubscribe callable
+        :param emergency_commands: commands handed to on_emergency immediately
+        :param poll_interval: seconds between polls when the source can't push
+        :param clock: time source for Override.received_at
+        :param events: (Optional) EventBus; defaults to the shared bus
+        """
+        self.source = source
+        self.emergency_commands = frozenset(emergency_commands)
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.events = events if events is not None else get_event_bus()
+        # Set by DecisionManager (or by hand): f(command), called from the listener's thread
+        self.on_emergency = None
+
+        self._queue = queue.SimpleQueue()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._thread = None
+        self._unsubscribe = None
+
+        # Counters
+        self.received = 0
+        self.emergencies = 0
+
+    # ------------------------------------------------------
+    # Public Methods
+    # ------------------------------------------------------
+
+    def start(self):
+        """Subscribes to the source (or starts polling it). Returns self."""
+        subscribe = getattr(self.source, "subscribe_overrides", None)
+        if subscribe is not None:
+            self._unsubscribe = subscribe(self.deliver)
+        else:
+            self._thread = threading.Thread(target=self._poll_loop, name="override-listener",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._closed.set()
+        self._wakeup.set()
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def deliver(self, command):
+        """
+        Takes one command from the source (the subscription callback; any
+        thread). Empty values, e.g. the echo of a clear, are ignored.
+        """
+        if not command:
+            return
+        if command in self.emergency_commands and self.on_emergency is not None:
+            self.emergencies += 1
+            try:
+                self.on_emergency(command)
+            except Exception as exc:
+                self.events.emit(ERROR, "OverrideListener", "Emergency handling of %r failed: %s",
+                                 command, exc)
+        self._queue.put(Override(command, self.clock()))
+        self.received += 1
+        self._wakeup.set()
+        self.events.emit(INFO, "OverrideListener", "Override command received: %s", command)
+        try:
+            self.source.clear_override_command()
+        except ConnectionError:
+            pass  # the command is queued; a stale copy at the source is harmless
+
+    def drain(self):
+        """
+        Returns the commands received since the last drain (oldest first)
+        as Override tuples. Never blocks.
+        """
+        self._wakeup.clear()
+        overrides = []
+        while True:
+            try:
+                overrides.append(self._queue.get_nowait())
+            except queue.Empty:
+                return overrides
+
+    def wait(self, timeout):
+        """
+        Sleeps up to `timeout` seconds, returning True early once a command is
+        waiting. Pass it as the loop's sleep (e.g. AdaptiveTickScheduler(sleep=...)).
+        """
+        return self._wakeup.wait(timeout)
+
+    @property
+    def pending(self):
+        """True if commands are waiting to be drained."""
+        return not self._queue.empty()
+
+    # ------------------------------------------------------
+    # Internal Helpers
+    # ------------------------------------------------------
+
+    def _poll_loop(self):
+        while not self._closed.is_set():
+            try:
+                command = self.source.get_override_command()
+            except ConnectionError:
+                command = None
+            if command:
+                self.deliver(command)
+            self._closed.wait(self.poll_interval)
@@ -0,0 +1,366 @@
+import argparse
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from telemetry.events import ERROR, EventBus
+
+from .fleet_decision_manager import FleetDecisionManager
+
+# Tunable DecisionManager settings and their current defaults
+PARAMETERS = {
+    "dust_threshold": 20.0,
+    "wind_speed_threshold": 15.0,
+    "wind_clean_duration": 900.0,
+    "water_usage_per_clean": 0.125,
+}
+
+TRACE_FIELDS = ("timestamp", "dust", "wind_speed", "wind_direction")
+
+METRICS = ("water_used", "water_cleanings", "failed_water_cleanings", "wind_cleanings",
+           "actuator_moves", "dusty_hours", "mean_dust")
+
+
+# ------------------------------------------------------
+# Traces
+# ------------------------------------------------------
+
+def synthetic_trace(days=365, interval=60.0, seed=0, start_time=0.0):
+    """
+    A plausible sensor trace: dust builds up at a slowly varying rate with
+    occasional dust storms, and wind follows a daily cycle with gusty days.
+
+    :param days: length of the trace
+    :param interval: seconds between samples
+    :param seed: random seed
+    :param start_time: timestamp of the first sample
+    :return: dict of equal-length arrays keyed by TRACE_FIELDS
+    """
+    rng = np.random.default_rng(seed)
+    n = int(days * 86400 / interval)
+    timestamps = start_time + np.arange(n) * interval
+    hours = (timestamps % 86400) / 3600.0
+    day = ((timestamps - start_time) // 86400).astype(np.int64)
+    num_days = int(day[-1]) + 1 if n else 0
+
+    # Dust accumulation: ~2-8 % per day, plus a storm on ~3 % of days
+    daily_rate = rng.uniform(2.0, 8.0, num_days)
+    storms = rng.random(num_days) < 0.03
+    daily_rate[storms] += rng.uniform(15.0, 40.0, np.count_nonzero(storms))
+    dust = np.cumsum(daily_rate[day] * interval / 86400.0)
+
+    # Wind: afternoon peak, windier on some days, gusts on top
+    daily_wind = rng.gamma(4.0, 2.0, num_days)
+    cycle = 1.0 + 0.6 * np.sin((hours - 9.0) / 24.0 * 2 * np.pi)
+    wind_speed = np.clip(daily_wind[day] * cycle + rng.normal(0.0, 1.5, n), 0.0, None)
+    wind_direction = (np.cumsum(rng.normal(0.0, 3.0, n)) + 270.0) % 360
+
+    return {"timestamp": timestamps, "dust": dust,
+            "wind_speed": wind_speed, "wind_direction": wind_direction}
+
+
+def trace_from_store(store, start_time, end_time, interval=60.0):
+    """
+    Reads a trace from a TimeSeriesStore, averaged into `interval`-second
+    buckets (empty buckets are dropped).
+    """
+    parts = [a for a in store.sample_arrays(start_time, end_time) if len(a)]
+    if not parts:
+        raise ValueError("No samples in the requested range.")
+    samples = np.concatenate(parts)
+    return _resample({f: samples[f].astype(np.float64) for f in TRACE_FIELDS}, interval)
+
+
+def trace_from_csv(path, interval=60.0):
+    """
+    Reads a trace from a CSV log with timestamp, dust, wind_speed and
+    wind_direction columns (others are ignored).
+    """
+    columns = np.genfromtxt(path, delimiter=",", names=True, usecols=TRACE_FIELDS,
+                            dtype=np.float64, encoding="utf-8")
+    return _resample({f: np.atleast_1d(columns[f]) for f in TRACE_FIELDS}, interval)
+
+
+def _resample(trace, interval):
+    order = np.argsort(trace["timestamp"], kind="stable")
+    ts = trace["timestamp"][order]
+    if not interval:
+        return {f: trace[f][order] for f in TRACE_FIELDS}
+    buckets = np.floor(ts / interval).astype(np.int64)
+    keys, index, counts = np.unique(buckets, return_inverse=True, return_counts=True)
+    out = {"timestamp": keys * float(interval)}
+    for field in ("dust", "wind_speed"):
+        out[field] = np.bincount(index, weights=trace[field][order]) / counts
+    # Directions are averaged as unit vectors so 359 and 1 don't give 180.
+    # Older samples have no direction (NaN); it only aims the panel, so use 0.
+    radians = np.radians(np.nan_to_num(trace["wind_direction"][order]))
+    out["wind_direction"] = np.degrees(np.arctan2(
+        np.bincount(index, weights=np.sin(radians)),
+        np.bincount(index, weights=np.cos(radians)))) % 360
+    return out
+
+
+# ------------------------------------------------------
+# Parameter Grid
+# ------------------------------------------------------
+
+def parameter_grid(**axes):
+    """
+    Cartesian product of the given values, e.g.
+    parameter_grid(dust_threshold=[10, 20, 30], wind_speed_threshold=range(5, 20)).
+    Parameters that aren't given keep their DecisionManager default.
+
+    :return: dict {parameter: flat array}, one entry per combination
+    """
+    unknown = set(axes) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown parameter(s): {', '.join(sorted(unknown))}")
+    values = [np.atleast_1d(np.asarray(axes.get(name, default), dtype=np.float64))
+              for name, default in PARAMETERS.items()]
+    mesh = np.meshgrid(*values, indexing="ij")
+    return {name: m.ravel() for name, m in zip(PARAMETERS, mesh)}
+
+
+# ------------------------------------------------------
+# Sweep
+# ------------------------------------------------------
+
+class PolicySweep:
+    """
+    What-if evaluation of DecisionManager settings against a sensor trace.
+
+    Every parameter combination is one "panel" of a FleetDecisionManager,
+    so the whole grid (or one chunk of it per worker process) steps through
+    the trace together, one batched run_logic() per sample. The state
+    machine is the same one DecisionManager runs.
+
+    The replay is closed loop: dust in the trace is treated as soiling that
+    builds up (its increases are applied to every combination), water
+    cleaning resets a combination's dust to zero, and wind cleaning blows
+    it off at `wind_removal_rate` per m/s per second. That way a policy that
+    cleans more often really does spend less time dusty.
+
+    Per combination it reports water used, water and wind cleaning counts,
+    failed (empty reservoir) cleanings, actuator moves made by cleaning
+    (facing into the wind and returning to tracking; sun tracking is the
+    same for every policy and isn't counted), hours above `dusty_level`
+    and the mean dust level.
+    """
+
+    def __init__(self, trace, dusty_level=20.0, wind_removal_rate=5e-5,
+                 initial_water_volume=float("inf"), workers=None, chunk_size=4096):
+        """
+        :param trace: dict of arrays keyed by TRACE_FIELDS (see synthetic_trace,
+                      trace_from_store and trace_from_csv)
+        :param dusty_level: dust percentage that counts as "dusty" when scoring
+        :param wind_removal_rate: fraction of dust removed per (m/s * second)
+                                  while wind cleaning
+        :param initial_water_volume: reservoir per combination in liters
+                                     (infinite: measure demand only)
+        :param workers: processes to spread the grid over (default: CPU count)
+        :param chunk_size: most combinations stepped together in one process
+        """
+        self.trace = {f: np.ascontiguousarray(trace[f], dtype=np.float64) for f in TRACE_FIELDS}
+        if len(self.trace["timestamp"]) < 2:
+            raise ValueError("A trace needs at least two samples.")
+        self.options = {
+            "dusty_level": dusty_level,
+            "wind_removal_rate": wind_removal_rate,
+            "initial_water_volume": initial_water_volume,
+        }
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def run(self, grid):
+        """
+        Evaluates every combination in `grid` (see parameter_grid).
+
+        :return: dict of arrays: the parameters followed by METRICS, one entry
+                 per combination in grid order
+        """
+        size = len(next(iter(grid.values())))
+        params = {name: np.broadcast_to(np.asarray(grid.get(name, default), dtype=np.float64),
+                                        (size,)) for name, default in PARAMETERS.items()}
+        # Enough chunks to keep every worker busy, but no bigger than chunk_size
+        per_chunk = max(1, min(self.chunk_size, math.ceil(size / self.workers)))
+        chunks = [{name: p[i:i + per_chunk] for name, p in params.items()}
+                  for i in range(0, size, per_chunk)]
+
+        if self.workers == 1 or len(chunks) == 1:
+            parts = [evaluate_chunk(self.trace, chunk, self.options) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                     initargs=(self.trace, self.options)) as pool:
+                parts = list(pool.map(_evaluate_in_worker, chunks))
+
+        results = {name: np.array(p) for name, p in params.items()}
+        for metric in METRICS:
+            results[metric] = np.concatenate([part[metric] for part in parts])
+        return results
+
+
+def evaluate_chunk(trace, params, options):
+    """
+    Replays `trace` for one chunk of parameter combinations in this process.
+
+    :param trace: dict of arrays keyed by TRACE_FIELDS
+    :param params: dict {parameter: array}, equal lengths
+    :param options: dusty_level, wind_removal_rate and initial_water_volume
+    :return: dict {metric: array}
+    """
+    n = len(params["dust_threshold"])
+    fleet = FleetDecisionManager(n, mode="real",
+                                 initial_water_volume=options["initial_water_volume"],
+                                 events=EventBus(level=ERROR))
+    for name in PARAMETERS:
+        getattr(fleet, name)[:] = params[name]
+
+    timestamps = trace["timestamp"]
+    wind_speeds = trace["wind_speed"]
+    wind_directions = trace["wind_direction"]
+    # Soiling between samples (drops in the recording are cleanings, not un-soiling)
+    soiling = np.maximum(np.diff(trace["dust"], prepend=trace["dust"][0]), 0.0)
+    # Each sample holds until the next one
+    durations = np.diff(timestamps, append=timestamps[-1] + np.median(np.diff(timestamps)))
+    usage = fleet.water_usage_per_clean
+    dusty_level = options["dusty_level"]
+    removal_rate = options["wind_removal_rate"]
+
+    dust = np.full(n, max(float(trace["dust"][0]), 0.0))
+    direction = np.empty(n)
+    water_used = np.zeros(n)
+    water_cleanings = np.zeros(n, dtype=np.int64)
+    failed = np.zeros(n, dtype=np.int64)
+    wind_cleanings = np.zeros(n, dtype=np.int64)
+    moves = np.zeros(n, dtype=np.int64)
+    dusty_seconds = np.zeros(n)
+    dust_seconds = np.zeros(n)
+
+    WIND = FleetDecisionManager.STATE_CLEANING_WIND
+    WATER = FleetDecisionManager.STATE_CLEANING_WATER
+    state = fleet.system_state
+
+    for i in range(len(timestamps)):
+        dust += soiling[i]
+        direction.fill(wind_directions[i])
+        was_wind = state == WIND
+        was_water = state == WATER
+        any_water = was_water.any()
+        if any_water:
+            # Same check _handle_water_cleaning makes before using water
+            cleaned = was_water & (fleet.water_volume >= usage)
+
+        fleet.run_logic(dust, wind_speeds[i], direction, timestamps[i])
+
+        # Water cleaning ran this step for every combination that was in WATER
+        if any_water:
+            dust[cleaned] = 0.0
+            water_used += usage * cleaned
+            water_cleanings += cleaned
+            failed += was_water & ~cleaned
+
+        is_wind = state == WIND
+        if is_wind.any() or was_wind.any():
+            started = is_wind & ~was_wind
+            wind_cleanings += started
+            # Facing the wind, then back to tracking when done
+            moves += started
+            moves += was_wind & ~is_wind
+            dust[is_wind] *= np.exp(-removal_rate * wind_speeds[i] * durations[i])
+
+        dusty_seconds += (dust > dusty_level) * durations[i]
+        dust_seconds += dust * durations[i]
+
+    total = timestamps[-1] - timestamps[0] + durations[-1]
+    return {
+        "water_used": water_used,
+        "water_cleanings": water_cleanings,
+        "failed_water_cleanings": failed,
+        "wind_cleanings": wind_cleanings,
+        "actuator_moves": moves,
+        "dusty_hours": dusty_seconds / 3600.0,
+        "mean_dust": dust_seconds / total,
+    }
+
+
+_WORKER_TRACE = None
+_WORKER_OPTIONS = None
+
+
+def _init_worker(trace, options):
+    # The trace is sent once per worker instead of once per chunk
+    global _WORKER_TRACE, _WORKER_OPTIONS
+    _WORKER_TRACE = trace
+    _WORKER_OPTIONS = options
+
+
+def _evaluate_in_worker(params):
+    return evaluate_chunk(_WORKER_TRACE, params, _WORKER_OPTIONS)
+
+
+# ------------------------------------------------------
+# Command Line
+# ------------------------------------------------------
+
+def _axis(text):
+    """'10:40:5' -> 10, 15, ..., 40 (inclusive); '10,20,30' -> a list."""
+    if ":" in text:
+        start, stop, step = (float(v) for v in text.split(":"))
+        return np.arange(start, stop + step / 2, step)
+    return [float(v) for v in text.split(",")]
+
+
+def main():
+    """
+    python -m managers.policy_sweep [--store DIR | --csv FILE | --days N]
+        --dust-threshold 10:40:2 --wind-speed-threshold 5:25:1 ...
+    """
+    parser = argparse.ArgumentParser(description="What-if sweep of DecisionManager settings.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--store", help="TimeSeriesStore folder to replay")
+    source.add_argument("--csv", help="CSV log with timestamp,dust,wind_speed,wind_direction columns")
+    source.add_argument("--days", type=float, default=365.0, help="synthetic trace length")
+    parser.add_argument("--start", type=float, default=0.0)
+    parser.add_argument("--end", type=float, default=float("inf"))
+    parser.add_argument("--interval", type=float, default=60.0, help="seconds per replayed sample")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic trace seed")
+    for name in PARAMETERS:
+        parser.add_argument("--" + name.replace("_", "-"), type=_axis,
+                            help="values as start:stop:step or a,b,c")
+    parser.add_argument("--dusty-level", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sort", choices=METRICS, default="dusty_hours")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.store:
+        from telemetry.timeseries_store import TimeSeriesStore
+        store = TimeSeriesStore(args.store)
+        trace = trace_from_store(store, args.start, args.end, args.interval)
+        store.close()
+    elif args.csv:
+        trace = trace_from_csv(args.csv, args.interval)
+    else:
+        trace = synthetic_trace(args.days, args.interval, args.seed)
+
+    axes = {name: getattr(args, name) for name in PARAMETERS if getattr(args, name) is not None}
+    grid = parameter_grid(**axes)
+    sweep = PolicySweep(trace, dusty_level=args.dusty_level, workers=args.workers)
+    wall_start = time.perf_counter()
+    results = sweep.run(grid)
+    wall_time = time.perf_counter() - wall_start
+
+    size = len(results["dust_threshold"])
+    print(f"{size} combinations x {len(trace['timestamp'])} samples in {wall_time:.1f} s")
+    columns = list(PARAMETERS) + list(METRICS)
+    print("  ".join(columns))
+    for i in itertools.islice(np.argsort(results[args.sort], kind="stable"), args.top):
+        print("  ".join(f"{results[c][i]:g}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import hashlib
+import heapq
+import itertools
+import time
+
+from Controllers.sensor_controller import SensorController
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from telemetry.events import INFO, WARNING, EventBus, StdoutSink
+
+from .decision_manager import DecisionManager
+
+
+class VirtualClock:
+    """
+    Injectable time source for simulations. Call it like time.time();
+    time only moves when the simulation advances it.
+    """
+
+    def __init__(self, start=0.0):
+        self.now = float(start)
+
+    def __call__(self):
+        return self.now
+
+    def advance_to(self, timestamp):
+        if timestamp < self.now:
+            raise ValueError("VirtualClock cannot move backwards")
+        self.now = timestamp
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class Simulation:
+    """
+    Discrete-event simulation driver around DecisionManager and the simulated
+    controllers.
+
+    Ticks (and any extra scheduled events, e.g. a reservoir refill or a user
+    override) sit in a priority queue ordered by virtual time. The driver pops
+    the next event, jumps the VirtualClock straight to it and runs it; nothing
+    ever sleeps, so months of virtual time run in seconds. With the same seed,
+    two runs produce the same state trace and the same summary (compare the
+    `trace_digest`, a running hash of every transition).
+    """
+
+    def __init__(self, duration, tick_interval=2.0, seed=0, start_time=0.0,
+                 initial_water_volume=2.0, quiet=True, record_trace=False,
+                 decision_mgr=None):
+        """
+        :param duration: virtual seconds to simulate
+        :param tick_interval: virtual seconds between run_logic() calls
+                              (same role as the sleep in main.py)
+        :param seed: seed for SensorController's simulated readings
+        :param start_time: virtual UNIX timestamp the run starts at
+        :param initial_water_volume: in liters
+        :param quiet: only record warnings (and print nothing) while running
+        :param record_trace: keep every (time, state) transition in state_trace
+                             (memory grows with the run length)
+        :param decision_mgr: (Optional) pre-built DecisionManager; its clock
+                             must be this simulation's `clock`
+        """
+        self.duration = duration
+        self.tick_interval = tick_interval
+        self.start_time = start_time
+        self.quiet = quiet
+        self.clock = VirtualClock(start_time)
+        if quiet:
+            self.events = EventBus(level=WARNING, clock=self.clock)
+        else:
+            self.events = EventBus(level=INFO, sinks=[StdoutSink()], clock=self.clock)
+
+        if decision_mgr is None:
+            decision_mgr = DecisionManager(
+                sensor_ctrl=SensorController(mode="simulated", seed=seed),
+                actuator_ctrl=ActuatorController(mode="simulated", events=self.events),
+                cleaning_ctrl=CleaningController(mode="simulated",
+                                                 initial_water_volume=initial_water_volume,
+                                                 events=self.events),
+                clock=self.clock,
+                events=self.events,
+            )
+        self.decision_mgr = decision_mgr
+
+        self._queue = []
+        self._sequence = itertools.count()  # tie-breaker keeps same-time events in order
+
+        # Results
+        self.ticks = 0
+        self.transitions = 0
+        self.time_in_state = {}
+        self.record_trace = record_trace
+        self.state_trace = []  # (virtual time, new state), if record_trace
+        self._trace_hash = hashlib.sha256()
+        self._state_since = start_time
+
+    # ------------------------------------------------------
+    # Public Methods
+    # ------------------------------------------------------
+
+    def schedule(self, at, action):
+        """
+        Schedules action(simulation) to run at virtual time `at`.
+        """
+        heapq.heappush(self._queue, (at, next(self._sequence), action))
+
+    def run(self):
+        """
+        Runs the simulation to completion and returns a summary dict.
+        """
+        end_time = self.start_time + self.duration
+        self._state_since = self.start_time
+        self.schedule(self.start_time, Simulation._tick)
+
+        wall_start = time.perf_counter()
+        while self._queue and self._queue[0][0] <= end_time:
+            at, _, action = heapq.heappop(self._queue)
+            self.clock.advance_to(at)
+            action(self)
+        wall_time = time.perf_counter() - wall_start
+
+        self._account_state_time(self.decision_mgr.system_state, end_time)
+        return self.summary(wall_time)
+
+    def summary(self, wall_time):
+        """
+        Returns the run results.
+        """
+        cleaning_ctrl = self.decision_mgr.cleaning_ctrl
+        return {
+            "virtual_seconds": self.duration,
+            "ticks": self.ticks,
+            "wall_seconds": wall_time,
+            "ticks_per_second": self.ticks / wall_time if wall_time else float("inf"),
+            "speedup": self.duration / wall_time if wall_time else float("inf"),
+            "transitions": self.transitions,
+            "time_in_state": dict(self.time_in_state),
+            "water_remaining": cleaning_ctrl.water_volume,
+            "final_state": self.decision_mgr.system_state,
+            "trace_digest": self._trace_hash.hexdigest(),
+        }
+
+    # ------------------------------------------------------
+    # Internal Helpers
+    # ------------------------------------------------------
+
+    def _tick(self):
+        previous = self.decision_mgr.system_state
+        self.decision_mgr.run_logic()
+        self.ticks += 1
+
+        current = self.decision_mgr.system_state
+        if current != previous:
+            now = self.clock()
+            self._account_state_time(previous, now)
+            self.transitions += 1
+            self._trace_hash.update(f"{now!r}:{current};".encode())
+            if self.record_trace:
+                self.state_trace.append((now, current))
+
+        self.schedule(self.clock() + self.tick_interval, Simulation._tick)
+
+    def _account_state_time(self, state, now):
+        """
+        Adds the time since the last transition to `state`.
+        """
+        self.time_in_state[state] = self.time_in_state.get(state, 0.0) + (now - self._state_since)
+        self._state_since = now
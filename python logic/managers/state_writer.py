@@ -0,0 +1,337 @@
+import json
+import os
+import time
+
+from telemetry.events import INFO, LEVEL_NAMES
+from telemetry.wire_format import WireEncoder
+
+
+class LocalBackend:
+    """
+    In-process stand-in for the Firebase uplink. Stores everything in memory
+    and counts network calls, so the StateWriter can be tested and benchmarked
+    offline. Set `online = False` to simulate a dropped uplink.
+    """
+
+    def __init__(self, latency=0.0):
+        """
+        :param latency: seconds each call sleeps to mimic a network round-trip
+        """
+        self.latency = latency
+        self.online = True
+        self.system_state = {}
+        self.events = []
+        self.override_command = None
+        self.calls = 0
+        self._override_subscribers = []
+
+    def update_system_state(self, fields):
+        self._round_trip()
+        self.system_state.update(fields)
+
+    def log_events(self, events):
+        self._round_trip()
+        self.events.extend(events)
+
+    def get_override_command(self):
+        self._round_trip()
+        return self.override_command
+
+    def clear_override_command(self):
+        self._round_trip()
+        self.override_command = None
+
+    def subscribe_overrides(self, callback):
+        """
+        Push delivery of override commands (what a Firebase listener gives
+        OverrideListener). Returns a callable that unsubscribes.
+        """
+        self._override_subscribers.append(callback)
+        return lambda: self._override_subscribers.remove(callback)
+
+    def publish_override(self, command):
+        """
+        Stands in for the app writing overrideCommand: stores it and, after
+        one `latency`, calls the subscribers (in the caller's thread).
+        """
+        self.override_command = command
+        if self.latency:
+            time.sleep(self.latency)
+        for callback in list(self._override_subscribers):
+            callback(command)
+
+    def _round_trip(self):
+        if not self.online:
+            raise ConnectionError("LocalBackend is offline")
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+
+class WireBackend:
+    """
+    StateWriter backend for a metered link: each state write or event batch
+    goes out as one compact binary frame (telemetry/wire_format.py) through
+    `send` instead of a JSON-like dict. Override commands still come from
+    the `downlink` backend (e.g. FirebaseManager), if any.
+
+    `send(frame)` should raise ConnectionError when the link is down, so
+    StateWriter spools the events and retries.
+    """
+
+    def __init__(self, send, downlink=None, clock=time.time):
+        """
+        :param send: callable taking one frame (bytes)
+        :param downlink: (Optional) backend polled for override commands
+        :param clock: time source for state records
+        """
+        self.send = send
+        self.downlink = downlink
+        self.clock = clock
+        self.system_state = {}
+        self._encoder = WireEncoder()
+
+        # Counters
+        self.frames = 0
+        self.bytes_sent = 0
+
+    def update_system_state(self, fields):
+        # StateWriter sends only changed fields; a state record carries both
+        self.system_state.update(fields)
+        self._encoder.add_state(self.clock(), self.system_state.get("currentState"),
+                                self.system_state.get("windCleanStartTime"))
+        self._send()
+
+    def log_events(self, events):
+        encoder = self._encoder
+        for event in events:
+            level = event.get("level", INFO)
+            encoder.add_event(event.get("timestamp", self.clock()), event.get("description", ""),
+                              _LEVELS.get(level, level), event.get("source"))
+        self._send()
+
+    def get_override_command(self):
+        if self.downlink is None:
+            return None
+        return self.downlink.get_override_command()
+
+    def clear_override_command(self):
+        if self.downlink is not None:
+            self.downlink.clear_override_command()
+
+    def _send(self):
+        frame = self._encoder.finish()
+        self.send(frame)
+        self.frames += 1
+        self.bytes_sent += len(frame)
+
+
+class StateWriter:
+    """
+    Sits between DecisionManager and the cloud backend and exposes the same
+    interface as FirebaseManager (set_system_state, log_event,
+    get_override_command, clear_override_command).
+
+    - State: only fields that changed since the last successful write are
+      sent, as soon as they change (a failed send is retried by the next
+      flush), so the dashboard never lags a state change by a flush interval.
+    - Events: queued and sent in bulk every `flush_interval` seconds or once
+      `max_batch` events are waiting.
+    - Outage: events that can't be sent are spooled to a bounded on-disk
+      outbox (JSON lines) and replayed once the uplink is back. When the
+      outbox is full, log_event() refuses new events and returns False.
+
+    The backend must provide update_system_state(fields), log_events(events),
+    get_override_command() and clear_override_command(); see LocalBackend.
+    """
+
+    def __init__(self, backend, flush_interval=10.0, max_batch=100,
+                 outbox_path=None, max_outbox_events=10000, clock=time.time):
+        """
+        :param backend: cloud backend (e.g. FirebaseManager or LocalBackend)
+        :param flush_interval: seconds between bulk writes
+        :param max_batch: flush early once this many events are queued
+        :param outbox_path: (Optional) file used to spool events while offline;
+                            without it, unsent events are kept in memory only
+        :param max_outbox_events: bound on spooled + queued events
+        :param clock: time source (injectable for tests/simulation)
+        """
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.outbox_path = outbox_path
+        self.max_outbox_events = max_outbox_events
+        self.clock = clock
+
+        self._sent_state = {}
+        self._pending_state = {}
+        self._pending_events = []
+        self._outbox_count = self._count_outbox()
+        self._last_flush = clock()
+
+        # Counters (useful for benchmarks and dashboards)
+        self.writes = 0
+        self.dropped_events = 0
+        self.failed_flushes = 0
+
+    # ------------------------------------------------------
+    # FirebaseManager-Compatible Interface
+    # ------------------------------------------------------
+
+    def set_system_state(self, state):
+        """
+        Records the latest state and sends the fields that changed right away.
+        """
+        changed = False
+        for key, value in state.items():
+            if self._sent_state.get(key, _MISSING) != value:
+                if self._pending_state.get(key, _MISSING) != value:
+                    changed = True
+                self._pending_state[key] = value
+            else:
+                # Changed and then changed back before a successful send
+                self._pending_state.pop(key, None)
+        if changed:
+            try:
+                self._send_state()
+            except ConnectionError:
+                self.failed_flushes += 1  # stays pending for the next flush
+        self._maybe_flush()
+
+    def log_event(self, event):
+        """
+        Queues an event for the next bulk write.
+        Returns False (and drops the event) if the outbox is full.
+        """
+        if self.backlog >= self.max_outbox_events:
+            self.dropped_events += 1
+            return False
+        event = dict(event)
+        event.setdefault("timestamp", self.clock())
+        self._pending_events.append(event)
+        self._maybe_flush()
+        return True
+
+    def get_override_command(self):
+        try:
+            return self.backend.get_override_command()
+        except ConnectionError:
+            return None
+
+    def clear_override_command(self):
+        try:
+            self.backend.clear_override_command()
+        except ConnectionError:
+            pass
+
+    # ------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------
+
+    @property
+    def backlog(self):
+        """Events waiting to be sent (queued in memory + spooled on disk)."""
+        return len(self._pending_events) + self._outbox_count
+
+    @property
+    def backpressure(self):
+        """True once the backlog passes 80% of the outbox bound."""
+        return self.backlog >= 0.8 * self.max_outbox_events
+
+    def flush(self):
+        """
+        Sends the pending state delta, any spooled outbox events and the
+        queued events. On failure, events go to the outbox and the state
+        delta stays pending. Returns True if everything was sent.
+        """
+        self._last_flush = self.clock()
+        try:
+            if self._pending_state:
+                self._send_state()
+
+            if self._outbox_count:
+                self._replay_outbox()
+
+            while self._pending_events:
+                batch = self._pending_events[:self.max_batch]
+                self.backend.log_events(batch)
+                self.writes += 1
+                del self._pending_events[:len(batch)]
+            return True
+        except ConnectionError:
+            self.failed_flushes += 1
+            self._spool(self._pending_events)
+            return False
+
+    def close(self):
+        """Final flush; anything unsent stays in the outbox for next start."""
+        self.flush()
+
+    # ------------------------------------------------------
+    # Internal Helpers
+    # ------------------------------------------------------
+
+    def _send_state(self):
+        self.backend.update_system_state(dict(self._pending_state))
+        self.writes += 1
+        self._sent_state.update(self._pending_state)
+        self._pending_state.clear()
+
+    def _maybe_flush(self):
+        if (len(self._pending_events) >= self.max_batch
+                or self.clock() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def _spool(self, events):
+        """
+        Moves events from memory to the on-disk outbox (if configured).
+        """
+        if not self.outbox_path or not events:
+            return
+        with open(self.outbox_path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._outbox_count += len(events)
+        events.clear()
+
+    def _replay_outbox(self):
+        """
+        Sends spooled events in batches, then removes the outbox. If the
+        uplink drops midway, the unsent remainder is written back atomically
+        and the ConnectionError is re-raised.
+        """
+        with open(self.outbox_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+
+        sent = 0
+        try:
+            while sent < len(lines):
+                batch = lines[sent:sent + self.max_batch]
+                self.backend.log_events([json.loads(line) for line in batch])
+                self.writes += 1
+                sent += len(batch)
+        except ConnectionError:
+            tmp_path = self.outbox_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(lines[sent:])
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.outbox_path)
+            self._outbox_count = len(lines) - sent
+            raise
+
+        os.remove(self.outbox_path)
+        self._outbox_count = 0
+
+    def _count_outbox(self):
+        if not self.outbox_path or not os.path.exists(self.outbox_path):
+            return 0
+        with open(self.outbox_path, "r", encoding="utf-8") as f:
+            return sum(1 for _ in f)
+
+
+_MISSING = object()
+# log_event() payloads carry level names ("WARNING"); the wire format wants numbers
+_LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
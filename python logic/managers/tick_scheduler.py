@@ -0,0 +1,277 @@
+import time
+
+from .decision_manager import DecisionManager
+
+# Seconds between decisions per state (main.py used a fixed 2 s)
+DEFAULT_STATE_INTERVALS = {
+    DecisionManager.STATE_SUN_TRACKING: 2.0,
+    DecisionManager.STATE_CLEANING_WIND: 1.0,   # ends as soon as the dust clears
+    DecisionManager.STATE_CLEANING_WATER: 1.0,
+    DecisionManager.STATE_IDLE: 30.0,           # only overrides can change anything
+}
+
+# Seconds between reads per sensor channel, and per-state overrides
+DEFAULT_CHANNEL_INTERVALS = {
+    "dust": 10.0,           # dust builds up over hours
+    "wind_speed": 2.0,
+    "wind_direction": 5.0,
+}
+# (Wind cleaning reads the wind direction once, to set the tilt on entry,
+# so the direction keeps its base rate there too)
+DEFAULT_STATE_CHANNEL_INTERVALS = {
+    DecisionManager.STATE_CLEANING_WIND: {"dust": 1.0},
+}
+
+# Change between two reads that counts as "volatile" per channel
+DEFAULT_VOLATILITY_DELTAS = {
+    "dust": 2.0,
+    "wind_speed": 3.0,
+    "wind_direction": 20.0,
+}
+
+_CHANNEL_GETTERS = {
+    "dust": "get_dust_percentage",
+    "wind_speed": "get_wind_speed",
+    "wind_direction": "get_wind_direction",
+}
+
+
+class ChannelPoller:
+    """
+    Stands in for SensorController with one polling rate per channel: a
+    get_*() call only reads the hardware when that channel's interval has
+    elapsed, and otherwise returns the last reading. DecisionManager uses
+    it unchanged (pass it as sensor_ctrl, or let AdaptiveTickScheduler
+    install it).
+    """
+
+    def __init__(self, sensor_ctrl, channel_intervals=None, volatility_deltas=None,
+                 clock=time.time):
+        """
+        :param sensor_ctrl: the real SensorController
+        :param channel_intervals: dict {channel: seconds between reads}
+        :param volatility_deltas: dict {channel: change that marks it volatile}
+        :param clock: time source
+        """
+        self.sensor_ctrl = sensor_ctrl
+        self.base_intervals = dict(DEFAULT_CHANNEL_INTERVALS)
+        if channel_intervals:
+            self.base_intervals.update(channel_intervals)
+        self.intervals = dict(self.base_intervals)
+        self.volatility_deltas = dict(DEFAULT_VOLATILITY_DELTAS)
+        if volatility_deltas:
+            self.volatility_deltas.update(volatility_deltas)
+        self.clock = clock
+
+        self._values = {}
+        self._read_at = {}
+        self.reads = {name: 0 for name in _CHANNEL_GETTERS}
+        self.cached = {name: 0 for name in _CHANNEL_GETTERS}
+        self.last_volatile_at = None
+
+    def __getattr__(self, name):
+        # Anything else (mode, async variants, ...) goes to the real controller
+        return getattr(self.sensor_ctrl, name)
+
+    def get_dust_percentage(self):
+        return self.read("dust")
+
+    def get_wind_speed(self):
+        return self.read("wind_speed")
+
+    def get_wind_direction(self):
+        return self.read("wind_direction")
+
+    def read(self, channel):
+        now = self.clock()
+        read_at = self._read_at.get(channel)
+        if read_at is not None and now - read_at < self.intervals.get(channel, 0.0):
+            self.cached[channel] += 1
+            return self._values[channel]
+
+        value = getattr(self.sensor_ctrl, _CHANNEL_GETTERS[channel])()
+        previous = self._values.get(channel)
+        if previous is not None and abs(value - previous) >= self.volatility_deltas.get(channel, float("inf")):
+            self.last_volatile_at = now
+        self._values[channel] = value
+        self._read_at[channel] = now
+        self.reads[channel] += 1
+        return value
+
+    def set_state_intervals(self, overrides):
+        """Applies per-state channel intervals on top of the base intervals."""
+        self.intervals = dict(self.base_intervals)
+        if overrides:
+            self.intervals.update(overrides)
+
+
+class AdaptiveTickScheduler:
+    """
+    Replaces main.py's fixed time.sleep(2) loop with an interval picked
+    per tick:
+
+    - per state (fast in CLEANING_WIND, slow in IDLE),
+    - faster (x `volatile_factor`) for `volatile_hold` seconds after any
+      channel jumps by more than its volatility delta,
+    - at night (sun below `night_elevation` while SUN_TRACKING or IDLE) it
+      sleeps until sunrise, waking every `night_max_sleep` seconds to pick
+      up overrides.
+
+    Sensor channels are polled at their own rates through a ChannelPoller.
+    stats() reports the effective tick rate and the ticks, sensor reads and
+    CPU time saved compared with a fixed `baseline_interval` loop.
+    """
+
+    def __init__(self, decision_mgr, solar_ephemeris=None, state_intervals=None,
+                 channel_intervals=None, state_channel_intervals=None,
+                 volatility_deltas=None, volatile_factor=0.25, volatile_hold=30.0,
+                 min_interval=0.25, night_elevation=-2.0, night_max_sleep=900.0,
+                 baseline_interval=2.0, clock=None, sleep=time.sleep):
+        """
+        :param decision_mgr: DecisionManager to drive (its sensor_ctrl gets wrapped)
+        :param solar_ephemeris: (Optional) SolarEphemeris for night detection;
+                                defaults to the manager's
+        :param state_intervals: dict {state: seconds between ticks}
+        :param channel_intervals: dict {channel: seconds between sensor reads}
+        :param state_channel_intervals: dict {state: {channel: seconds}} overrides
+        :param volatility_deltas: dict {channel: change that counts as volatile}
+        :param volatile_factor: interval multiplier while readings are volatile
+        :param volatile_hold: seconds the fast rate is kept after a volatile read
+        :param min_interval: lower bound for any tick interval
+        :param night_elevation: sun elevation (degrees) below which it is night
+        :param night_max_sleep: longest single sleep at night (override latency)
+        :param baseline_interval: fixed interval the savings are measured against
+        :param clock: time source (defaults to the manager's clock)
+        :param sleep: sleep function (VirtualClock.sleep in simulations)
+        """
+        self.mgr = decision_mgr
+        self.clock = clock if clock is not None else decision_mgr.clock
+        self.sleep = sleep
+        self.solar_ephemeris = solar_ephemeris or decision_mgr.solar_ephemeris
+        self.state_intervals = dict(DEFAULT_STATE_INTERVALS)
+        if state_intervals:
+            self.state_intervals.update(state_intervals)
+        self.state_channel_intervals = dict(DEFAULT_STATE_CHANNEL_INTERVALS)
+        if state_channel_intervals:
+            self.state_channel_intervals.update(state_channel_intervals)
+        self.volatile_factor = volatile_factor
+        self.volatile_hold = volatile_hold
+        self.min_interval = min_interval
+        self.night_elevation = night_elevation
+        self.night_max_sleep = night_max_sleep
+        self.baseline_interval = baseline_interval
+
+        if isinstance(decision_mgr.sensor_ctrl, ChannelPoller):
+            self.poller = decision_mgr.sensor_ctrl
+        else:
+            self.poller = ChannelPoller(decision_mgr.sensor_ctrl, channel_intervals,
+                                        volatility_deltas, self.clock)
+            decision_mgr.sensor_ctrl = self.poller
+
+        # Stats
+        self.ticks = 0
+        self.night_sleeps = 0
+        self.cpu_seconds = 0.0
+        self._started_at = None
+        self._stop = False
+
+    # ------------------------------------------------------
+    # Public Methods
+    # ------------------------------------------------------
+
+    def next_interval(self, now=None):
+        """Seconds until the next tick, given the current state and readings."""
+        if now is None:
+            now = self.clock()
+        state = self.mgr.system_state
+        interval = self.state_intervals.get(state, self.baseline_interval)
+
+        if state in (self.mgr.STATE_SUN_TRACKING, self.mgr.STATE_IDLE):
+            until_sunrise = self.seconds_until_sunrise(now)
+            if until_sunrise:
+                self.night_sleeps += 1
+                return min(until_sunrise, self.night_max_sleep)
+
+        last_volatile = self.poller.last_volatile_at
+        if last_volatile is not None and now - last_volatile < self.volatile_hold:
+            interval *= self.volatile_factor
+        return max(self.min_interval, interval)
+
+    def seconds_until_sunrise(self, now):
+        """0 during the day (or without an ephemeris), else seconds until the sun is up."""
+        if self.solar_ephemeris is None:
+            return 0.0
+        _, elevation = self.solar_ephemeris.get_sun_position(now)
+        if elevation > self.night_elevation:
+            return 0.0
+        # Coarse scan in 10-minute steps (sunrise is < 24 h away outside polar regions)
+        step = 600.0
+        t = now
+        for _ in range(144):
+            t += step
+            if self.solar_ephemeris.get_sun_position(t)[1] > self.night_elevation:
+                return t - now
+        return self.night_max_sleep
+
+    def tick(self):
+        """Runs one decision tick and returns the interval before the next."""
+        cpu_start = time.process_time()
+        self.poller.set_state_intervals(self.state_channel_intervals.get(self.mgr.system_state))
+        self.mgr.run_logic()
+        self.ticks += 1
+        interval = self.next_interval()
+        # Cached sensor readings must expire before the next tick
+        set_tick_interval = getattr(self.poller.sensor_ctrl, "set_tick_interval", None)
+        if set_tick_interval is not None:
+            set_tick_interval(interval)
+        self.cpu_seconds += time.process_time() - cpu_start
+        return interval
+
+    def run(self, duration=None):
+        """
+        Runs the control loop until `duration` seconds pass (forever if None)
+        or stop() is called.
+        """
+        self._started_at = self.clock()
+        self._stop = False
+        end = None if duration is None else self._started_at + duration
+        while not self._stop:
+            interval = self.tick()
+            if end is not None:
+                remaining = end - self.clock()
+                if remaining <= 0:
+                    break
+                interval = min(interval, remaining)
+            self.sleep(interval)
+
+    def stop(self):
+        self._stop = True
+
+    def stats(self):
+        """
+        Effective tick rate and savings versus a fixed baseline_interval loop
+        (which would read every channel on every tick).
+        """
+        elapsed = max(self.clock() - self._started_at, 1e-9) if self._started_at is not None else 0.0
+        baseline_ticks = elapsed / self.baseline_interval
+        avg_cpu = self.cpu_seconds / self.ticks if self.ticks else 0.0
+        reads = dict(self.poller.reads)
+        return {
+            "elapsed_seconds": elapsed,
+            "ticks": self.ticks,
+            "ticks_per_second": self.ticks / elapsed if elapsed else 0.0,
+            "mean_interval": elapsed / self.ticks if self.ticks else 0.0,
+            "baseline_ticks": baseline_ticks,
+            "ticks_saved": baseline_ticks - self.ticks,
+            "night_sleeps": self.night_sleeps,
+            "sensor_reads": reads,
+            # dust and wind speed are read every baseline tick
+            "sensor_reads_saved": {
+                "dust": baseline_ticks - reads["dust"],
+                "wind_speed": baseline_ticks - reads["wind_speed"],
+            },
+            # every tick pushes state to the cloud when a firebase_mgr is set
+            "uplink_calls_saved": baseline_ticks - self.ticks if self.mgr.firebase_mgr else 0,
+            "cpu_seconds": self.cpu_seconds,
+            "cpu_seconds_saved": avg_cpu * (baseline_ticks - self.ticks),
+        }
@@ -0,0 +1,100 @@
+import time
+
+
+class Timer:
+    """Handle returned by TimerWheel.schedule(); pass it to cancel()."""
+
+    __slots__ = ("deadline", "callback", "rounds", "active")
+
+    def __init__(self, deadline, callback, rounds):
+        self.deadline = deadline
+        self.callback = callback
+        self.rounds = rounds
+        self.active = True  # False once fired or cancelled
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel: timers are dropped into one of `slots` buckets by
+    deadline, and advance() only visits the buckets the clock has moved
+    past since the last call. Scheduling and cancelling are O(1), and an
+    idle tick costs one slot visit no matter how many timers are pending,
+    instead of every timeout polling the clock on every tick.
+
+    Timers fire on the first advance() at or after their deadline, rounded
+    up to the wheel resolution.
+    """
+
+    def __init__(self, resolution=1.0, slots=512, clock=time.time):
+        """
+        :param resolution: seconds per slot (timer precision)
+        :param slots: number of slots; timers further out than
+                      resolution * slots wait extra rounds
+        :param clock: time source
+        """
+        self.resolution = resolution
+        self.slots = [[] for _ in range(slots)]
+        self.clock = clock
+        self._tick = int(clock() // resolution)
+        self.pending = 0
+
+    def schedule(self, delay, callback):
+        """Runs callback(now) `delay` seconds from now."""
+        return self.schedule_at(self.clock() + delay, callback)
+
+    def schedule_at(self, deadline, callback):
+        """Runs callback(now) once the clock reaches `deadline`."""
+        target = max(int(-(-deadline // self.resolution)), self._tick + 1)
+        ticks_ahead = target - self._tick
+        timer = Timer(deadline, callback, (ticks_ahead - 1) // len(self.slots))
+        self.slots[target % len(self.slots)].append(timer)
+        self.pending += 1
+        return timer
+
+    def cancel(self, timer):
+        """Cancels a pending timer (it is dropped lazily when its slot comes up)."""
+        if timer is not None and timer.active:
+            timer.active = False
+            self.pending -= 1
+
+    def advance(self, now=None):
+        """
+        Fires every timer that is due by `now` (default: the clock).
+
+        :return: number of timers fired
+        """
+        if now is None:
+            now = self.clock()
+        target = int(now // self.resolution)
+        if target <= self._tick:
+            return 0
+        fired = 0
+        num_slots = len(self.slots)
+        # After a long gap (e.g. a suspended process) one lap covers every slot
+        last = min(target, self._tick + num_slots)
+        start = self._tick
+        self._tick = target
+        for tick in range(start + 1, last + 1):
+            slot = self.slots[tick % num_slots]
+            if not slot:
+                continue
+            keep = []
+            due = []
+            laps = (target - tick) // num_slots
+            for timer in slot:
+                if not timer.active:
+                    continue
+                if timer.rounds <= laps:
+                    due.append(timer)
+                else:
+                    timer.rounds -= laps + 1
+                    keep.append(timer)
+            slot[:] = keep
+            for timer in due:
+                if not timer.active:
+                    continue  # cancelled by an earlier callback
+                timer.active = False
+                self.pending -= 1
+                timer.callback(now)
+                fired += 1
+        return fired
@@ -0,0 +1,11 @@
+from .expected_power import ClearSkyPowerModel, clear_sky_irradiance, recompute_dust_history
+from .solar_position import SolarEphemeris, sun_position, sun_position_batch
+
+__all__ = [
+    "ClearSkyPowerModel",
+    "clear_sky_irradiance",
+    "recompute_dust_history",
+    "SolarEphemeris",
+    "sun_position",
+    "sun_position_batch",
+]
\ No newline at end of file
@@ -0,0 +1,229 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from .solar_position import SECONDS_PER_DAY, sun_position_batch
+
+SOLAR_CONSTANT = 1353.0      # W/m² at the top of the atmosphere (Meinel model)
+STC_IRRADIANCE = 1000.0      # W/m² at standard test conditions
+STC_CELL_TEMPERATURE = 25.0  # °C at standard test conditions
+
+
+# ------------------------------------------------------
+# Clear-Sky Irradiance
+# ------------------------------------------------------
+
+def clear_sky_irradiance(elevation):
+    """
+    Clear-sky beam (DNI), diffuse (DHI) and global horizontal (GHI)
+    irradiance in W/m² for a sun elevation in degrees, using the Meinel
+    attenuation model with the Kasten-Young air mass. Works on Python
+    floats or NumPy arrays; irradiance is 0 with the sun below the horizon.
+    """
+    elevation = np.asarray(elevation, dtype=np.float64)
+    up = elevation > 0
+    el = np.where(up, elevation, 90.0)
+    air_mass = 1.0 / (np.sin(np.radians(el)) + 0.50572 * (el + 6.07995) ** -1.6364)
+    dni = np.where(up, SOLAR_CONSTANT * 0.7 ** (air_mass ** 0.678), 0.0)
+    dhi = 0.1 * dni
+    ghi = dni * np.sin(np.radians(el)) + dhi
+    if dni.ndim == 0:
+        return float(dni), float(dhi), float(ghi)
+    return dni, dhi, ghi
+
+
+# ------------------------------------------------------
+# Expected Power Model
+# ------------------------------------------------------
+
+class ClearSkyPowerModel:
+    """
+    Expected panel output under a clear sky, used as the reference for
+    dust estimation (dust% = 1 - actual / expected).
+
+    Orientation follows ActuatorController: the panel faces the base angle
+    (azimuth) at an elevation equal to the tilt angle, so a panel tracking
+    the sun has tilt == sun elevation. Plane-of-array irradiance is beam on
+    the panel plus isotropic sky diffuse and ground reflection; output is
+    then derated for cell temperature (NOCT model).
+
+    Per site and UTC day, one vectorized call fills a table of sun position
+    and clear-sky irradiance per time bucket. Plane-of-array irradiance is
+    memoized by (time bucket, quantized base angle, quantized tilt angle),
+    so while the panel holds its orientation every tick within a bucket is
+    a dict lookup plus the temperature derating.
+    """
+
+    def __init__(self, latitude, longitude, rated_power=300.0, temperature_coefficient=-0.004,
+                 noct=45.0, albedo=0.2, time_bucket=60, angle_step=1.0,
+                 max_cached_days=3, max_memo_entries=4096):
+        """
+        :param latitude: site latitude in degrees (north positive)
+        :param longitude: site longitude in degrees (east positive)
+        :param rated_power: panel output in watts at 1000 W/m² and 25 °C
+        :param temperature_coefficient: relative power change per °C above 25 °C
+        :param noct: nominal operating cell temperature in °C
+        :param albedo: ground reflectance (0.2 grass/soil, ~0.3-0.4 desert sand)
+        :param time_bucket: table step in seconds, dividing 86400; the sun is taken
+                            at the bucket midpoint
+        :param angle_step: panel angles are rounded to this many degrees for memoization
+        :param max_cached_days: number of day tables to keep in memory
+        :param max_memo_entries: number of memoized (bucket, orientation) entries
+        """
+        time_bucket = int(time_bucket)
+        if time_bucket < 1 or SECONDS_PER_DAY % time_bucket:
+            raise ValueError("time_bucket must divide a day evenly")
+        self.latitude = latitude
+        self.longitude = longitude
+        self.rated_power = rated_power
+        self.temperature_coefficient = temperature_coefficient
+        self.noct = noct
+        self.albedo = albedo
+        self.time_bucket = time_bucket
+        self.angle_step = angle_step
+        self.max_cached_days = max_cached_days
+        self.max_memo_entries = max_memo_entries
+        self._buckets_per_day = SECONDS_PER_DAY // self.time_bucket
+        self._tables = OrderedDict()  # day index -> list of per-bucket tuples
+        self._memo = OrderedDict()    # (bucket, base, tilt) -> POA irradiance
+
+    def expected_power(self, timestamp, base_angle, tilt_angle, ambient_temperature=25.0):
+        """
+        Expected clear-sky output in watts for one panel orientation.
+
+        :param timestamp: UNIX timestamp (seconds, UTC)
+        :param base_angle: panel azimuth in degrees (ActuatorController.current_base_angle)
+        :param tilt_angle: panel elevation in degrees (ActuatorController.current_tilt_angle)
+        :param ambient_temperature: air temperature in °C
+        """
+        poa = self.irradiance(timestamp, base_angle, tilt_angle)
+        if poa <= 0.0:
+            return 0.0
+        return self._derate(poa, ambient_temperature)
+
+    def irradiance(self, timestamp, base_angle, tilt_angle):
+        """Clear-sky plane-of-array irradiance in W/m² (memoized)."""
+        bucket = int(timestamp // self.time_bucket)
+        step = self.angle_step
+        key = (bucket, round(base_angle % 360 / step), round(tilt_angle / step))
+        memo = self._memo
+        poa = memo.get(key)
+        if poa is not None:
+            return poa
+
+        day, index = divmod(bucket, self._buckets_per_day)
+        sin_el, cos_el, azimuth, dni, dhi, ghi = self._get_table(day)[index]
+        if dni == 0.0:
+            poa = 0.0
+        else:
+            normal_el = math.radians(key[2] * step)
+            sin_n, cos_n = math.sin(normal_el), math.cos(normal_el)
+            cos_aoi = sin_el * sin_n + cos_el * cos_n * math.cos(azimuth - math.radians(key[1] * step))
+            poa = (dni * max(cos_aoi, 0.0)
+                   + dhi * (1 + sin_n) / 2
+                   + ghi * self.albedo * (1 - sin_n) / 2)
+
+        memo[key] = poa
+        if len(memo) > self.max_memo_entries:
+            memo.popitem(last=False)
+        return poa
+
+    def expected_power_batch(self, timestamps, base_angles, tilt_angles, ambient_temperatures=25.0):
+        """
+        Vectorized expected_power() over arrays (e.g. stored history). Uses
+        the same bucket midpoints and angle rounding as the scalar path, so
+        results match it.
+
+        :return: NumPy array of expected watts
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        step = self.angle_step
+        base = np.radians(np.round(np.asarray(base_angles, dtype=np.float64) % 360 / step) * step)
+        tilt = np.radians(np.round(np.asarray(tilt_angles, dtype=np.float64) / step) * step)
+
+        midpoints = (np.floor_divide(timestamps, self.time_bucket) + 0.5) * self.time_bucket
+        azimuth, elevation = sun_position_batch(midpoints, self.latitude, self.longitude)
+        dni, dhi, ghi = clear_sky_irradiance(elevation)
+
+        el = np.radians(elevation)
+        sin_n = np.sin(tilt)
+        cos_aoi = np.sin(el) * sin_n + np.cos(el) * np.cos(tilt) * np.cos(np.radians(azimuth) - base)
+        poa = (dni * np.maximum(cos_aoi, 0.0)
+               + dhi * (1 + sin_n) / 2
+               + ghi * self.albedo * (1 - sin_n) / 2)
+        poa = np.where(dni > 0, poa, 0.0)
+
+        power = self._derate(poa, np.asarray(ambient_temperatures, dtype=np.float64))
+        return np.where(poa > 0, power, 0.0)
+
+    def dust_percentage_batch(self, timestamps, actual_power, base_angles, tilt_angles,
+                              ambient_temperatures=25.0, min_expected_power=1.0):
+        """
+        Vectorized dust% = (1 - actual / expected) * 100, clamped at 0.
+        Samples where the expected power is below min_expected_power (night,
+        sun behind the panel) are NaN, since the ratio means nothing there.
+        """
+        expected = self.expected_power_batch(timestamps, base_angles, tilt_angles,
+                                             ambient_temperatures)
+        actual = np.asarray(actual_power, dtype=np.float64)
+        valid = expected >= min_expected_power
+        ratio = np.divide(actual, expected, out=np.zeros_like(expected), where=valid)
+        return np.where(valid, np.maximum((1 - ratio) * 100, 0.0), np.nan)
+
+    def clear_cache(self):
+        """Drop all cached day tables and memoized irradiance values."""
+        self._tables.clear()
+        self._memo.clear()
+
+    # ------------------------------------------------------
+    # Internal Helpers
+    # ------------------------------------------------------
+
+    def _derate(self, poa, ambient_temperature):
+        cell_temperature = ambient_temperature + (self.noct - 20) / 800 * poa
+        return (self.rated_power * poa / STC_IRRADIANCE
+                * (1 + self.temperature_coefficient * (cell_temperature - STC_CELL_TEMPERATURE)))
+
+    def _get_table(self, day):
+        table = self._tables.get(day)
+        if table is None:
+            table = self._build_table(day)
+            self._tables[day] = table
+            while len(self._tables) > self.max_cached_days:
+                self._tables.popitem(last=False)
+        else:
+            self._tables.move_to_end(day)
+        return table
+
+    def _build_table(self, day):
+        midpoints = day * SECONDS_PER_DAY + (np.arange(self._buckets_per_day) + 0.5) * self.time_bucket
+        azimuth, elevation = sun_position_batch(midpoints, self.latitude, self.longitude)
+        dni, dhi, ghi = clear_sky_irradiance(elevation)
+        el = np.radians(elevation)
+        # Lists of tuples: cheaper to index one bucket at a time than NumPy arrays
+        return list(zip(np.sin(el).tolist(), np.cos(el).tolist(), np.radians(azimuth).tolist(),
+                        dni.tolist(), dhi.tolist(), ghi.tolist()))
+
+
+# ------------------------------------------------------
+# Stored History
+# ------------------------------------------------------
+
+def recompute_dust_history(model, store, start_time, end_time, legacy_expected_power=300.0,
+                           ambient_temperature=25.0):
+    """
+    Re-estimates dust for samples in a TimeSeriesStore that were recorded
+    with the old constant expected power. The measured power is recovered
+    from the stored dust (actual = legacy * (1 - dust/100)); samples that
+    were clamped to 0% only give a lower bound on the actual power.
+
+    :return: list of (timestamps, dust_percentages) array pairs, one per segment
+    """
+    results = []
+    for arr in store.sample_arrays(start_time, end_time):
+        actual = legacy_expected_power * (1 - arr["dust"].astype(np.float64) / 100)
+        dust = model.dust_percentage_batch(arr["timestamp"], actual, arr["base_angle"],
+                                           arr["tilt_angle"], ambient_temperature)
+        results.append((np.array(arr["timestamp"]), dust))
+    return results
@@ -0,0 +1,211 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+MINUTES_PER_DAY = 1440
+
+
+# ------------------------------------------------------
+# Core Ephemeris (NOAA general solar position algorithm)
+# ------------------------------------------------------
+
+def _solar_terms(timestamps):
+    """
+    Returns (declination_rad, equation_of_time_minutes) for UNIX timestamps.
+    Works on Python floats or NumPy arrays.
+    """
+    xp = np if isinstance(timestamps, np.ndarray) else math
+    jd = timestamps / SECONDS_PER_DAY + 2440587.5
+    jc = (jd - 2451545.0) / 36525.0
+
+    mean_long = (280.46646 + jc * (36000.76983 + jc * 0.0003032)) % 360
+    mean_anom = 357.52911 + jc * (35999.05029 - 0.0001537 * jc)
+    ecc = 0.016708634 - jc * (0.000042037 + 0.0000001267 * jc)
+
+    m = xp.radians(mean_anom)
+    eq_ctr = (xp.sin(m) * (1.914602 - jc * (0.004817 + 0.000014 * jc))
+              + xp.sin(2 * m) * (0.019993 - 0.000101 * jc)
+              + xp.sin(3 * m) * 0.000289)
+    omega = xp.radians(125.04 - 1934.136 * jc)
+    app_long = mean_long + eq_ctr - 0.00569 - 0.00478 * xp.sin(omega)
+
+    mean_obliq = 23 + (26 + (21.448 - jc * (46.815 + jc * (0.00059 - jc * 0.001813))) / 60) / 60
+    obliq = xp.radians(mean_obliq + 0.00256 * xp.cos(omega))
+
+    asin = math.asin if xp is math else np.arcsin
+    declination = asin(xp.sin(obliq) * xp.sin(xp.radians(app_long)))
+
+    l0 = xp.radians(mean_long)
+    var_y = xp.tan(obliq / 2) ** 2
+    eq_time = 4 * xp.degrees(
+        var_y * xp.sin(2 * l0)
+        - 2 * ecc * xp.sin(m)
+        + 4 * ecc * var_y * xp.sin(m) * xp.cos(2 * l0)
+        - 0.5 * var_y ** 2 * xp.sin(4 * l0)
+        - 1.25 * ecc ** 2 * xp.sin(2 * m)
+    )
+    return declination, eq_time
+
+
+def sun_position(timestamp, latitude, longitude):
+    """
+    Computes the sun position for one site and time.
+
+    :param timestamp: UNIX timestamp (seconds, UTC)
+    :param latitude: site latitude in degrees (north positive)
+    :param longitude: site longitude in degrees (east positive)
+    :return: (azimuth, elevation) in degrees; azimuth is clockwise from north
+    """
+    declination, eq_time = _solar_terms(float(timestamp))
+    minutes = (timestamp % SECONDS_PER_DAY) / 60.0
+    true_solar_time = (minutes + eq_time + 4 * longitude) % MINUTES_PER_DAY
+    hour_angle = math.radians(true_solar_time / 4 - 180)
+    lat = math.radians(latitude)
+
+    cos_zenith = (math.sin(lat) * math.sin(declination)
+                  + math.cos(lat) * math.cos(declination) * math.cos(hour_angle))
+    elevation = 90 - math.degrees(math.acos(max(-1.0, min(1.0, cos_zenith))))
+    azimuth = math.degrees(math.atan2(
+        math.sin(hour_angle),
+        math.cos(hour_angle) * math.sin(lat) - math.tan(declination) * math.cos(lat),
+    )) + 180
+    return azimuth % 360, elevation
+
+
+def sun_position_batch(timestamps, latitudes, longitudes):
+    """
+    Vectorized sun_position() for many timestamps and/or sites.
+    Inputs are broadcast against each other (e.g. one site over many
+    timestamps, or many sites at one timestamp).
+
+    :return: (azimuth, elevation) NumPy arrays in degrees
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+
+    declination, eq_time = _solar_terms(timestamps)
+    minutes = (timestamps % SECONDS_PER_DAY) / 60.0
+    true_solar_time = (minutes + eq_time + 4 * longitudes) % MINUTES_PER_DAY
+    hour_angle = np.radians(true_solar_time / 4 - 180)
+    lat = np.radians(latitudes)
+
+    cos_zenith = (np.sin(lat) * np.sin(declination)
+                  + np.cos(lat) * np.cos(declination) * np.cos(hour_angle))
+    elevation = 90 - np.degrees(np.arccos(np.clip(cos_zenith, -1.0, 1.0)))
+    azimuth = np.degrees(np.arctan2(
+        np.sin(hour_angle),
+        np.cos(hour_angle) * np.sin(lat) - np.tan(declination) * np.cos(lat),
+    )) + 180
+    return azimuth % 360, elevation
+
+
+# ------------------------------------------------------
+# Per-Site, Per-Day Lookup Table
+# ------------------------------------------------------
+
+class SolarEphemeris:
+    """
+    Sun position source for one site, backed by a per-day table of sun
+    positions at minute resolution.
+
+    The first lookup of a (UTC) day computes the whole day in one vectorized
+    call; every other lookup that day is a table read with linear
+    interpolation, so the control loop never runs the full ephemeris per tick.
+    """
+
+    def __init__(self, latitude, longitude, resolution=60, max_cached_days=3):
+        """
+        :param latitude: site latitude in degrees (north positive)
+        :param longitude: site longitude in degrees (east positive)
+        :param resolution: table step in seconds (60 = one entry per minute), dividing 86400
+        :param max_cached_days: number of day tables to keep in memory
+        """
+        resolution = int(resolution)
+        if resolution < 1 or SECONDS_PER_DAY % resolution:
+            raise ValueError("resolution must divide a day evenly")
+        self.latitude = latitude
+        self.longitude = longitude
+        self.resolution = resolution
+        self.max_cached_days = max_cached_days
+        self._steps_per_day = SECONDS_PER_DAY // self.resolution
+        self._tables = OrderedDict()  # day index -> (azimuth_unwrapped, elevation)
+
+    def get_sun_position(self, timestamp):
+        """
+        Returns (azimuth, elevation) in degrees for the given UNIX timestamp,
+        interpolated from the cached day table.
+        """
+        day, offset = divmod(timestamp, SECONDS_PER_DAY)
+        azimuth, elevation = self._get_table(int(day))
+
+        pos = offset / self.resolution
+        i = int(pos)
+        frac = pos - i
+        az = azimuth[i] + (azimuth[i + 1] - azimuth[i]) * frac
+        el = elevation[i] + (elevation[i + 1] - elevation[i]) * frac
+        return az % 360, el
+
+    def get_sun_positions(self, timestamps):
+        """
+        Vectorized table lookup for an array of timestamps (which may span
+        several days).
+
+        :return: (azimuth, elevation) NumPy arrays in degrees
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        azimuth_out = np.empty(timestamps.shape)
+        elevation_out = np.empty(timestamps.shape)
+        days = np.floor_divide(timestamps, SECONDS_PER_DAY).astype(np.int64)
+
+        for day in np.unique(days):
+            mask = days == day
+            azimuth, elevation = self._get_arrays(int(day))
+            x = (timestamps[mask] - day * SECONDS_PER_DAY) / self.resolution
+            grid = np.arange(len(azimuth))
+            azimuth_out[mask] = np.interp(x, grid, azimuth) % 360
+            elevation_out[mask] = np.interp(x, grid, elevation)
+        return azimuth_out, elevation_out
+
+    def clear_cache(self):
+        """Drop all cached day tables."""
+        self._tables.clear()
+
+    # ------------------------------------------------------
+    # Internal Helpers
+    # ------------------------------------------------------
+
+    def _get_entry(self, day):
+        entry = self._tables.get(day)
+        if entry is None:
+            entry = self._build_table(day)
+            self._tables[day] = entry
+            while len(self._tables) > self.max_cached_days:
+                self._tables.popitem(last=False)
+        else:
+            self._tables.move_to_end(day)
+        return entry
+
+    def _get_table(self, day):
+        """
+        Returns the (azimuth, elevation) lists for a day. Lists are used for
+        the scalar path because indexing them is cheaper than indexing NumPy
+        arrays one element at a time.
+        """
+        entry = self._get_entry(day)
+        return entry[2], entry[3]
+
+    def _get_arrays(self, day):
+        """Returns the (azimuth, elevation) NumPy arrays for a day."""
+        entry = self._get_entry(day)
+        return entry[0], entry[1]
+
+    def _build_table(self, day):
+        # One extra sample so the last minute of the day can be interpolated
+        timestamps = day * SECONDS_PER_DAY + np.arange(self._steps_per_day + 1) * self.resolution
+        azimuth, elevation = sun_position_batch(timestamps, self.latitude, self.longitude)
+        # Unwrap so interpolation across north (359° -> 0°) stays continuous
+        azimuth = np.degrees(np.unwrap(np.radians(azimuth)))
+        return azimuth, elevation, azimuth.tolist(), elevation.tolist()
@@ -0,0 +1,22 @@
+import argparse
+
+from managers.simulation import Simulation
+
+def main():
+    """
+    Runs the DecisionManager state machine in virtual time and prints a
+    summary, e.g. `python simulate.py --days 90 --seed 1`.
+    """
+    parser = argparse.ArgumentParser(description="Run the DecisionManager in virtual time.")
+    parser.add_argument("--days", type=float, default=30.0, help="virtual days to simulate")
+    parser.add_argument("--tick", type=float, default=2.0, help="virtual seconds per tick")
+    parser.add_argument("--seed", type=int, default=0, help="sensor random seed")
+    args = parser.parse_args()
+
+    sim = Simulation(duration=args.days * 86400, tick_interval=args.tick, seed=args.seed)
+    result = sim.run()
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,56 @@
+from .events import (
+    DEBUG,
+    INFO,
+    WARNING,
+    ERROR,
+    EventBus,
+    StdoutSink,
+    FileSink,
+    CloudSink,
+    get_event_bus,
+)
+
+# Imported on first access: the metrics endpoint pulls in http.server and the
+# dashboard asyncio, which every controller import would otherwise pay for
+_LAZY = {
+    "ControlLoopMetrics": ".metrics",
+    "MetricsRegistry": ".metrics",
+    "TimeSeriesStore": ".timeseries_store",
+    "RollupEngine": ".rollups",
+    "DashboardServer": ".dashboard_server",
+    "WireEncoder": ".wire_format",
+    "decode_frame": ".wire_format",
+    "decode_stream": ".wire_format",
+    "iter_frames": ".wire_format",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = [
+    "DEBUG",
+    "INFO",
+    "WARNING",
+    "ERROR",
+    "EventBus",
+    "StdoutSink",
+    "FileSink",
+    "CloudSink",
+    "get_event_bus",
+    "ControlLoopMetrics",
+    "MetricsRegistry",
+    "TimeSeriesStore",
+    "RollupEngine",
+    "DashboardServer",
+    "WireEncoder",
+    "decode_frame",
+    "decode_stream",
+    "iter_frames",
+]
\ No newline at end of file
@@ -0,0 +1,330 @@
+import asyncio
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from .events import LEVEL_NAMES
+
+# Per-viewer backlog before it is treated as a slow consumer and resynced
+DEFAULT_CLIENT_QUEUE = 256
+KEEPALIVE_SECONDS = 15.0
+
+
+def panel_state(decision_mgr, dust_level=None, wind_speed=None):
+    """
+    The fields the dashboard shows for one DecisionManager, rounded so that
+    sensor noise below display precision doesn't produce an update.
+    """
+    state = {
+        "currentState": decision_mgr.system_state,
+        "baseAngle": round(decision_mgr.actuator_ctrl.current_base_angle, 1),
+        "tiltAngle": round(decision_mgr.actuator_ctrl.current_tilt_angle, 1),
+        "waterVolume": round(decision_mgr.cleaning_ctrl.water_volume, 3),
+        "windCleanStartTime": decision_mgr.wind_clean_start_time,
+    }
+    if dust_level is not None:
+        state["dust"] = round(dust_level, 1)
+    if wind_speed is not None:
+        state["windSpeed"] = round(wind_speed, 1)
+    return state
+
+
+class _Viewer:
+    __slots__ = ("queue", "resync")
+
+    def __init__(self, maxsize):
+        self.queue = asyncio.Queue(maxsize)
+        self.resync = False
+
+
+class DashboardServer:
+    """
+    Embedded asyncio HTTP server that pushes live state to dashboards over
+    Server-Sent Events and serves downsampled history.
+
+    Endpoints (all JSON except the stream; CORS is open so the static
+    dashboard page can connect from file:// or another port):
+      GET /api/stream   - SSE: 'snapshot' on connect, then 'state' diffs and 'log' events
+      GET /api/state    - current full state
+      GET /api/history  - ?start=&end=&points= rollup rows (finest resolution within budget)
+      GET /api/events   - ?start=&end=&limit= stored log and state-change events
+    A malformed query parameter gets a 400. History and events are read
+    under the rollups' and store's locks, so they can be served while the
+    control loop is appending to (or rotating) the same segments.
+
+    publish() runs on the control loop: it diffs the new state against the
+    last one, and if anything changed, serializes the diff once into an SSE
+    frame and hands those bytes to the server loop. Fanning out to viewers
+    happens there, so the tick costs the same with 1 or 500 dashboards open.
+    A viewer that falls `client_queue` frames behind is skipped ahead to a
+    fresh snapshot instead of slowing anyone down.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, rollups=None, store=None,
+                 client_queue=DEFAULT_CLIENT_QUEUE, clock=time.time):
+        """
+        :param host: interface to listen on
+        :param port: TCP port
+        :param rollups: (Optional) RollupEngine backing /api/history
+        :param store: (Optional) TimeSeriesStore backing /api/events
+        :param client_queue: frames buffered per viewer
+        :param clock: time source for update timestamps
+        """
+        self.host = host
+        self.port = port
+        self.rollups = rollups
+        self.store = store
+        self.client_queue = client_queue
+        self.clock = clock
+
+        self.state = {}
+        self.sequence = 0
+        self.updates_published = 0
+        # (sequence, state) swapped as one tuple, so the server thread never
+        # pairs a state with the wrong sequence
+        self._published = (0, self.state)
+        self._snapshot_cache = None  # (sequence, snapshot frame)
+        self._viewers = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._keepalive_task = None
+
+    @property
+    def viewer_count(self):
+        return len(self._viewers)
+
+    # ------------------------------------------------------
+    # Control Loop Side
+    # ------------------------------------------------------
+
+    def publish(self, state):
+        """
+        Pushes the fields of `state` that changed since the last call.
+        Safe to call from the control loop thread. Returns True if an update
+        was sent.
+        """
+        current = self.state
+        changes = {k: v for k, v in state.items() if current.get(k, _MISSING) != v}
+        if not changes:
+            return False
+        # Replaced, never mutated, so the server thread can serialize it safely
+        self.state = {**current, **changes}
+        self.sequence += 1
+        self._published = (self.sequence, self.state)
+        self.updates_published += 1
+        frame = _sse_frame("state", {"t": self.clock(), "changes": changes}, self.sequence)
+        self._dispatch(frame)
+        return True
+
+    def publish_from(self, decision_mgr, dust_level=None, wind_speed=None):
+        return self.publish(panel_state(decision_mgr, dust_level, wind_speed))
+
+    def event_sink(self, event):
+        """EventBus sink: forwards events to the dashboard's log table."""
+        frame = _sse_frame("log", {
+            "t": event["timestamp"],
+            "level": LEVEL_NAMES.get(event["level"], event["level"]),
+            "source": event["source"],
+            "message": event["message"],
+        })
+        self._dispatch(frame)
+
+    # ------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------
+
+    async def start_async(self):
+        """Starts serving on the running event loop (asyncio runtime)."""
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._keepalive_task = self._loop.create_task(self._keepalive())
+        return self._server
+
+    def start(self):
+        """Starts serving on a background thread (synchronous main loop)."""
+        ready = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start_async())
+            ready.set()
+            loop.run_forever()
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="dashboard-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        if self._thread is not None:
+            future = asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+            future.result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+        else:
+            self._server.close()
+            self._keepalive_task.cancel()
+        self._loop = None
+
+    async def _shutdown(self):
+        self._server.close()
+        self._keepalive_task.cancel()
+        for viewer in list(self._viewers):
+            while not viewer.queue.empty():
+                viewer.queue.get_nowait()
+            viewer.queue.put_nowait(None)
+        await self._server.wait_closed()
+
+    # ------------------------------------------------------
+    # Fan-Out (server loop)
+    # ------------------------------------------------------
+
+    def _dispatch(self, frame):
+        loop = self._loop
+        if loop is None or not self._viewers:
+            return
+        if self._thread is not None:
+            loop.call_soon_threadsafe(self._broadcast, frame)
+        else:
+            self._broadcast(frame)
+
+    def _broadcast(self, frame):
+        for viewer in self._viewers:
+            if viewer.resync:
+                continue
+            try:
+                viewer.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and send a snapshot instead
+                while not viewer.queue.empty():
+                    viewer.queue.get_nowait()
+                viewer.resync = True
+                viewer.queue.put_nowait(b"")
+
+    def _snapshot(self):
+        # Cached with the sequence it was built for: if publish() runs while
+        # it is being built, the next viewer sees the mismatch and rebuilds
+        sequence, state = self._published
+        cached = self._snapshot_cache
+        if cached is None or cached[0] != sequence:
+            cached = self._snapshot_cache = (
+                sequence, _sse_frame("snapshot", {"t": self.clock(), "state": state}, sequence))
+        return cached[1]
+
+    async def _keepalive(self):
+        while self._server is not None and self._server.is_serving():
+            await asyncio.sleep(KEEPALIVE_SECONDS)
+            self._broadcast(b": keepalive\n\n")
+
+    # ------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------
+
+    async def _handle_client(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # headers are not needed
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2 or parts[0] not in ("GET", "OPTIONS"):
+                await self._respond(writer, 405, {"error": "method not allowed"})
+                return
+            url = urlparse(parts[1])
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+            if parts[0] == "OPTIONS":
+                await self._respond(writer, 204, None)
+            elif url.path == "/api/stream":
+                await self._stream(writer)
+            elif url.path == "/api/state":
+                sequence, state = self._published
+                await self._respond(writer, 200, {"sequence": sequence, "state": state})
+            elif url.path in ("/api/history", "/api/events"):
+                handler = self._history if url.path == "/api/history" else self._events
+                try:
+                    status, payload = handler(query)
+                except ValueError as exc:
+                    status, payload = 400, {"error": f"bad query parameter: {exc}"}
+                await self._respond(writer, status, payload)
+            else:
+                await self._respond(writer, 404, {"error": "not found"})
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _stream(self, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\n"
+                     b"Content-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\n"
+                     b"Connection: keep-alive\r\n"
+                     b"Access-Control-Allow-Origin: *\r\n\r\n"
+                     b"retry: 3000\n\n")
+        writer.write(self._snapshot())
+        viewer = _Viewer(self.client_queue)
+        self._viewers.add(viewer)
+        try:
+            await writer.drain()
+            while True:
+                frame = await viewer.queue.get()
+                if frame is None:
+                    break
+                if viewer.resync:
+                    viewer.resync = False
+                    frame = self._snapshot()
+                writer.write(frame)
+                await writer.drain()
+        finally:
+            self._viewers.discard(viewer)
+
+    async def _respond(self, writer, status, payload):
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        reason = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+                  405: "Method Not Allowed", 503: "Service Unavailable"}.get(status, "")
+        writer.write((f"HTTP/1.1 {status} {reason}\r\n"
+                      "Content-Type: application/json\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      "Access-Control-Allow-Origin: *\r\n"
+                      "Access-Control-Allow-Methods: GET\r\n"
+                      "Connection: close\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    def _history(self, query):
+        if self.rollups is None:
+            return 503, {"error": "no rollups configured"}
+        now = self.clock()
+        end = float(query.get("end", now))
+        start = float(query.get("start", end - 86400))
+        points = max(1, int(query.get("points", 500)))
+        resolution = int(query["resolution"]) if "resolution" in query else None
+        if resolution is not None and resolution not in self.rollups.resolutions:
+            return 400, {"error": f"resolution must be one of {list(self.rollups.resolutions)}"}
+        resolution, rows = self.rollups.query(start, end, points, resolution)
+        return 200, {"start": start, "end": end, "resolution": resolution, "rows": rows}
+
+    def _events(self, query):
+        if self.store is None:
+            return 503, {"error": "no store configured"}
+        now = self.clock()
+        end = float(query.get("end", now + 1))
+        start = float(query.get("start", end - 86400))
+        limit = max(1, int(query.get("limit", 100)))
+        events = list(self.store.iter_events(start, end))[-limit:]
+        return 200, {"events": events}
+
+
+_MISSING = object()
+
+
+def _sse_frame(event, payload, event_id=None):
+    """Serializes one SSE frame (the same bytes go to every viewer)."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n".encode("utf-8")
@@ -0,0 +1,165 @@
+import json
+import time
+from collections import deque
+
+# Levels (same numbers as the standard logging module)
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+
+class EventBus:
+    """
+    Structured event system shared by the controllers and DecisionManager,
+    replacing print() in the hot paths.
+
+    - Level gating: emit() returns before doing any work (no formatting,
+      no dict, no I/O) when the level is below the bus level.
+    - Messages use %-style templates and are only formatted once an event
+      passes the gate, e.g. emit(INFO, "ActuatorController",
+      "Rotating base from %s° to %s°", old, new).
+    - Every accepted event is kept in an in-memory ring buffer (recent())
+      and handed to each sink (stdout, file, cloud manager, ...).
+    """
+
+    def __init__(self, level=INFO, sinks=None, buffer_size=1000, clock=time.time):
+        """
+        :param level: minimum level that gets recorded
+        :param sinks: list of callables taking one event dict
+        :param buffer_size: number of recent events kept in memory
+        :param clock: time source for event timestamps
+        """
+        self.level = level
+        self.sinks = list(sinks) if sinks is not None else []
+        self.clock = clock
+        self._recent = deque(maxlen=buffer_size)
+
+    def enabled(self, level):
+        """True if events at `level` would be recorded."""
+        return level >= self.level
+
+    def emit(self, level, source, message, *args, **fields):
+        """
+        Records an event if `level` passes the gate.
+
+        :param level: DEBUG, INFO, WARNING or ERROR
+        :param source: component name, e.g. 'ActuatorController'
+        :param message: %-style template (formatted lazily with args)
+        :param fields: extra structured data stored on the event
+        """
+        if level < self.level:
+            return None
+        event = {
+            "timestamp": self.clock(),
+            "level": level,
+            "source": source,
+            "message": message % args if args else message,
+        }
+        if fields:
+            event.update(fields)
+        self._recent.append(event)
+        for sink in self.sinks:
+            sink(event)
+        return event
+
+    # Convenience wrappers
+    def debug(self, source, message, *args, **fields):
+        return self.emit(DEBUG, source, message, *args, **fields)
+
+    def info(self, source, message, *args, **fields):
+        return self.emit(INFO, source, message, *args, **fields)
+
+    def warning(self, source, message, *args, **fields):
+        return self.emit(WARNING, source, message, *args, **fields)
+
+    def error(self, source, message, *args, **fields):
+        return self.emit(ERROR, source, message, *args, **fields)
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+
+    def recent(self, n=None, min_level=DEBUG):
+        """
+        Returns up to n of the most recent events (oldest first) at or above
+        min_level.
+        """
+        events = [e for e in self._recent if e["level"] >= min_level]
+        return events if n is None else events[-n:]
+
+
+# ------------------------------------------------------
+# Sinks
+# ------------------------------------------------------
+
+class StdoutSink:
+    """
+    Prints events as '[Source:mode] message', like the old print() calls.
+    """
+
+    def __call__(self, event):
+        mode = event.get("mode")
+        tag = f"{event['source']}:{mode}" if mode else event["source"]
+        if event["level"] >= WARNING:
+            print(f"[{tag}] {LEVEL_NAMES.get(event['level'], event['level'])}: {event['message']}")
+        else:
+            print(f"[{tag}] {event['message']}")
+
+
+class FileSink:
+    """
+    Appends events to a file as JSON lines.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, event):
+        self._file.write(json.dumps(event) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CloudSink:
+    """
+    Forwards events at or above min_level to a cloud manager's log_event()
+    (FirebaseManager or StateWriter). Events marked `uplinked` were already
+    sent by their source (DecisionManager._log_event()) and are skipped.
+    """
+
+    def __init__(self, firebase_mgr, min_level=WARNING):
+        self.firebase_mgr = firebase_mgr
+        self.min_level = min_level
+
+    def __call__(self, event):
+        if event["level"] >= self.min_level and not event.get("uplinked"):
+            self.firebase_mgr.log_event({
+                "description": event["message"],
+                "level": LEVEL_NAMES.get(event["level"], event["level"]),
+                "source": event["source"],
+                "timestamp": event["timestamp"],
+            })
+
+
+# ------------------------------------------------------
+# Process-Wide Default Bus
+# ------------------------------------------------------
+
+_default_bus = EventBus(level=INFO, sinks=[StdoutSink()])
+
+
+def get_event_bus():
+    """
+    Returns the default bus that controllers use when none is passed in.
+    It prints INFO and above to stdout, matching the old print() behavior;
+    raise its level (e.g. to WARNING) to make logging nearly free.
+    """
+    return _default_bus
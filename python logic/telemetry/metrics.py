@@ -0,0 +1,315 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Latency buckets in seconds (10 µs .. 5 s)
+DEFAULT_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+# ------------------------------------------------------
+# Metric Types (Prometheus text exposition format)
+# ------------------------------------------------------
+
+class _Metric:
+    TYPE = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # label values tuple -> value
+
+    def _label_str(self, labels, extra=None):
+        pairs = list(zip(self.labelnames, labels))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.TYPE}"]
+        for labels, value in list(self._values.items()):
+            lines.append(f"{self.name}{self._label_str(labels)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+
+class Gauge(_Metric):
+    TYPE = "gauge"
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+    def value(self, *labels):
+        return self._values.get(labels)
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        entry = self._values.get(labels)
+        if entry is None:
+            # [per-bucket counts..., +Inf count], sum
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def count(self, *labels):
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.TYPE}"]
+        for labels, (counts, total) in list(self._values.items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets + ("+Inf",), counts):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{self._label_str(labels, ('le', bound))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_str(labels)} {total}")
+            lines.append(f"{self.name}_count{self._label_str(labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds metrics and exports them in the Prometheus text format, either to
+    a file (for node_exporter's textfile collector) or over a small HTTP
+    endpoint.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._server = None
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self):
+        """Returns every metric in Prometheus text format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Writes render() to `path` atomically (write temp file, then rename)."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def serve(self, port=9108, host="127.0.0.1", extra_routes=None):
+        """
+        Starts a background HTTP server exposing GET /metrics.
+
+        :param extra_routes: {path: handler(query_dict) -> str} for extra endpoints;
+                             a handler raises ValueError for bad input (400)
+                             or RuntimeError if it can't run now (409)
+        """
+        registry = self
+        routes = dict(extra_routes or {})
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/metrics":
+                    body = registry.render()
+                elif url.path in routes:
+                    try:
+                        body = routes[url.path](parse_qs(url.query))
+                    except ValueError as exc:  # bad query parameter
+                        self.send_error(400, str(exc))
+                        return
+                    except RuntimeError as exc:  # e.g. a profile is already running
+                        self.send_error(409, str(exc))
+                        return
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # keep the control loop's stdout clean
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+# ------------------------------------------------------
+# Control Loop Instrumentation
+# ------------------------------------------------------
+
+class ControlLoopMetrics:
+    """
+    The metrics DecisionManager and the controllers report when given a
+    `metrics=` instance. Without one, the instrumented code paths reduce to
+    a single `is None` check.
+
+    Also carries an on-demand cProfile hook: start_profile() profiles the
+    next N ticks (optionally only every k-th tick) and writes the stats.
+    """
+
+    PHASES = ("sensors", "overrides", "state_handler", "cloud_update")
+
+    def __init__(self, registry=None):
+        self.registry = registry if registry is not None else MetricsRegistry()
+        r = self.registry
+
+        self.tick_seconds = r.histogram(
+            "solar_tick_seconds", "Duration of one run_logic() tick.")
+        self.phase_seconds = r.histogram(
+            "solar_tick_phase_seconds", "Duration of each run_logic() phase.", ("phase",))
+        self.switch_calls = r.counter(
+            "solar_switch_state_calls_total", "Calls to _switch_state().", ("to_state",))
+        self.transitions = r.counter(
+            "solar_state_transitions_total", "State changes.", ("from_state", "to_state"))
+        self.actuator_commands = r.counter(
+            "solar_actuator_commands_total", "Commands sent to the actuators.", ("command",))
+        self.water_volume = r.gauge(
+            "solar_water_volume_liters", "Water left in the cleaning reservoir.")
+        self.water_used = r.counter(
+            "solar_water_used_liters_total", "Water used for cleaning.")
+        self.water_cleanings = r.counter(
+            "solar_water_cleanings_total", "Water cleaning attempts.", ("result",))
+
+        self._profiler = None
+        self._profile_lock = threading.Lock()
+        self._profile_ticks_left = 0
+        self._profile_sample_every = 1
+        self._profile_tick_index = 0
+        self._profile_output = None
+        self.last_profile = None
+
+    # Hooks called by DecisionManager / controllers
+
+    def observe_phase(self, phase, seconds):
+        self.phase_seconds.observe(seconds, phase)
+
+    def observe_tick(self, seconds):
+        self.tick_seconds.observe(seconds)
+
+    def record_switch(self, old_state, new_state):
+        self.switch_calls.inc(new_state)
+        if old_state != new_state:
+            self.transitions.inc(old_state, new_state)
+
+    def record_actuator_command(self, command):
+        self.actuator_commands.inc(command)
+
+    def record_water_cleaning(self, success, liters_used, volume_left):
+        self.water_cleanings.inc("success" if success else "insufficient_water")
+        if liters_used:
+            self.water_used.inc(amount=liters_used)
+        self.water_volume.set(volume_left)
+
+    # On-demand profiling
+
+    def start_profile(self, ticks=100, sample_every=1, output_path=None):
+        """
+        Profiles the next `ticks` sampled ticks, where every `sample_every`-th
+        tick is sampled. When done, the pstats summary is kept in
+        last_profile and (optionally) the raw stats are dumped to output_path.
+
+        May be called from any thread (e.g. the /profile endpoint). Raises
+        RuntimeError while a profile is still running and ValueError if
+        ticks < 1.
+        """
+        if ticks < 1:
+            raise ValueError("ticks must be at least 1")
+        with self._profile_lock:
+            if self._profiler is not None:
+                raise RuntimeError("A profile is already running")
+            self._profile_ticks_left = ticks
+            self._profile_sample_every = max(1, sample_every)
+            self._profile_tick_index = 0
+            self._profile_output = output_path
+            # Published last: the control thread only looks at _profiler
+            self._profiler = cProfile.Profile()
+        return f"Profiling next {ticks} ticks (every {self._profile_sample_every})\n"
+
+    def tick_started(self):
+        """Returns True if this tick is being profiled."""
+        if self._profiler is None:
+            return False
+        self._profile_tick_index += 1
+        if self._profile_tick_index % self._profile_sample_every:
+            return False
+        self._profiler.enable()
+        return True
+
+    def tick_finished(self, profiled):
+        if not profiled:
+            return
+        self._profiler.disable()
+        self._profile_ticks_left -= 1
+        if self._profile_ticks_left <= 0:
+            profiler = self._profiler
+            if self._profile_output:
+                profiler.dump_stats(self._profile_output)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+            self.last_profile = out.getvalue()
+            with self._profile_lock:
+                self._profiler = None
+
+    # Export
+
+    def serve(self, port=9108, host="127.0.0.1"):
+        """
+        Serves /metrics, plus /profile?ticks=N&every=K to trigger profiling
+        and /profile/last to read the latest profile.
+        """
+        def trigger(query):
+            try:
+                ticks = int(query.get("ticks", ["100"])[0])
+                sample_every = int(query.get("every", ["1"])[0])
+            except ValueError:
+                raise ValueError("ticks and every must be integers")
+            return self.start_profile(ticks=ticks, sample_every=sample_every)
+
+        def last(query):
+            return self.last_profile or "No profile yet.\n"
+
+        return self.registry.serve(port, host, {"/profile": trigger, "/profile/last": last})
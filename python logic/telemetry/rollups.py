@@ -0,0 +1,370 @@
+import argparse
+import csv
+import math
+import os
+import struct
+import threading
+
+from .timeseries_store import SAMPLE_FIELDS, STATE_CODES, STATE_NAMES, SegmentedStream
+
+# Minute, hour and day buckets (each divides a day, so buckets never straddle days)
+DEFAULT_RESOLUTIONS = (60, 3600, 86400)
+
+# Sample fields that get sum/min/max aggregates
+ROLLUP_FIELDS = ("dust", "wind_speed", "base_angle", "tilt_angle", "water_volume")
+CLEANING_STATES = ("CLEANING_WIND", "CLEANING_WATER")
+
+# bucket start, sample count, (sum, min, max) per field, samples per state,
+# cleaning events (entries into CLEANING_WIND / CLEANING_WATER)
+ROLLUP_RECORD = struct.Struct(
+    "<dI" + "dff" * len(ROLLUP_FIELDS) + "I" * len(STATE_NAMES) + "I" * len(CLEANING_STATES))
+
+_FIELD_INDEX = [SAMPLE_FIELDS.index(f) for f in ROLLUP_FIELDS]
+_CLEANING_CODES = tuple(STATE_CODES[s] for s in CLEANING_STATES)
+
+
+class _Bucket:
+    """Open (still filling) aggregate for one resolution."""
+
+    __slots__ = ("start", "count", "sums", "mins", "maxs", "state_counts", "cleaning_events")
+
+    def __init__(self, start):
+        self.start = start
+        self.count = 0
+        self.sums = [0.0] * len(ROLLUP_FIELDS)
+        self.mins = [math.inf] * len(ROLLUP_FIELDS)
+        self.maxs = [-math.inf] * len(ROLLUP_FIELDS)
+        self.state_counts = [0] * len(STATE_NAMES)
+        self.cleaning_events = [0] * len(CLEANING_STATES)
+
+    def pack_values(self):
+        values = [self.start, self.count]
+        for s, lo, hi in zip(self.sums, self.mins, self.maxs):
+            values.extend((s, lo, hi))
+        return values + self.state_counts + self.cleaning_events
+
+
+class RollupEngine:
+    """
+    Incremental rollups of the sample stream for dashboard history queries.
+
+    Each resolution (minute, hour, day by default) keeps one open bucket in
+    memory; when a sample lands past its end, the bucket is materialized as
+    a fixed-width record in its own SegmentedStream. Queries pick the finest
+    resolution that stays within the caller's point budget, so a week-long
+    chart reads ~168 hourly records instead of 600k raw samples.
+    """
+
+    def __init__(self, root, resolutions=DEFAULT_RESOLUTIONS, retention_days=None):
+        """
+        :param root: folder for the rollup segments (one subfolder per resolution)
+        :param resolutions: bucket sizes in seconds, each dividing 86400
+        :param retention_days: (Optional) dict {resolution: days} or one value for all
+        """
+        self.resolutions = tuple(sorted(resolutions))
+        self.streams = {}
+        for res in self.resolutions:
+            if 86400 % res:
+                raise ValueError("Each resolution must divide a day evenly")
+            days = retention_days.get(res) if isinstance(retention_days, dict) else retention_days
+            partition_seconds = max(86400, res * 1024)
+            self.streams[res] = SegmentedStream(
+                os.path.join(root, str(res)), ROLLUP_RECORD,
+                partition_seconds=partition_seconds,
+                records_per_partition=partition_seconds // res,
+                retention_seconds=days * 86400 if days is not None else None)
+        self._open = {res: None for res in self.resolutions}
+        self._last_state = None
+        # Held while buckets change or are read, so a query from the
+        # dashboard thread never sees a bucket both stored and still open
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------
+
+    def add_sample(self, timestamp, dust, wind_speed, base_angle, tilt_angle, water_volume, state):
+        """
+        Folds one sample into every open bucket. `state` is a state name or code.
+        """
+        code = STATE_CODES.get(state, state) if isinstance(state, str) else state
+        values = (dust, wind_speed, base_angle, tilt_angle, water_volume)
+        with self._lock:
+            entered_cleaning = code != self._last_state and code in _CLEANING_CODES
+            self._last_state = code
+
+            for res in self.resolutions:
+                start = timestamp - timestamp % res
+                bucket = self._open[res]
+                if bucket is None or bucket.start != start:
+                    if bucket is not None:
+                        self.streams[res].append(*bucket.pack_values())
+                    bucket = self._open[res] = _Bucket(start)
+
+                bucket.count += 1
+                sums, mins, maxs = bucket.sums, bucket.mins, bucket.maxs
+                for i, v in enumerate(values):
+                    sums[i] += v
+                    if v < mins[i]:
+                        mins[i] = v
+                    if v > maxs[i]:
+                        maxs[i] = v
+                if code < len(STATE_NAMES):
+                    bucket.state_counts[code] += 1
+                if entered_cleaning:
+                    bucket.cleaning_events[_CLEANING_CODES.index(code)] += 1
+
+    def add_arrays(self, timestamps, columns, states, final=True):
+        """
+        Vectorized ingest of a chunk of samples (NumPy arrays, sorted by time).
+        Used by backfill. Every bucket wholly inside the chunk is written in
+        one pass; unless `final`, samples of the last (possibly incomplete)
+        day are returned as a carry-over to prepend to the next chunk.
+
+        :param columns: dict {field: array} for ROLLUP_FIELDS
+        :return: index where the carry-over starts (len(timestamps) if none)
+        """
+        import numpy as np
+
+        n = len(timestamps)
+        if n == 0:
+            return 0
+        cut = n
+        if not final:
+            last_day = timestamps[-1] - timestamps[-1] % 86400
+            cut = int(np.searchsorted(timestamps, last_day, side="left"))
+            if cut == 0:
+                return 0
+
+        with self._lock:
+            ts = timestamps[:cut]
+            states = states[:cut].astype(np.int64)
+            prev = np.concatenate(([-1 if self._last_state is None else self._last_state], states[:-1]))
+            entered = (states != prev)
+            self._last_state = int(states[-1])
+
+            for res in self.resolutions:
+                self._flush_open(res)
+                bucket_ids = np.floor_divide(ts, res)
+                starts = np.flatnonzero(np.r_[True, bucket_ids[1:] != bucket_ids[:-1]])
+                counts = np.diff(np.r_[starts, len(ts)])
+                records = [bucket_ids[starts] * res, counts]
+                for field in ROLLUP_FIELDS:
+                    col = np.asarray(columns[field][:cut], dtype=np.float64)
+                    records.extend((np.add.reduceat(col, starts),
+                                    np.minimum.reduceat(col, starts),
+                                    np.maximum.reduceat(col, starts)))
+                for code in range(len(STATE_NAMES)):
+                    records.append(np.add.reduceat((states == code).astype(np.int64), starts))
+                for code in _CLEANING_CODES:
+                    records.append(np.add.reduceat((entered & (states == code)).astype(np.int64), starts))
+
+                stream = self.streams[res]
+                for row in zip(*(r.tolist() for r in records)):
+                    stream.append(*row)
+        return cut
+
+    def is_empty(self):
+        """True if no bucket has been stored or opened yet."""
+        if any(bucket is not None and bucket.count for bucket in self._open.values()):
+            return False
+        return not any(stream.partitions() for stream in self.streams.values())
+
+    def flush(self):
+        """Materializes every open bucket (e.g. at shutdown) and flushes to disk."""
+        with self._lock:
+            for res in self.resolutions:
+                self._flush_open(res)
+                self.streams[res].flush()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            for stream in self.streams.values():
+                stream.close()
+
+    # ------------------------------------------------------
+    # Query
+    # ------------------------------------------------------
+
+    def pick_resolution(self, start_time, end_time, max_points):
+        """
+        Finest resolution whose bucket count over the range fits max_points
+        (the coarsest one if none fits).
+        """
+        span = max(0.0, end_time - start_time)
+        for res in self.resolutions:
+            if span / res <= max_points:
+                return res
+        return self.resolutions[-1]
+
+    def query(self, start_time, end_time, max_points=500, resolution=None):
+        """
+        Returns (resolution, rows) where each row is a dict with the bucket
+        start, count, <field>_mean/_min/_max, seconds-in-state shares and
+        cleaning event counts. The still-open bucket is included, so the
+        newest data shows up immediately. Safe to call from another thread
+        while samples are being added.
+
+        A bucket can be stored more than once (a partial one flushed at
+        shutdown, then reopened by the first samples after a restart);
+        records with the same start are merged into one row.
+        """
+        res = resolution or self.pick_resolution(start_time, end_time, max_points)
+        merged = {}
+        with self._lock:
+            for record in self.streams[res].records(start_time - start_time % res, end_time):
+                self._merge_into(merged, record)
+            bucket = self._open[res]
+            if bucket is not None and bucket.count and start_time - res < bucket.start < end_time:
+                self._merge_into(merged, bucket.pack_values())
+        return res, [self._row(record) for record in merged.values()]
+
+    # ------------------------------------------------------
+    # Internal Helpers
+    # ------------------------------------------------------
+
+    def _flush_open(self, res):
+        bucket = self._open[res]
+        if bucket is not None and bucket.count:
+            self.streams[res].append(*bucket.pack_values())
+        self._open[res] = None
+
+    @staticmethod
+    def _merge_into(merged, record):
+        start = record[0]
+        previous = merged.get(start)
+        if previous is None:
+            merged[start] = list(record)
+            return
+        previous[1] += record[1]
+        offset = 2
+        for _ in ROLLUP_FIELDS:
+            previous[offset] += record[offset]
+            previous[offset + 1] = min(previous[offset + 1], record[offset + 1])
+            previous[offset + 2] = max(previous[offset + 2], record[offset + 2])
+            offset += 3
+        for i in range(offset, len(record)):
+            previous[i] += record[i]
+
+    @staticmethod
+    def _row(record):
+        start, count = record[0], record[1]
+        row = {"timestamp": start, "count": count}
+        offset = 2
+        for field in ROLLUP_FIELDS:
+            total, lo, hi = record[offset:offset + 3]
+            row[f"{field}_mean"] = total / count if count else None
+            row[f"{field}_min"] = lo
+            row[f"{field}_max"] = hi
+            offset += 3
+        for name in STATE_NAMES:
+            row[f"samples_{name.lower()}"] = record[offset]
+            offset += 1
+        for name in CLEANING_STATES:
+            row[f"events_{name.lower()}"] = record[offset]
+            offset += 1
+        return row
+
+
+# ------------------------------------------------------
+# Backfill
+# ------------------------------------------------------
+
+def _require_empty(engine):
+    # query() merges records that share a bucket start, so backfilling over
+    # existing buckets would count their samples twice
+    if not engine.is_empty():
+        raise ValueError("Backfill needs an empty rollup folder; "
+                         "it already holds live-ingested or backfilled buckets")
+
+
+def backfill_from_store(engine, store, start_time, end_time):
+    """
+    Rebuilds rollups from a TimeSeriesStore, one segment at a time. Each
+    segment is a zero-copy NumPy view, so memory stays bounded by one day
+    of samples no matter how much history there is.
+
+    Raises ValueError unless the engine is empty (see RollupEngine.is_empty()).
+    """
+    _require_empty(engine)
+    total = 0
+    for arr in store.sample_arrays(start_time, end_time):
+        columns = {f: arr[f] for f in ROLLUP_FIELDS}
+        engine.add_arrays(arr["timestamp"], columns, arr["state"], final=True)
+        total += len(arr)
+    engine.flush()
+    return total
+
+
+def backfill_from_csv(engine, path, chunk_rows=100000):
+    """
+    Rebuilds rollups from a CSV log with SAMPLE_FIELDS columns (state as a
+    name or code), reading `chunk_rows` rows at a time. Rows of a day that
+    isn't complete yet are carried into the next chunk.
+
+    Raises ValueError unless the engine is empty (see RollupEngine.is_empty()).
+    """
+    import numpy as np
+
+    _require_empty(engine)
+
+    def flush_chunk(rows, final):
+        ts = np.array([r[0] for r in rows], dtype=np.float64)
+        states = np.array([r[-1] for r in rows], dtype=np.int64)
+        columns = {f: np.array([r[1 + i] for r in rows], dtype=np.float64)
+                   for i, f in enumerate(ROLLUP_FIELDS)}
+        cut = engine.add_arrays(ts, columns, states, final=final)
+        return rows[cut:]
+
+    total = 0
+    rows = []
+    threshold = chunk_rows
+    with open(path, newline="", encoding="utf-8") as f:
+        for record in csv.DictReader(f):
+            state = record["state"]
+            code = int(state) if state.isdigit() else STATE_CODES.get(state, 255)
+            rows.append([float(record["timestamp"])]
+                        + [float(record[field]) for field in ROLLUP_FIELDS] + [code])
+            total += 1
+            if len(rows) >= threshold:
+                rows = flush_chunk(rows, final=False)
+                # Carried-over rows wait for another full chunk before retrying
+                threshold = len(rows) + chunk_rows
+    if rows:
+        flush_chunk(rows, final=True)
+    engine.flush()
+    return total
+
+
+def main():
+    """
+    python -m telemetry.rollups --rollups DIR (--store DIR | --csv FILE)
+    """
+    from .timeseries_store import TimeSeriesStore
+
+    parser = argparse.ArgumentParser(description="Backfill dashboard rollups from history.")
+    parser.add_argument("--rollups", required=True, help="rollup folder")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--store", help="TimeSeriesStore folder")
+    source.add_argument("--csv", help="CSV log with timestamp,dust,...,state columns")
+    parser.add_argument("--start", type=float, default=0.0)
+    parser.add_argument("--end", type=float, default=float("inf"))
+    parser.add_argument("--chunk-rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    engine = RollupEngine(args.rollups)
+    if not engine.is_empty():
+        parser.error(f"{args.rollups} already holds rollups; backfill into an empty folder")
+    if args.store:
+        store = TimeSeriesStore(args.store)
+        count = backfill_from_store(engine, store, args.start, args.end)
+        store.close()
+    else:
+        count = backfill_from_csv(engine, args.csv, args.chunk_rows)
+    engine.close()
+    print(f"Backfilled {count} samples.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+from .events import INFO
+
+# Segment file header: magic, version, record size, partition start, record count
+_HEADER = struct.Struct("<4sHHqQ")
+_COUNT = struct.Struct("<Q")
+_COUNT_OFFSET = 16
+_TIMESTAMP = struct.Struct("<d")
+HEADER_SIZE = 64
+MAGIC = b"SPTS"
+VERSION = 1
+
+# State names are dictionary-coded into one byte (same order as FleetDecisionManager)
+STATE_NAMES = ("SUN_TRACKING", "CLEANING_WIND", "CLEANING_WATER", "IDLE")
+STATE_CODES = {name: code for code, name in enumerate(STATE_NAMES)}
+UNKNOWN_STATE = 255
+
+# Event kinds
+KIND_LOG = 0
+KIND_STATE_CHANGE = 1
+
+# Fixed-width records; every record starts with a float64 timestamp
+SAMPLE_RECORD = struct.Struct("<dffffffBxxx")
+SAMPLE_FIELDS = ("timestamp", "dust", "wind_speed", "wind_direction",
+                 "base_angle", "tilt_angle", "water_volume", "state")
+EVENT_RECORD = struct.Struct("<dBB6x112s")
+EVENT_MESSAGE_BYTES = 112
+
+
+class Segment:
+    """
+    One memory-mapped, preallocated segment file holding the fixed-width
+    records of one time partition. The file is created sparse, so unused
+    capacity costs no SD card writes; trim() shrinks it once the partition
+    is closed.
+    """
+
+    def __init__(self, path, record_struct, partition_start=0, capacity=86400, writable=True):
+        self.path = path
+        self.record_struct = record_struct
+        self.record_size = record_struct.size
+        self.writable = writable
+
+        if os.path.exists(path):
+            self._file = open(path, "r+b" if writable else "rb")
+            magic, version, record_size, self.partition_start, self.count = _HEADER.unpack(
+                self._file.read(_HEADER.size))
+            if magic != MAGIC or record_size != self.record_size:
+                raise ValueError(f"{path} is not a segment with {self.record_size}-byte records")
+            if version != VERSION:
+                raise ValueError(f"{path} is a version {version} segment; only version {VERSION} is supported")
+        else:
+            if not writable:
+                raise FileNotFoundError(path)
+            self._file = open(path, "w+b")
+            self.partition_start = int(partition_start)
+            self.count = 0
+            self._file.truncate(HEADER_SIZE + capacity * self.record_size)
+
+        self._map()
+        if self.count == 0 and writable:
+            _HEADER.pack_into(self._mm, 0, MAGIC, VERSION, self.record_size, self.partition_start, 0)
+
+    @property
+    def capacity(self):
+        return (len(self._mm) - HEADER_SIZE) // self.record_size
+
+    def append(self, values):
+        """Packs one record straight into the mapped file."""
+        if self.count >= self.capacity:
+            self._grow()
+        self.record_struct.pack_into(self._mm, HEADER_SIZE + self.count * self.record_size, *values)
+        self.count += 1
+        _COUNT.pack_into(self._mm, _COUNT_OFFSET, self.count)
+
+    def timestamp_at(self, index):
+        return _TIMESTAMP.unpack_from(self._mm, HEADER_SIZE + index * self.record_size)[0]
+
+    def bisect(self, timestamp):
+        """Index of the first record with timestamp >= `timestamp`."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamp_at(mid) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def view(self, start, end):
+        """Zero-copy memoryview over records [start, end)."""
+        offset = HEADER_SIZE + start * self.record_size
+        return memoryview(self._mm)[offset:HEADER_SIZE + end * self.record_size]
+
+    def flush(self):
+        if self.writable:
+            self._mm.flush()
+
+    def trim(self):
+        """Compaction: drop the unused preallocated tail of the file."""
+        self.close()
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + self.count * self.record_size)
+
+    def close(self):
+        try:
+            self.flush()
+            self._mm.close()
+        except BufferError:
+            pass  # a caller still holds a view; the map is released with it
+        self._file.close()
+
+    def _map(self):
+        access = mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=access)
+
+    def _grow(self):
+        # Old map stays alive until any outstanding views are released
+        self._mm.flush()
+        self._file.truncate(HEADER_SIZE + max(1, self.capacity) * 2 * self.record_size)
+        self._map()
+
+
+class SegmentedStream:
+    """
+    Append-only stream of fixed-width records split into time-partitioned
+    segment files: <directory>/<partition start>.seg.
+
+    Writes come from the control loop; records() can be called from another
+    thread (the dashboard server), since appends, rotation, retention and
+    reads all take the stream's lock. scan() and iter_records() don't, so
+    they are for the writer's own thread or a stream nobody writes to.
+    """
+
+    def __init__(self, directory, record_struct, partition_seconds=86400,
+                 records_per_partition=86400, retention_seconds=None, max_open_readers=8):
+        """
+        :param directory: folder holding this stream's segments
+        :param record_struct: struct.Struct whose first field is a float64 timestamp
+        :param partition_seconds: time span of one segment (default: one day)
+        :param records_per_partition: initial preallocated records per segment
+        :param retention_seconds: (Optional) segments older than this are deleted
+        :param max_open_readers: closed segments kept mapped for scans
+        """
+        self.directory = directory
+        self.record_struct = record_struct
+        self.partition_seconds = int(partition_seconds)
+        self.records_per_partition = records_per_partition
+        self.retention_seconds = retention_seconds
+        self.max_open_readers = max_open_readers
+        os.makedirs(directory, exist_ok=True)
+
+        self._active = None
+        self._readers = OrderedDict()  # partition start -> read-only Segment
+        self._lock = threading.RLock()
+
+    def append(self, timestamp, *fields):
+        partition = int(timestamp // self.partition_seconds) * self.partition_seconds
+        with self._lock:
+            active = self._active
+            if active is None or active.partition_start != partition:
+                active = self._rotate(partition)
+            active.append((timestamp,) + fields)
+
+    def partitions(self):
+        """Sorted partition start times present on disk."""
+        starts = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".seg"):
+                starts.append(int(name[:-4]))
+        return sorted(starts)
+
+    def scan(self, start_time, end_time):
+        """
+        Yields zero-copy memoryviews of the records with
+        start_time <= timestamp < end_time, one view per segment.
+        """
+        first = int(start_time // self.partition_seconds) * self.partition_seconds
+        for partition in self.partitions():
+            if partition < first or partition >= end_time:
+                continue
+            segment = self._segment_for_read(partition)
+            lo = segment.bisect(start_time)
+            hi = segment.bisect(end_time)
+            if hi > lo:
+                yield segment.view(lo, hi)
+
+    def iter_records(self, start_time, end_time):
+        """Yields decoded record tuples in the time range."""
+        for view in self.scan(start_time, end_time):
+            yield from self.record_struct.iter_unpack(view)
+
+    def records(self, start_time, end_time):
+        """
+        Returns the decoded records in the time range as a list, read under
+        the lock so a writer on another thread can't rotate or delete a
+        segment halfway through.
+        """
+        with self._lock:
+            return list(self.iter_records(start_time, end_time))
+
+    def enforce_retention(self, now):
+        """Deletes segments whose whole partition is older than the retention window."""
+        if self.retention_seconds is None:
+            return []
+        removed = []
+        with self._lock:
+            for partition in self.partitions():
+                if partition + self.partition_seconds > now - self.retention_seconds:
+                    break
+                if self._active is not None and self._active.partition_start == partition:
+                    continue
+                reader = self._readers.pop(partition, None)
+                if reader is not None:
+                    reader.close()
+                os.remove(self._path(partition))
+                removed.append(partition)
+        return removed
+
+    def flush(self):
+        with self._lock:
+            if self._active is not None:
+                self._active.flush()
+
+    def close(self):
+        with self._lock:
+            if self._active is not None:
+                self._active.close()
+                self._active = None
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+
+    def _path(self, partition):
+        return os.path.join(self.directory, f"{partition}.seg")
+
+    def _rotate(self, partition):
+        if self._active is not None:
+            self._active.trim()
+        reader = self._readers.pop(partition, None)
+        if reader is not None:
+            reader.close()
+        self._active = Segment(self._path(partition), self.record_struct,
+                               partition, self.records_per_partition)
+        if self.retention_seconds is not None:
+            self.enforce_retention(partition)
+        return self._active
+
+    def _segment_for_read(self, partition):
+        if self._active is not None and self._active.partition_start == partition:
+            return self._active
+        reader = self._readers.get(partition)
+        if reader is None:
+            reader = Segment(self._path(partition), self.record_struct, writable=False)
+            self._readers[partition] = reader
+            while len(self._readers) > self.max_open_readers:
+                self._readers.popitem(last=False)[1].close()
+        else:
+            self._readers.move_to_end(partition)
+        return reader
+
+
+class TimeSeriesStore:
+    """
+    Local history for the dashboard: one sample stream (sensor readings,
+    actuator angles, water volume, state) and one event stream (state
+    changes and log messages), both stored as fixed-width binary records in
+    memory-mapped, day-partitioned segment files.
+
+    A 1 Hz sample costs 36 bytes, so a year of data is ~1.1 GB on disk, and
+    nothing is loaded into RAM beyond the pages a query touches.
+    """
+
+    def __init__(self, root, partition_seconds=86400, sample_rate_hz=1.0, retention_days=None,
+                 rollups=None):
+        """
+        :param root: folder for the store (created if missing)
+        :param partition_seconds: time span of one segment file
+        :param sample_rate_hz: expected sample rate, used to preallocate segments
+        :param retention_days: (Optional) delete segments older than this
+        :param rollups: (Optional) RollupEngine updated with every sample
+        """
+        self.rollups = rollups
+        retention = retention_days * 86400 if retention_days is not None else None
+        self.samples = SegmentedStream(
+            os.path.join(root, "samples"), SAMPLE_RECORD, partition_seconds,
+            records_per_partition=int(partition_seconds * sample_rate_hz) + 1,
+            retention_seconds=retention)
+        self.events = SegmentedStream(
+            os.path.join(root, "events"), EVENT_RECORD, partition_seconds,
+            records_per_partition=1024, retention_seconds=retention)
+
+    # ------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------
+
+    def record_sample(self, timestamp, dust, wind_speed, base_angle, tilt_angle,
+                      water_volume, state, wind_direction=float("nan")):
+        code = STATE_CODES.get(state, UNKNOWN_STATE)
+        self.samples.append(timestamp, dust, wind_speed, wind_direction, base_angle,
+                            tilt_angle, water_volume, code)
+        if self.rollups is not None:
+            self.rollups.add_sample(timestamp, dust, wind_speed, base_angle, tilt_angle,
+                                    water_volume, code)
+
+    def record_event(self, timestamp, message, level=INFO, kind=KIND_LOG):
+        encoded = message.encode("utf-8")[:EVENT_MESSAGE_BYTES]
+        self.events.append(timestamp, level, kind, encoded)
+
+    def record_state_change(self, timestamp, old_state, new_state):
+        self.record_event(timestamp, f"{old_state}->{new_state}", kind=KIND_STATE_CHANGE)
+
+    def event_sink(self, event):
+        """EventBus sink: stores every event the bus accepts."""
+        self.record_event(event["timestamp"], event["message"], event["level"])
+
+    # ------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------
+
+    def iter_samples(self, start_time, end_time):
+        """Yields sample tuples (see SAMPLE_FIELDS); state is decoded to its name."""
+        for record in self.samples.iter_records(start_time, end_time):
+            code = record[-1]
+            yield record[:-1] + (STATE_NAMES[code] if code < len(STATE_NAMES) else None,)
+
+    def sample_arrays(self, start_time, end_time):
+        """
+        Yields one NumPy structured array per segment, each a zero-copy view
+        over the mapped file. Requires NumPy (imported on first use).
+        """
+        import numpy as np
+        dtype = np.dtype({
+            "names": list(SAMPLE_FIELDS),
+            "formats": ["<f8", "<f4", "<f4", "<f4", "<f4", "<f4", "<f4", "u1"],
+            "offsets": [0, 8, 12, 16, 20, 24, 28, 32],
+            "itemsize": SAMPLE_RECORD.size,
+        })
+        for view in self.samples.scan(start_time, end_time):
+            yield np.frombuffer(view, dtype=dtype)
+
+    def iter_events(self, start_time, end_time, kind=None):
+        """
+        Yields event dicts in the time range (optionally of one kind). The
+        range is read up front, so this is safe while another thread records.
+        """
+        for timestamp, level, event_kind, raw in self.events.records(start_time, end_time):
+            if kind is not None and event_kind != kind:
+                continue
+            yield {
+                "timestamp": timestamp,
+                "level": level,
+                "kind": event_kind,
+                "message": raw.rstrip(b"\0").decode("utf-8", errors="replace"),
+            }
+
+    # ------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------
+
+    def enforce_retention(self, now):
+        return self.samples.enforce_retention(now) + self.events.enforce_retention(now)
+
+    def flush(self):
+        self.samples.flush()
+        self.events.flush()
+
+    def close(self):
+        self.samples.close()
+        self.events.close()
@@ -0,0 +1,320 @@
+import math
+import struct
+
+from .events import INFO
+from .timeseries_store import STATE_CODES, STATE_NAMES, UNKNOWN_STATE
+
+# Compact uplink encoding for state, sensor and event records.
+#
+# A frame is one batch: a header, then records back to back. Every record
+# starts with a one-byte tag and a uint16 millisecond delta from the previous
+# record's timestamp (the first one is relative to the header's base time).
+# Angles are delta-coded in centidegrees against the previous sample in the
+# frame, state names are one byte (STATE_CODES), and sources and event
+# messages are strings defined once per frame and then referred to by code.
+# Frames are self-contained, so a lost batch never corrupts the next one.
+
+MAGIC = b"SW"
+VERSION = 1
+
+# magic, version, flags, data record count, payload bytes, base timestamp
+_FRAME = struct.Struct("<2sBBIId")
+FRAME_HEADER_SIZE = _FRAME.size
+
+TAG_TIME = 0     # re-anchors the time deltas (gap longer than 65 s)
+TAG_STATE = 1
+TAG_SAMPLE = 2
+TAG_EVENT = 3
+TAG_STRING = 4   # defines the next string code
+
+# tag, timestamp (absolute)
+_TIME = struct.Struct("<Bd")
+# tag, dt ms, state code, wind clean start relative to the record (0.1 s)
+_STATE = struct.Struct("<BHBi")
+# tag, dt ms, state code, dust (0.01 %), wind speed (0.01 m/s), wind
+# direction (0.01 deg), base / tilt angle deltas (0.01 deg), water volume
+_SAMPLE = struct.Struct("<BHBHHHhhf")
+# tag, dt ms, level, source code, message code
+_EVENT = struct.Struct("<BHBHH")
+# tag, UTF-8 length (the bytes follow)
+_STRING = struct.Struct("<BH")
+
+_NO_START = -0x80000000
+_NO_READING = 0xFFFF
+_MAX_READING = 0xFFFE
+
+# Strings every frame knows without defining them
+STATIC_STRINGS = (
+    "",
+    "DecisionManager",
+    "ActuatorController",
+    "CleaningController",
+    "SensorController",
+    "SensorFilter",
+    "FleetDecisionManager",
+    "FleetRunner",
+)
+_STATIC_CODES = {s: code for code, s in enumerate(STATIC_STRINGS)}
+
+SAMPLE_FIELDS = ("timestamp", "dust", "wind_speed", "wind_direction",
+                 "base_angle", "tilt_angle", "water_volume", "state")
+
+
+class WireEncoder:
+    """
+    Packs records into one frame at a time. Records are written with
+    struct.pack_into straight into a reused buffer, so adding a record
+    allocates nothing; finish() returns the frame and starts the next one.
+
+    Readings are quantized to 0.01 units (dust %, m/s, degrees) and
+    timestamps to 1 ms, which is well inside the sensors' accuracy.
+    """
+
+    def __init__(self, capacity=4096):
+        """
+        :param capacity: initial buffer size in bytes (grows if needed)
+        """
+        self._buffer = bytearray(capacity)
+        self.reset()
+
+    # ------------------------------------------------------
+    # Public Methods
+    # ------------------------------------------------------
+
+    def add_state(self, timestamp, state, wind_clean_start_time=None):
+        """
+        The systemState payload of DecisionManager._update_firebase_state().
+        """
+        dt = self._time_delta(timestamp)
+        if wind_clean_start_time is None:
+            start = _NO_START
+        else:
+            start = max(min(round((wind_clean_start_time - timestamp) * 10), 0x7FFFFFFF), _NO_START + 1)
+        self._ensure(_STATE.size)
+        _STATE.pack_into(self._buffer, self._size, TAG_STATE, dt,
+                         STATE_CODES.get(state, UNKNOWN_STATE), start)
+        self._size += _STATE.size
+        self.records += 1
+
+    def add_sample(self, timestamp, dust, wind_speed, wind_direction, base_angle, tilt_angle,
+                   water_volume, state):
+        """
+        One tick's readings, angles, water level and state (the same fields
+        as a TimeSeriesStore sample).
+        """
+        dt = self._time_delta(timestamp)
+        base = round(base_angle * 100) % 36000
+        tilt = round(tilt_angle * 100)
+        # Shortest way round for the base, so the delta always fits
+        base_delta = (base - self._base_angle + 18000) % 36000 - 18000
+        tilt_delta = max(min(tilt - self._tilt_angle, 0x7FFF), -0x8000)
+        self._base_angle = base
+        self._tilt_angle += tilt_delta
+        self._ensure(_SAMPLE.size)
+        _SAMPLE.pack_into(self._buffer, self._size, TAG_SAMPLE, dt,
+                          STATE_CODES.get(state, UNKNOWN_STATE),
+                          _reading(dust), _reading(wind_speed),
+                          _reading(wind_direction % 360),
+                          base_delta, tilt_delta, water_volume)
+        self._size += _SAMPLE.size
+        self.records += 1
+
+    def add_event(self, timestamp, message, level=INFO, source=None):
+        """
+        An event-log entry (DecisionManager._log_event() or an EventBus event).
+        """
+        dt = self._time_delta(timestamp)
+        source_code = self._string_code(source or "")
+        message_code = self._string_code(message)
+        self._ensure(_EVENT.size)
+        _EVENT.pack_into(self._buffer, self._size, TAG_EVENT, dt, level, source_code, message_code)
+        self._size += _EVENT.size
+        self.records += 1
+
+    def finish(self):
+        """
+        Returns the frame (bytes) holding every record added since the last
+        finish() and resets the encoder for the next batch.
+        """
+        base = self._frame_base if self._frame_base is not None else 0.0
+        _FRAME.pack_into(self._buffer, 0, MAGIC, VERSION, 0, self.records,
+                         self._size - _FRAME.size, base)
+        frame = bytes(memoryview(self._buffer)[:self._size])
+        self.reset()
+        return frame
+
+    def reset(self):
+        """Drops any unfinished records."""
+        self._size = _FRAME.size
+        self.records = 0
+        self._frame_base = None
+        self._base = None
+        self._last_ms = 0
+        self._base_angle = 0
+        self._tilt_angle = 0
+        self._strings = dict(_STATIC_CODES)
+
+    @property
+    def size(self):
+        """Bytes the frame would have if finished now."""
+        return self._size
+
+    # ------------------------------------------------------
+    # Internal Helpers
+    # ------------------------------------------------------
+
+    def _ensure(self, nbytes):
+        needed = self._size + nbytes
+        if needed > len(self._buffer):
+            self._buffer.extend(bytes(max(needed, 2 * len(self._buffer)) - len(self._buffer)))
+
+    def _time_delta(self, timestamp):
+        if self._base is None:
+            self._frame_base = self._base = timestamp
+        ms = round((timestamp - self._base) * 1000)
+        dt = ms - self._last_ms
+        if not 0 <= dt <= 0xFFFF:
+            # Long gap (or clock step back): re-anchor on an absolute time
+            self._ensure(_TIME.size)
+            _TIME.pack_into(self._buffer, self._size, TAG_TIME, timestamp)
+            self._size += _TIME.size
+            self._base = timestamp
+            ms = dt = 0
+        self._last_ms = ms
+        return dt
+
+    def _string_code(self, text):
+        code = self._strings.get(text)
+        if code is not None:
+            return code
+        code = len(self._strings)
+        if code > 0xFFFF:
+            raise ValueError("too many distinct strings in one frame")
+        data = text.encode("utf-8")[:0xFFFF]
+        self._ensure(_STRING.size + len(data))
+        _STRING.pack_into(self._buffer, self._size, TAG_STRING, len(data))
+        start = self._size + _STRING.size
+        self._buffer[start:start + len(data)] = data
+        self._size = start + len(data)
+        self._strings[text] = code
+        return code
+
+
+def decode_frame(buffer, offset=0):
+    """
+    Decodes one frame without copying the buffer (it is read through a
+    memoryview with struct.unpack_from; only strings are materialized).
+
+    :param buffer: bytes, bytearray or memoryview holding the frame
+    :param offset: where the frame starts
+    :return: (list of record dicts, offset just past the frame)
+    """
+    view = memoryview(buffer)
+    magic, version, _, count, length, base = _FRAME.unpack_from(view, offset)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a telemetry wire frame")
+    position = offset + _FRAME.size
+    end = position + length
+    if end > len(view):
+        raise ValueError("truncated telemetry wire frame")
+
+    records = []
+    strings = list(STATIC_STRINGS)
+    ms = 0
+    base_angle = 0
+    tilt_angle = 0
+    while position < end:
+        tag = view[position]
+        if tag == TAG_SAMPLE:
+            (_, dt, state, dust, wind_speed, wind_direction, base_delta, tilt_delta,
+             water_volume) = _SAMPLE.unpack_from(view, position)
+            position += _SAMPLE.size
+            ms += dt
+            base_angle = (base_angle + base_delta) % 36000
+            tilt_angle += tilt_delta
+            records.append({
+                "type": "sample",
+                "timestamp": base + ms / 1000.0,
+                "dust": _value(dust),
+                "wind_speed": _value(wind_speed),
+                "wind_direction": _value(wind_direction),
+                "base_angle": base_angle / 100.0,
+                "tilt_angle": tilt_angle / 100.0,
+                "water_volume": water_volume,
+                "state": _state_name(state),
+            })
+        elif tag == TAG_STATE:
+            _, dt, state, start = _STATE.unpack_from(view, position)
+            position += _STATE.size
+            ms += dt
+            timestamp = base + ms / 1000.0
+            records.append({
+                "type": "state",
+                "timestamp": timestamp,
+                "currentState": _state_name(state),
+                "windCleanStartTime": None if start == _NO_START else timestamp + start / 10.0,
+            })
+        elif tag == TAG_EVENT:
+            _, dt, level, source, message = _EVENT.unpack_from(view, position)
+            position += _EVENT.size
+            ms += dt
+            records.append({
+                "type": "event",
+                "timestamp": base + ms / 1000.0,
+                "level": level,
+                "source": strings[source] or None,
+                "description": strings[message],
+            })
+        elif tag == TAG_STRING:
+            _, size = _STRING.unpack_from(view, position)
+            position += _STRING.size
+            strings.append(str(view[position:position + size], "utf-8"))
+            position += size
+        elif tag == TAG_TIME:
+            base = _TIME.unpack_from(view, position)[1]
+            position += _TIME.size
+            ms = 0
+        else:
+            raise ValueError(f"unknown record tag {tag}")
+
+    if len(records) != count:
+        raise ValueError("telemetry wire frame record count mismatch")
+    return records, end
+
+
+def iter_frames(buffer):
+    """
+    Splits a stream of concatenated frames into memoryview slices of the
+    original buffer (no copies), e.g. to forward them one by one.
+    """
+    view = memoryview(buffer)
+    offset = 0
+    while offset < len(view):
+        length = _FRAME.unpack_from(view, offset)[4]
+        end = offset + _FRAME.size + length
+        yield view[offset:end]
+        offset = end
+
+
+def decode_stream(buffer):
+    """Decodes every frame in a stream of concatenated frames."""
+    records = []
+    offset = 0
+    while offset < len(buffer):
+        frame_records, offset = decode_frame(buffer, offset)
+        records.extend(frame_records)
+    return records
+
+
+def _reading(value):
+    if value != value:  # NaN
+        return _NO_READING
+    return max(min(round(value * 100), _MAX_READING), 0)
+
+
+def _value(raw):
+    return math.nan if raw == _NO_READING else raw / 100.0
+
+
+def _state_name(code):
+    return STATE_NAMES[code] if code < len(STATE_NAMES) else None
@@ -0,0 +1,78 @@
+import threading
+
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from Controllers.motion_planner import MotionPlanner
+from Controllers.sensor_controller import SensorController
+from hal.simulator import SimulatedActuatorDriver
+from hal.stub import StubActuatorDriver
+from managers.decision_manager import DecisionManager
+from telemetry.events import WARNING, EventBus
+
+import main
+
+
+def _controller(driver=None, time_scale=0.01):
+    # 170° of base travel at 6°/s is ~28 modelled seconds: ~0.3 s wall-clock
+    if driver is None:
+        driver = SimulatedActuatorDriver(slew={"base_rate": 6.0, "tilt_rate": 3.0},
+                                         time_scale=time_scale)
+    return ActuatorController(events=EventBus(level=WARNING), driver=driver)
+
+
+class ClosingDriver(StubActuatorDriver):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_a_finished_reposition_counts_once():
+    ctrl = _controller(time_scale=0.001)
+    duration = ctrl.move_to(90.0, 30.0)
+    assert duration == 15.0          # the base (15 s) and the tilt (10 s) together
+    stats = ctrl.motion_stats()
+    assert (stats["repositions"], stats["move_seconds"]) == (1, 15.0)
+    assert stats["sequential_move_seconds"] == 25.0
+    assert stats["stopped_repositions"] == 0
+    ctrl.close()
+
+
+def test_a_move_cancelled_while_it_is_awaited_is_a_stopped_reposition():
+    ctrl = _controller()
+    running = ctrl.start_move("base", 170.0)
+    queued = ctrl.start_move("base", 90.0)   # waits behind the running move
+    tilt = ctrl.start_move("tilt", 45.0)
+    stopper = threading.Timer(0.05, ctrl.stop_actuators)
+    stopper.start()
+    # The queued move isn't cancelled yet when wait_for_moves() gets to it;
+    # stop_actuators() cancels it while it is being awaited
+    duration = ctrl.wait_for_moves([queued, running, tilt])
+    stopper.join()
+
+    assert queued.cancelled()
+    assert 0.0 < duration < 30.0
+    assert 0.0 < ctrl.current_base_angle < 170.0
+    stats = ctrl.motion_stats()
+    assert (stats["repositions"], stats["move_seconds"]) == (0, 0.0)
+    assert stats["stopped_repositions"] == 1
+    assert stats["stopped_move_seconds"] == duration
+    assert stats["cancelled_moves"] == 2     # the base and the tilt were cut short
+    ctrl.close()
+
+
+def test_stub_moves_complete_inline():
+    ctrl = ActuatorController(mode="real", events=EventBus(level=WARNING))
+    assert not ctrl.driver.realtime
+    assert ctrl.start_move("base", 45.0).result() == (45.0, 0.0, True)
+    assert ctrl._executors == {}
+
+
+def test_shutdown_closes_the_actuators_behind_a_planner():
+    quiet = EventBus(level=WARNING)
+    driver = ClosingDriver(events=quiet)
+    ctrl = _controller(driver)
+    mgr = DecisionManager(SensorController(mode="simulated", seed=0), MotionPlanner(ctrl),
+                          CleaningController(mode="simulated", events=quiet), events=quiet)
+    main.shutdown(mgr)
+    assert driver.closed
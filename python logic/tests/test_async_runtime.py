@@ -0,0 +1,73 @@
+import asyncio
+import threading
+
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from Controllers.sensor_controller import SensorController
+from hal.drivers import CleaningDriver
+from managers.decision_manager import DecisionManager
+from telemetry.events import WARNING, EventBus
+
+
+class _SlowPump(CleaningDriver):
+    """A pump run that lasts until it is cancelled."""
+
+    def set_pump(self, on):
+        pass
+
+    def set_vibration(self, on):
+        pass
+
+
+class _Remote:
+    """Polled override source that records the thread of each call."""
+
+    def __init__(self):
+        self.override_command = None
+        self.threads = []
+
+    def get_override_command(self):
+        self.threads.append(threading.current_thread())
+        return self.override_command
+
+    def clear_override_command(self):
+        self.threads.append(threading.current_thread())
+        self.override_command = None
+
+    def set_system_state(self, state):
+        pass
+
+    def log_event(self, event):
+        pass
+
+
+def test_polled_override_is_applied_on_the_loop():
+    quiet = EventBus(level=WARNING)
+    cleaning = CleaningController(driver=_SlowPump(), events=quiet)
+    cleaning.pump_run_time = 3600
+    remote = _Remote()
+    mgr = DecisionManager(SensorController(mode="simulated", seed=0), ActuatorController(events=quiet),
+                          cleaning, firebase_mgr=remote, events=quiet)
+    switched_on = []
+    switch = mgr._switch_state
+    mgr._switch_state = lambda state: (switched_on.append(threading.current_thread()), switch(state))
+
+    async def scenario():
+        mgr.system_state = mgr.STATE_CLEANING_WATER
+        await mgr.run_logic_async()
+        task = mgr._water_clean_task
+        assert task is not None and not task.done()
+
+        remote.override_command = "stop_all"
+        await mgr.run_logic_async()
+        await asyncio.sleep(0)
+        return task
+
+    task = asyncio.run(scenario())
+    assert mgr.system_state == mgr.STATE_IDLE
+    assert task.cancelled()
+    assert mgr._water_clean_task is None
+    assert remote.override_command is None
+    # The remote calls ran in worker threads, the state change on the loop
+    assert all(t is not threading.main_thread() for t in remote.threads)
+    assert switched_on == [threading.main_thread()]
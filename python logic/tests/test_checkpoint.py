@@ -0,0 +1,109 @@
+import os
+
+import pytest
+
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from Controllers.sensor_controller import SensorController
+from managers.checkpoint import SLOT_SIZE, Checkpointer
+from managers.decision_manager import DecisionManager
+from managers.simulation import VirtualClock
+from telemetry.events import WARNING, EventBus
+
+
+def _manager(clock, **settings):
+    quiet = EventBus(level=WARNING)
+    mgr = DecisionManager(SensorController(mode="simulated", seed=0),
+                          ActuatorController(events=quiet),
+                          CleaningController(mode="simulated", initial_water_volume=2.0, events=quiet),
+                          clock=clock, events=quiet)
+    for name, value in settings.items():
+        setattr(mgr, name, value)
+    return mgr
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "state.ckpt")
+
+
+def test_save_is_skipped_when_nothing_changed(path):
+    clock = VirtualClock()
+    checkpointer = Checkpointer(path, clock=clock)
+    mgr = _manager(clock)
+    assert checkpointer.save(mgr)
+    assert not checkpointer.save(mgr)
+    mgr.actuator_ctrl.rotate_base_to(90)
+    assert checkpointer.save(mgr)
+    assert (checkpointer.saves, checkpointer.skipped) == (2, 1)
+    checkpointer.close()
+
+
+def test_restore_resumes_runtime_state(path):
+    clock = VirtualClock()
+    mgr = _manager(clock)
+    mgr.system_state = mgr.STATE_CLEANING_WIND
+    mgr.wind_clean_start_time = clock() - 120.0
+    mgr.actuator_ctrl.move_to(base_angle=210.0, tilt_angle=15.0)
+    mgr.cleaning_ctrl.water_volume = 1.25
+    checkpointer = Checkpointer(path, clock=clock)
+    checkpointer.save(mgr)
+    checkpointer.close()
+
+    fresh = _manager(clock)
+    checkpoint = Checkpointer(path, clock=clock).restore(fresh)
+    assert checkpoint["sequence"] == 1
+    assert fresh.system_state == fresh.STATE_CLEANING_WIND
+    assert fresh.wind_clean_start_time == pytest.approx(clock() - 120.0)
+    assert fresh.actuator_ctrl.current_base_angle == pytest.approx(210.0)
+    assert fresh.actuator_ctrl.current_tilt_angle == pytest.approx(15.0)
+    assert fresh.cleaning_ctrl.water_volume == pytest.approx(1.25)
+
+
+def test_restore_keeps_the_current_configuration(path):
+    clock = VirtualClock()
+    checkpointer = Checkpointer(path, clock=clock)
+    checkpointer.save(_manager(clock, dust_threshold=30.0, wind_clean_duration=600))
+    checkpointer.close()
+
+    # Settings changed while the system was down
+    fresh = _manager(clock, dust_threshold=45.0, wind_clean_duration=300)
+    Checkpointer(path, clock=clock).restore(fresh)
+    assert fresh.dust_threshold == 45.0
+    assert fresh.wind_clean_duration == 300
+
+
+def test_a_torn_slot_falls_back_to_the_previous_checkpoint(path):
+    clock = VirtualClock()
+    checkpointer = Checkpointer(path, clock=clock)
+    mgr = _manager(clock)
+    mgr.actuator_ctrl.rotate_base_to(10)
+    checkpointer.save(mgr)  # sequence 1
+    mgr.actuator_ctrl.rotate_base_to(20)
+    checkpointer.save(mgr)  # sequence 2, the other slot
+    newest_slot = checkpointer.sequence % 2
+    checkpointer.close()
+
+    # Power cut halfway through rewriting the newest slot
+    with open(path, "r+b") as f:
+        f.seek(newest_slot * SLOT_SIZE + SLOT_SIZE // 2)
+        f.write(b"\xff" * 8)
+
+    checkpointer = Checkpointer(path, clock=clock)
+    checkpoint = checkpointer.load()
+    assert checkpoint["sequence"] == 1
+    assert checkpoint["base_angle"] == pytest.approx(10.0)
+    # The next save goes on after the intact sequence and into the torn slot
+    mgr.actuator_ctrl.rotate_base_to(30)
+    checkpointer.save(mgr)
+    checkpointer.close()
+    assert Checkpointer(path, clock=clock).load()["base_angle"] == pytest.approx(30.0)
+
+
+def test_no_checkpoint_when_both_slots_are_damaged(path):
+    with open(path, "wb") as f:
+        f.write(os.urandom(2 * SLOT_SIZE))
+    checkpointer = Checkpointer(path)
+    assert checkpointer.load() is None
+    assert checkpointer.restore(_manager(VirtualClock())) is None
+    checkpointer.close()
@@ -0,0 +1,77 @@
+import json
+import socket
+import threading
+
+from telemetry.dashboard_server import DashboardServer
+from telemetry.rollups import RollupEngine
+from telemetry.timeseries_store import TimeSeriesStore
+
+T0 = 20000 * 86400.0
+
+
+def _get(server, path):
+    with socket.create_connection((server.host, server.port), timeout=5) as sock:
+        sock.sendall(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode("latin-1"))
+        response = b""
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body) if body else None
+
+
+def test_bad_query_parameters_get_a_400(tmp_path):
+    rollups = RollupEngine(str(tmp_path / "rollups"))
+    store = TimeSeriesStore(str(tmp_path / "store"), rollups=rollups)
+    server = DashboardServer(port=0, rollups=rollups, store=store, clock=lambda: T0).start()
+    try:
+        for path in ("/api/history?points=abc", "/api/history?start=x",
+                     "/api/events?limit=ten", "/api/history?resolution=1.5"):
+            status, payload = _get(server, path)
+            assert status == 400, path
+            assert "error" in payload
+        assert _get(server, "/api/history?points=10")[0] == 200
+    finally:
+        server.stop()
+        store.close()
+
+
+def test_queries_run_while_the_control_loop_writes(tmp_path):
+    # Hour-long partitions with a two-hour retention: the writer rotates and
+    # deletes segments the whole time the dashboard is reading them
+    rollups = RollupEngine(str(tmp_path / "rollups"), resolutions=(60, 3600))
+    store = TimeSeriesStore(str(tmp_path / "store"), partition_seconds=3600,
+                            retention_days=2 / 24, rollups=rollups)
+    server = DashboardServer(rollups=rollups, store=store)
+    done = threading.Event()
+    errors = []
+
+    def write():
+        try:
+            for i in range(20000):
+                t = T0 + i * 2.0
+                store.record_sample(t, 1.0, 2.0, 90.0, 30.0, 1.5, "SUN_TRACKING")
+                if i % 50 == 0:
+                    store.record_event(t, f"tick {i}")
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+        finally:
+            done.set()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    queries = 0
+    while not done.is_set():
+        now = T0 + 40000.0
+        for handler, query in ((server._history, {"start": str(T0), "end": str(now), "points": "50"}),
+                               (server._events, {"start": str(T0), "end": str(now)})):
+            status, _ = handler(query)
+            assert status == 200
+            queries += 1
+    writer.join()
+    store.close()
+    rollups.close()
+    assert not errors
+    assert queries > 0
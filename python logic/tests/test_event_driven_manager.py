@@ -0,0 +1,68 @@
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from Controllers.sensor_controller import SensorController
+from managers.decision_manager import DecisionManager
+from managers.event_driven_manager import (INPUT_DUST, INPUT_WIND_SPEED,
+                                           EventDrivenDecisionManager)
+from managers.override_listener import OverrideListener
+from managers.state_writer import LocalBackend
+from telemetry.events import WARNING, EventBus
+
+
+def _manager(listener=None):
+    quiet = EventBus(level=WARNING)
+    return DecisionManager(SensorController(mode="simulated", seed=0),
+                           ActuatorController(events=quiet),
+                           CleaningController(mode="simulated", initial_water_volume=1e9, events=quiet),
+                           events=quiet, override_listener=listener)
+
+
+def test_small_changes_are_suppressed():
+    runner = EventDrivenDecisionManager(_manager())
+    assert runner.publish(INPUT_DUST, 10.0)
+    assert not runner.publish(INPUT_DUST, 10.3)
+    assert runner.publish(INPUT_DUST, 10.6)
+    assert (runner.published, runner.suppressed) == (2, 1)
+
+
+def test_a_change_across_a_guard_threshold_is_published():
+    mgr = _manager()
+    mgr.wind_speed_threshold = 15.0
+    runner = EventDrivenDecisionManager(mgr)
+    runner.publish(INPUT_WIND_SPEED, 14.8)
+    assert runner.publish(INPUT_WIND_SPEED, 15.2)   # within epsilon, but crosses
+    assert not runner.publish(INPUT_WIND_SPEED, 15.4)
+    assert runner.publish(INPUT_WIND_SPEED, 15.0)   # back to <= threshold
+
+    # Only the current state's guards count: CLEANING_WIND ignores wind speed
+    mgr.system_state = mgr.STATE_CLEANING_WIND
+    assert not runner.publish(INPUT_WIND_SPEED, 15.3)
+
+
+def test_crossing_switches_state_on_that_step():
+    mgr = _manager()
+    mgr.dust_threshold = 30.0
+    mgr.wind_speed_threshold = 15.0
+    readings = iter([(29.8, 20.0), (30.2, 20.0)])
+    mgr._gather_sensor_data = lambda: next(readings)
+    runner = EventDrivenDecisionManager(mgr)
+    runner.step()
+    assert mgr.system_state == mgr.STATE_SUN_TRACKING
+    runner.step()
+    assert mgr.system_state == mgr.STATE_CLEANING_WIND
+
+
+def test_an_emergency_during_the_step_is_applied_before_it_ends():
+    backend = LocalBackend()
+    listener = OverrideListener(backend, events=EventBus(level=WARNING)).start()
+    mgr = _manager(listener)
+    runner = EventDrivenDecisionManager(mgr)
+    runner.step()
+    assert mgr.system_state != mgr.STATE_IDLE
+
+    update = mgr.actuator_ctrl.update
+    mgr.actuator_ctrl.update = lambda: (backend.publish_override("stop_all"), update())
+    runner.step()
+    assert mgr.system_state == mgr.STATE_IDLE
+    assert not mgr._preempted
+    listener.close()
@@ -0,0 +1,37 @@
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from Controllers.sensor_controller import SensorController
+from managers.decision_manager import DecisionManager
+from managers.state_writer import StateWriter, WireBackend
+from telemetry.events import DEBUG, INFO, WARNING, CloudSink, EventBus
+from telemetry.wire_format import decode_stream
+
+
+def test_level_gate_skips_formatting():
+    bus = EventBus(level=WARNING)
+
+    class Loud:
+        def __str__(self):
+            raise AssertionError("formatted below the gate")
+
+    assert bus.emit(INFO, "Test", "%s", Loud()) is None
+    assert bus.emit(WARNING, "Test", "value %d", 3)["message"] == "value 3"
+    assert [e["message"] for e in bus.recent(min_level=DEBUG)] == ["value 3"]
+
+
+def test_decision_manager_events_reach_the_cloud_once_with_their_level():
+    frames = []
+    writer = StateWriter(WireBackend(frames.append), max_batch=1)
+    bus = EventBus(level=INFO)
+    bus.add_sink(CloudSink(writer, min_level=INFO))
+    mgr = DecisionManager(SensorController(mode="simulated", seed=0), ActuatorController(events=bus),
+                          CleaningController(initial_water_volume=0.0, events=bus),
+                          firebase_mgr=writer, events=bus)
+    mgr._log_event("Water reservoir empty or cleaning failed.", WARNING)
+    bus.emit(WARNING, "SensorFilter", "Dust spike rejected")
+
+    events = [r for r in decode_stream(b"".join(frames)) if r["type"] == "event"]
+    assert [(e["description"], e["level"], e["source"]) for e in events] == [
+        ("Water reservoir empty or cleaning failed.", WARNING, "DecisionManager"),
+        ("Dust spike rejected", WARNING, "SensorFilter"),
+    ]
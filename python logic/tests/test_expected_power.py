@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from models.expected_power import ClearSkyPowerModel, clear_sky_irradiance
+from models.solar_position import SECONDS_PER_DAY, sun_position_batch
+
+LAT, LON = 24.7136, 46.6753
+NOON = 19723 * SECONDS_PER_DAY + 9 * 3600  # ~local solar noon in Riyadh
+
+
+def _sun(timestamp):
+    azimuth, elevation = sun_position_batch(np.array([timestamp + 30.0]), LAT, LON)
+    return float(azimuth[0]), float(elevation[0])
+
+
+def test_irradiance_is_zero_below_the_horizon():
+    assert clear_sky_irradiance(-5.0) == (0.0, 0.0, 0.0)
+    dni, dhi, ghi = clear_sky_irradiance(np.array([10.0, 60.0]))
+    assert dni[1] > dni[0] > 0
+    assert np.all(ghi > dhi)
+
+
+def test_facing_the_sun_beats_facing_away():
+    model = ClearSkyPowerModel(LAT, LON)
+    azimuth, elevation = _sun(NOON)
+    facing = model.expected_power(NOON, azimuth, elevation)
+    away = model.expected_power(NOON, (azimuth + 180) % 360, 10.0)
+    assert 150.0 < facing < 300.0
+    assert away < facing / 2
+    assert model.expected_power(NOON + 12 * 3600, azimuth, elevation) == 0.0
+
+
+def test_scalar_and_batch_paths_agree():
+    model = ClearSkyPowerModel(LAT, LON)
+    rng = np.random.default_rng(0)
+    timestamps = NOON + rng.uniform(-6 * 3600, 6 * 3600, 200)
+    bases = rng.uniform(0, 360, 200)
+    tilts = rng.uniform(0, 90, 200)
+    batch = model.expected_power_batch(timestamps, bases, tilts, 30.0)
+    scalar = [model.expected_power(t, b, a, 30.0) for t, b, a in zip(timestamps, bases, tilts)]
+    np.testing.assert_allclose(batch, scalar, rtol=1e-6, atol=1e-6)
+
+
+def test_memo_and_day_tables_stay_bounded():
+    model = ClearSkyPowerModel(LAT, LON, max_memo_entries=50, max_cached_days=2)
+    for i in range(500):
+        model.expected_power(NOON + i * 3600, i % 360, 30.0)
+    assert len(model._memo) <= 50
+    assert len(model._tables) <= 2
+
+
+def test_dust_is_nan_where_the_ratio_means_nothing():
+    model = ClearSkyPowerModel(LAT, LON)
+    azimuth, elevation = _sun(NOON)
+    expected = model.expected_power(NOON, azimuth, elevation)
+    dust = model.dust_percentage_batch([NOON, NOON, NOON + 12 * 3600], [expected * 0.8, expected * 1.1, 5.0],
+                                       [azimuth] * 3, [elevation] * 3)
+    assert dust[0] == pytest.approx(20.0, abs=0.5)
+    assert dust[1] == 0.0
+    assert np.isnan(dust[2])
+
+
+@pytest.mark.parametrize("time_bucket", [0, 7, 100000])
+def test_time_bucket_must_divide_a_day(time_bucket):
+    with pytest.raises(ValueError):
+        ClearSkyPowerModel(LAT, LON, time_bucket=time_bucket)
@@ -0,0 +1,75 @@
+import os
+import signal
+import time
+
+import numpy as np
+import pytest
+
+from managers.decision_manager import DecisionManager
+from managers.fleet_runner import (PANEL_FIELDS, FleetRunner, _publish_panel, _restore_panel,
+                                   build_panel)
+from telemetry.events import ERROR, EventBus
+
+
+def _panel(seed=0):
+    return build_panel(0, "simulated", seed, 2.0, EventBus(level=ERROR))
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.02)
+
+
+def test_restore_carries_over_the_published_snapshot():
+    old = _panel()
+    old.system_state = DecisionManager.STATE_CLEANING_WIND
+    old.cleaning_ctrl.water_volume = 1.25
+    old.actuator_ctrl.current_base_angle = 210.0
+    old.actuator_ctrl.current_tilt_angle = 35.0
+    old.wind_clean_start_time = 1234.5
+    row = np.zeros(len(PANEL_FIELDS))
+    _publish_panel(old, row, 99.0)
+
+    new = _panel(seed=1)
+    _restore_panel(new, row)
+    assert new.system_state == DecisionManager.STATE_CLEANING_WIND
+    assert new.cleaning_ctrl.water_volume == 1.25
+    assert new.actuator_ctrl.current_base_angle == 210.0
+    assert new.actuator_ctrl.current_tilt_angle == 35.0
+    assert new.wind_clean_start_time == 1234.5
+
+
+def test_first_start_restores_nothing():
+    mgr = _panel()
+    state, water = mgr.system_state, mgr.cleaning_ctrl.water_volume
+    row = np.zeros(len(PANEL_FIELDS))
+    row[0] = 3.0
+    _restore_panel(mgr, row)
+    assert (mgr.system_state, mgr.cleaning_ctrl.water_volume) == (state, water)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_killed_worker_restarts_from_its_snapshot():
+    fleet = FleetRunner(2, num_workers=1, tick_interval=0.05, seed=3,
+                        events=EventBus(level=ERROR))
+    fleet.start()
+    try:
+        _wait_for(lambda: fleet.panel_ticks() > 0)
+        os.kill(fleet._processes[0].pid, signal.SIGKILL)
+        fleet._processes[0].join()
+
+        # What the dead worker last published is what its successor resumes from
+        fleet._panels[:, 1] = 0.5  # water_volume
+        ticks = fleet.stats()[0]["ticks"]
+        assert fleet.supervise() == [0]
+        _wait_for(lambda: fleet.stats()[0]["ticks"] > ticks + 2)
+
+        assert fleet.restarts == [1]
+        water = fleet.snapshot()["water_volume"]
+        assert np.all(water <= 0.5)
+        assert fleet.supervise() == []
+    finally:
+        fleet.stop()
@@ -0,0 +1,102 @@
+import sys
+import threading
+import types
+
+import pytest
+
+from hal import available_backends, backend_class, load_backend, register_backend, registry
+from hal.stub import StubActuatorDriver
+from telemetry.events import WARNING, EventBus
+
+
+class FakePwm:
+    def __init__(self, gpio, pin, frequency):
+        self.gpio = gpio
+        self.pin = pin
+        self.duty_cycles = []
+
+    def start(self, duty_cycle):
+        self.duty_cycles.append(duty_cycle)
+
+    def ChangeDutyCycle(self, duty_cycle):
+        self.duty_cycles.append(duty_cycle)
+
+    def stop(self):
+        self.gpio.stopped.append(self.pin)
+
+
+@pytest.fixture
+def gpio(monkeypatch):
+    """A stand-in RPi.GPIO, so the hardware drivers import off a Pi."""
+    module = types.ModuleType("RPi.GPIO")
+    module.BCM, module.OUT, module.HIGH, module.LOW = "BCM", "OUT", 1, 0
+    module.pins = {}
+    module.stopped = []
+    module.cleaned = []
+    module.setmode = lambda mode: None
+    module.setup = lambda pin, direction, initial=None: module.pins.__setitem__(pin, initial)
+    module.output = module.pins.__setitem__
+    module.PWM = lambda pin, frequency: FakePwm(module, pin, frequency)
+    module.cleanup = lambda *pins: module.cleaned.append(pins)
+    package = types.ModuleType("RPi")
+    package.GPIO = module
+    monkeypatch.setitem(sys.modules, "RPi", package)
+    monkeypatch.setitem(sys.modules, "RPi.GPIO", module)
+    for name in ("hal.pwm", "hal.gpio"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    return module
+
+
+def _quiet():
+    return EventBus(level=WARNING)
+
+
+def test_pwm_move_pulses_then_releases(gpio):
+    driver = load_backend("actuator", "pwm", {"settle_time": 0.0}, events=_quiet())
+    assert driver.rotate_base(0.0, 180.0) is None
+    assert driver.tilt_top(0.0, 90.0) is None
+    base, tilt = driver._pwm["base"], driver._pwm["tilt"]
+    assert base.duty_cycles == [0, 7.5, 0]
+    assert tilt.duty_cycles == [0, 7.0, 0]
+
+
+def test_pwm_base_stopped_midway_has_swept_linearly(gpio):
+    driver = load_backend("actuator", "pwm", {"settle_time": 0.4}, events=_quiet())
+    threading.Timer(0.2, driver.stop).start()
+    # 350 -> 10 crosses the servo's whole range instead of wrapping past 0
+    reached = driver.rotate_base(350.0, 10.0)
+    assert reached is not None
+    assert 90.0 < reached < 270.0
+
+
+def test_pwm_close_releases_only_its_own_pins(gpio):
+    driver = load_backend("actuator", "pwm", {"base_pin": 12, "tilt_pin": 13}, events=_quiet())
+    driver.close()
+    assert sorted(gpio.stopped) == [12, 13]
+    assert gpio.cleaned == [((12, 13),)]
+
+
+def test_gpio_cleaning_driver_switches_active_low_relays(gpio):
+    driver = load_backend("cleaning", "gpio", {"active_high": False}, events=_quiet())
+    assert gpio.pins == {23: gpio.HIGH, 24: gpio.HIGH}
+    driver.set_pump(True)
+    assert gpio.pins[23] == gpio.LOW
+    driver.close()
+    assert gpio.pins == {23: gpio.HIGH, 24: gpio.HIGH}
+    assert gpio.cleaned == [((23, 24),)]
+
+
+def test_registry_resolves_and_rejects_backends():
+    assert "pwm" in available_backends("actuator")
+    assert backend_class("actuator", "stub") is StubActuatorDriver
+    with pytest.raises(ValueError, match="Unknown actuator backend"):
+        backend_class("actuator", "servo-hat")
+
+    class Custom(StubActuatorDriver):
+        pass
+
+    register_backend("actuator", "test-custom", Custom)
+    try:
+        assert isinstance(load_backend("actuator", "test-custom", events=_quiet()), Custom)
+    finally:
+        del registry._BACKENDS["actuator"]["test-custom"]
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from Controllers.sensor_controller import SensorController
+from managers.decision_manager import DecisionManager
+from managers.event_driven_manager import EventDrivenDecisionManager
+from telemetry.events import WARNING, EventBus
+from telemetry.metrics import ControlLoopMetrics
+
+
+def _manager(metrics):
+    quiet = EventBus(level=WARNING)
+    return DecisionManager(SensorController(mode="simulated", seed=0),
+                           ActuatorController(events=quiet, metrics=metrics),
+                           CleaningController(initial_water_volume=1e9, events=quiet, metrics=metrics),
+                           events=quiet, metrics=metrics)
+
+
+def _run_sync(mgr, ticks):
+    for _ in range(ticks):
+        mgr.run_logic()
+
+
+def _run_async(mgr, ticks):
+    async def loop():
+        for _ in range(ticks):
+            await mgr.run_logic_async()
+    asyncio.run(loop())
+
+
+def _run_event_driven(mgr, ticks):
+    runner = EventDrivenDecisionManager(mgr)
+    for _ in range(ticks):
+        runner.step()
+
+
+@pytest.mark.parametrize("run", [_run_sync, _run_async, _run_event_driven])
+def test_every_runtime_records_phases_and_finishes_profiles(run):
+    metrics = ControlLoopMetrics()
+    mgr = _manager(metrics)
+    metrics.start_profile(ticks=3, sample_every=2)
+    run(mgr, 6)
+    assert metrics.last_profile and "function calls" in metrics.last_profile
+    assert metrics.tick_seconds.count() == 6
+    for phase in ControlLoopMetrics.PHASES:
+        assert metrics.phase_seconds.count(phase) == 6
+    # The profile finished, so a new one can start
+    metrics.start_profile(ticks=1)
+    run(mgr, 1)
+
+
+def test_overlapping_and_empty_profiles_are_refused():
+    metrics = ControlLoopMetrics()
+    with pytest.raises(ValueError):
+        metrics.start_profile(ticks=0)
+    metrics.start_profile(ticks=2)
+    with pytest.raises(RuntimeError):
+        metrics.start_profile(ticks=2)
+
+
+def test_prometheus_text_lists_transitions():
+    metrics = ControlLoopMetrics()
+    metrics.record_switch("SUN_TRACKING", "CLEANING_WIND")
+    metrics.record_switch("CLEANING_WIND", "CLEANING_WIND")
+    text = metrics.registry.render()
+    assert 'solar_state_transitions_total{from_state="SUN_TRACKING",to_state="CLEANING_WIND"} 1' in text
+    assert 'solar_switch_state_calls_total{to_state="CLEANING_WIND"} 2' in text
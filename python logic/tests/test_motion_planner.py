@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+
+from Controllers.actuator_controller import ActuatorController
+from Controllers.motion_planner import MotionPlanner, shortest_azimuth_delta
+from managers.simulation import VirtualClock
+from telemetry.events import WARNING, EventBus
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock()
+
+
+def _planner(clock, **kwargs):
+    return MotionPlanner(ActuatorController(events=EventBus(level=WARNING)), clock=clock, **kwargs)
+
+
+@pytest.mark.parametrize("start, end, delta", [(359, 1, 2), (1, 359, -2), (0, 180, -180), (90, 270, -180),
+                                               (10, 40, 30)])
+def test_shortest_azimuth_delta(start, end, delta):
+    assert shortest_azimuth_delta(start, end) == delta
+
+
+def test_setpoints_within_the_deadband_are_dropped(clock):
+    planner = _planner(clock, base_deadband=2.0, tilt_deadband=1.0)
+    assert planner.tilt_top_to(30)
+    assert not planner.tilt_top_to(30.5)
+    assert planner.tilt_top_to(32)
+    assert planner.current_tilt_angle == 32
+    assert planner.stats()["skipped_deadband"] == 1
+
+
+def test_azimuth_error_wraps_round_north(clock):
+    planner = _planner(clock, base_deadband=3.0)
+    planner.rotate_base_to(180)
+    planner.rotate_base_to(359)
+    # 359° -> 1° is 2° of error, inside the deadband (not 358°)
+    assert not planner.rotate_base_to(1)
+    assert planner.rotate_base_to(5)
+    assert planner.current_base_angle == 5
+    assert planner.stats()["base_travel"] == pytest.approx(180 + 179 + 6)
+
+
+def test_sun_tracking_rotates_the_base_the_short_way(clock):
+    planner = _planner(clock)
+    planner.rotate_base_to(355)
+    travel = planner.base_travel
+    planner.move_panel_for_sun(5, 40)  # 10° away: under the 15° threshold
+    assert planner.current_base_angle == 355
+    planner.move_panel_for_sun(20, 40)  # 25° away across north
+    assert planner.current_base_angle == 20
+    assert planner.base_travel - travel == pytest.approx(25)
+
+
+def test_flip_hysteresis_keeps_the_base_from_swinging(clock):
+    planner = _planner(clock, flip_hysteresis=5.0)
+    planner.move_panel_for_sun(100, 80)
+    base = planner.current_base_angle
+    planner.move_panel_for_sun(100, 93)  # past 90° but inside the band
+    assert planner.current_base_angle == base
+    planner.move_panel_for_sun(100, 96)
+    assert planner.current_base_angle == 280
+    planner.move_panel_for_sun(100, 87)  # back under 90° but inside the band
+    assert planner.current_base_angle == 280
+
+
+def test_rate_limited_setpoints_are_coalesced_and_issued_by_update(clock):
+    planner = _planner(clock, min_command_interval=10.0)
+    assert planner.tilt_top_to(10)
+    clock.sleep(2)
+    assert not planner.tilt_top_to(20)
+    assert not planner.tilt_top_to(30)  # the newest wins
+    planner.update()
+    assert planner.current_tilt_angle == 10
+    clock.sleep(8)
+    planner.update()
+    assert planner.current_tilt_angle == 30
+    assert planner.stats()["coalesced"] == 1
+
+
+def test_stop_discards_pending_setpoints_and_skips_repeats(clock):
+    planner = _planner(clock, min_command_interval=10.0)
+    planner.tilt_top_to(10)
+    planner.tilt_top_to(20)
+    planner.stop_actuators()
+    planner.stop_actuators()
+    clock.sleep(10)
+    planner.update()
+    assert planner.current_tilt_angle == 10
+    stats = planner.stats()
+    assert stats["discarded"] == 1
+    assert stats["skipped_stops"] == 1
+
+
+def test_stops_from_another_thread_while_planning(clock):
+    planner = _planner(clock, min_command_interval=1.0)
+    done = threading.Event()
+    errors = []
+
+    def stopper():
+        try:
+            while not done.is_set():
+                planner.stop_actuators()
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    thread = threading.Thread(target=stopper)
+    thread.start()
+    try:
+        for i in range(2000):
+            clock.sleep(0.5)
+            planner.move_panel_for_sun((i * 7) % 360, 10 + i % 70)
+            planner.update()
+    finally:
+        done.set()
+        thread.join()
+    assert not errors
+    assert planner.stats()["commands_issued"] > 0
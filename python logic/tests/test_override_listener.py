@@ -0,0 +1,75 @@
+import threading
+
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from Controllers.sensor_controller import SensorController
+from managers.decision_manager import DecisionManager
+from managers.override_listener import OverrideListener
+from managers.state_writer import LocalBackend
+from telemetry.events import WARNING, EventBus
+
+
+def _manager(listener, quiet):
+    return DecisionManager(SensorController(mode="simulated", seed=0),
+                           ActuatorController(events=quiet),
+                           CleaningController(mode="simulated", initial_water_volume=1e9, events=quiet),
+                           events=quiet, override_listener=listener)
+
+
+def test_pushed_commands_are_queued_and_cleared_at_the_source():
+    backend = LocalBackend()
+    listener = OverrideListener(backend, events=EventBus(level=WARNING)).start()
+    backend.publish_override("force_clean")
+    assert backend.override_command is None
+    backend.publish_override("")  # the echo of a clear is ignored
+    assert listener.pending
+    assert [o.command for o in listener.drain()] == ["force_clean"]
+    assert listener.drain() == []
+    listener.close()
+    backend.publish_override("resume")
+    assert listener.received == 1
+
+
+def test_wait_returns_early_when_a_command_arrives():
+    backend = LocalBackend()
+    listener = OverrideListener(backend, events=EventBus(level=WARNING)).start()
+    threading.Timer(0.05, backend.publish_override, ("resume",)).start()
+    assert listener.wait(5.0)
+    listener.close()
+
+
+def test_sources_without_push_are_polled():
+    backend = LocalBackend()
+
+    class PollOnly:
+        get_override_command = staticmethod(backend.get_override_command)
+        clear_override_command = staticmethod(backend.clear_override_command)
+
+    listener = OverrideListener(PollOnly(), poll_interval=0.01, events=EventBus(level=WARNING)).start()
+    backend.override_command = "force_clean"
+    assert listener.wait(5.0)
+    assert [o.command for o in listener.drain()] == ["force_clean"]
+    listener.close()
+    assert backend.override_command is None
+
+
+def test_stop_all_preempts_and_the_tick_applies_it():
+    quiet = EventBus(level=WARNING)
+    backend = LocalBackend()
+    listener = OverrideListener(backend, events=quiet).start()
+    mgr = _manager(listener, quiet)
+    stops = []
+    stop = mgr.actuator_ctrl.stop_actuators
+    mgr.actuator_ctrl.stop_actuators = lambda: (stops.append(1), stop())
+
+    backend.publish_override("stop_all")
+    assert stops == [1]  # right away, from the publishing thread
+    assert listener.emergencies == 1
+    mgr.run_logic()
+    assert mgr.system_state == mgr.STATE_IDLE
+    assert backend.calls == 1  # the clear; the tick never polled the backend
+
+    backend.publish_override("resume")
+    mgr.run_logic()
+    assert mgr.system_state != mgr.STATE_IDLE
+    listener.close()
@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+import pytest
+
+from managers.policy_sweep import PolicySweep, parameter_grid, synthetic_trace
+
+# Four one-minute samples: clean, then 30 % dust in a 5 m/s breeze
+TRACE = {
+    "timestamp": np.arange(4) * 60.0,
+    "dust": np.array([0.0, 30.0, 30.0, 30.0]),
+    "wind_speed": np.full(4, 5.0),
+    "wind_direction": np.full(4, 90.0),
+}
+
+
+def test_metrics_on_a_tiny_trace():
+    # Calm by the default threshold (water cleaning), windy by a 3 m/s one
+    results = PolicySweep(TRACE, workers=1).run(parameter_grid(wind_speed_threshold=[15, 3]))
+
+    # Dusty from the second sample; washed off on the step after
+    assert results["water_cleanings"].tolist() == [1, 0]
+    assert results["water_used"].tolist() == [0.125, 0.0]
+    assert results["dusty_hours"][0] == pytest.approx(60 / 3600)
+    assert results["mean_dust"][0] == pytest.approx(30 * 60 / 240)
+
+    # Facing into the wind for the rest of the trace, blowing dust off
+    assert results["wind_cleanings"].tolist() == [0, 1]
+    assert results["actuator_moves"].tolist() == [0, 1]
+    assert results["dusty_hours"][1] == pytest.approx(180 / 3600)
+    remaining = [30 * math.exp(-5e-5 * 5 * 60 * k) for k in (1, 2, 3)]
+    assert results["mean_dust"][1] == pytest.approx(sum(remaining) * 60 / 240)
+    assert results["failed_water_cleanings"].tolist() == [0, 0]
+
+
+def test_an_empty_reservoir_counts_as_a_failed_cleaning():
+    results = PolicySweep(TRACE, workers=1, initial_water_volume=0.1).run(parameter_grid())
+    assert results["failed_water_cleanings"].tolist() == [1]
+    assert results["water_used"].tolist() == [0.0]
+    assert results["dusty_hours"][0] == pytest.approx(180 / 3600)
+
+
+def test_worker_processes_match_a_single_process():
+    trace = synthetic_trace(days=3, interval=300.0, seed=2)
+    grid = parameter_grid(dust_threshold=[10, 20, 30], wind_speed_threshold=[5, 15])
+    single = PolicySweep(trace, workers=1).run(grid)
+    pooled = PolicySweep(trace, workers=2, chunk_size=2).run(grid)
+    for name, values in single.items():
+        np.testing.assert_array_equal(pooled[name], values, err_msg=name)
+
+
+def test_unknown_parameters_and_short_traces_are_rejected():
+    with pytest.raises(ValueError):
+        parameter_grid(dust_limit=[1, 2])
+    with pytest.raises(ValueError):
+        PolicySweep({f: v[:1] for f, v in TRACE.items()})
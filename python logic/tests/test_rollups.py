@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from telemetry.rollups import RollupEngine
+
+DAY = 86400.0
+T0 = 20000 * DAY
+
+
+def _samples(n, step=7.0, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = T0 + np.arange(n) * step
+    columns = {
+        "dust": rng.uniform(0, 50, n),
+        "wind_speed": rng.uniform(0, 20, n),
+        "base_angle": rng.uniform(0, 360, n),
+        "tilt_angle": rng.uniform(0, 90, n),
+        "water_volume": np.linspace(2.0, 1.0, n),
+    }
+    states = rng.choice([0, 1, 2], n)
+    return ts, columns, states
+
+
+def test_backfill_matches_incremental_ingest(tmp_path):
+    ts, columns, states = _samples(30000)
+    incremental = RollupEngine(str(tmp_path / "incremental"))
+    for i in range(len(ts)):
+        incremental.add_sample(ts[i], *(float(columns[f][i]) for f in
+                                        ("dust", "wind_speed", "base_angle", "tilt_angle", "water_volume")),
+                               int(states[i]))
+    incremental.flush()
+
+    backfilled = RollupEngine(str(tmp_path / "backfilled"))
+    cut = 0
+    for chunk in np.array_split(np.arange(len(ts)), 4):
+        # Chunk boundaries fall mid-day: the carry-over must line up
+        stop = chunk[-1] + 1
+        cut += backfilled.add_arrays(ts[cut:stop], {f: c[cut:stop] for f, c in columns.items()},
+                                     states[cut:stop], final=stop == len(ts))
+    backfilled.flush()
+
+    for res in incremental.resolutions:
+        _, expected = incremental.query(T0, ts[-1] + 1, resolution=res)
+        _, actual = backfilled.query(T0, ts[-1] + 1, resolution=res)
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            assert a.keys() == e.keys()
+            for key in e:
+                assert a[key] == pytest.approx(e[key], rel=1e-5), (res, key)
+
+
+def test_a_bucket_split_by_a_restart_is_returned_once(tmp_path):
+    root = str(tmp_path / "rollups")
+    engine = RollupEngine(root)
+    for i in range(30):
+        engine.add_sample(T0 + i, float(i), 1.0, 2.0, 3.0, 4.0, "SUN_TRACKING")
+    engine.close()  # the open minute is written as a partial row
+
+    engine = RollupEngine(root)
+    for i in range(30, 50):
+        engine.add_sample(T0 + i, float(i), 1.0, 2.0, 3.0, 4.0, "CLEANING_WIND")
+    for stored_too in (False, True):
+        if stored_too:
+            engine.flush()
+        _, rows = engine.query(T0, T0 + 60, resolution=60)
+        assert len(rows) == 1
+        row = rows[0]
+        assert row["count"] == 50
+        assert row["dust_mean"] == pytest.approx(24.5)
+        assert (row["dust_min"], row["dust_max"]) == (0.0, 49.0)
+        assert row["samples_sun_tracking"] == 30
+        assert row["samples_cleaning_wind"] == 20
+    engine.close()
+
+
+def _store_with_samples(path, n=5000):
+    from telemetry.timeseries_store import TimeSeriesStore
+
+    store = TimeSeriesStore(path)
+    ts, columns, states = _samples(n)
+    for i in range(n):
+        store.record_sample(ts[i], columns["dust"][i], columns["wind_speed"][i], columns["base_angle"][i],
+                            columns["tilt_angle"][i], columns["water_volume"][i], int(states[i]))
+    store.flush()
+    return store, ts
+
+
+def _hour_counts(engine, end):
+    _, rows = engine.query(T0, end, resolution=3600)
+    return [row["count"] for row in rows]
+
+
+def test_backfill_refuses_a_folder_that_already_holds_buckets(tmp_path):
+    from telemetry.rollups import backfill_from_csv, backfill_from_store
+
+    store, ts = _store_with_samples(str(tmp_path / "store"))
+    root = str(tmp_path / "rollups")
+    engine = RollupEngine(root)
+    assert engine.is_empty()
+    assert backfill_from_store(engine, store, 0, float("inf")) == len(ts)
+    counts = _hour_counts(engine, ts[-1] + 1)
+    assert sum(counts) == len(ts)
+
+    # Re-running the backfill (same engine, or reopened) must not double the counts
+    with pytest.raises(ValueError):
+        backfill_from_store(engine, store, 0, float("inf"))
+    engine.close()
+    engine = RollupEngine(root)
+    with pytest.raises(ValueError):
+        backfill_from_store(engine, store, 0, float("inf"))
+    csv_path = tmp_path / "log.csv"
+    csv_path.write_text("timestamp,dust,wind_speed,base_angle,tilt_angle,water_volume,state\n")
+    with pytest.raises(ValueError):
+        backfill_from_csv(engine, str(csv_path))
+    assert _hour_counts(engine, ts[-1] + 1) == counts
+    engine.close()
+
+    # Live-ingested buckets count too, even before they are written
+    live = RollupEngine(str(tmp_path / "live"))
+    live.add_sample(T0, 1.0, 1.0, 1.0, 1.0, 1.0, "SUN_TRACKING")
+    assert not live.is_empty()
+    with pytest.raises(ValueError):
+        backfill_from_store(live, store, 0, float("inf"))
+    live.close()
+    store.close()
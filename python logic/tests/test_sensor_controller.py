@@ -0,0 +1,57 @@
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from Controllers.sensor_controller import DEFAULT_TTL, SensorController
+from managers.decision_manager import DecisionManager
+from managers.simulation import VirtualClock
+from managers.tick_scheduler import AdaptiveTickScheduler
+from telemetry.events import WARNING, EventBus
+
+
+def test_cached_readings_expire_after_their_ttl():
+    clock = VirtualClock(1000.0)
+    sensors = SensorController(mode="real", clock=clock)
+    sensors.get_wind_speed()
+    sensors.get_wind_direction()  # same tick: from the same acquisition
+    assert (sensors.bus_transactions, sensors.cache_hits) == (1, 1)
+
+    clock.sleep(DEFAULT_TTL["wind_speed"] - 0.1)
+    sensors.get_wind_speed()
+    assert sensors.bus_transactions == 1
+    clock.sleep(0.1)
+    sensors.get_wind_speed()
+    assert sensors.bus_transactions == 2
+
+
+def test_ttl_follows_the_tick_interval():
+    clock = VirtualClock(1000.0)
+    sensors = SensorController(mode="real", clock=clock)
+    sensors.set_tick_interval(0.5)
+    assert sensors.ttl["wind_speed"] == 0.25
+    assert sensors.ttl["ambient_temperature"] == DEFAULT_TTL["ambient_temperature"]
+    sensors.get_wind_speed()
+    clock.sleep(0.25)
+    sensors.get_wind_speed()
+    assert sensors.bus_transactions == 2
+
+    simulated = SensorController(mode="simulated", seed=0)
+    simulated.set_tick_interval(0.5)
+    assert simulated.ttl == {}
+
+
+def test_fast_scheduler_ticks_never_reuse_a_reading():
+    clock = VirtualClock(1000.0)
+    quiet = EventBus(level=WARNING)
+    sensors = SensorController(mode="real", clock=clock)
+    mgr = DecisionManager(sensors, ActuatorController(events=quiet),
+                          CleaningController(mode="simulated", initial_water_volume=1e9, events=quiet),
+                          events=quiet, clock=clock)
+    scheduler = AdaptiveTickScheduler(mgr, clock=clock, sleep=clock.sleep,
+                                      channel_intervals={"wind_speed": 0.0})
+    mgr.system_state = mgr.STATE_CLEANING_WIND
+    mgr.dust_threshold = -1.0  # stay in wind cleaning
+    scheduler.poller.last_volatile_at = clock()  # 0.25 s ticks
+    for _ in range(8):
+        clock.sleep(scheduler.tick())
+    assert sensors.ttl["wind_speed"] == 0.125
+    assert scheduler.poller.reads["wind_speed"] == 8
+    assert sensors.bus_transactions == 8  # one fresh acquisition per tick
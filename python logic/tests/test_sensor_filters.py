@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from Controllers.sensor_filters import HampelFilter, default_filter_chains
+from managers.decision_manager import DecisionManager
+from managers.fleet_sensor_filter import default_fleet_filters
+from managers.simulation import VirtualClock
+from telemetry.events import WARNING, EventBus
+
+
+class _DustySensors:
+    """Dust reads 80 % until the first water cleaning, then 5 %."""
+
+    def __init__(self, cleaning_ctrl):
+        self.cleaning_ctrl = cleaning_ctrl
+        self.initial_volume = cleaning_ctrl.water_volume
+
+    def get_dust_percentage(self):
+        return 80.0 if self.cleaning_ctrl.water_volume >= self.initial_volume else 5.0
+
+    def get_wind_speed(self):
+        return 2.0  # calm: dust is cleaned with water
+
+    def get_wind_direction(self):
+        return 200.0
+
+
+@pytest.fixture
+def quiet():
+    return EventBus(level=WARNING)
+
+
+def test_hampel_rejects_spikes_both_ways_by_default():
+    hampel = HampelFilter(window=5, min_deviation=1.0)
+    for t in range(5):
+        hampel.update(10.0, t)
+    assert hampel.update(50.0, 5) == (10.0, "spike")
+    assert hampel.update(-30.0, 6) == (10.0, "spike")
+
+
+def test_hampel_high_side_lets_drops_through():
+    hampel = HampelFilter(window=5, min_deviation=1.0, side="high")
+    for t in range(5):
+        hampel.update(80.0, t)
+    assert hampel.update(5.0, 5) == (5.0, None)
+    assert hampel.update(200.0, 6) == (80.0, "spike")
+
+
+def test_hampel_rejects_unknown_side():
+    with pytest.raises(ValueError):
+        HampelFilter(side="up")
+
+
+def test_dust_drop_after_cleaning_is_not_held_back(quiet):
+    clock = VirtualClock()
+    cleaning_ctrl = CleaningController(mode="simulated", initial_water_volume=2.0, events=quiet)
+    mgr = DecisionManager(_DustySensors(cleaning_ctrl), ActuatorController(events=quiet),
+                          cleaning_ctrl, clock=clock, events=quiet,
+                          sensor_filters=default_filter_chains(quiet))
+    # Fill the filter windows with dusty readings, then resume
+    mgr.system_state = mgr.STATE_IDLE
+    for _ in range(10):
+        clock.sleep(2)
+        mgr.run_logic()
+    mgr.system_state = mgr.STATE_SUN_TRACKING
+    for _ in range(20):
+        clock.sleep(2)
+        mgr.run_logic()
+
+    # One cleaning, not one per tick the old dusty median was held
+    assert cleaning_ctrl.water_volume == pytest.approx(2.0 - cleaning_ctrl.water_usage_per_clean)
+    assert mgr.system_state == mgr.STATE_SUN_TRACKING
+
+
+def test_fleet_dust_filter_passes_drops_and_rejects_rises(quiet):
+    dust = default_fleet_filters(3, quiet)["dust"]
+    for t in range(10):
+        dust.process(np.full(3, 80.0), 2.0 * t)
+    out = dust.process(np.array([5.0, 80.0, 200.0]), 20.0)
+    assert out.tolist() == [5.0, 80.0, 80.0]
+    assert dust.flagged == {"spike": 1}
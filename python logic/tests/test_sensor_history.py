@@ -0,0 +1,108 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from Controllers.sensor_history import SensorHistory
+
+
+def _reference(values, window):
+    recent = values[-window:]
+    return np.mean(recent), min(recent), max(recent), np.percentile(recent, 90)
+
+
+def test_rolling_stats_match_a_full_recompute():
+    rng = random.Random(3)
+    history = SensorHistory(capacity=50, window=5, windows=(20, 50))
+    values = []
+    for _ in range(400):
+        values.append(history.append(rng.uniform(0, 100)))
+        for window in history.windows:
+            mean, low, high, p90 = _reference(values, window)
+            assert history.mean(window) == pytest.approx(mean)
+            assert history.min(window) == low
+            assert history.max(window) == high
+            assert history.percentile(90, window) == pytest.approx(p90)
+    assert len(history) == 50
+    assert history.values(3) == values[-3:]
+
+
+def test_non_finite_samples_are_skipped():
+    rng = random.Random(7)
+    history = SensorHistory(capacity=50, window=5, smoothing="median")
+    finite = []
+    for i in range(500):
+        value = rng.uniform(0, 100)
+        if i % 17 == 16:
+            value = (math.nan, math.inf, -math.inf)[i % 3]
+            assert history.append(value) is None
+        else:
+            history.append(value)
+            finite.append(value)
+        assert history.smoothed() == pytest.approx(np.median(finite[-5:]))
+    assert history.skipped == 29
+    assert history.latest == finite[-1]
+    assert not any(math.isnan(v) for v in history.values())
+
+
+def test_smoothed_is_none_until_a_finite_reading():
+    history = SensorHistory(window=3)
+    history.append(math.nan)
+    assert history.smoothed() is None
+    assert history.mean() is None and history.percentile(50) is None
+    history.append(4.0)
+    assert history.smoothed() == 4.0
+
+
+@pytest.mark.parametrize("q", [-1, 100.5, 150])
+def test_percentile_rejects_q_outside_0_to_100(q):
+    history = SensorHistory(window=3)
+    history.append(1.0)
+    with pytest.raises(ValueError):
+        history.percentile(q)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"window": 0},
+    {"capacity": 10, "window": 11},
+    {"capacity": 10, "window": 5, "windows": (0,)},
+    {"capacity": 10, "window": 5, "windows": (20,)},
+    {"smoothing": "mode"},
+])
+def test_invalid_windows_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        SensorHistory(**kwargs)
+
+
+def test_unconfigured_window_is_rejected():
+    history = SensorHistory(capacity=100, window=10, windows=(60,))
+    history.append(1.0)
+    assert history.windows == (10, 60)
+    with pytest.raises(ValueError):
+        history.mean(30)
+
+
+def test_decisions_ignore_a_nan_reading():
+    from Controllers.actuator_controller import ActuatorController
+    from Controllers.cleaning_controller import CleaningController
+    from managers.decision_manager import DecisionManager
+    from telemetry.events import WARNING, EventBus
+
+    class Sensors:
+        readings = iter([10.0, 10.0, math.nan, 10.0])
+
+        def get_dust_percentage(self):
+            return next(self.readings)
+
+        def get_wind_speed(self):
+            return 2.0
+
+    quiet = EventBus(level=WARNING)
+    mgr = DecisionManager(Sensors(), ActuatorController(events=quiet),
+                          CleaningController(events=quiet), events=quiet,
+                          dust_history=SensorHistory(capacity=10, window=3, smoothing="median"))
+    for _ in range(4):
+        mgr.run_logic()
+    assert mgr.system_state == mgr.STATE_SUN_TRACKING
+    assert mgr.dust_history.skipped == 1
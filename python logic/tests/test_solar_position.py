@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from models.solar_position import SECONDS_PER_DAY, SolarEphemeris, sun_position_batch
+
+LAT, LON = 31.95, 35.93
+DAY_START = 19723 * SECONDS_PER_DAY  # 2024-01-01 00:00 UTC
+
+
+@pytest.mark.parametrize("resolution", [0, -60, 7, 100000])
+def test_resolution_must_divide_a_day(resolution):
+    with pytest.raises(ValueError):
+        SolarEphemeris(LAT, LON, resolution=resolution)
+
+
+@pytest.mark.parametrize("resolution", [1, 60, 3600, SECONDS_PER_DAY])
+def test_lookups_cover_the_whole_day(resolution):
+    ephemeris = SolarEphemeris(LAT, LON, resolution=resolution)
+    # First and last instants of the day, and the very end of the table
+    for timestamp in (DAY_START, DAY_START + SECONDS_PER_DAY - 0.001, DAY_START + 43200.5):
+        azimuth, elevation = ephemeris.get_sun_position(timestamp)
+        assert 0.0 <= azimuth < 360.0
+        assert -90.0 <= elevation <= 90.0
+
+
+def test_table_matches_the_full_ephemeris():
+    ephemeris = SolarEphemeris(LAT, LON)
+    timestamps = DAY_START + np.linspace(0, 3 * SECONDS_PER_DAY - 1, 500)
+    azimuth, elevation = ephemeris.get_sun_positions(timestamps)
+    exact_azimuth, exact_elevation = sun_position_batch(timestamps, LAT, LON)
+    # Compare azimuths the short way round north
+    assert np.max(np.abs((azimuth - exact_azimuth + 180) % 360 - 180)) < 0.05
+    assert np.max(np.abs(elevation - exact_elevation)) < 0.05
+    for timestamp, az, el in zip(timestamps[::50], azimuth[::50], elevation[::50]):
+        scalar_az, scalar_el = ephemeris.get_sun_position(timestamp)
+        assert scalar_az == pytest.approx(az, abs=1e-9)
+        assert scalar_el == pytest.approx(el, abs=1e-9)
+
+
+def test_day_tables_are_evicted_past_max_cached_days():
+    ephemeris = SolarEphemeris(LAT, LON, max_cached_days=2)
+    for day in range(4):
+        ephemeris.get_sun_position(DAY_START + day * SECONDS_PER_DAY + 600)
+    assert len(ephemeris._tables) == 2
@@ -0,0 +1,133 @@
+import json
+
+import pytest
+
+from managers.simulation import VirtualClock
+from managers.state_writer import LocalBackend, StateWriter
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock()
+
+
+def test_only_changed_state_fields_are_sent(clock):
+    backend = LocalBackend()
+    writer = StateWriter(backend, flush_interval=10.0, clock=clock)
+    writer.set_system_state({"currentState": "SUN_TRACKING", "windCleanStartTime": None})
+    clock.sleep(10)
+    writer.set_system_state({"currentState": "SUN_TRACKING", "windCleanStartTime": None})
+    assert backend.system_state == {"currentState": "SUN_TRACKING", "windCleanStartTime": None}
+    calls = backend.calls
+    clock.sleep(10)
+    writer.set_system_state({"currentState": "CLEANING_WIND", "windCleanStartTime": None})
+    assert backend.calls == calls + 1
+    assert writer.writes == 2
+
+
+def test_events_are_batched(clock):
+    backend = LocalBackend()
+    writer = StateWriter(backend, flush_interval=10.0, max_batch=5, clock=clock)
+    for i in range(4):
+        writer.log_event({"description": f"event {i}"})
+    assert backend.events == []
+    writer.log_event({"description": "event 4"})
+    assert [e["description"] for e in backend.events] == [f"event {i}" for i in range(5)]
+    assert backend.calls == 1
+
+
+def test_outbox_is_replayed_in_order_after_an_outage(clock, tmp_path):
+    outbox = str(tmp_path / "outbox.jsonl")
+    backend = LocalBackend()
+    backend.online = False
+    writer = StateWriter(backend, max_batch=2, outbox_path=outbox, clock=clock)
+    for i in range(5):
+        writer.log_event({"description": f"event {i}"})
+    writer.flush()
+    with open(outbox, encoding="utf-8") as f:
+        assert len(f.readlines()) == 5
+    assert writer.backlog == 5
+
+    # A restarted writer picks up the spooled events
+    writer = StateWriter(backend, max_batch=2, outbox_path=outbox, clock=clock)
+    assert writer.backlog == 5
+    backend.online = True
+    writer.log_event({"description": "event 5"})
+    assert writer.flush()
+    assert [e["description"] for e in backend.events] == [f"event {i}" for i in range(6)]
+    assert writer.backlog == 0
+    assert not (tmp_path / "outbox.jsonl").exists()
+
+
+def test_replay_interrupted_midway_keeps_the_unsent_remainder(clock, tmp_path):
+    outbox = tmp_path / "outbox.jsonl"
+    outbox.write_text("".join(json.dumps({"description": f"event {i}"}) + "\n" for i in range(6)))
+
+    class FlakyBackend(LocalBackend):
+        drop_after = 2
+
+        def log_events(self, events):
+            super().log_events(events)
+            if len(self.events) == self.drop_after:
+                self.online = False  # the uplink drops after the first batch
+
+    backend = FlakyBackend()
+    writer = StateWriter(backend, max_batch=2, outbox_path=str(outbox), clock=clock)
+    assert not writer.flush()
+    assert [e["description"] for e in backend.events] == ["event 0", "event 1"]
+    assert writer.backlog == 4
+    assert len(outbox.read_text().splitlines()) == 4
+
+    backend.online = True
+    assert writer.flush()
+    assert [e["description"] for e in backend.events] == [f"event {i}" for i in range(6)]
+
+
+def test_full_outbox_refuses_new_events(clock):
+    backend = LocalBackend()
+    backend.online = False
+    writer = StateWriter(backend, max_batch=100, max_outbox_events=3, clock=clock)
+    assert all(writer.log_event({"description": "x"}) for _ in range(3))
+    assert not writer.log_event({"description": "x"})
+    assert writer.dropped_events == 1
+    assert writer.backpressure
+
+
+def test_override_commands_survive_an_offline_backend(clock):
+    backend = LocalBackend()
+    writer = StateWriter(backend, clock=clock)
+    backend.override_command = "stop_all"
+    assert writer.get_override_command() == "stop_all"
+    writer.clear_override_command()
+    assert backend.override_command is None
+    backend.online = False
+    assert writer.get_override_command() is None
+    writer.clear_override_command()  # swallowed
+
+
+def test_state_changes_are_sent_without_waiting_for_a_flush(clock):
+    backend = LocalBackend()
+    writer = StateWriter(backend, flush_interval=60.0, clock=clock)
+    writer.set_system_state({"currentState": "SUN_TRACKING"})
+    clock.sleep(2)
+    writer.set_system_state({"currentState": "CLEANING_WIND"})
+    assert backend.system_state == {"currentState": "CLEANING_WIND"}
+    clock.sleep(2)
+    calls = backend.calls
+    writer.set_system_state({"currentState": "CLEANING_WIND"})
+    assert backend.calls == calls
+
+
+def test_failed_state_send_is_retried_by_the_next_flush(clock):
+    backend = LocalBackend()
+    writer = StateWriter(backend, flush_interval=10.0, clock=clock)
+    backend.online = False
+    writer.set_system_state({"currentState": "IDLE"})
+    assert writer.failed_flushes == 1
+    backend.online = True
+    clock.sleep(2)
+    writer.set_system_state({"currentState": "IDLE"})  # unchanged: no retry yet
+    assert backend.system_state != {"currentState": "IDLE"}
+    clock.sleep(10)
+    writer.set_system_state({"currentState": "IDLE"})
+    assert backend.system_state == {"currentState": "IDLE"}
@@ -0,0 +1,80 @@
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from Controllers.sensor_controller import SensorController
+from managers.decision_manager import DecisionManager
+from managers.simulation import VirtualClock
+from managers.tick_scheduler import AdaptiveTickScheduler, ChannelPoller
+from models.solar_position import SECONDS_PER_DAY, SolarEphemeris
+from telemetry.events import WARNING, EventBus
+
+LAT, LON = 24.7136, 46.6753
+NOON = 19723 * SECONDS_PER_DAY + 9 * 3600       # ~local solar noon in Riyadh
+MIDNIGHT = NOON + 12 * 3600
+
+
+def _scheduler(start, ephemeris=None, **kwargs):
+    clock = VirtualClock(start)
+    quiet = EventBus(level=WARNING)
+    mgr = DecisionManager(SensorController(mode="simulated", seed=0),
+                          ActuatorController(events=quiet),
+                          CleaningController(mode="simulated", initial_water_volume=1e9, events=quiet),
+                          solar_ephemeris=ephemeris, events=quiet, clock=clock)
+    return AdaptiveTickScheduler(mgr, clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def test_interval_follows_the_state():
+    scheduler, _ = _scheduler(NOON)
+    mgr = scheduler.mgr
+    expected = {mgr.STATE_SUN_TRACKING: 2.0, mgr.STATE_CLEANING_WIND: 1.0,
+                mgr.STATE_CLEANING_WATER: 1.0, mgr.STATE_IDLE: 30.0}
+    for state, interval in expected.items():
+        mgr.system_state = state
+        assert scheduler.next_interval() == interval
+
+
+def test_volatile_readings_speed_up_the_tick_for_a_while():
+    scheduler, clock = _scheduler(NOON)
+    scheduler.poller.last_volatile_at = clock()
+    assert scheduler.next_interval() == 0.5
+    scheduler.mgr.system_state = scheduler.mgr.STATE_CLEANING_WIND
+    assert scheduler.next_interval() == 0.25     # clamped to min_interval
+    clock.sleep(scheduler.volatile_hold)
+    assert scheduler.next_interval() == 1.0
+
+
+def test_channels_are_read_at_their_own_rate():
+    clock = VirtualClock(NOON)
+    poller = ChannelPoller(SensorController(mode="simulated", seed=0), clock=clock)
+    first = poller.get_dust_percentage()
+    clock.sleep(5.0)
+    assert poller.get_dust_percentage() == first
+    assert (poller.reads["dust"], poller.cached["dust"]) == (1, 1)
+    poller.set_state_intervals({"dust": 1.0})
+    poller.get_dust_percentage()
+    assert poller.reads["dust"] == 2
+    poller.set_state_intervals(None)
+    assert poller.intervals["dust"] == 10.0
+
+
+def test_sleeps_through_the_night_in_capped_steps():
+    ephemeris = SolarEphemeris(LAT, LON)
+    scheduler, clock = _scheduler(MIDNIGHT, ephemeris)
+    until_sunrise = scheduler.seconds_until_sunrise(clock())
+    assert 4 * 3600 < until_sunrise < 8 * 3600
+    assert scheduler.seconds_until_sunrise(NOON) == 0.0
+    assert scheduler.next_interval() == scheduler.night_max_sleep
+    assert scheduler.next_interval(clock() + until_sunrise - 300) <= 300 + 600
+
+    # Cleaning carries on at its own pace in the dark
+    scheduler.mgr.system_state = scheduler.mgr.STATE_CLEANING_WATER
+    assert scheduler.next_interval() == 1.0
+
+
+def test_a_night_takes_one_tick_per_max_sleep():
+    scheduler, clock = _scheduler(MIDNIGHT, SolarEphemeris(LAT, LON))
+    scheduler.mgr.system_state = scheduler.mgr.STATE_IDLE
+    scheduler.run(duration=4 * 3600)
+    stats = scheduler.stats()
+    assert stats["ticks"] == 4 * 3600 / scheduler.night_max_sleep + 1  # plus the closing tick
+    assert stats["night_sleeps"] == stats["ticks"]
+    assert stats["ticks_saved"] > 7000
@@ -0,0 +1,74 @@
+from managers.simulation import VirtualClock
+from managers.timer_wheel import TimerWheel
+
+
+def _wheel(resolution=1.0, slots=8):
+    clock = VirtualClock()
+    return clock, TimerWheel(resolution, slots=slots, clock=clock)
+
+
+def test_timer_fires_once_at_its_deadline():
+    clock, wheel = _wheel()
+    fired = []
+    wheel.schedule(5.0, fired.append)
+    clock.sleep(4.0)
+    assert wheel.advance() == 0
+    clock.sleep(1.0)
+    assert wheel.advance() == 1
+    assert fired == [clock()]
+    clock.sleep(10.0)
+    assert wheel.advance() == 0
+    assert wheel.pending == 0
+
+
+def test_timers_beyond_one_lap_wait_extra_rounds():
+    clock, wheel = _wheel(slots=8)
+    fired = []
+    wheel.schedule(3.0, lambda now: fired.append("short"))
+    wheel.schedule(19.0, lambda now: fired.append("long"))
+    for _ in range(18):
+        clock.sleep(1.0)
+        wheel.advance()
+    assert fired == ["short"]
+    clock.sleep(1.0)
+    wheel.advance()
+    assert fired == ["short", "long"]
+
+
+def test_a_long_gap_fires_everything_due():
+    clock, wheel = _wheel(slots=8)
+    fired = []
+    for delay in (2.0, 9.0, 30.0, 100.0):
+        wheel.schedule(delay, lambda now, d=delay: fired.append(d))
+    clock.sleep(50.0)
+    assert wheel.advance() == 3
+    assert sorted(fired) == [2.0, 9.0, 30.0]
+    assert wheel.pending == 1
+
+
+def test_cancelled_timers_never_fire():
+    clock, wheel = _wheel()
+    fired = []
+    timer = wheel.schedule(2.0, fired.append)
+    wheel.cancel(timer)
+    wheel.cancel(timer)  # idempotent
+    assert wheel.pending == 0
+    clock.sleep(5.0)
+    assert wheel.advance() == 0
+    assert fired == []
+
+
+def test_a_callback_can_cancel_a_timer_due_in_the_same_slot():
+    clock, wheel = _wheel()
+    fired = []
+    second = None
+
+    def first(now):
+        fired.append("first")
+        wheel.cancel(second)
+
+    wheel.schedule(2.0, first)
+    second = wheel.schedule(2.0, lambda now: fired.append("second"))
+    clock.sleep(2.0)
+    wheel.advance()
+    assert fired == ["first"]
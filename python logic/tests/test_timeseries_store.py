@@ -0,0 +1,73 @@
+import struct
+
+import pytest
+
+from Controllers.actuator_controller import ActuatorController
+from Controllers.cleaning_controller import CleaningController
+from Controllers.sensor_controller import SensorController
+from managers.decision_manager import DecisionManager
+from managers.simulation import VirtualClock
+from telemetry.events import WARNING, EventBus
+from telemetry.timeseries_store import (KIND_STATE_CHANGE, SAMPLE_RECORD, Segment, TimeSeriesStore,
+                                        VERSION)
+
+DAY = 86400.0
+
+
+def test_samples_span_partitions_and_decode_their_state(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    for i in range(6):
+        store.record_sample(DAY - 3 + i, i, 2 * i, 90.0, 30.0, 1.5, "CLEANING_WIND", wind_direction=10.0 * i)
+    assert store.samples.partitions() == [0, 86400]
+    rows = list(store.iter_samples(DAY - 2, DAY + 2))
+    assert [r[0] for r in rows] == [DAY - 2, DAY - 1, DAY, DAY + 1]
+    assert rows[0][1:4] == (1.0, 2.0, 10.0)
+    assert rows[0][-1] == "CLEANING_WIND"
+    arrays = list(store.sample_arrays(0, 2 * DAY))
+    assert sum(len(a) for a in arrays) == 6
+    store.close()
+
+
+def test_events_and_state_changes_round_trip(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    store.record_event(5.0, "Water reservoir empty or cleaning failed.", WARNING)
+    store.record_state_change(6.0, "SUN_TRACKING", "CLEANING_WATER")
+    changes = list(store.iter_events(0, 10, kind=KIND_STATE_CHANGE))
+    assert [e["message"] for e in changes] == ["SUN_TRACKING->CLEANING_WATER"]
+    assert len(list(store.iter_events(0, 10))) == 2
+    store.close()
+
+
+def test_retention_deletes_old_partitions(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), retention_days=2)
+    for day in range(5):
+        store.record_sample(day * DAY + 1, 0, 0, 0, 0, 0, "IDLE")
+    # Partitions that still overlap the last two days are kept
+    assert store.samples.partitions() == [2 * DAY, 3 * DAY, 4 * DAY]
+    store.close()
+
+
+def test_decision_manager_records_the_wind_direction(tmp_path):
+    clock = VirtualClock(1000.0)
+    quiet = EventBus(level=WARNING)
+    store = TimeSeriesStore(str(tmp_path))
+    mgr = DecisionManager(SensorController(mode="simulated", seed=3, clock=clock),
+                          ActuatorController(events=quiet), CleaningController(events=quiet),
+                          clock=clock, events=quiet, store=store)
+    for _ in range(5):
+        mgr.run_logic()
+        clock.sleep(2)
+    directions = [row[3] for row in store.iter_samples(0, 2000)]
+    assert len(directions) == 5
+    assert all(0.0 <= d < 360.0 for d in directions)
+    store.close()
+
+
+def test_segments_of_an_unknown_version_are_rejected(tmp_path):
+    path = str(tmp_path / "0.seg")
+    Segment(path, SAMPLE_RECORD).close()
+    with open(path, "r+b") as f:
+        f.seek(4)
+        f.write(struct.pack("<H", VERSION + 1))
+    with pytest.raises(ValueError, match="version"):
+        Segment(path, SAMPLE_RECORD, writable=False)
@@ -0,0 +1,94 @@
+import math
+
+import pytest
+
+from telemetry.events import INFO, WARNING
+from telemetry.wire_format import WireEncoder, decode_frame, decode_stream, iter_frames
+
+T0 = 1.7e9
+
+
+def test_sample_round_trip_is_quantized_to_hundredths():
+    encoder = WireEncoder()
+    encoder.add_sample(T0, 12.344, 4.2, 359.99, 120.5, 35.25, 1.875, "SUN_TRACKING")
+    encoder.add_sample(T0 + 2.0, math.nan, 4.3, 10.0, 359.5, 36.0, 1.75, "CLEANING_WIND")
+    records, end = decode_frame(encoder.finish())
+
+    first, second = records
+    assert first["type"] == "sample"
+    assert first["timestamp"] == pytest.approx(T0)
+    assert first["dust"] == pytest.approx(12.34)
+    assert first["wind_direction"] == pytest.approx(359.99)
+    assert first["base_angle"] == pytest.approx(120.5)
+    assert first["tilt_angle"] == pytest.approx(35.25)
+    assert first["water_volume"] == pytest.approx(1.875)
+    assert first["state"] == "SUN_TRACKING"
+    assert second["timestamp"] == pytest.approx(T0 + 2.0)
+    assert math.isnan(second["dust"])
+    # The base angle delta takes the short way round 0°
+    assert second["base_angle"] == pytest.approx(359.5)
+    assert second["state"] == "CLEANING_WIND"
+
+
+def test_state_and_event_round_trip():
+    encoder = WireEncoder()
+    encoder.add_state(T0, "CLEANING_WIND", T0 - 30.0)
+    encoder.add_state(T0 + 1.0, "SUN_TRACKING", None)
+    encoder.add_event(T0 + 1.5, "Wind cleaning finished.", INFO, "DecisionManager")
+    encoder.add_event(T0 + 1.5, "A message only this frame knows", WARNING, "custom-source")
+    encoder.add_event(T0 + 1.6, "A message only this frame knows", WARNING, None)
+    records, _ = decode_frame(encoder.finish())
+
+    assert [r["type"] for r in records] == ["state", "state", "event", "event", "event"]
+    assert records[0]["currentState"] == "CLEANING_WIND"
+    assert records[0]["windCleanStartTime"] == pytest.approx(T0 - 30.0)
+    assert records[1]["windCleanStartTime"] is None
+    assert records[2]["description"] == "Wind cleaning finished."
+    assert records[2]["source"] == "DecisionManager"
+    assert records[3]["source"] == "custom-source"
+    assert records[3]["level"] == WARNING
+    assert records[4]["description"] == "A message only this frame knows"
+    assert records[4]["source"] is None
+
+
+def test_long_gaps_reanchor_the_timestamps():
+    encoder = WireEncoder()
+    encoder.add_event(T0, "first")
+    encoder.add_event(T0 + 3600.0, "an hour later")
+    encoder.add_event(T0 + 10.0, "clock stepped back")
+    records, _ = decode_frame(encoder.finish())
+    assert [r["timestamp"] for r in records] == pytest.approx([T0, T0 + 3600.0, T0 + 10.0])
+
+
+def test_frames_are_self_contained_in_a_stream():
+    encoder = WireEncoder()
+    encoder.add_event(T0, "custom message")
+    first = encoder.finish()
+    encoder.add_event(T0 + 5.0, "custom message")
+    encoder.add_sample(T0 + 6.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, "IDLE")
+    second = encoder.finish()
+
+    stream = first + second
+    assert [bytes(frame) for frame in iter_frames(stream)] == [first, second]
+    records = decode_stream(stream)
+    assert [r["type"] for r in records] == ["event", "event", "sample"]
+    assert records[1]["description"] == "custom message"
+    assert records[2]["base_angle"] == pytest.approx(4.0)
+
+
+def test_finish_resets_the_encoder():
+    encoder = WireEncoder()
+    encoder.add_event(T0, "x")
+    encoder.finish()
+    records, _ = decode_frame(encoder.finish())
+    assert records == []
+
+
+def test_damaged_frames_are_rejected():
+    encoder = WireEncoder()
+    encoder.add_event(T0, "x")
+    frame = encoder.finish()
+    with pytest.raises(ValueError):
+        decode_frame(b"XX" + frame[2:])
+    with pytest.raises(ValueError):
+        decode_frame(frame[:-1])